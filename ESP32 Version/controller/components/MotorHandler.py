@@ -2,10 +2,15 @@
 # License: AGPL 3.0
 
 import uasyncio as asyncio
-from time import sleep
+from time import ticks_ms, ticks_diff
 from model.Motor import Motor
 from controller.SensorHandler import SensorHandler
 
+# Break-before-make: every relay off, wait DEAD_TIME_MS, then the new one on
+DEAD_TIME_MS = 100
+# A speed is held at least MIN_HOLD_MS to protect the relay contacts
+MIN_HOLD_MS = 5000
+
 
 class MotorHandler:
     """
@@ -18,6 +23,10 @@ class MotorHandler:
                            pin2=self.parameters.get_motor_pin2(),
                            pin3=self.parameters.get_motor_pin3(),
                            pin4=self.parameters.get_motor_pin4())
+        self.speed = 0
+        self.target = 0
+        self.changed_at = None
+        self.busy = False
         # Set all pins down for security reason before doing anything else
         self.all_pin_down()
 
@@ -28,11 +37,15 @@ class MotorHandler:
         self.motor.set_pin3_value(1)
         self.motor.set_pin4_value(1)
 
-    def set_motor_speed(self, speed):
+    async def set_motor_speed(self, speed):
         """
         Select the motor speed
         Be careful to always have ALL GPIO DOWN BEFORE TURNING ONE UP, to avoid a short circuit
         DANGER will be potentially handling high current and voltage
+
+        Dead time and hold time are awaited, so the other tasks keep running.
+        A call made while a change is in progress only updates the target:
+        the running change applies the latest one and the call returns at once.
         """
         # Restrain speed range in case of bad user input
         if speed < 0:
@@ -40,40 +53,30 @@ class MotorHandler:
         if speed > 4:
             speed = 4
 
-        if speed == 0:
-            self.all_pin_down()
-            print("Speed set to 0")
-        if speed == 1:
-            self.motor.set_pin2_value(1)
-            self.motor.set_pin3_value(1)
-            self.motor.set_pin4_value(1)
-            sleep(1)
-            self.motor.set_pin1_value(0)
-            print("Speed set to 1")
-        if speed == 2:
-            self.motor.set_pin1_value(1)
-            self.motor.set_pin3_value(1)
-            self.motor.set_pin4_value(1)
-            sleep(1)
-            self.motor.set_pin2_value(0)
-            print("Speed set to 2")
-            sleep(1)
-        if speed == 3:
-            self.motor.set_pin1_value(1)
-            self.motor.set_pin2_value(1)
-            self.motor.set_pin4_value(1)
-            sleep(1)
-            self.motor.set_pin3_value(0)
-            print("Speed set to 3")
-            sleep(1)
-        if speed == 4:
-            self.motor.set_pin1_value(1)
-            self.motor.set_pin2_value(1)
-            self.motor.set_pin3_value(1)
-            sleep(1)
-            self.motor.set_pin4_value(0)
-            print("Speed set to 4")
-            sleep(1)
+        self.target = speed
+        if self.busy:
+            return
+        self.busy = True
+        try:
+            while self.target != self.speed:
+                if self.changed_at is not None:
+                    wait = MIN_HOLD_MS - ticks_diff(ticks_ms(), self.changed_at)
+                    if wait > 0:
+                        await asyncio.sleep_ms(wait)
+                        continue
+                self.all_pin_down()
+                self.speed = 0
+                if self.target:
+                    await asyncio.sleep_ms(DEAD_TIME_MS)
+                # target may have changed during the dead time
+                speed = self.target
+                if speed:
+                    getattr(self.motor, "set_pin" + str(speed) + "_value")(0)
+                self.speed = speed
+                self.changed_at = ticks_ms()
+                print("Speed set to " + str(speed))
+        finally:
+            self.busy = False
 
 
 async def temp_control(motor_handler, parameters, sampling_time):
@@ -86,7 +89,7 @@ async def temp_control(motor_handler, parameters, sampling_time):
         # Manual Motor mode, let's the user choose his speed
         if parameters.get_motor_mode() == "manual":
             print("Choosen speed: " + str(parameters.get_motor_user_speed()))
-            motor_handler.set_motor_speed(parameters.get_motor_user_speed())
+            await motor_handler.set_motor_speed(parameters.get_motor_user_speed())
             await asyncio.sleep(60)
 
         # Auto Motor Mode, temperature driven
@@ -112,14 +115,14 @@ async def temp_control(motor_handler, parameters, sampling_time):
                 if speed > max_speed:
                     speed = max_speed
                 print("Mode Auto - " + "Temp: " + str(temp_value) + " speed: " + str(speed))
-                motor_handler.set_motor_speed(speed)
+                await motor_handler.set_motor_speed(speed)
             # Case if current temp is above targeted temp plus one hysteresis
             elif target < temp_value < (target + hysteresis):
                 speed = min_speed + 1
                 if speed > max_speed:
                     speed = max_speed
                 print("Mode Auto - " + "Temp: " + str(temp_value) + " speed: " + str(speed))
-                motor_handler.set_motor_speed(speed)
+                await motor_handler.set_motor_speed(speed)
             # Case if current temp is above targeted temp plus hysteresis,
             # but below target temp + two hysteresis
             elif (target + hysteresis) < temp_value < (target + hysteresis * 2):
@@ -127,14 +130,14 @@ async def temp_control(motor_handler, parameters, sampling_time):
                 if speed > max_speed:
                     speed = max_speed
                 print("Mode Auto - " + "Temp: " + str(temp_value) + " speed: " + str(speed))
-                motor_handler.set_motor_speed(speed)
+                await motor_handler.set_motor_speed(speed)
             # Case if current temp is above targeted temp plus two hysteresis,
             # but below target temp + three hysteresis
             elif (target + hysteresis * 2) <= temp_value < (target + hysteresis * 3):
                 speed = max_speed
                 print("Mode Auto - " + "Temp: " + str(temp_value) + " speed: " + str(speed))
-                motor_handler.set_motor_speed(speed)
+                await motor_handler.set_motor_speed(speed)
             else:
                 print("Temp above target: " + str(temp_value) + " speed set to max")
-                motor_handler.set_motor_speed(max_speed)
+                await motor_handler.set_motor_speed(max_speed)
             await asyncio.sleep(sampling_time)
@@ -0,0 +1,199 @@
+# app.py
+# Author : Progradius
+# License: AGPL-3.0
+# -------------------------------------------------------------
+#  Objet application : sous-systèmes construits à la demande
+# -------------------------------------------------------------
+"""
+``Application`` regroupe la construction de tous les sous-systèmes.
+
+‣ Importer ce module ne touche à rien : ni GPIO, ni bus I²C, ni réseau.
+‣ Le matériel passe par hal.backend : avec PHYTO_HAL=sim (ou hors Pi),
+  toute la pile démarre sur un Linux ordinaire ; Wi-Fi et NTP sont sautés.
+‣ Chaque sous-système est une ``cached_property`` : il est créé (avec ses
+  imports lourds — pydantic, RPi.GPIO, jinja2, requests…) au premier accès,
+  chronométré par la ``BootSequence``, puis réutilisé.
+‣ ``build()`` déroule l'ordre de démarrage sûr (config → GPIO → composants
+  → timers → capteurs) ; un outil ou un test peut n'en demander qu'une partie
+  (``Application().config`` ne charge que la configuration).
+"""
+
+from __future__ import annotations
+
+import asyncio
+from functools import cached_property
+from typing import TYPE_CHECKING
+
+from controllers.BootSequence import BootSequence
+from utils.pretty_console import success, warning
+
+if TYPE_CHECKING:
+    from param.config import AppConfig
+    from components.MotorHandler import MotorHandler
+    from controllers.SensorController import SensorController
+    from controllers.SystemStatus import SystemStatus
+    from controllers.PuppetMaster import PuppetMaster
+
+
+class Application:
+
+    def __init__(self, boot: BootSequence | None = None):
+        self.boot = boot or BootSequence()
+
+    # ──────────────────────────────────────────────────────────
+    #  Sous-systèmes (construits au premier accès)
+    # ──────────────────────────────────────────────────────────
+    @cached_property
+    def config(self) -> AppConfig:
+        from param.config import AppConfig
+        config = self.boot.run("config", AppConfig.load)
+        success("Configuration chargée")
+        return config
+
+    @property
+    def motor_pins(self) -> list[int]:
+        g = self.config.gpio
+        return [g.motor_pin1, g.motor_pin2, g.motor_pin3, g.motor_pin4]
+
+    @property
+    def generic_pins(self) -> list[int]:
+        """Sorties non moteur : OFF (HIGH) sans danger — surtout pas le moteur."""
+        g = self.config.gpio
+        return [g.dailytimer1_pin, g.dailytimer2_pin, g.cyclic1_pin, g.cyclic2_pin, g.heater_pin]
+
+    @cached_property
+    def gpio(self) -> bool:
+        """Broches dans l'état sûr : moteur LOW d'abord, puis génériques HIGH."""
+        def _init_safe_gpio() -> None:
+            from hal.backend import GPIO
+            from function import motor_all_pin_down_at_boot
+
+            motor_all_pin_down_at_boot(self.config)
+            GPIO.setwarnings(False)
+            GPIO.setmode(GPIO.BCM)
+            for pin in self.generic_pins:
+                GPIO.setup(pin, GPIO.OUT, initial=GPIO.HIGH)
+            for pin in self.motor_pins:
+                GPIO.setup(pin, GPIO.OUT, initial=GPIO.LOW)
+
+        self.boot.run("gpio", _init_safe_gpio)
+        success("GPIO initialisés (génériques=HIGH, moteur=LOW)")
+        return True
+
+    @cached_property
+    def components(self) -> dict:
+        from model.Component import Component
+        self.gpio
+        g = self.config.gpio
+        return self.boot.run("components", lambda: {
+            "light1":  Component(pin=g.dailytimer1_pin),
+            "light2":  Component(pin=g.dailytimer2_pin),
+            "cyclic1": Component(pin=g.cyclic1_pin),
+            "cyclic2": Component(pin=g.cyclic2_pin),
+            "heater":  Component(pin=g.heater_pin),
+        })
+
+    @cached_property
+    def motor_handler(self) -> MotorHandler:
+        from components.MotorHandler import MotorHandler
+        self.gpio
+        handler = self.boot.run("motor", MotorHandler, self.config)
+        success("Composants physiques initialisés")
+        return handler
+
+    @cached_property
+    def timers(self) -> dict:
+        """Les DailyTimers appliquent l'état planifié dès leur création."""
+        from model.DailyTimer import DailyTimer
+        from model.CyclicTimer import CyclicTimer
+        c, cfg = self.components, self.config
+        return self.boot.run("timers", lambda: {
+            "daily1":  DailyTimer(c["light1"],  timer_id="1", config=cfg),
+            "daily2":  DailyTimer(c["light2"],  timer_id="2", config=cfg),
+            "cyclic1": CyclicTimer(c["cyclic1"], timer_id="1", config=cfg),
+            "cyclic2": CyclicTimer(c["cyclic2"], timer_id="2", config=cfg),
+        })
+
+    @cached_property
+    def sensor_handler(self) -> SensorController:
+        """Bus ouvert, drivers sondés plus tard en parallèle (``background_boot``)."""
+        from controllers.SensorController import SensorController
+        return self.boot.run("sensor_bus", SensorController, self.config, probe=False)
+
+    @cached_property
+    def status(self) -> SystemStatus:
+        from controllers.SystemStatus import SystemStatus
+        return SystemStatus(
+            config=self.config,
+            component=self.components["light1"],
+            motor=self.motor_handler.motor,
+        )
+
+    @cached_property
+    def puppet_master(self) -> PuppetMaster:
+        from controllers.PuppetMaster import PuppetMaster
+        t = self.timers
+        return PuppetMaster(
+            config             = self.config,
+            controller_status  = self.status,
+            sensor_handler     = self.sensor_handler,
+            dailytimer1        = t["daily1"],
+            dailytimer2        = t["daily2"],
+            cyclic_timer1      = t["cyclic1"],
+            cyclic_timer2      = t["cyclic2"],
+            motor_handler      = self.motor_handler,
+            heater_component   = self.components["heater"],
+            boot               = self.boot,
+        )
+
+    # ──────────────────────────────────────────────────────────
+    #  Démarrage
+    # ──────────────────────────────────────────────────────────
+    def build(self) -> "Application":
+        """Étapes rapides, dans l'ordre sûr, puis l'orchestrateur."""
+        self.config
+        self.gpio
+        self.components
+        self.motor_handler
+        self.timers
+        self.sensor_handler
+        self.puppet_master
+        return self
+
+    async def _network_chain(self) -> None:
+        from hal.backend import is_simulated
+        from network.network_handler import do_connect, is_host_connected
+        # le ping n'a de sens qu'une fois le Wi-Fi tenté
+        if is_simulated():
+            self.boot.skip("wifi", "matériel simulé")
+        else:
+            await self.boot.run_async("wifi", do_connect, self.config, timeout=25)
+        state = await self.boot.run_async("host", is_host_connected, self.config, timeout=5)
+        if state != "online":
+            warning("Machine hôte hors-ligne → mode dégradé")
+
+    async def background_boot(self) -> None:
+        """Réseau, NTP et sondage capteurs en parallèle, chacun borné."""
+        from function import set_ntp_time
+        from hal.backend import is_simulated
+
+        async def _ntp() -> None:
+            if is_simulated():
+                self.boot.skip("ntp", "matériel simulé")
+            else:
+                await self.boot.run_async("ntp", set_ntp_time, timeout=15)
+
+        await asyncio.gather(
+            self._network_chain(),
+            _ntp(),
+            self.boot.run_coro("sensors", self.sensor_handler.probe_async(timeout=10), timeout=15),
+        )
+        self.boot.report()
+
+    async def run(self) -> None:
+        # boucles de contrôle + serveur d'abord…
+        main_task = asyncio.ensure_future(self.puppet_master.main_loop())
+        await asyncio.sleep(0)
+        # …puis réseau / NTP / capteurs en parallèle
+        boot_task = asyncio.ensure_future(self.background_boot())
+        await asyncio.gather(main_task, boot_task)
@@ -0,0 +1,116 @@
+# benchmarks/import_time.py
+# Author : Progradius
+# License: AGPL-3.0
+# -------------------------------------------------------------
+#  Coût d'import à froid (python -X importtime) + budget
+# -------------------------------------------------------------
+"""
+Mesure le temps d'import cumulé de chaque module cible dans un interpréteur
+neuf (``python -X importtime -c "import <module>"``), garde le minimum de
+``--repeat`` essais et le compare au budget de ``import_budget.json``.
+
+Le budget déclare aussi, par module, les dépendances lourdes qui ne doivent
+PAS être chargées à l'import (jinja2, requests, rich, RPi.GPIO…).
+
+    python benchmarks/import_time.py              # contrôle, code 1 si dépassement
+    python benchmarks/import_time.py --update     # réécrit les budgets (mesure × marge)
+    python benchmarks/import_time.py --top 15     # détail des imports les plus chers
+
+À lancer depuis « RPi Version/ ».
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+BUDGET_FILE = os.path.join(os.path.dirname(__file__), "import_budget.json")
+
+_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def measure(module: str) -> tuple[int | None, dict[str, int], str]:
+    """
+    Importe *module* dans un sous-processus.
+    Renvoie (cumul µs du module ou None si échec, {module chargé: self µs}, erreur).
+    """
+    env = dict(os.environ, PYTHONPATH=ROOT, PYTHONDONTWRITEBYTECODE="")
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, env=env, capture_output=True, text=True, timeout=60,
+    )
+    loaded: dict[str, int] = {}
+    total = None
+    for line in proc.stderr.splitlines():
+        m = _LINE.match(line)
+        if not m:
+            continue
+        self_us, cumul_us, indent, name = int(m[1]), int(m[2]), m[3], m[4]
+        loaded[name] = self_us
+        if name == module and len(indent) <= 1:
+            total = cumul_us
+    if proc.returncode != 0:
+        err = proc.stderr.strip().splitlines()
+        return None, loaded, err[-1] if err else f"code {proc.returncode}"
+    return total, loaded, ""
+
+
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--update", action="store_true", help="réécrit les budgets")
+    ap.add_argument("--margin", type=float, default=1.5, help="marge relative appliquée par --update")
+    ap.add_argument("--slack-ms", type=float, default=5.0, help="marge absolue minimale (--update)")
+    ap.add_argument("--top", type=int, default=0, help="affiche les N imports les plus chers")
+    args = ap.parse_args(argv)
+
+    with open(BUDGET_FILE, encoding="utf-8") as f:
+        budget = json.load(f)
+
+    failures = 0
+    print(f"{'module':<34} {'mesuré':>10} {'budget':>10}  statut")
+    for module, spec in budget["modules"].items():
+        best, loaded, err = None, {}, ""
+        for _ in range(max(1, args.repeat)):
+            total, loaded, err = measure(module)
+            if total is None:
+                break
+            best = total if best is None else min(best, total)
+
+        if best is None:
+            print(f"{module:<34} {'—':>10} {spec.get('max_us', '—'):>10}  IMPORT KO : {err}")
+            failures += 1
+            continue
+
+        forbidden = [m for m in spec.get("forbid", []) if m in loaded]
+        status = "ok"
+        if args.update:
+            spec["max_us"] = int(max(best * args.margin, best + args.slack_ms * 1000))
+            status = "budget mis à jour"
+        elif best > spec.get("max_us", best):
+            status = "DÉPASSEMENT"
+        if forbidden:
+            status = f"IMPORT INTERDIT : {', '.join(forbidden)}"
+        if status not in ("ok", "budget mis à jour"):
+            failures += 1
+        print(f"{module:<34} {best/1000:>8.1f}ms {spec['max_us']/1000:>8.1f}ms  {status}")
+
+        if args.top:
+            for name, us in sorted(loaded.items(), key=lambda kv: -kv[1])[:args.top]:
+                print(f"    {us/1000:>8.1f}ms  {name}")
+
+    if args.update:
+        with open(BUDGET_FILE, "w", encoding="utf-8") as f:
+            json.dump(budget, f, indent=2, ensure_ascii=False)
+            f.write("\n")
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
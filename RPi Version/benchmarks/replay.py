@@ -0,0 +1,396 @@
+# benchmarks/replay.py
+# Author : Progradius
+# License: AGPL-3.0
+# -------------------------------------------------------------
+#  Rejeu accéléré des boucles de contrôle sur une serre simulée
+# -------------------------------------------------------------
+"""
+Fait tourner les VRAIES coroutines de contrôle (timer_daily, timer_cyclic,
+climate_control, ou temp_control + heat_control avec ``--regulator legacy``)
+sur le matériel simulé, en temps virtuel, avec le modèle thermique et
+hydrique de hal/sim/greenhouse.py. Deux semaines se rejouent en quelques
+secondes, de façon déterministe.
+
+Sorties :
+  • commutations par sortie (usure des relais) et taux d'activation ;
+    par actionneur (chauffage, extraction = somme des relais moteur), avec
+    les plus courtes périodes ON / OFF du chauffage (court-cycle) ;
+  • climat : % du temps dans la bande de consigne jour/nuit, dessous, dessus ;
+    % du temps au-dessus de l'humidité maximale ;
+  • énergie : chauffage et extraction (kWh) ;
+  • erreur de timing par évènement planifié (DailyTimer : heure ON/OFF ;
+    Cyclic séquentiel : durée ON/OFF ; Cyclic journalier : heure ON).
+
+    python benchmarks/replay.py --days 14
+    python benchmarks/replay.py --days 7 --motor-mode auto --json replay.json
+    python benchmarks/replay.py --days 7 --motor-mode auto --regulator legacy
+
+À lancer depuis « RPi Version/ ».
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+
+from utils import pretty_console as pc                      # noqa: E402
+from utils.timebase import VirtualClock                      # noqa: E402
+
+
+# ──────────────────────────────────────────────────────────────
+#  Enregistrement des commutations
+# ──────────────────────────────────────────────────────────────
+class SwitchRecorder:
+    """Horodate (temps virtuel) chaque changement de niveau des sorties."""
+
+    def __init__(self, clock, gpio, outputs: dict, start: datetime):
+        self.clock = clock
+        self.outputs = outputs                  # nom → (pin, actif_bas)
+        self.events: dict[str, list] = {name: [] for name in outputs}
+        self._last: dict[int, int] = {}
+        for name, (pin, active_low) in outputs.items():
+            self._last[pin] = gpio.level(pin)
+            initial_on = (self._last[pin] == 0) if active_low else bool(self._last[pin])
+            self.events[name].append((start, initial_on))
+            gpio.watch(pin, self._make_cb(name, active_low))
+
+    def _make_cb(self, name: str, active_low: bool):
+        def _cb(pin: int, level: int) -> None:
+            if self._last.get(pin) == level:
+                return
+            self._last[pin] = level
+            self.events[name].append((self.clock.now(), (level == 0) if active_low else bool(level)))
+        return _cb
+
+    def switches(self, name: str) -> int:
+        return max(0, len(self.events[name]) - 1)
+
+    def shortest(self, name: str) -> tuple:
+        """Plus courtes périodes ON et OFF complètes (s) ; None si aucune."""
+        evs = self.events[name]
+        spans = {True: [], False: []}
+        for (t, state), (nxt, _) in zip(evs[1:], evs[2:]):
+            spans[state].append((nxt - t).total_seconds())
+        return tuple(round(min(spans[s]), 1) if spans[s] else None for s in (True, False))
+
+    def on_ratio(self, name: str, end: datetime) -> float:
+        evs = self.events[name]
+        total = (end - evs[0][0]).total_seconds() or 1.0
+        on = 0.0
+        for (t, state), nxt in zip(evs, evs[1:] + [(end, None)]):
+            if state:
+                on += (nxt[0] - t).total_seconds()
+        return on / total
+
+
+# ──────────────────────────────────────────────────────────────
+#  Erreurs de timing
+# ──────────────────────────────────────────────────────────────
+def _summary(errors: list, missed: int = 0) -> dict:
+    if not errors:
+        return {"events": 0, "missed": missed}
+    abs_err = sorted(abs(e) for e in errors)
+    return {
+        "events":  len(errors),
+        "missed":  missed,
+        "mean_s":  round(statistics.fmean(errors), 2),
+        "p95_s":   round(abs_err[min(len(abs_err) - 1, int(0.95 * len(abs_err)))], 2),
+        "max_s":   round(abs_err[-1], 2),
+    }
+
+
+def daily_timing(events: list, blk, start: datetime, end: datetime) -> dict:
+    """Écart entre l'heure planifiée de ON/OFF et la commutation observée."""
+    if not blk.enabled:
+        return {"events": 0, "missed": 0}
+    expected = []
+    day = start.date()
+    while datetime.combine(day, datetime.min.time()) <= end:
+        base = datetime.combine(day, datetime.min.time())
+        expected.append((base + timedelta(hours=blk.start_hour, minutes=blk.start_minute), True))
+        # la plage inclut la minute d'arrêt : OFF attendu à hh:mm + 1 min
+        expected.append((base + timedelta(hours=blk.stop_hour, minutes=blk.stop_minute + 1), False))
+        day += timedelta(days=1)
+
+    transitions = events[1:]
+    errors, missed = [], 0
+    for when, state in expected:
+        if not (start < when <= end - timedelta(minutes=5)):
+            continue
+        hit = next((t for t, s in transitions if s == state and t >= when - timedelta(minutes=2)), None)
+        if hit is None or (hit - when) > timedelta(hours=1):
+            missed += 1
+        else:
+            errors.append((hit - when).total_seconds())
+    return _summary(errors, missed)
+
+
+def sequential_timing(events: list, blk, cfg) -> dict:
+    """Durée ON/OFF observée vs durée configurée (phase jour/nuit au début)."""
+    from components.cyclic_timer_handler import _is_day_from
+    errors = []
+    for (t0, s0), (t1, _) in zip(events[1:], events[2:]):
+        day = _is_day_from(cfg, t0)
+        if s0:
+            wanted = blk.on_time_day if day else blk.on_time_night
+        else:
+            wanted = blk.off_time_day if day else blk.off_time_night
+        errors.append((t1 - t0).total_seconds() - wanted)
+    return _summary(errors)
+
+
+def journalier_timing(events: list, blk, start: datetime, end: datetime) -> dict:
+    interval = 86400 // blk.triggers_per_day
+    expected = []
+    day = start.date()
+    while day <= end.date():
+        if day.toordinal() % blk.period_days == 0:
+            t0 = datetime.combine(day, datetime.min.time()) + timedelta(hours=blk.first_trigger_hour)
+            expected += [t0 + timedelta(seconds=n * interval) for n in range(blk.triggers_per_day)]
+        day += timedelta(days=1)
+    ons = [t for t, s in events[1:] if s]
+    errors, missed = [], 0
+    for when in expected:
+        if not (start <= when <= end - timedelta(seconds=blk.action_duration_seconds)):
+            continue
+        hit = next((t for t in ons if t >= when - timedelta(seconds=1)), None)
+        if hit is None or (hit - when) > timedelta(minutes=30):
+            missed += 1
+        else:
+            errors.append((hit - when).total_seconds())
+    return _summary(errors, missed)
+
+
+# ──────────────────────────────────────────────────────────────
+#  Rejeu
+# ──────────────────────────────────────────────────────────────
+def replay(config_path: str, days: float, start: datetime, *, motor_mode: str | None = None,
+           regulator: str | None = None, step_s: float = 30.0, seed: int = 0,
+           verbose: bool = False) -> dict:
+    from hal import backend as hal
+    from hal.sim.devices import SimEnvironment
+    from hal.sim.greenhouse import GreenhouseModel
+    from hal.sim.hardware import SimHardware
+    from param.config import AppConfig
+
+    pc.mute(not verbose)
+
+    # copie de travail : le rejeu ne modifie jamais la vraie configuration
+    work = Path(tempfile.mkdtemp(prefix="phyto-replay-"))
+    shutil.copy(config_path, work / "param.json")
+    AppConfig._path = work / "param.json"
+    cfg = AppConfig.load()
+    for name in type(cfg.sensors).model_fields:
+        setattr(cfg.sensors, name, name == "bme280_state")
+    if motor_mode:
+        cfg.motor.motor_mode = motor_mode
+    if regulator:
+        cfg.climate.enabled = regulator == "coordinated"
+
+    sim = SimHardware(SimEnvironment(temperature=18.0, seed=seed), i2c_byte_time_s=0.0, w1_probes={})
+    hal.use_simulator(sim)
+    clock = VirtualClock(start)
+
+    from components.MotorHandler import MotorHandler, temp_control
+    from components.climate_control import climate_control
+    from components.heater_control import heat_control
+    from components.dailytimer_handler import timer_daily
+    from components.cyclic_timer_handler import timer_cyclic
+    from controllers.SensorController import SensorController
+    from model.Component import Component
+    from model.CyclicTimer import CyclicTimer
+    from model.DailyTimer import DailyTimer
+
+    g = cfg.gpio
+    gpio = sim.gpio
+    gpio.setmode(gpio.BCM)
+    lights = [Component(pin=g.dailytimer1_pin), Component(pin=g.dailytimer2_pin)]
+    outs = [Component(pin=g.cyclic1_pin), Component(pin=g.cyclic2_pin)]
+    heater = Component(pin=g.heater_pin)
+    motor = MotorHandler(cfg, clock=clock)
+    sensors = SensorController(cfg, clock=clock)
+
+    model = GreenhouseModel(
+        sim.env, gpio, heater_pin=g.heater_pin, lamp_pin=g.dailytimer1_pin,
+        motor_pins=[g.motor_pin1, g.motor_pin2, g.motor_pin3, g.motor_pin4],
+    )
+    model.temperature = model.outside(start)
+
+    outputs = {
+        "dailytimer1": (g.dailytimer1_pin, True),
+        "dailytimer2": (g.dailytimer2_pin, True),
+        "cyclic1":     (g.cyclic1_pin, True),
+        "cyclic2":     (g.cyclic2_pin, True),
+        "heater":      (g.heater_pin, True),
+        "motor1":      (g.motor_pin1, False),
+        "motor2":      (g.motor_pin2, False),
+        "motor3":      (g.motor_pin3, False),
+        "motor4":      (g.motor_pin4, False),
+    }
+    recorder = SwitchRecorder(clock, gpio, outputs, start)
+
+    from components.cyclic_timer_handler import _is_day_from
+    band = {"in": 0, "below": 0, "above": 0}
+    temps: list[float] = []
+    rh_max = cfg.climate.humidity_max or 80.0
+    humid: list[float] = []
+
+    def _sample(now: datetime, t: float) -> None:
+        ts = cfg.temperature
+        if _is_day_from(cfg, now):
+            lo, hi = ts.target_temp_min_day, ts.target_temp_max_day
+        else:
+            lo, hi = ts.target_temp_min_night, ts.target_temp_max_night
+        band["below" if t < lo else "above" if t > hi else "in"] += 1
+        temps.append(t)
+        humid.append(model.humidity)
+
+    async def _model_loop() -> None:
+        while True:
+            now = clock.now()
+            _sample(now, model.step(step_s, now))
+            await clock.sleep(step_s)
+
+    async def _main() -> None:
+        daily = [DailyTimer(lights[i], timer_id=i + 1, config=cfg, clock=clock) for i in range(2)]
+        cyclic = [CyclicTimer(outs[i], timer_id=i + 1, config=cfg) for i in range(2)]
+        if cfg.climate.enabled:
+            regulation = (
+                climate_control(config=cfg, sensor_handler=sensors, heater_component=heater,
+                                fan=motor, sampling_time=15, clock=clock),
+            )
+        else:
+            regulation = (
+                temp_control(motor_handler=motor, config=cfg, sensor_handler=sensors,
+                             sampling_time=15, clock=clock),
+                heat_control(heater_component=heater, sensor_handler=sensors, config=cfg,
+                             sampling_time=30, clock=clock),
+            )
+        tasks = [asyncio.ensure_future(c) for c in (
+            _model_loop(),
+            *(timer_daily(d, cfg, sampling_time=60, clock=clock) for d in daily),
+            *(timer_cyclic(c, cfg, clock=clock) for c in cyclic),
+            *regulation,
+        )]
+        await clock.sleep(days * 86400)
+        for t in tasks:
+            t.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    wall0 = time.perf_counter()
+    try:
+        clock.run(_main())
+    finally:
+        wall = time.perf_counter() - wall0
+        pc.mute(False)
+        clock.close()
+        shutil.rmtree(work, ignore_errors=True)
+
+    end = clock.now()
+    samples = sum(band.values()) or 1
+    timing = {
+        "dailytimer1": daily_timing(recorder.events["dailytimer1"], cfg.daily_timer1, start, end),
+        "dailytimer2": daily_timing(recorder.events["dailytimer2"], cfg.daily_timer2, start, end),
+    }
+    for i, blk in ((1, cfg.cyclic1), (2, cfg.cyclic2)):
+        evs = recorder.events[f"cyclic{i}"]
+        if not blk.enabled or blk.mode == "impulsions":
+            # impulsions : thread en temps réel, hors rejeu (benchmarks/suite.py --only pulse)
+            timing[f"cyclic{i}"] = {"events": 0, "missed": 0}
+        elif blk.mode == "séquentiel":
+            timing[f"cyclic{i}"] = sequential_timing(evs, blk, cfg)
+        else:
+            timing[f"cyclic{i}"] = journalier_timing(evs, blk, start, end)
+
+    return {
+        "start":        start.isoformat(),
+        "virtual_days": days,
+        "regulator":    "coordinated" if cfg.climate.enabled else "legacy",
+        "wall_s":       round(wall, 3),
+        "speedup":      round(days * 86400 / wall) if wall else None,
+        "outputs": {
+            name: {"switches": recorder.switches(name), "on_pct": round(100 * recorder.on_ratio(name, end), 2),
+                   **dict(zip(("min_on_s", "min_off_s"), recorder.shortest(name)))}
+            for name in outputs
+        },
+        "motor_switches": sum(recorder.switches(f"motor{i}") for i in range(1, 5)),
+        "actuator_switches": {
+            "heater": recorder.switches("heater"),
+            "fan":    sum(recorder.switches(f"motor{i}") for i in range(1, 5)),
+        },
+        "climate": {
+            "in_band_pct": round(100 * band["in"] / samples, 2),
+            "below_pct":   round(100 * band["below"] / samples, 2),
+            "above_pct":   round(100 * band["above"] / samples, 2),
+            "t_min":       round(min(temps), 2) if temps else None,
+            "t_max":       round(max(temps), 2) if temps else None,
+            "t_mean":      round(statistics.fmean(temps), 2) if temps else None,
+            "rh_max":      rh_max,
+            "rh_above_pct": round(100 * sum(h > rh_max for h in humid) / samples, 2),
+            "rh_mean":     round(statistics.fmean(humid), 2) if humid else None,
+        },
+        "energy_kwh": {name: round(wh / 1000.0, 3) for name, wh in model.energy_wh.items()},
+        "timing": timing,
+    }
+
+
+def _minutes(seconds: float | None) -> str:
+    return "–" if seconds is None else f"{seconds / 60:.0f} min"
+
+
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    ap.add_argument("--config", default=os.path.join(ROOT, "param", "param.json"))
+    ap.add_argument("--days", type=float, default=14.0)
+    ap.add_argument("--start", default="2024-03-04T00:00",
+                    help="début du rejeu (ISO 8601, heure locale)")
+    ap.add_argument("--motor-mode", choices=("manual", "auto"))
+    ap.add_argument("--regulator", choices=("coordinated", "legacy"),
+                    help="défaut : Climate_Control.enabled de la config")
+    ap.add_argument("--step", type=float, default=30.0, help="pas du modèle thermique (s)")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--json", help="écrit le résultat dans ce fichier")
+    ap.add_argument("--verbose", action="store_true", help="garde les logs des boucles")
+    args = ap.parse_args(argv)
+
+    res = replay(args.config, args.days, datetime.fromisoformat(args.start),
+                 motor_mode=args.motor_mode, regulator=args.regulator, step_s=args.step, seed=args.seed,
+                 verbose=args.verbose)
+
+    print(f"Rejeu {res['virtual_days']} j en {res['wall_s']} s (×{res['speedup']}), régulation {res['regulator']}")
+    print("Commutations : " + ", ".join(
+        f"{n}={o['switches']}" for n, o in res["outputs"].items() if o["switches"]))
+    a, h = res["actuator_switches"], res["outputs"]["heater"]
+    print(f"Actionneurs : chauffage {a['heater']} (ON ≥ {_minutes(h['min_on_s'])}, "
+          f"OFF ≥ {_minutes(h['min_off_s'])}), extraction {a['fan']}")
+    c = res["climate"]
+    print(f"Climat : {c['in_band_pct']} % dans la bande, {c['below_pct']} % dessous, "
+          f"{c['above_pct']} % dessus (T {c['t_min']}…{c['t_max']} °C, moy. {c['t_mean']})")
+    print(f"Humidité : {c['rh_above_pct']} % du temps au-dessus de {c['rh_max']} %HR (moy. {c['rh_mean']})")
+    e = res["energy_kwh"]
+    print(f"Énergie : chauffage {e['heater']} kWh, extraction {e['fan']} kWh")
+    for name, t in res["timing"].items():
+        if t["events"] or t["missed"]:
+            print(f"Timing {name:<12} n={t['events']:<4} manqués={t['missed']:<3} "
+                  f"moy={t.get('mean_s', 0):>7} s  p95={t.get('p95_s', 0):>7} s  max={t.get('max_s', 0):>7} s")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(res, f, indent=2, ensure_ascii=False)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
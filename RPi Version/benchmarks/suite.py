@@ -0,0 +1,565 @@
+# benchmarks/suite.py
+# Author : Progradius
+# License: AGPL-3.0
+# -------------------------------------------------------------
+#  Bancs de mesure des chemins chauds (capteurs, web, export)
+# -------------------------------------------------------------
+"""
+Mesure, sur matériel simulé (hal.sim), les chemins chauds de l'application :
+
+  sensors   latence de SensorController.get_sensor_value, par clé
+  http      Server._handle : req/s, p50 / p99 pour /, /monitor, /status, /static
+  sse       diffusion /console/stream vers N clients (évènements/s, pertes)
+  lag       retard de la boucle asyncio pendant l'export Influx + /monitor
+  config    AppConfig.load / save
+  stats     SensorStats.update
+  metrics   coût d'une observation (utils.metrics) et d'un rendu /metrics
+  pulse     retard des fronts d'un train d'impulsions : PulseTrain (thread)
+            contre la même cadence en asyncio.sleep, boucle chargée
+
+Rien n'est écrit dans param/ : configuration et stats sont copiées dans un
+répertoire temporaire. Les coûts matériels simulés se règlent avec les
+variables PHYTO_SIM_* (cf. hal/sim/hardware.py).
+
+    python benchmarks/suite.py --out benchmarks/results/base.json
+    python benchmarks/suite.py --only http,sse --compare benchmarks/results/base.json
+
+``--compare`` affiche l'écart de chaque métrique et sort en code 1 si l'une
+régresse de plus de ``--tolerance``. Convention de nommage des métriques :
+suffixe ``_per_s`` → plus haut = mieux ; ``_ns`` / ``_us`` / ``_ms`` / ``_s``
+→ plus bas = mieux ; le reste est informatif.
+
+À lancer depuis « RPi Version/ ».
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+
+from utils import pretty_console as pc                      # noqa: E402
+
+
+# ──────────────────────────────────────────────────────────────
+#  Outils de mesure
+# ──────────────────────────────────────────────────────────────
+def _pct(sorted_values: list, q: float) -> float:
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+def distribution(samples_s: list, unit: str = "us") -> dict:
+    """Résumé d'une série de durées (secondes) : moyenne, p50, p99, max."""
+    if not samples_s:
+        return {"n": 0}
+    k = 1e6 if unit == "us" else 1e3
+    s = sorted(samples_s)
+    return {
+        "n":            len(s),
+        f"mean_{unit}": round(statistics.fmean(s) * k, 2),
+        f"p50_{unit}":  round(_pct(s, 0.50) * k, 2),
+        f"p99_{unit}":  round(_pct(s, 0.99) * k, 2),
+        f"max_{unit}":  round(s[-1] * k, 2),
+    }
+
+
+def timed(fn, n: int, warmup: int = 3) -> list:
+    for _ in range(warmup):
+        fn()
+    out = []
+    for _ in range(n):
+        t0 = time.perf_counter()
+        fn()
+        out.append(time.perf_counter() - t0)
+    return out
+
+
+# ──────────────────────────────────────────────────────────────
+#  Contexte : config temporaire + matériel simulé
+# ──────────────────────────────────────────────────────────────
+class Sandbox:
+    """Application complète sur banc simulé, sans rien écrire dans param/."""
+
+    def __init__(self, config_path: str):
+        from hal import backend as hal
+        from hal.sim.hardware import SimHardware
+        from param.config import AppConfig
+        from model.SensorStats import SensorStats
+
+        self.work = Path(tempfile.mkdtemp(prefix="phyto-bench-"))
+        shutil.copy(config_path, self.work / "param.json")
+        AppConfig._path = self.work / "param.json"
+        SensorStats.FILE = self.work / "sensor_stats.json"
+
+        hal.use_simulator(SimHardware.from_env())
+
+        from app import Application
+        self.app = Application()
+        cfg = self.app.config
+        for name in type(cfg.sensors).model_fields:
+            setattr(cfg.sensors, name, True)
+        self.app.components
+        self.app.motor_handler
+        self.app.sensor_handler
+        self._server = None
+
+    @property
+    def sensors(self):
+        return self.app.sensor_handler
+
+    async def probe(self) -> None:
+        if not self.sensors.probed:
+            await self.sensors.probe_async(timeout=10)
+
+    def server(self):
+        """Instance ``Server`` (sans écoute) partagée par les bancs web."""
+        if self._server is None:
+            from network.web.server import Server
+            c = self.app.components
+            self._server = Server(
+                controller_status=self.app.status,
+                sensor_handler=self.sensors,
+                config=self.app.config,
+                outlets={"dailytimer1": c["light1"], "dailytimer2": c["light2"],
+                         "cyclic1": c["cyclic1"], "cyclic2": c["cyclic2"], "heater": c["heater"]},
+                motor_handler=self.app.motor_handler,
+            )
+        return self._server
+
+    def close(self) -> None:
+        from hal import backend as hal
+        hal.reset()
+        shutil.rmtree(self.work, ignore_errors=True)
+
+
+async def _http_get(port: int, path: str) -> bytes:
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: bench\r\n\r\n".encode("ascii"))
+    await writer.drain()
+    data = await reader.read()
+    writer.close()
+    return data
+
+
+# ──────────────────────────────────────────────────────────────
+#  Bancs
+# ──────────────────────────────────────────────────────────────
+def bench_sensors(sb: Sandbox, args) -> dict:
+    asyncio.run(sb.probe())
+    out = {}
+    for key in sb.sensors.enabled_keys():
+        n = max(5, args.iterations // 10) if key == "HCSR04" else args.iterations
+        out[key] = distribution(timed(lambda: sb.sensors.get_sensor_value(key), n))
+    return out
+
+
+HTTP_PATHS = ("/", "/monitor", "/status", "/static/css/style.css", "/metrics")
+
+
+def bench_http(sb: Sandbox, args) -> dict:
+    server = sb.server()
+
+    async def _run() -> dict:
+        await sb.probe()
+        sb.sensors.refresh()
+        srv = await asyncio.start_server(server._handle, "127.0.0.1", 0)
+        port = srv.sockets[0].getsockname()[1]
+        out = {}
+        try:
+            for path in HTTP_PATHS:
+                for _ in range(3):
+                    await _http_get(port, path)
+                lat = []
+                for _ in range(args.iterations):
+                    t0 = time.perf_counter()
+                    resp = await _http_get(port, path)
+                    lat.append(time.perf_counter() - t0)
+                if not resp.startswith(b"HTTP/1.1 200"):
+                    raise RuntimeError(f"{path} → {resp[:40]!r}")
+
+                # débit : `concurrency` clients en parallèle
+                todo = args.iterations
+                async def _worker() -> None:
+                    nonlocal todo
+                    while todo > 0:
+                        todo -= 1
+                        await _http_get(port, path)
+                t0 = time.perf_counter()
+                await asyncio.gather(*(_worker() for _ in range(args.concurrency)))
+                wall = time.perf_counter() - t0
+
+                out[path] = {**distribution(lat, "ms"),
+                             "req_per_s": round(args.iterations / wall, 1),
+                             "bytes": len(resp)}
+        finally:
+            srv.close()
+            await srv.wait_closed()
+        return out
+
+    return asyncio.run(_run())
+
+
+def bench_sse(sb: Sandbox, args) -> dict:
+    from utils.log_bus import log_bus
+    server = sb.server()
+    n_events = args.sse_events
+
+    async def _client(port: int, tag: bytes, received: list, idx: int, ready: asyncio.Event) -> None:
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(b"GET /console/stream?format=json HTTP/1.1\r\n\r\n")
+        await writer.drain()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    return
+                if not line.startswith(b"data: ") or tag not in line:
+                    continue                    # historique, keep-alive, autres rounds
+                if b"ready" in line:
+                    ready.set()
+                else:
+                    received[idx] += 1
+                    if received[idx] >= n_events:
+                        return
+        finally:
+            writer.close()
+
+    async def _round(port: int, clients: int) -> dict:
+        tag = f"bench-sse-{clients}".encode()
+        base = log_bus.subscriber_count
+        received = [0] * clients
+        readies = [asyncio.Event() for _ in range(clients)]
+        tasks = [asyncio.ensure_future(_client(port, tag, received, i, readies[i]))
+                 for i in range(clients)]
+        while log_bus.subscriber_count < base + clients:
+            await asyncio.sleep(0.005)
+        log_bus.publish("info", f"{tag.decode()} ready", "")
+        await asyncio.wait_for(asyncio.gather(*(e.wait() for e in readies)), 10)
+
+        t0 = time.perf_counter()
+        for i in range(n_events):
+            log_bus.publish("info", f"{tag.decode()} {i}", "")
+            if i % 50 == 49:
+                await asyncio.sleep(0)
+        done, pending = await asyncio.wait(tasks, timeout=30)
+        wall = time.perf_counter() - t0
+        for t in pending:
+            t.cancel()
+        total = sum(received)
+
+        # les handlers des clients partis ne le découvrent qu'en écrivant
+        for _ in range(100):
+            if log_bus.subscriber_count <= base:
+                break
+            log_bus.publish("info", "bench-sse flush", "")
+            await asyncio.sleep(0.01)
+        return {
+            "events_per_s": round(total / wall, 1),
+            "fanout_ms":    round(wall * 1e3, 2),
+            "lost":         clients * n_events - total,
+        }
+
+    async def _run() -> dict:
+        srv = await asyncio.start_server(server._handle, "127.0.0.1", 0)
+        port = srv.sockets[0].getsockname()[1]
+        out = {}
+        try:
+            for clients in args.sse_clients:
+                out[f"{clients}_clients"] = await _round(port, clients)
+        finally:
+            srv.close()
+        return out
+
+    # les handlers SSE orphelins sont annulés par asyncio.run à la fermeture
+    return asyncio.run(_run())
+
+
+class _InfluxStub(BaseHTTPRequestHandler):
+    """Répond 204 à tout POST /write, comme InfluxDB 1.x."""
+    posts = 0
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        type(self).posts += 1
+        self.send_response(204)
+        self.end_headers()
+
+    def log_message(self, *_):
+        pass
+
+
+def bench_lag(sb: Sandbox, args) -> dict:
+    from network.web import influx_handler
+
+    stub = ThreadingHTTPServer(("127.0.0.1", 0), _InfluxStub)
+    threading.Thread(target=stub.serve_forever, daemon=True).start()
+    cfg = sb.app.config
+    cfg.network.host_machine_address = "127.0.0.1"
+    cfg.network.influx_db_port = str(stub.server_address[1])
+    influx_handler.reload_endpoint(cfg)
+    influx_handler.bind_sensor_handler(sb.sensors)
+    server = sb.server()
+    tick = 0.005
+
+    async def _run() -> dict:
+        await sb.probe()
+        srv = await asyncio.start_server(server._handle, "127.0.0.1", 0)
+        port = srv.sockets[0].getsockname()[1]
+        pages = 0
+
+        async def _monitor_client() -> None:
+            nonlocal pages
+            while True:
+                await _http_get(port, "/monitor")
+                pages += 1
+                await asyncio.sleep(args.monitor_interval)
+
+        lags: list = []
+        async def _probe() -> None:
+            loop = asyncio.get_running_loop()
+            while True:
+                t0 = loop.time()
+                await asyncio.sleep(tick)
+                lags.append(max(0.0, loop.time() - t0 - tick))
+
+        tasks = [asyncio.ensure_future(c) for c in (
+            influx_handler.write_sensor_values(period=args.influx_period),
+            _monitor_client(),
+            _probe(),
+        )]
+        await asyncio.sleep(args.duration)
+        for t in tasks:
+            t.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        srv.close()
+        return {**distribution(lags, "ms"), "influx_posts": _InfluxStub.posts,
+                "monitor_pages": pages}
+
+    try:
+        return asyncio.run(_run())
+    finally:
+        stub.shutdown()
+
+
+def bench_config(sb: Sandbox, args) -> dict:
+    from param.config import AppConfig
+    cfg = AppConfig.load()
+    return {
+        "load": distribution(timed(AppConfig.load, args.iterations)),
+        "save": distribution(timed(cfg.save, args.iterations)),
+    }
+
+
+def bench_stats(sb: Sandbox, args) -> dict:
+    from model.SensorStats import SensorStats
+    stats = SensorStats()
+    values = iter(range(10**9))
+    # valeurs croissantes : chaque appel déplace le max (pire cas)
+    return {"update": distribution(timed(lambda: stats.update("BME280T", float(next(values))),
+                                         args.iterations))}
+
+
+def bench_metrics(sb: Sandbox, args) -> dict:
+    from utils import metrics
+    hist = metrics.histogram("phyto_bench_seconds", "banc", ("key",))
+    count = metrics.counter("phyto_bench_total", "banc", ("key",))
+    n = 200_000
+
+    def _per_call_ns(fn) -> float:
+        t0 = time.perf_counter()
+        for _ in range(n):
+            fn()
+        return round((time.perf_counter() - t0) / n * 1e9, 1)
+
+    empty = _per_call_ns(lambda: None)
+    return {
+        "histogram_observe_ns": round(_per_call_ns(lambda: hist.labels("BME280T").observe(0.0012)) - empty, 1),
+        "counter_inc_ns":       round(_per_call_ns(lambda: count.labels("BME280T").inc()) - empty, 1),
+        "render": distribution(timed(metrics.render, args.iterations)),
+    }
+
+
+def bench_pulse(sb: Sandbox, args) -> dict:
+    """
+    Train ``--pulse`` (ms ON/OFF) pendant ``--duration`` s, la boucle étant
+    occupée par un AppConfig.load toutes les 20 ms (ce que le mode
+    séquentiel faisait à chaque cycle). Même cadence, échéances absolues
+    dans les deux cas : seul l'ordonnanceur diffère.
+    """
+    from controllers.PulseTrain import PulseTrain
+    from hal.backend import GPIO
+    from param.config import AppConfig
+
+    on_ms, off_ms = args.pulse
+    g = sb.app.config.gpio
+    train = PulseTrain(g.cyclic1_pin, "bench")
+
+    async def _run() -> list:
+        late: list = []
+
+        async def _sleep_train() -> None:
+            edge = time.perf_counter()
+            while True:
+                for on, dur in ((True, on_ms), (False, off_ms)):
+                    await asyncio.sleep(max(0.0, edge - time.perf_counter()))
+                    late.append(time.perf_counter() - edge)
+                    GPIO.output(g.cyclic2_pin, GPIO.LOW if on else GPIO.HIGH)
+                    edge += dur / 1000
+
+        async def _load() -> None:
+            while True:
+                AppConfig.load()
+                await asyncio.sleep(0.02)
+
+        train.configure(on_ms, off_ms)
+        train.start()
+        tasks = [asyncio.ensure_future(c) for c in (_sleep_train(), _load())]
+        await asyncio.sleep(args.duration)
+        for t in tasks:
+            t.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        train.stop()
+        return late
+
+    late = asyncio.run(_run())
+    return {
+        "thread":  {**train.jitter(), "realtime": train.realtime, "resyncs": train.resyncs},
+        "asyncio": distribution(late, "us"),
+    }
+
+
+BENCHES = {
+    "sensors": bench_sensors,
+    "http":    bench_http,
+    "sse":     bench_sse,
+    "lag":     bench_lag,
+    "config":  bench_config,
+    "stats":   bench_stats,
+    "metrics": bench_metrics,
+    "pulse":   bench_pulse,
+}
+
+
+# ──────────────────────────────────────────────────────────────
+#  Comparaison à une référence
+# ──────────────────────────────────────────────────────────────
+def _flatten(tree: dict, prefix: str = "") -> dict:
+    flat = {}
+    for k, v in tree.items():
+        name = f"{prefix}.{k}" if prefix else k
+        if isinstance(v, dict):
+            flat.update(_flatten(v, name))
+        elif isinstance(v, (int, float)):
+            flat[name] = v
+    return flat
+
+
+def _direction(metric: str) -> int:
+    """+1 : plus haut = mieux ; -1 : plus bas = mieux ; 0 : informatif."""
+    leaf = metric.rsplit(".", 1)[-1]
+    if leaf.endswith("_per_s"):
+        return 1
+    if leaf.endswith(("_ns", "_us", "_ms", "_s")):
+        return -1
+    return 0
+
+
+def compare(current: dict, baseline: dict, tolerance: float) -> int:
+    cur, base = _flatten(current["results"]), _flatten(baseline["results"])
+    regressions = 0
+    print(f"\n{'métrique':<52} {'référence':>12} {'actuel':>12} {'écart':>8}")
+    for name in sorted(cur.keys() & base.keys()):
+        sense = _direction(name)
+        if not sense or not base[name]:
+            continue
+        delta = (cur[name] - base[name]) / base[name]
+        worse = -delta * sense
+        mark = "  RÉGRESSION" if worse > tolerance else "  mieux" if worse < -tolerance else ""
+        regressions += worse > tolerance
+        print(f"{name:<52} {base[name]:>12g} {cur[name]:>12g} {delta:>+7.1%}{mark}")
+    print(f"\n{regressions} régression(s) au-delà de ±{tolerance:.0%}")
+    return 1 if regressions else 0
+
+
+def _meta() -> dict:
+    try:
+        rev = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                             capture_output=True, text=True, timeout=5).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        rev = ""
+    return {
+        "date":     datetime.now().isoformat(timespec="seconds"),
+        "git":      rev,
+        "python":   platform.python_version(),
+        "machine":  platform.machine(),
+        "platform": platform.platform(terse=True),
+        "sim_env":  {k: v for k, v in os.environ.items() if k.startswith("PHYTO_SIM_")},
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    ap.add_argument("--only", help=f"sous-ensemble séparé par des virgules ({', '.join(BENCHES)})")
+    ap.add_argument("--config", default=os.path.join(ROOT, "param", "param.json"))
+    ap.add_argument("--iterations", type=int, default=200)
+    ap.add_argument("--concurrency", type=int, default=8, help="clients HTTP parallèles (débit)")
+    ap.add_argument("--sse-clients", default="1,10,50",
+                    type=lambda s: [int(x) for x in s.split(",")])
+    ap.add_argument("--sse-events", type=int, default=300)
+    ap.add_argument("--duration", type=float, default=5.0, help="durée des bancs « lag » et « pulse » (s)")
+    ap.add_argument("--pulse", default="50,150", type=lambda s: [int(x) for x in s.split(",")],
+                    help="ms ON,OFF du banc « pulse »")
+    ap.add_argument("--influx-period", type=int, default=1)
+    ap.add_argument("--monitor-interval", type=float, default=0.2)
+    ap.add_argument("--out", help="écrit les résultats (JSON) dans ce fichier")
+    ap.add_argument("--compare", help="référence JSON produite par --out")
+    ap.add_argument("--tolerance", type=float, default=0.10)
+    ap.add_argument("--verbose", action="store_true", help="garde les logs de l'application")
+    args = ap.parse_args(argv)
+
+    names = args.only.split(",") if args.only else list(BENCHES)
+    unknown = set(names) - set(BENCHES)
+    if unknown:
+        ap.error(f"banc(s) inconnu(s) : {', '.join(sorted(unknown))}")
+
+    pc.mute(not args.verbose)
+    sb = Sandbox(args.config)
+    results: dict = {}
+    try:
+        for name in names:
+            t0 = time.perf_counter()
+            results[name] = BENCHES[name](sb, args)
+            print(f"{name:<8} terminé en {time.perf_counter() - t0:.1f} s", file=sys.stderr)
+    finally:
+        sb.close()
+        pc.mute(False)
+
+    report = {"meta": _meta(), "results": results}
+    print(json.dumps(results, indent=2, ensure_ascii=False))
+    if args.out:
+        os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            return compare(report, json.load(f), args.tolerance)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -10,23 +10,39 @@ Règle matérielle :
     - Vitesse N (1..4) → d'abord tout LOW, puis SEULEMENT la pin N à HIGH
 
 Ça évite les courts-circuits si plusieurs relais sont fermés.
+
+Transitions (break-before-make) sans bloquer la boucle asyncio :
+``set_motor_speed`` ne fait que poser une cible ; une tâche de transition
+coupe tout (une écriture GPIO groupée), attend ``dead_time_ms`` (await),
+puis ferme la pin de la vitesse voulue. Une demande arrivant pendant une
+transition ou pendant le temps de maintien ``min_hold_s`` d'une vitesse
+remplace la cible (coalescence) : seule la dernière est appliquée, à
+l'échéance. ``all_off`` reste immédiat (sécurité). Sans boucle asyncio
+(scripts, démarrage), transition synchrone.
 """
 
 import asyncio
+import math
 from time import sleep
 
-import RPi.GPIO as GPIO
+from hal.backend import GPIO
 
 from model.Motor import Motor
+from model.Zone import Zone, legacy_settings
 from param.config import AppConfig
+from utils.metrics import counter
 from utils.pretty_console import info, warning, success, error
+from utils.timebase import Clock, MeteredClock, SYSTEM_CLOCK
+
+_TRANSITIONS = counter("phyto_motor_transitions_total", "Demandes de vitesse moteur", ("result",))
 
 
 class MotorHandler:
     """Encapsule les opérations bas niveau sur le moteur (active-HIGH)."""
 
-    def __init__(self, config: AppConfig):
+    def __init__(self, config: AppConfig, clock: Clock = SYSTEM_CLOCK):
         self.config = config
+        self.clock = clock
         pins = [
             config.gpio.motor_pin1,
             config.gpio.motor_pin2,
@@ -39,45 +55,79 @@ class MotorHandler:
             GPIO.setup(p, GPIO.OUT, initial=GPIO.LOW)
 
         self.motor = Motor(*pins)
-        self.speed = 0  # dernière vitesse appliquée
+        self.speed = 0                  # dernière vitesse appliquée
+        self.target = 0                 # dernière vitesse demandée
+        self.changed_at = -math.inf     # horloge de la dernière vitesse appliquée
+        self._task = None
         info(f"MotorHandler (active-HIGH) initialisé sur pins {pins}")
 
     # ──────────────────────────────────────────────────────────
     def all_off(self):
-        """État sûr : toutes les sorties moteur à LOW."""
+        """État sûr : toutes les sorties moteur à LOW, transition en cours abandonnée."""
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
         self.motor.all_off()
-        self.speed = 0
+        self.speed = self.target = 0
+
+    @property
+    def busy(self) -> bool:
+        """Transition en cours (coupure, temps mort ou maintien)."""
+        return self._task is not None and not self._task.done()
 
     # ──────────────────────────────────────────────────────────
     def set_motor_speed(self, speed: int):
         """
-        speed 0..4
-        0 → tout LOW
-        N → d'abord tout LOW, puis une seule pin HIGH
+        speed 0..4 ; demande non bloquante : la transition est faite par
+        une tâche (voir l'en-tête), la vitesse effective est ``speed``.
         """
         speed = max(0, min(speed, 4))
-
-        # pas de changement → ne rien faire
-        if speed == self.speed:
+        if speed == self.target:
             return
+        self.target = speed
+        if self.busy:
+            _TRANSITIONS.labels("coalesced").inc()
+            return                      # la tâche en cours prendra la nouvelle cible
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._apply_blocking(speed)
+            return
+        self._task = loop.create_task(self._transition())
+
+    async def _transition(self):
+        m = self.config.motor
+        while self.target != self.speed:
+            wait = m.min_hold_s - (self.clock.monotonic() - self.changed_at)
+            if wait > 0:
+                _TRANSITIONS.labels("held").inc()
+                await self.clock.sleep(wait)
+                continue
+            # 1) état sûr (break)
+            self.motor.all_off()
+            self.speed = 0
+            if self.target and m.dead_time_ms:
+                await self.clock.sleep(m.dead_time_ms / 1000.0)
+            # 2) la cible peut avoir changé pendant le temps mort (make)
+            speed = self.target
+            if speed:
+                self.motor.write(speed)
+            self._applied(speed)
+
+    def _apply_blocking(self, speed: int):
+        self.motor.all_off()
+        if speed:
+            sleep(self.config.motor.dead_time_ms / 1000.0)
+            self.motor.write(speed)
+        self._applied(speed)
 
-        # 1) état sûr
-        self.all_off()
-        # petit délai matériel
-        sleep(0.05)
-
-        # 2) activer la bonne pin si > 0
+    def _applied(self, speed: int):
+        self.speed = speed
+        self.changed_at = self.clock.monotonic()
+        _TRANSITIONS.labels("applied").inc()
         if speed == 0:
             warning("Vitesse moteur : 0 (tout OFF)")
         else:
-            try:
-                # nom de la méthode dans Motor : set_pin{n}_value(True/False)
-                getattr(self.motor, f"set_pin{speed}_value")(True)  # True → HIGH → ON
-                success(f"Vitesse moteur réglée : {speed}")
-            except AttributeError:
-                error(f"[MOTOR] pin de vitesse {speed} inexistante ?")
-
-        self.speed = speed
+            success(f"Vitesse moteur réglée : {speed}")
 
 
 # ─────────────────────────────────────────────────────────────
@@ -88,6 +138,8 @@ async def temp_control(
     config: AppConfig,
     sensor_handler,
     sampling_time: int = 15,
+    clock: Clock = SYSTEM_CLOCK,
+    zone: Zone = None,
 ):
     """
     • manual : vitesse imposée par l'utilisateur (config.motor.motor_user_speed)
@@ -96,7 +148,14 @@ async def temp_control(
     pas de double init, pas de doublons dans les logs.
 
     IMPORTANT : on fait un PREMIER CHECK avant le premier sleep.
+
+    *zone* : capteur et consignes de la zone (« main » par défaut) ; le
+    moteur n'existe que dans l'installation historique.
     """
+    own_zone = zone is None
+    if own_zone:
+        zone = Zone(legacy_settings(config))
+    clock = MeteredClock(clock, zone.loop_name("temp_control"))
 
     async def _apply_once():
         mode = (config.motor.motor_mode or "").lower()
@@ -108,7 +167,13 @@ async def temp_control(
             return
 
         if mode == "auto":
-            raw = sensor_handler.get_sensor_value("BME280T")
+            if not getattr(sensor_handler, "probed", True):
+                # boot : capteurs encore en cours de sondage → on garde l'état
+                info("[MOTOR] [AUTO] capteurs en cours de sondage → vitesse conservée")
+                return
+            if own_zone:
+                zone.settings = legacy_settings(config)
+            raw = zone.reading(sensor_handler, max_age=2 * sampling_time)
             try:
                 temp_val = float(raw)
             except (TypeError, ValueError):
@@ -116,7 +181,7 @@ async def temp_control(
                 motor_handler.set_motor_speed(0)
                 return
 
-            ts = config.temperature
+            ts = zone.settings.temperature
             tmin = ts.target_temp_min_day
             tmax = ts.target_temp_max_day
             hyst = ts.hysteresis_offset
@@ -144,10 +209,11 @@ async def temp_control(
         warning(f"[MOTOR] Mode moteur inconnu : {mode!r} → OFF")
         motor_handler.set_motor_speed(0)
 
-    # 1er passage IMMÉDIAT
-    await _apply_once()
-
-    # puis boucle régulière
-    while True:
-        await asyncio.sleep(sampling_time)
-        await _apply_once()
+    # 1er passage IMMÉDIAT, puis à chaque période (ou à chaque changement
+    # de mesure / de config pour une zone pilotée par évènements)
+    wake = zone.listener()
+    run = True
+    while not zone.removed:
+        if run:
+            await _apply_once()
+        run = await zone.idle(clock, wake, sampling_time, sensor_handler)
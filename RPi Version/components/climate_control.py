@@ -0,0 +1,294 @@
+# components/climate_control.py
+# Author : Progradius
+# License: AGPL-3.0
+# -------------------------------------------------------------
+#  Régulation climatique coordonnée : chauffage + extraction
+# -------------------------------------------------------------
+"""
+Une seule boucle par zone possède les deux actionneurs (remplace
+temp_control + heat_control pour « main », fan_control + heat_control pour
+une zone) : ils ne se contredisent plus et ne battent plus en bord de bande.
+
+Bandes (consignes jour/nuit de la zone, h = hysteresis_offset) :
+    T ≤ min                         chauffage ON
+    T > min(min + h, max)           chauffage OFF
+    T > max                         extraction au-dessus du plancher
+Entre les deux, zone neutre : ni chauffage, ni extraction forcée. Le
+chauffage garde l'hystérésis complète de l'ancien heat_control (moins de
+démarrages), bornée à max : il ne chauffe jamais dans la bande d'extraction.
+
+‣ Extraction, ``fan_mode`` :
+    pi     palier = Kp·e + Ki·∫e dt (e = T − max) ; l'intégrale ne
+           s'accumule pas contre une butée ;
+    steps  un palier de plus tous les h °C au-dessus de max (l'ancien
+           temp_control, mais avec les consignes de nuit) ;
+  dans les deux cas, la sortie doit dépasser le palier courant de
+  ``fan_stage_hysteresis`` avant d'en changer.
+‣ Humidité (capteur d'humidité de la zone) : au-dessus de
+  ``humidity_max``, palier plancher ``humidity_stage`` jusqu'à
+  ``humidity_max − humidity_hysteresis`` ; sous le seuil d'arrêt du
+  chauffage, premier palier seulement, chauffage permis (chauffer-ventiler).
+‣ Interverrouillage : chauffage ON → extraction ramenée au plancher.
+‣ Temps minimaux : chauffage ON ``heater_min_on_s``, OFF
+  ``heater_min_off_s``, deux démarrages espacés d'au moins
+  ``heater_min_cycle_s`` (anti-court-cycle) ; un palier d'extraction est
+  tenu ``fan_min_dwell_s``. Une commande retenue est rejouée à la période
+  suivante sans attendre de nouvelle mesure. Sécurités (lecture
+  invalide, chauffage désactivé, interverrouillage, moteur en manuel) :
+  appliquées sans délai.
+‣ Lecture invalide : chauffage OFF, extraction au premier palier.
+
+Moteur en mode « manual » : vitesse imposée, seul le chauffage est régulé.
+État du régulateur : ``Zone.to_dict()["regulator"]`` (GET /api/v1/zones).
+"""
+
+from __future__ import annotations
+
+import math
+from typing import Optional, Tuple
+
+from model.Zone import MAIN, Zone, legacy_settings
+from param.config import AppConfig, ClimateControlSettings, MotorSettings
+from utils.metrics import counter
+from utils.pretty_console import info, warning
+from utils.timebase import Clock, MeteredClock, SYSTEM_CLOCK
+
+_HELD = counter("phyto_climate_held_total", "Commandes retenues par un temps minimal", ("zone", "reason"))
+_MAX_DT = 120.0                     # trou de mesure : pas d'intégration au-delà
+
+
+class FanOutput:
+    """Extraction par paliers : moteur 4 vitesses (MotorHandler) ou relais (1 palier)."""
+
+    def __init__(self, device):
+        self.device = device
+        self.motor = hasattr(device, "set_motor_speed")
+
+    @property
+    def stages(self) -> int:
+        return 4 if self.motor else 1
+
+    def get(self) -> int:
+        return self.device.speed if self.motor else int(self.device.get_state())
+
+    def set(self, stage: int) -> None:
+        if self.motor:
+            self.device.set_motor_speed(stage)
+        else:
+            self.device.set_state(1 if stage else 0)
+
+
+def _number(raw) -> Optional[float]:
+    try:
+        return float(raw)
+    except (TypeError, ValueError):
+        return None
+
+
+class ClimateRegulator:
+
+    def __init__(self, zone: Zone, heater=None, fan: Optional[FanOutput] = None,
+                 clock: Clock = SYSTEM_CLOCK):
+        self.zone = zone
+        self.heater = heater
+        self.fan = fan
+        self.clock = clock
+        self.heat = int(heater.get_state()) if heater is not None else 0
+        self.stage = fan.get() if fan is not None else 0
+        self.demand = 0                     # palier voulu par la température (au-dessus du plancher)
+        self.integral = 0.0
+        self.output = 0.0                   # sortie continue de l'extraction (paliers)
+        self.purge = False
+        self.pending = False                # commande retenue : repasser à la période suivante
+        self.held: set = set()
+        self.heat_since = self.stage_since = self.last_start = -math.inf
+        self._last_t: Optional[float] = None
+        self.last: dict = {}
+
+    # ──────────────────────────────────────────────────────────
+    #  Un passage
+    # ──────────────────────────────────────────────────────────
+    def step(self, s: ClimateControlSettings, motor: MotorSettings,
+             temp: Optional[float], rh: Optional[float], day: bool) -> Tuple[int, int]:
+        """Mesures → (chauffage, palier d'extraction) appliqués."""
+        now = self.clock.monotonic()
+        dt = 0.0 if self._last_t is None else min(max(now - self._last_t, 0.0), _MAX_DT)
+        self._last_t = now
+        self.pending = False
+        held = set()
+
+        tmin, tmax = self.zone.targets(day)
+        hyst = self.zone.settings.temperature.hysteresis_offset
+        if self.fan is None:
+            lo = hi = 0
+        elif self.fan.motor:
+            hi = max(0, min(motor.max_speed, self.fan.stages))
+            lo = max(0, min(motor.min_speed, hi))
+        else:
+            lo, hi = 0, 1
+        manual = self.fan is not None and self.fan.motor and (motor.motor_mode or "").lower() == "manual"
+        heat_ok = self.heater is not None and self.zone.settings.heater_enabled
+
+        if temp is None:
+            self.integral, self.demand, self.purge = 0.0, 0, False
+            want_heat, floor = 0, min(max(1, lo), hi)
+            want_stage = floor
+        else:
+            if s.humidity_max is None or rh is None:
+                self.purge = False
+            elif rh > s.humidity_max:
+                self.purge = True
+            elif rh < s.humidity_max - s.humidity_hysteresis:
+                self.purge = False
+
+            if s.fan_mode == "pi":
+                self._pi(s, temp - tmax, dt, hi - lo)
+            else:
+                self._steps(s, temp, tmax, hyst, hi - lo)
+            off_at = min(tmin + hyst, tmax)
+            floor = lo
+            if self.purge:
+                floor = min(max(lo, s.humidity_stage if temp > off_at else 1), hi)
+            want_stage = max(lo + self.demand, floor)
+
+            want_heat = 1 if temp <= tmin else 0 if temp > off_at else self.heat
+            if not heat_ok or want_stage > floor:
+                want_heat = 0
+
+        if self.heater is not None:
+            self._set_heater(want_heat, s, now, held, force=temp is None or not heat_ok)
+
+        if self.fan is not None:
+            if manual:
+                self._set_fan(max(0, min(motor.motor_user_speed, self.fan.stages)), s, now, held, force=True)
+            else:
+                if self.heat:
+                    want_stage = min(want_stage, floor)     # interverrouillage
+                self._set_fan(want_stage, s, now, held,
+                              force=temp is None or (self.heat == 1 and self.stage > floor))
+
+        for reason in held - self.held:
+            _HELD.labels(self.zone.name, reason).inc()
+        self.held = held
+        self.pending = bool(held)
+        self.last = {
+            "temp": temp, "rh": rh, "day": day, "targets": [tmin, tmax],
+            "heater": self.heat, "fan": self.stage, "fan_manual": manual,
+        }
+        return self.heat, self.stage
+
+    # ──────────────────────────────────────────────────────────
+    #  Extraction : demande au-dessus du plancher (0 … span)
+    # ──────────────────────────────────────────────────────────
+    def _pi(self, s: ClimateControlSettings, error: float, dt: float, span: int) -> None:
+        u = s.kp * error + self.integral
+        if not ((u >= span and error > 0) or (u <= 0 and error < 0)):
+            self.integral = min(max(self.integral + s.ki * error * dt, 0.0), float(span))
+            u = s.kp * error + self.integral
+        self.output = min(max(u, 0.0), float(span))
+        if abs(self.output - self.demand) > 0.5 + s.fan_stage_hysteresis:
+            self.demand = int(round(self.output))
+
+    def _steps(self, s: ClimateControlSettings, temp: float, tmax: float, hyst: float, span: int) -> None:
+        def level(t: float) -> int:
+            return 0 if t <= tmax else min(span, 1 + int((t - tmax) // max(hyst, 0.1)))
+        self.output = float(level(temp))
+        up = level(temp)
+        down = level(temp + s.fan_stage_hysteresis * max(hyst, 0.1))
+        if up > self.demand:
+            self.demand = up
+        elif down < self.demand:
+            self.demand = down
+
+    # ──────────────────────────────────────────────────────────
+    #  Sorties (temps minimaux)
+    # ──────────────────────────────────────────────────────────
+    def _set_heater(self, want: int, s: ClimateControlSettings, now: float, held: set, force: bool) -> None:
+        if want == self.heat:
+            return
+        if not force:
+            since = now - self.heat_since
+            if self.heat and since < s.heater_min_on_s:
+                held.add("heater_min_on")
+                return
+            if not self.heat and since < s.heater_min_off_s:
+                held.add("heater_min_off")
+                return
+            if not self.heat and now - self.last_start < s.heater_min_cycle_s:
+                held.add("heater_cycle")
+                return
+        self.heater.set_state(want)
+        self.heat, self.heat_since = want, now
+        if want:
+            self.last_start = now
+
+    def _set_fan(self, want: int, s: ClimateControlSettings, now: float, held: set, force: bool) -> None:
+        if want == self.stage:
+            return
+        if not force and now - self.stage_since < s.fan_min_dwell_s:
+            held.add("fan_dwell")
+            return
+        self.fan.set(want)
+        self.stage, self.stage_since = want, now
+
+    def to_dict(self) -> dict:
+        return {
+            **self.last,
+            "demand":   self.demand,
+            "output":   round(self.output, 3),
+            "integral": round(self.integral, 3),
+            "purge":    self.purge,
+            "held":     sorted(self.held),
+        }
+
+
+# ─────────────────────────────────────────────────────────────
+#  Boucle
+# ─────────────────────────────────────────────────────────────
+async def climate_control(
+    *,
+    config: AppConfig,
+    sensor_handler,
+    heater_component=None,
+    fan=None,
+    sampling_time: int = 15,
+    clock: Clock = SYSTEM_CLOCK,
+    zone: Zone = None,
+):
+    """
+    *fan* : MotorHandler (4 vitesses) ou Component (relais) ; *zone* :
+    capteurs, photopériode et consignes de la zone pilotée ; sans zone,
+    celles de l'installation historique relues à chaque passage.
+    Réglages (``Climate_Control``, ``Motor_Settings``) relus à chaque passage.
+    """
+    own_zone = zone is None
+    if own_zone:
+        zone = Zone(legacy_settings(config))
+    tag = "" if zone.name == MAIN else f" [{zone.name}]"
+    clock = MeteredClock(clock, zone.loop_name("climate_control"))
+    regulator = ClimateRegulator(zone, heater_component, FanOutput(fan) if fan is not None else None, clock)
+    zone.regulator = regulator
+
+    def _apply_once():
+        if own_zone:
+            zone.settings = legacy_settings(config)
+        if not getattr(sensor_handler, "probed", True):
+            return                                  # boot : sondage des capteurs en cours
+        temp = _number(zone.reading(sensor_handler, max_age=2 * sampling_time))
+        rh = None
+        if zone.settings.humidity_sensor:
+            rh = _number(zone.reading(sensor_handler, zone.settings.humidity_sensor, max_age=2 * sampling_time))
+        if temp is None:
+            warning(f"Climat{tag} - lecture de la T ambiante échouée → chauffage OFF, extraction minimale")
+
+        before = (regulator.heat, regulator.stage)
+        heat, stage = regulator.step(config.climate, config.motor, temp, rh, zone.is_day(clock.now()))
+        if (heat, stage) != before:
+            info(f"Climat{tag} – T={temp}, HR={rh} → chauffage {'ON' if heat else 'OFF'}, extraction {stage}")
+
+    wake = zone.listener()
+    run = True
+    while not zone.removed:
+        if run:
+            _apply_once()
+        run = await zone.idle(clock, wake, sampling_time, sensor_handler) or regulator.pending
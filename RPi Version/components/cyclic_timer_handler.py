@@ -2,13 +2,16 @@
 # Author  : Progradius
 # License : AGPL-3.0
 
-import asyncio
-from datetime import datetime, timedelta, time, date
+from __future__ import annotations
+
+from datetime import datetime, timedelta, time
 
 from utils.pretty_console import box, warning
+from utils.timebase import Clock, MeteredClock, SYSTEM_CLOCK
 from param.config import AppConfig
 
 aSYNC_DAY = 24 * 3600
+aSYNC_PULSE_POLL = 5            # s : relecture des réglages du mode impulsions
 
 aSYNC_COL_ACT  = "green"
 aSYNC_COL_OFF  = "yellow"
@@ -18,15 +21,35 @@ aSYNC_COL_WARN = "red"
 aSYNC_SLEEP_TEMPLATE = "[J] #{tid} SLEEP {msg}"
 
 
-async def timer_cyclic(cyclic_timer) -> None:
-    """Coroutine de pilotage du CyclicTimer (mode journalier ou séquentiel)."""
+async def timer_cyclic(
+    cyclic_timer,
+    config: AppConfig | None = None,
+    clock: Clock = SYSTEM_CLOCK,
+) -> None:
+    """
+    Coroutine de pilotage du CyclicTimer (mode journalier, séquentiel ou
+    impulsions). *config* : instance partagée (patchée à chaud) ; à défaut,
+    le JSON est relu à chaque cycle.
+
+    Mode impulsions : les fronts sont émis par le thread du PulseTrain ;
+    la coroutine ne fait que lui repasser les durées de la phase jour/nuit
+    toutes les ``aSYNC_PULSE_POLL`` s et l'arrête en quittant le mode.
+    """
 
     tid    = cyclic_timer.timer_id
     comp   = cyclic_timer.component
+    clock  = MeteredClock(clock, f"timer_cyclic{tid}")
+
+    try:
+        await _cyclic_loop(cyclic_timer, config, clock, tid, comp)
+    finally:
+        _stop_pulse(cyclic_timer)
+
 
+async def _cyclic_loop(cyclic_timer, config: AppConfig | None, clock: Clock, tid: str, comp) -> None:
     while True:
         # recharger complètement la conf
-        cfg = AppConfig.load()
+        cfg = config if config is not None else AppConfig.load()
         if cyclic_timer.timer_id == "1":
             cyc_conf = cfg.cyclic1
             gpio_pin = cfg.gpio.cyclic1_pin
@@ -39,11 +62,12 @@ async def timer_cyclic(cyclic_timer) -> None:
         if not enabled:
             # on force OFF et on redort un peu
             box(f"Cyclic #{tid} désactivé → GPIO {gpio_pin} OFF", color=aSYNC_COL_INFO)
+            _stop_pulse(cyclic_timer)
             try:
                 comp.set_state(0)
             except Exception as e:
                 warning(f"Cyclic #{tid} OFF échoué: {e}")
-            await asyncio.sleep(5)
+            await clock.sleep(5)
             continue
         # ------------------------------
 
@@ -52,43 +76,59 @@ async def timer_cyclic(cyclic_timer) -> None:
         cyclic_timer._load_from_config_block()
 
         mode = cyclic_timer.get_mode().lower()
-
-        if mode == "journalier":
+        if mode != "impulsions":
+            _stop_pulse(cyclic_timer)
+
+        if mode == "impulsions":
+            day = _is_day_from(cfg, clock.now())
+            on_ms, off_ms = cyclic_timer.get_pulse_day() if day else cyclic_timer.get_pulse_night()
+            train = cyclic_timer.pulse
+            if train is None:
+                from controllers.PulseTrain import PulseTrain
+                train = cyclic_timer.pulse = PulseTrain(comp.pin, f"cyclic{tid}")
+                box(f"[I] #{tid} train d'impulsions sur GPIO {comp.pin}", color=aSYNC_COL_ACT)
+            if train.configure(on_ms, off_ms):
+                box(f"[I][{'Jour' if day else 'Nuit'}] #{tid} {on_ms} ms ON / {off_ms} ms OFF",
+                    color=aSYNC_COL_ACT if on_ms else aSYNC_COL_OFF)
+            train.start()
+            await clock.sleep(aSYNC_PULSE_POLL)
+
+        elif mode == "journalier":
             period_days       = cyclic_timer.get_period_days()
             triggers_per_day  = cyclic_timer.get_triggers_per_day()
             first_hour        = cyclic_timer.get_first_trigger_hour()
             action_duration   = cyclic_timer.get_action_duration()
             interval_seconds  = aSYNC_DAY // triggers_per_day
 
-            today_ord   = date.today().toordinal()
+            today_ord   = clock.today().toordinal()
             days_offset = (period_days - (today_ord % period_days)) % period_days
             if days_offset:
                 msg = f"{days_offset} jour{'s' if days_offset > 1 else ''}"
                 box(aSYNC_SLEEP_TEMPLATE.format(tid=tid, msg=msg), color=aSYNC_COL_INFO)
-                await asyncio.sleep(days_offset * aSYNC_DAY)
+                await clock.sleep(days_offset * aSYNC_DAY)
 
             # on refait la journée
-            day0 = date.today()
+            day0 = clock.today()
             trigger0 = datetime.combine(day0, time(first_hour, 0))
             for n in range(triggers_per_day):
                 trig_time = trigger0 + timedelta(seconds=n * interval_seconds)
-                now = datetime.now()
+                now = clock.now()
                 if trig_time > now:
                     delay = (trig_time - now).total_seconds()
                     box(aSYNC_SLEEP_TEMPLATE.format(tid=tid, msg=f"{int(delay)} s"), color=aSYNC_COL_INFO)
-                    await asyncio.sleep(delay)
+                    await clock.sleep(delay)
 
                 # ON
-                box(f"[J] #{tid} ON  @ {datetime.now():%H:%M:%S}", color=aSYNC_COL_ACT)
+                box(f"[J] #{tid} ON  @ {clock.now():%H:%M:%S}", color=aSYNC_COL_ACT)
                 try:
                     comp.set_state(1)
                 except Exception as e:
                     warning(f"CyclicTimer #{tid} activation échouée : {e}")
 
-                await asyncio.sleep(action_duration)
+                await clock.sleep(action_duration)
 
                 # OFF
-                box(f"[J] #{tid} OFF @ {datetime.now():%H:%M:%S}", color=aSYNC_COL_OFF)
+                box(f"[J] #{tid} OFF @ {clock.now():%H:%M:%S}", color=aSYNC_COL_OFF)
                 try:
                     comp.set_state(0)
                 except Exception as e:
@@ -96,10 +136,10 @@ async def timer_cyclic(cyclic_timer) -> None:
 
             # fin de journée
             box(aSYNC_SLEEP_TEMPLATE.format(tid=tid, msg=f"{period_days} jour(s)"), color=aSYNC_COL_INFO)
-            await asyncio.sleep(period_days * aSYNC_DAY)
+            await clock.sleep(period_days * aSYNC_DAY)
 
         elif mode == "séquentiel":
-            if _is_day_from(cfg):
+            if _is_day_from(cfg, clock.now()):
                 on_d  = cyclic_timer.get_on_time_day()
                 off_d = cyclic_timer.get_off_time_day()
                 phase = "Jour"
@@ -109,29 +149,37 @@ async def timer_cyclic(cyclic_timer) -> None:
                 phase = "Nuit"
 
             # ON
-            box(f"[S][{phase}] #{tid} ON  @ {datetime.now():%H:%M:%S}", color=aSYNC_COL_ACT)
+            box(f"[S][{phase}] #{tid} ON  @ {clock.now():%H:%M:%S}", color=aSYNC_COL_ACT)
             try:
                 comp.set_state(1)
             except Exception as e:
                 warning(f"CyclicTimer #{tid} activation échouée : {e}")
-            await asyncio.sleep(on_d)
+            await clock.sleep(on_d)
 
             # OFF
-            box(f"[S][{phase}] #{tid} OFF @ {datetime.now():%H:%M:%S}", color=aSYNC_COL_OFF)
+            box(f"[S][{phase}] #{tid} OFF @ {clock.now():%H:%M:%S}", color=aSYNC_COL_OFF)
             try:
                 comp.set_state(0)
             except Exception as e:
                 warning(f"CyclicTimer #{tid} désactivation échouée : {e}")
-            await asyncio.sleep(off_d)
+            await clock.sleep(off_d)
 
         else:
             warning(f"CyclicTimer #{tid} mode inconnu : « {mode} » → arrêt du timer")
             return
 
 
-def _is_day_from(cfg: AppConfig) -> bool:
-    from datetime import datetime
-    now      = datetime.now()
+def _stop_pulse(cyclic_timer) -> None:
+    """Arrête le train d'impulsions éventuel (sortie OFF)."""
+    train = getattr(cyclic_timer, "pulse", None)
+    if train is not None:
+        cyclic_timer.pulse = None
+        train.stop()
+        box(f"[I] #{cyclic_timer.timer_id} train d'impulsions arrêté", color=aSYNC_COL_OFF)
+
+
+def _is_day_from(cfg: AppConfig, now: datetime | None = None) -> bool:
+    now      = now or datetime.now()
     start_h  = cfg.daily_timer1.start_hour
     start_m  = cfg.daily_timer1.start_minute
     stop_h   = cfg.daily_timer1.stop_hour
@@ -1,25 +1,29 @@
 # components/dailytimer_handler.py
-import asyncio
-from datetime import datetime, timedelta
+from __future__ import annotations
+
+from datetime import timedelta
 
 from utils import pretty_console as ui
+from utils.timebase import Clock, MeteredClock, SYSTEM_CLOCK
 from param.config import AppConfig
 
 async def timer_daily(
     dailytimer,
     config: AppConfig | None = None,
-    sampling_time: int = 60
+    sampling_time: int = 60,
+    clock: Clock = SYSTEM_CLOCK,
 ):
     tid = str(dailytimer.timer_id)
+    clock = MeteredClock(clock, f"timer_daily{tid}")
 
     while True:
-        now_dt = datetime.now()
+        now_dt = clock.now()
         ui.clock(f"DailyTimer #{tid}  –  check @ {now_dt:%H:%M:%S}")
 
-        # recharger conf
+        # recharger conf (instance partagée si fournie, sinon le JSON)
         if hasattr(dailytimer, "refresh_from_config"):
             try:
-                dailytimer.refresh_from_config()
+                dailytimer.refresh_from_config(config)
             except Exception as e:
                 ui.warning(f"Échec refresh_from_config #{tid} → {e}")
 
@@ -30,7 +34,7 @@ async def timer_daily(
                 dailytimer.component.set_state(0)
             except Exception:
                 pass
-            await asyncio.sleep(sampling_time)
+            await clock.sleep(sampling_time)
             continue
 
         changed = dailytimer.toggle_state_daily()
@@ -44,4 +48,4 @@ async def timer_daily(
         next_dt = now_dt + timedelta(seconds=sampling_time)
         ui.info(f"Prochaine vérif : {next_dt:%H:%M:%S}")
 
-        await asyncio.sleep(sampling_time)
+        await clock.sleep(sampling_time)
@@ -0,0 +1,59 @@
+# components/fan_control.py
+# Author : Progradius
+# License: AGPL-3.0
+"""
+Extracteur tout-ou-rien (relais) d'une zone sans moteur 4 vitesses.
+"""
+
+from model.Zone import Zone
+from utils.pretty_console import info, warning
+from utils.timebase import Clock, MeteredClock, SYSTEM_CLOCK
+
+
+async def fan_control(
+    *,
+    fan_component,
+    sensor_handler,
+    zone: Zone,
+    sampling_time: int = 15,
+    clock: Clock = SYSTEM_CLOCK,
+):
+    """
+    Hystérésis sur la consigne haute de la zone (jour/nuit) :
+      - Allume si T > temp_max
+      - Éteint si T ≤ temp_max - hysteresis
+      - Sinon conserve l'état précédent
+    Lecture invalide → extracteur ON (mieux vaut trop ventiler que cuire).
+    """
+    clock = MeteredClock(clock, zone.loop_name("fan_control"))
+    current_state = fan_component.get_state()
+
+    def _apply_once():
+        nonlocal current_state
+        if not getattr(sensor_handler, "probed", True):
+            return                                  # boot : sondage des capteurs en cours
+        _, temp_max = zone.targets(zone.is_day(clock.now()))
+        seuil_off = temp_max - zone.settings.temperature.hysteresis_offset
+
+        temp = zone.reading(sensor_handler, max_age=2 * sampling_time)
+        if temp is None:
+            warning(f"Extracteur [{zone.name}] - lecture de la T ambiante échouée → ON")
+            wanted = 1
+        elif temp > temp_max:
+            wanted = 1
+        elif temp <= seuil_off:
+            wanted = 0
+        else:
+            return
+
+        if wanted != current_state:
+            fan_component.set_state(wanted)
+            current_state = wanted
+            info(f"Extracteur [{zone.name}] – T={temp}, max={temp_max:.1f} → {'ON' if wanted else 'OFF'}")
+
+    wake = zone.listener()
+    run = True
+    while not zone.removed:
+        if run:
+            _apply_once()
+        run = await zone.idle(clock, wake, sampling_time, sensor_handler)
@@ -1,7 +1,7 @@
 # controller/components/heater_control.py
-import asyncio
-from datetime import datetime
+from model.Zone import MAIN, Zone, legacy_settings
 from utils.pretty_console import info, warning
+from utils.timebase import Clock, MeteredClock, SYSTEM_CLOCK
 
 
 async def heat_control(
@@ -9,7 +9,9 @@ async def heat_control(
     heater_component,
     sensor_handler,
     config,             # AppConfig
-    sampling_time: int = 60
+    sampling_time: int = 60,
+    clock: Clock = SYSTEM_CLOCK,
+    zone: Zone = None,
 ):
     """
     Pilote le chauffage avec hystérésis stricte :
@@ -18,47 +20,61 @@ async def heat_control(
           - Allume si T ≤ temp_min
           - Éteint si T > temp_min + hysteresis
           - Sinon conserve l'état précédent
+
+    *zone* : capteur, photopériode et consignes de la zone pilotée ; sans
+    zone, celles de l'installation historique relues à chaque passage.
     """
+    own_zone = zone is None
+    if own_zone:
+        zone = Zone(legacy_settings(config))
+    tag = "" if zone.name == MAIN else f" [{zone.name}]"
+    clock = MeteredClock(clock, zone.loop_name("heat_control"))
     current_state = heater_component.get_state()  # récupération initiale
 
-    while True:
-        if not config.heater_settings.enabled:
+    def _apply_once():
+        nonlocal current_state
+        if own_zone:
+            zone.settings = legacy_settings(config)
+        settings = zone.settings
+
+        if not settings.heater_enabled:
             if current_state != 0:
                 heater_component.set_state(0)
                 current_state = 0
-                info("Chauffage désactivé manuellement → OFF")
-            await asyncio.sleep(sampling_time)
-            continue
+                info(f"Chauffage{tag} désactivé manuellement → OFF")
+            return
 
-        # Détermination jour/nuit
-        now_m = datetime.now().hour * 60 + datetime.now().minute
-        start = config.daily_timer1.start_hour * 60 + config.daily_timer1.start_minute
-        stop  = config.daily_timer1.stop_hour  * 60 + config.daily_timer1.stop_minute
-        is_day = start <= now_m <= stop if start <= stop else now_m >= start or now_m <= stop
-
-        # Plage de consigne
-        temp_min = config.temperature.target_temp_min_day if is_day else config.temperature.target_temp_min_night
-        hysteresis = config.temperature.hysteresis_offset
+        # Plage de consigne (jour/nuit selon la photopériode de la zone)
+        temp_min, _ = zone.targets(zone.is_day(clock.now()))
+        hysteresis = settings.temperature.hysteresis_offset
 
         # Lecture température
-        temp = sensor_handler.get_sensor_value("BME280T")
+        temp = zone.reading(sensor_handler, max_age=2 * sampling_time)
         if temp is None:
-            warning("Chauffage - lecture de la T ambiante échouée")
-        else:
-            seuil_off = temp_min + hysteresis
-            info(f"Chauffage – T={temp:.1f}°C, min={temp_min:.1f}, seuil OFF={seuil_off:.1f}")
+            warning(f"Chauffage{tag} - lecture de la T ambiante échouée")
+            return
 
-            if temp <= temp_min and current_state == 0:
-                heater_component.set_state(1)
-                current_state = 1
-                info("Chauffage → ON")
+        seuil_off = temp_min + hysteresis
+        info(f"Chauffage{tag} – T={temp:.1f}°C, min={temp_min:.1f}, seuil OFF={seuil_off:.1f}")
 
-            elif temp > seuil_off and current_state == 1:
-                heater_component.set_state(0)
-                current_state = 0
-                info("Chauffage → OFF")
+        if temp <= temp_min and current_state == 0:
+            heater_component.set_state(1)
+            current_state = 1
+            info(f"Chauffage{tag} → ON")
 
-            else:
-                info(f"Chauffage → État conservé : {'ON' if current_state else 'OFF'}")
+        elif temp > seuil_off and current_state == 1:
+            heater_component.set_state(0)
+            current_state = 0
+            info(f"Chauffage{tag} → OFF")
+
+        else:
+            info(f"Chauffage{tag} → État conservé : {'ON' if current_state else 'OFF'}")
 
-        await asyncio.sleep(sampling_time)
+    # zone pilotée par évènements : passage seulement quand une mesure liée,
+    # la photopériode ou la config a bougé (ou cache capteurs trop vieux)
+    wake = zone.listener()
+    run = True
+    while not zone.removed:
+        if run:
+            _apply_once()
+        run = await zone.idle(clock, wake, sampling_time, sensor_handler)
@@ -0,0 +1,117 @@
+# controllers/BootSequence.py
+# Author : Progradius
+# License: AGPL-3.0
+# -------------------------------------------------------------
+#  Séquence de démarrage par étapes, chronométrée
+# -------------------------------------------------------------
+"""
+Démarrage en deux temps :
+
+  1. Étapes **synchrones** et rapides (config, GPIO sûrs, composants,
+     timers) → les sorties sont dans leur état planifié en < 1 s.
+  2. Étapes **lentes** (Wi-Fi, NTP, ping hôte, sondage capteurs) lancées
+     en parallèle dans des threads, chacune avec son propre timeout,
+     pendant que les boucles de contrôle tournent déjà.
+
+Chaque étape est chronométrée ; ``report()`` affiche le bilan et
+``to_dict()`` l'expose à l'API (/api/v1/boot).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Any, Callable
+
+from utils.pretty_console import box, warning, error
+
+
+class BootSequence:
+
+    def __init__(self):
+        self._t0 = time.perf_counter()
+        self.stages: dict[str, dict] = {}
+
+    # ──────────────────────────────────────────────────────────
+    def _record(self, name: str, start: float, status: str, detail: str = "") -> None:
+        self.stages[name] = {
+            "ms":       round((time.perf_counter() - start) * 1000, 1),
+            "at_ms":    round((time.perf_counter() - self._t0) * 1000, 1),
+            "status":   status,
+            "detail":   detail,
+        }
+
+    def run(self, name: str, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Étape synchrone : exécutée immédiatement, exception propagée."""
+        start = time.perf_counter()
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as exc:
+            self._record(name, start, "error", repr(exc))
+            raise
+        self._record(name, start, "ok")
+        return result
+
+    async def run_async(
+        self,
+        name: str,
+        fn: Callable[..., Any],
+        *args,
+        timeout: float,
+        **kwargs,
+    ) -> Any:
+        """
+        Étape bloquante exécutée dans un thread, bornée par *timeout*.
+        Ne lève jamais : renvoie None en cas d'erreur ou de dépassement.
+        """
+        start = time.perf_counter()
+        try:
+            result = await asyncio.wait_for(
+                asyncio.to_thread(fn, *args, **kwargs), timeout
+            )
+        except asyncio.TimeoutError:
+            self._record(name, start, "timeout", f"> {timeout}s")
+            warning(f"Boot : étape « {name} » abandonnée après {timeout}s")
+            return None
+        except Exception as exc:
+            self._record(name, start, "error", repr(exc))
+            error(f"Boot : étape « {name} » en erreur : {exc!r}")
+            return None
+        self._record(name, start, "ok", "" if result is None else str(result))
+        return result
+
+    async def run_coro(self, name: str, coro, *, timeout: float) -> Any:
+        """Variante pour une coroutine (ex. sondage capteurs)."""
+        start = time.perf_counter()
+        try:
+            result = await asyncio.wait_for(coro, timeout)
+        except asyncio.TimeoutError:
+            self._record(name, start, "timeout", f"> {timeout}s")
+            warning(f"Boot : étape « {name} » abandonnée après {timeout}s")
+            return None
+        except Exception as exc:
+            self._record(name, start, "error", repr(exc))
+            error(f"Boot : étape « {name} » en erreur : {exc!r}")
+            return None
+        self._record(name, start, "ok", "" if result is None else str(result))
+        return result
+
+    def skip(self, name: str, reason: str) -> None:
+        """Étape volontairement non exécutée (ex. Wi-Fi en simulation)."""
+        self._record(name, time.perf_counter(), "skipped", reason)
+
+    # ──────────────────────────────────────────────────────────
+    def to_dict(self) -> dict:
+        return {
+            "total_ms": round((time.perf_counter() - self._t0) * 1000, 1),
+            "stages":   self.stages,
+        }
+
+    def report(self) -> None:
+        width = max((len(n) for n in self.stages), default=5)
+        lines = [
+            f"{name.ljust(width)}  {st['ms']:>8.1f} ms  @{st['at_ms']:>8.1f} ms  {st['status']}"
+            for name, st in self.stages.items()
+        ]
+        lines.append(f"{'total'.ljust(width)}  {self.to_dict()['total_ms']:>8.1f} ms")
+        box("Boot — durée par étape\n" + "\n".join(lines), color="cyan")
@@ -0,0 +1,252 @@
+# controllers/BusDiscovery.py
+# Author : Progradius
+# License: AGPL-3.0
+# -------------------------------------------------------------
+#  Découverte à chaud des capteurs I²C et 1-Wire
+# -------------------------------------------------------------
+"""
+Tâche de fond qui détecte les capteurs branchés / débranchés sans
+redémarrage ni aller-retour de configuration.
+
+‣ I²C : une transaction d'un octet (``read_byte``, comme ``i2cdetect -r``)
+  par adresse CONNUE des drivers — pas de balayage 0x03…0x77. Les sondes
+  sont faites à tour de rôle sous un budget de temps par passage
+  (``budget_ms``) ; celles qui n'ont pas tenu reprennent au passage suivant.
+‣ 1-Wire : liste des répertoires ``28-*`` (aucune lecture de sonde).
+‣ Différence avec l'état connu, puis action ciblée :
+    apparu   + activé dans la config + driver absent → instanciation (thread)
+    disparu  + driver attaché                        → driver libéré,
+                                                       disjoncteur ouvert
+  « Disparu » = ``DETACH_MISSES`` sondes sans réponse d'affilée : un NACK
+  ou un EIO isolé ne libère rien (le disjoncteur du capteur gère les
+  pépins courts). Les capteurs sains ne sont jamais touchés. Un capteur
+  vu mais désactivé dans la config est seulement signalé.
+‣ Chaque changement est publié dans la console (flux SSE de l'interface)
+  et gardé dans un historique court (GET /api/v1/devices).
+‣ Coût de chaque passage mesuré (histogramme ``phyto_discovery_scan_seconds``).
+
+Variables d'environnement :
+    PHYTO_DISCOVERY_S          période de passage, s ; 0 = désactivé (défaut 30)
+    PHYTO_DISCOVERY_BUDGET_MS  temps de sondage I²C max par passage (défaut 20)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+from hal import backend as hal
+from sensor_handlers import registry
+from utils.metrics import counter, histogram
+from utils.pretty_console import info, success, warning
+
+# driver → (nom HAL, adresse par défaut) : capteurs uniques I²C du registre
+I2C_DEVICES: Dict[str, Tuple[str, int]] = {
+    spec.name: (spec.kind, spec.address)
+    for spec in registry.singletons() if spec.bus == "i2c"
+}
+
+DETACH_MISSES = 3                   # sondes sans réponse d'affilée avant libération
+
+_SCAN_SECONDS = histogram("phyto_discovery_scan_seconds", "Durée d'un passage de découverte")
+_EVENTS = counter("phyto_discovery_events_total", "Changements détectés sur les bus", ("kind",))
+
+
+def interval_from_env() -> float:
+    try:
+        return float(os.getenv("PHYTO_DISCOVERY_S", "30"))
+    except ValueError:
+        return 30.0
+
+
+def enabled() -> bool:
+    return interval_from_env() > 0
+
+
+class BusDiscovery:
+
+    def __init__(self, sensor_handler, interval: Optional[float] = None,
+                 budget_ms: Optional[float] = None, history: int = 50):
+        self.sensors = sensor_handler
+        self.interval = interval or interval_from_env() or 30.0
+        if budget_ms is None:
+            try:
+                budget_ms = float(os.getenv("PHYTO_DISCOVERY_BUDGET_MS", "20"))
+            except ValueError:
+                budget_ms = 20.0
+        self.budget_s = budget_ms / 1000
+
+        self.present: Dict[str, bool] = {}               # driver → vu sur le bus
+        self.misses: Dict[str, int] = {}                 # driver → sondes ratées d'affilée
+        self.w1_ids: Optional[set] = None
+        self.events: deque = deque(maxlen=history)
+        self.last_scan: Optional[dict] = None
+        self.scans = 0
+        self._cursor = 0
+
+    # ──────────────────────────────────────────────────────────
+    async def run(self) -> None:
+        info(f"Découverte des capteurs : passage toutes les {self.interval:g} s")
+        while True:
+            if self.sensors.probed:
+                await self.scan()
+            await asyncio.sleep(self.interval)
+
+    async def scan(self) -> dict:
+        t0 = time.perf_counter()
+        seen, probed = self._probe_i2c()
+        t1 = time.perf_counter()
+        added, removed = self._list_w1()
+        t2 = time.perf_counter()
+        _SCAN_SECONDS.observe(t2 - t0)
+
+        for name, present in seen.items():
+            await self._reconcile_i2c(name, present)
+        await self._reconcile_w1(added, removed)
+
+        self.scans += 1
+        self.last_scan = {
+            "ts":      round(time.time(), 3),
+            "i2c_ms":  round((t1 - t0) * 1000, 2),
+            "w1_ms":   round((t2 - t1) * 1000, 2),
+            "probed":  probed,
+            "pending": [n for n in I2C_DEVICES if n not in seen],
+        }
+        return self.last_scan
+
+    # ──────────────────────────────────────────────────────────
+    #  Sondage (borné)
+    # ──────────────────────────────────────────────────────────
+    def _addresses(self) -> List[Tuple[str, int]]:
+        return [(name, hal.i2c_address(dev, default)) for name, (dev, default) in I2C_DEVICES.items()]
+
+    def _probe_i2c(self) -> Tuple[Dict[str, bool], List[str]]:
+        """Tour de rôle sous budget ; une adresse partagée n'est sondée qu'une fois."""
+        bus = self.sensors.i2c
+        if bus is None:
+            return {}, []
+        targets = self._addresses()
+        n = len(targets)
+        seen: Dict[str, bool] = {}
+        by_addr: Dict[int, bool] = {}
+        probed = []
+        start = time.perf_counter()
+        for step in range(n):
+            name, addr = targets[(self._cursor + step) % n]
+            if step and time.perf_counter() - start > self.budget_s:
+                self._cursor = (self._cursor + step) % n
+                break
+            if addr not in by_addr:
+                try:
+                    bus.read_byte(addr)
+                    by_addr[addr] = True
+                except OSError:
+                    by_addr[addr] = False
+                probed.append(f"0x{addr:02X}")
+            seen[name] = by_addr[addr]
+        else:
+            self._cursor = 0
+        return seen, probed
+
+    def _list_w1(self) -> Tuple[List[str], List[str]]:
+        import glob
+        from sensor_handlers.DS18Handler import SYSFS_PATTERN
+        ids = {os.path.basename(p) for p in glob.glob(os.path.join(hal.w1_root(), SYSFS_PATTERN))}
+        if self.w1_ids is None:
+            drv = self.sensors.ds18
+            self.w1_ids = set(drv.get_address_list()) if drv is not None else set()
+        added, removed = sorted(ids - self.w1_ids), sorted(self.w1_ids - ids)
+        self.w1_ids = ids
+        return added, removed
+
+    # ──────────────────────────────────────────────────────────
+    #  Réconciliation
+    # ──────────────────────────────────────────────────────────
+    def _event(self, kind: str, device: str, detail: str) -> None:
+        _EVENTS.labels(kind).inc()
+        self.events.append({"ts": round(time.time(), 3), "kind": kind, "device": device, "detail": detail})
+        if kind == "attached":
+            success(f"Capteur {device} branché : {detail}")
+        elif kind == "detached":
+            warning(f"Capteur {device} débranché : {detail}")
+        else:
+            info(f"Capteur {device} : {detail}")
+
+    def _attached(self, name: str) -> bool:
+        drv = getattr(self.sensors, name, None)
+        return drv is not None and getattr(drv, "available", True)
+
+    async def _make(self, name: str):
+        try:
+            drv = await asyncio.to_thread(self.sensors._make_driver, name)
+        except Exception as e:
+            warning(f"Instanciation {name} : {e!r}")
+            return None
+        return drv if getattr(drv, "available", True) else None
+
+    async def _reconcile_i2c(self, name: str, present: bool) -> None:
+        was = self.present.get(name)
+        self.present[name] = present
+        misses = 0 if present else self.misses.get(name, 0) + 1
+        self.misses[name] = misses
+        enabled = getattr(self.sensors, f"{name}_enabled", False)
+        addr = f"0x{hal.i2c_address(*I2C_DEVICES[name]):02X}"
+
+        # instanciation seulement sur changement (deux drivers peuvent partager 0x29)
+        if present and enabled and was is not True and not self._attached(name):
+            drv = await self._make(name)
+            if drv is not None:
+                self.sensors.attach_driver(name, drv)
+                self._event("attached", name, f"répond en {addr}, driver attaché")
+        elif not present and misses >= DETACH_MISSES and self._attached(name):
+            self.sensors.detach_driver(name, f"absent du bus ({addr})")
+            self._event("detached", name, f"plus de réponse en {addr} ({misses} sondes), driver libéré")
+        elif present and not enabled and was is not True:
+            self._event("seen", name, f"répond en {addr} mais désactivé dans la config")
+
+    async def _reconcile_w1(self, added: List[str], removed: List[str]) -> None:
+        if not (added or removed) or not self.sensors.ds18_enabled:
+            return
+        drv = self.sensors.ds18
+        if drv is None or not drv.available:
+            fresh = await self._make("ds18")
+            if fresh is not None:
+                self.sensors.attach_driver("ds18", fresh)
+                self._event("attached", "ds18", f"{len(fresh.get_address_list())} sonde(s) 1-Wire")
+            return
+
+        new, gone = drv.rescan()
+        for dev in new:
+            slot = drv.slot_of(dev)
+            self.sensors.health.forget(f"DS18B#{slot}")
+            self._event("attached", f"DS18B#{slot}", f"sonde {dev}")
+        for dev in gone:
+            slot = drv.slot_of(dev)
+            self.sensors.health.breaker(f"DS18B#{slot}").trip(f"sonde {dev} absente")
+            self._event("detached", f"DS18B#{slot}", f"sonde {dev} absente")
+
+    # ──────────────────────────────────────────────────────────
+    def to_dict(self) -> dict:
+        i2c = {}
+        for name, (dev, default) in I2C_DEVICES.items():
+            i2c[name] = {
+                "address":  f"0x{hal.i2c_address(dev, default):02X}",
+                "present":  self.present.get(name),
+                "misses":   self.misses.get(name, 0),
+                "enabled":  getattr(self.sensors, f"{name}_enabled", False),
+                "attached": self._attached(name),
+            }
+        ds18 = self.sensors.ds18
+        return {
+            "interval_s": self.interval,
+            "budget_ms":  round(self.budget_s * 1000, 1),
+            "scans":      self.scans,
+            "last_scan":  self.last_scan,
+            "i2c":        i2c,
+            "w1": {dev: ds18.slot_of(dev) if ds18 is not None else None
+                   for dev in sorted(self.w1_ids or ())},
+            "events":     list(self.events)[::-1],
+        }
@@ -0,0 +1,248 @@
+# controllers/DerivedMetrics.py
+# Author : Progradius
+# License: AGPL-3.0
+# -------------------------------------------------------------
+#  Métriques dérivées : VPD, point de rosée, humidité absolue, DLI
+# -------------------------------------------------------------
+"""
+Grandeurs calculées sur l'appareil à mesure que les lectures arrivent,
+servies par SensorController comme des clés capteur ordinaires (registre :
+driver « derived ») et exportées dans le même passage Influx :
+
+    VPD          kPa        déficit de pression de vapeur de l'air
+    LEAF-VPD     kPa        idem à la température de feuille (MLX90614 objet)
+    DEWPOINT     °C         point de rosée
+    ABSHUM       g/m³       humidité absolue
+    DLI          mol/m²/j   intégrale lumineuse du jour (TSL-LUX → PPFD)
+    PHOTOPERIOD  h          durée éclairée du jour (lux ≥ seuil)
+
+‣ Entrées trouvées par grandeur (``KeySpec.quantity``) dans chaque
+  « unité » : les capteurs uniques ensemble, puis chaque entrée de l'arbre
+  I²C seule (VPD@etagere1 depuis BME280T@etagere1 / BME280H@etagere1).
+‣ DLI et photopériode s'accumulent échantillon par échantillon (trapèzes,
+  trou d'acquisition > ``max_gap_s`` non intégré) et repartent de zéro à
+  minuit (heure locale) ; remis à zéro au redémarrage.
+‣ Formules vectorisées : chaque fonction accepte des flottants ou des
+  tableaux NumPy (si NumPy est installé) ; ``daily_light`` recalcule d'un
+  bloc DLI et photopériode jour par jour d'un historique (ts, lux), avec
+  la même règle d'intégration que l'accumulateur en flux.
+
+Magnus (Sonntag 1990) : e_s(T) = 0,6112·exp(17,62·T / (243,12 + T)) kPa.
+"""
+
+from __future__ import annotations
+
+import math
+import time
+from datetime import date
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+
+from param.config import DerivedMetricsSettings
+from utils.timebase import Clock, SYSTEM_CLOCK
+
+try:
+    import numpy as np
+except ImportError:                                     # pragma: no cover
+    np = None
+
+_A, _B = 17.62, 243.12              # Magnus, -45…60 °C
+_EPOCH = date(1970, 1, 1).toordinal()
+
+# clé dérivée (base) → grandeurs d'entrée, dans l'ordre des arguments
+INPUTS: Dict[str, Tuple[str, ...]] = {
+    "VPD":          ("air_temp", "rh"),
+    "LEAF-VPD":     ("leaf_temp", "air_temp", "rh"),
+    "DEWPOINT":     ("air_temp", "rh"),
+    "ABSHUM":       ("air_temp", "rh"),
+    "DLI":          ("lux",),
+    "PHOTOPERIOD":  ("lux",),
+}
+
+
+# ──────────────────────────────────────────────────────────────
+#  Formules (flottants ou tableaux NumPy)
+# ──────────────────────────────────────────────────────────────
+def _xp(*values):
+    return np if np is not None and any(isinstance(v, np.ndarray) for v in values) else math
+
+
+def _rh(rh):
+    """%RH borné à ]0, 100] (log du point de rosée)."""
+    if np is not None and isinstance(rh, np.ndarray):
+        return np.clip(rh, 0.1, 100.0)
+    return min(max(rh, 0.1), 100.0)
+
+
+def saturation_vp(t):
+    """Pression de vapeur saturante, kPa."""
+    return 0.6112 * _xp(t).exp(_A * t / (_B + t))
+
+
+def vpd(t, rh):
+    return saturation_vp(t) * (1.0 - _rh(rh) / 100.0)
+
+
+def leaf_vpd(t_leaf, t_air, rh):
+    return saturation_vp(t_leaf) - saturation_vp(t_air) * _rh(rh) / 100.0
+
+
+def dew_point(t, rh):
+    g = _xp(t, rh).log(_rh(rh) / 100.0) + _A * t / (_B + t)
+    return _B * g / (_A - g)
+
+
+def absolute_humidity(t, rh):
+    """g/m³ : ρ = e·M_eau / (R·T)."""
+    return 2166.8 * saturation_vp(t) * _rh(rh) / 100.0 / (t + 273.15)
+
+
+def daily_light(ts: Sequence[float], lux: Sequence[float],
+                settings: DerivedMetricsSettings) -> Dict[date, Tuple[float, float]]:
+    """
+    Historique (epoch croissants, lux) → {jour: (DLI mol/m²/j, photopériode h)}.
+    Un intervalle compte pour le jour de son échantillon de fin ; décalage
+    horaire du premier point appliqué à tout l'historique.
+    """
+    if len(ts) < 2:
+        return {}
+    offset = time.localtime(ts[0]).tm_gmtoff
+    if np is None:
+        out: Dict[date, list] = {}
+        for i in range(1, len(ts)):
+            mol, lit = _light_step(lux[i - 1], lux[i], ts[i] - ts[i - 1], settings)
+            acc = out.setdefault(date.fromordinal(_EPOCH + int((ts[i] + offset) // 86400)), [0.0, 0.0])
+            acc[0] += mol
+            acc[1] += lit
+        return {d: (round(m, 3), round(s / 3600.0, 2)) for d, (m, s) in out.items()}
+
+    ts = np.asarray(ts, dtype=float)
+    lux = np.asarray(lux, dtype=float)
+    dt = np.diff(ts)
+    mean = (lux[1:] + lux[:-1]) / 2.0
+    ok = (dt > 0) & (dt <= settings.max_gap_s)
+    mol = np.where(ok, mean * settings.lux_to_ppfd * dt / 1e6, 0.0)
+    lit = np.where(ok & (mean >= settings.light_threshold_lux), dt, 0.0)
+    days, inv = np.unique(((ts[1:] + offset) // 86400).astype(np.int64), return_inverse=True)
+    mol_d = np.bincount(inv, weights=mol)
+    lit_d = np.bincount(inv, weights=lit)
+    return {date.fromordinal(_EPOCH + int(d)): (round(float(m), 3), round(float(s) / 3600.0, 2))
+            for d, m, s in zip(days, mol_d, lit_d)}
+
+
+def _light_step(prev_lux: float, lux: float, dt: float,
+                settings: DerivedMetricsSettings) -> Tuple[float, float]:
+    """(mol/m², secondes éclairées) d'un intervalle, règle des trapèzes."""
+    if dt <= 0 or dt > settings.max_gap_s:
+        return 0.0, 0.0
+    mean = (prev_lux + lux) / 2.0
+    lit = dt if mean >= settings.light_threshold_lux else 0.0
+    return mean * settings.lux_to_ppfd * dt / 1e6, lit
+
+
+# ──────────────────────────────────────────────────────────────
+#  Accumulateur lumineux (une unité)
+# ──────────────────────────────────────────────────────────────
+class LightIntegrator:
+
+    __slots__ = ("day", "mol", "lit_s", "last", "yesterday")
+
+    def __init__(self):
+        self.day: Optional[date] = None
+        self.mol = 0.0
+        self.lit_s = 0.0
+        self.last: Optional[Tuple[float, float]] = None       # (lux, horloge monotone)
+        self.yesterday: Optional[Tuple[float, float]] = None  # (DLI, photopériode h)
+
+    def add(self, lux: float, t: float, today: date, settings: DerivedMetricsSettings) -> None:
+        if self.last is not None and t <= self.last[1]:
+            return                                          # échantillon déjà compté
+        if today != self.day:
+            if self.day is not None:
+                self.yesterday = (self.dli, self.hours)
+            self.day, self.mol, self.lit_s = today, 0.0, 0.0
+        if self.last is not None:
+            mol, lit = _light_step(self.last[0], lux, t - self.last[1], settings)
+            self.mol += mol
+            self.lit_s += lit
+        self.last = (lux, t)
+
+    @property
+    def dli(self) -> float:
+        return round(self.mol, 3)
+
+    @property
+    def hours(self) -> float:
+        return round(self.lit_s / 3600.0, 2)
+
+
+# ──────────────────────────────────────────────────────────────
+#  Moteur (SensorController)
+# ──────────────────────────────────────────────────────────────
+class DerivedMetrics:
+
+    def __init__(self, settings: DerivedMetricsSettings, clock: Clock = SYSTEM_CLOCK):
+        self.settings = settings
+        self.clock = clock
+        self._light: Dict[str, LightIntegrator] = {}          # unité → accumulateur
+
+    def configure(self, settings: DerivedMetricsSettings) -> None:
+        """Nouveaux réglages : s'appliquent aux intervalles suivants (cumuls conservés)."""
+        self.settings = settings
+
+    def plan(self, routes: Dict[str, object]) -> Dict[str, Tuple[str, Tuple[str, ...]]]:
+        """
+        Clés capteur actives (SensorController.Route) → clés dérivées calculables :
+        {clé dérivée: (unité, clés d'entrée)}.
+        """
+        if not self.settings.enabled:
+            return {}
+        found: Dict[str, Dict[str, str]] = {}
+        for key, route in routes.items():
+            quantity = route.key.quantity
+            if quantity:
+                found.setdefault(route.unit, {}).setdefault(quantity, key)
+        plan = {}
+        for unit, by_quantity in found.items():
+            for base, needs in INPUTS.items():
+                if all(q in by_quantity for q in needs):
+                    plan[base + (f"@{unit}" if unit else "")] = (unit, tuple(by_quantity[q] for q in needs))
+        for unit in [u for u in self._light if u not in found]:
+            del self._light[unit]
+        return plan
+
+    def compute(self, method: str, unit: str, inputs: Iterable, t: Optional[float] = None):
+        """Valeur d'une clé dérivée ; None si une entrée manque."""
+        values = list(inputs)
+        if any(not isinstance(v, (int, float)) for v in values):
+            return None
+        if method in ("dli", "photoperiod"):
+            light = self._light.get(unit)
+            if light is None:
+                light = self._light[unit] = LightIntegrator()
+            light.add(float(values[0]), self.clock.monotonic() if t is None else t,
+                      self.clock.now().date(), self.settings)
+            return light.dli if method == "dli" else light.hours
+        try:
+            result = _FORMULAS[method](*values)
+        except (ValueError, ZeroDivisionError, OverflowError):
+            return None
+        return round(result, 3 if method in ("vpd", "leaf_vpd") else 2)
+
+    def to_dict(self) -> Dict[str, dict]:
+        return {
+            unit or "main": {
+                "day":          light.day.isoformat() if light.day else None,
+                "dli":          light.dli,
+                "photoperiod":  light.hours,
+                "yesterday":    dict(zip(("dli", "photoperiod"), light.yesterday)) if light.yesterday else None,
+            }
+            for unit, light in self._light.items()
+        }
+
+
+_FORMULAS = {
+    "vpd":                vpd,
+    "leaf_vpd":           leaf_vpd,
+    "dew_point":          dew_point,
+    "absolute_humidity":  absolute_humidity,
+}
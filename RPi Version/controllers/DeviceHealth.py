@@ -0,0 +1,186 @@
+# controllers/DeviceHealth.py
+# Author : Progradius
+# License: AGPL-3.0
+# -------------------------------------------------------------
+#  Disjoncteur par périphérique capteur (absent, instable, mort)
+# -------------------------------------------------------------
+"""
+État de santé de chaque périphérique, tenu par SensorController.
+
+    healthy ──échec──▶ degraded ──N échecs consécutifs──▶ open
+       ▲                  │                                │ délai écoulé
+       └────succès────────┘◀──────succès──── half-open ◀───┘
+                                                 │ échec
+                                                 ▼
+                                        open (délai × 2, plafonné)
+
+‣ degraded : les lectures continuent ; une seule alerte à l'entrée.
+‣ open : plus AUCUN accès au bus ni log, la lecture rend None tout de
+  suite (coût : une comparaison d'horloge). Une alerte unique à
+  l'ouverture.
+‣ half-open : une seule lecture d'essai (le driver est ré-instancié s'il
+  n'avait pas pu s'initialiser : capteur rebranché). Succès → healthy
+  avec un message de rétablissement ; échec → open, délai doublé.
+‣ Un périphérique = un driver I²C/GPIO, ou une sonde DS18B20 (chaque
+  sonde du bus 1-Wire a son propre disjoncteur).
+
+Variables d'environnement :
+    PHYTO_SENSOR_OPEN_AFTER     échecs consécutifs avant ouverture (défaut 3)
+    PHYTO_SENSOR_BACKOFF_S      1er délai avant essai, s          (défaut 30)
+    PHYTO_SENSOR_BACKOFF_MAX_S  délai maximal, s                  (défaut 3600)
+"""
+
+from __future__ import annotations
+
+import os
+import time
+from typing import Callable, Dict, Optional
+
+from utils.metrics import counter, gauge
+from utils.pretty_console import success, warning, error
+
+HEALTHY = "healthy"
+DEGRADED = "degraded"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+STATES = (HEALTHY, DEGRADED, OPEN, HALF_OPEN)     # index = code (segment partagé, métrique)
+
+_TRIPS = counter("phyto_device_trips_total", "Ouvertures du disjoncteur d'un périphérique", ("device",))
+_SKIPPED = counter("phyto_device_skipped_reads_total", "Lectures évitées (disjoncteur ouvert)", ("device",))
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+class DeviceBreaker:
+
+    def __init__(self, device: str, *, open_after: int = 3, backoff_initial: float = 30.0,
+                 backoff_max: float = 3600.0, clock: Callable[[], float] = time.monotonic):
+        self.device = device
+        self.open_after = max(1, open_after)
+        self.backoff_initial = backoff_initial
+        self.backoff_max = backoff_max
+        self._clock = clock
+
+        self.state = HEALTHY
+        self.failures = 0                    # échecs consécutifs
+        self.trips = 0
+        self.skipped = 0
+        self.backoff = 0.0
+        self.last_error: Optional[str] = None
+        self.last_ok: Optional[float] = None            # epoch
+        self.retry_at: Optional[float] = None           # epoch du prochain essai (open)
+        self._retry_mono = 0.0
+
+    # ──────────────────────────────────────────────────────────
+    #  Chemin chaud
+    # ──────────────────────────────────────────────────────────
+    def allow(self) -> bool:
+        """False : périphérique hors service, ne pas toucher au bus."""
+        if self.state != OPEN:
+            return True
+        if self._clock() < self._retry_mono:
+            self.skipped += 1
+            _SKIPPED.labels(self.device).inc()
+            return False
+        self.state = HALF_OPEN
+        return True
+
+    @property
+    def probing(self) -> bool:
+        return self.state == HALF_OPEN
+
+    def success(self) -> None:
+        if self.state in (OPEN, HALF_OPEN):
+            success(f"Capteur {self.device} rétabli (après {self.failures} échec(s))")
+        elif self.state == DEGRADED:
+            success(f"Capteur {self.device} de nouveau stable")
+        self.state = HEALTHY
+        self.failures = 0
+        self.backoff = 0.0
+        self.retry_at = None
+        self.last_ok = time.time()
+
+    def failure(self, reason: str) -> None:
+        self.failures += 1
+        self.last_error = reason
+
+        if self.state == HALF_OPEN:                     # essai raté : on rouvre, plus longtemps
+            self._open(min(self.backoff_max, max(self.backoff_initial, self.backoff * 2)))
+            return
+        if self.failures >= self.open_after:
+            self.trips += 1
+            _TRIPS.labels(self.device).inc()
+            self._open(self.backoff_initial)
+            error(f"Capteur {self.device} hors service ({self.failures} échecs : {reason}) "
+                  f"→ lectures suspendues, essai dans {self.backoff:g} s")
+        elif self.state == HEALTHY:
+            self.state = DEGRADED
+            warning(f"Capteur {self.device} instable : {reason}")
+
+    def trip(self, reason: str) -> None:
+        """Ouverture immédiate (périphérique vu absent du bus), sans alerte."""
+        self.last_error = reason
+        self.trips += 1
+        _TRIPS.labels(self.device).inc()
+        self._open(self.backoff_max)
+
+    def _open(self, backoff: float) -> None:
+        self.state = OPEN
+        self.backoff = backoff
+        self._retry_mono = self._clock() + backoff
+        self.retry_at = round(time.time() + backoff, 3)
+
+    # ──────────────────────────────────────────────────────────
+    def to_dict(self) -> dict:
+        return {
+            "state":      self.state,
+            "failures":   self.failures,
+            "trips":      self.trips,
+            "backoff_s":  self.backoff,
+            "retry_at":   self.retry_at,
+            "last_ok":    round(self.last_ok, 3) if self.last_ok else None,
+            "last_error": self.last_error,
+        }
+
+
+class DeviceHealth:
+    """Disjoncteurs créés à la demande, un par périphérique."""
+
+    def __init__(self, open_after: Optional[int] = None, backoff_initial: Optional[float] = None,
+                 backoff_max: Optional[float] = None, clock: Callable[[], float] = time.monotonic):
+        self.open_after = open_after or int(_env_float("PHYTO_SENSOR_OPEN_AFTER", 3))
+        self.backoff_initial = backoff_initial or _env_float("PHYTO_SENSOR_BACKOFF_S", 30)
+        self.backoff_max = backoff_max or _env_float("PHYTO_SENSOR_BACKOFF_MAX_S", 3600)
+        self._clock = clock
+        self.breakers: Dict[str, DeviceBreaker] = {}
+
+        gauge("phyto_device_state", "Santé des périphériques (0 ok, 1 dégradé, 2 ouvert, 3 essai)",
+              ("device",)).set_function(
+            lambda: {(name, ): STATES.index(b.state) for name, b in self.breakers.items()}
+        )
+
+    def breaker(self, device: str) -> DeviceBreaker:
+        b = self.breakers.get(device)
+        if b is None:
+            b = self.breakers[device] = DeviceBreaker(
+                device, open_after=self.open_after, backoff_initial=self.backoff_initial,
+                backoff_max=self.backoff_max, clock=self._clock,
+            )
+        return b
+
+    def state(self, device: str) -> str:
+        b = self.breakers.get(device)
+        return b.state if b is not None else HEALTHY
+
+    def forget(self, device: str) -> None:
+        """Périphérique désactivé par la config : son historique ne compte plus."""
+        self.breakers.pop(device, None)
+
+    def to_dict(self) -> Dict[str, dict]:
+        return {name: b.to_dict() for name, b in sorted(self.breakers.items())}
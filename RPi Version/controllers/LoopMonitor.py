@@ -0,0 +1,226 @@
+# controllers/LoopMonitor.py
+# Author : Progradius
+# License: AGPL-3.0
+# -------------------------------------------------------------
+#  Retard de la boucle asyncio + détection des appels bloquants
+# -------------------------------------------------------------
+"""
+Chien de garde de la boucle d'évènements.
+
+‣ Une coroutine « battement » dort ``interval`` et mesure son retard au
+  réveil : c'est le retard d'ordonnancement subi par toutes les tâches
+  (histogramme ``phyto_event_loop_lag_seconds``).
+‣ Un thread veilleur surveille ce battement. S'il est en retard, la boucle
+  est bloquée par un appel synchrone : le veilleur capture la pile du
+  thread de la boucle (``sys._current_frames``) et la tâche asyncio en
+  cours, PENDANT le blocage.
+‣ Au réveil, si le retard dépasse ``threshold``, le blocage est enregistré
+  avec sa pile et attribué (tâche, coroutine, première frame du projet) ;
+  un rapport glissant est servi par l'API (/api/v1/diagnostics/loop).
+
+Coût : un réveil de coroutine toutes les ``interval`` et un réveil de
+thread toutes les ``interval / 2`` ; la capture de pile n'a lieu qu'en
+cas de blocage.
+
+Variables d'environnement :
+    PHYTO_LOOP_MONITOR   0 = désactivé                       (défaut 1)
+    PHYTO_LOOP_STALL_MS  seuil de blocage signalé, en ms      (défaut 100)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import sys
+import threading
+import time
+from collections import deque
+from typing import Optional
+
+from utils.metrics import counter, histogram
+from utils.pretty_console import warning
+
+_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+_MAX_FRAMES = 40
+
+_LAG = histogram("phyto_event_loop_lag_seconds", "Retard d'ordonnancement de la boucle asyncio")
+_STALLS = counter("phyto_event_loop_stalls_total", "Blocages de la boucle au-delà du seuil", ("task",))
+_STALL_SECONDS = histogram("phyto_event_loop_stall_seconds", "Durée des blocages de la boucle")
+
+
+def enabled() -> bool:
+    return os.getenv("PHYTO_LOOP_MONITOR", "1") != "0"
+
+
+def _project_path(filename: str) -> Optional[str]:
+    """Chemin relatif au projet, ou None (stdlib, site-packages)."""
+    path = os.path.abspath(filename)
+    if not path.startswith(_ROOT + os.sep) or "site-packages" in path:
+        return None
+    return os.path.relpath(path, _ROOT)
+
+
+class LoopMonitor:
+
+    def __init__(self, threshold_s: Optional[float] = None, interval_s: Optional[float] = None,
+                 history: int = 50, window: int = 1200):
+        if threshold_s is None:
+            try:
+                threshold_s = float(os.getenv("PHYTO_LOOP_STALL_MS", "100")) / 1000
+            except ValueError:
+                threshold_s = 0.1
+        self.threshold_s = threshold_s
+        self.interval_s = interval_s or min(0.05, threshold_s / 2)
+
+        self.stalls: deque = deque(maxlen=history)        # derniers blocages (détaillés)
+        self.sites: dict[tuple, dict] = {}                # (tâche, site) → agrégats
+        self.stalls_total = 0
+        self._lags: deque = deque(maxlen=window)          # retards récents (s)
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread_id: Optional[int] = None
+        self._beat = time.monotonic()
+        self._capture: Optional[dict] = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+    # ──────────────────────────────────────────────────────────
+    #  Battement (thread de la boucle)
+    # ──────────────────────────────────────────────────────────
+    async def run(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._thread_id = threading.get_ident()
+        self._beat = time.monotonic()
+        self._stop.clear()
+        threading.Thread(target=self._watch, name="loop-monitor", daemon=True).start()
+        try:
+            while True:
+                t0 = time.monotonic()
+                await asyncio.sleep(self.interval_s)
+                now = time.monotonic()
+                lag = max(0.0, now - t0 - self.interval_s)
+                beat, self._beat = self._beat, now
+                self._lags.append(lag)
+                _LAG.observe(lag)
+                if lag >= self.threshold_s:
+                    self._record(lag, beat)
+        finally:
+            self._stop.set()
+
+    def _record(self, lag: float, beat: float) -> None:
+        with self._lock:
+            cap, self._capture = self._capture, None
+        if cap is None or cap["beat"] != beat:
+            # blocage terminé avant le passage du veilleur
+            cap = {"task": None, "coro": None, "frames": []}
+
+        frames = [
+            {"file": rel or filename, "line": lineno, "func": func}
+            for filename, lineno, func, rel in cap["frames"]
+        ]
+        project = [f for (_, _, _, rel), f in zip(cap["frames"], frames) if rel]
+        where = project[-1] if project else None
+        leaf = frames[-1] if frames else None
+        task = cap["task"] or ("callback" if frames else "inconnu")
+
+        rec = {
+            "ts":     round(time.time() - lag, 3),
+            "lag_ms": round(lag * 1000, 1),
+            "task":   task,
+            "coro":   cap["coro"],
+            "where":  f"{where['file']}:{where['line']} {where['func']}" if where else None,
+            "leaf":   f"{leaf['file']}:{leaf['line']} {leaf['func']}" if leaf else None,
+            "stack":  frames,
+        }
+        self.stalls.append(rec)
+        self.stalls_total += 1
+
+        site = self.sites.setdefault((task, rec["where"]), {
+            "task": task, "where": rec["where"], "count": 0, "total_ms": 0.0, "max_ms": 0.0,
+        })
+        site["count"] += 1
+        site["total_ms"] = round(site["total_ms"] + rec["lag_ms"], 1)
+        site["max_ms"] = max(site["max_ms"], rec["lag_ms"])
+        site["last_ts"] = rec["ts"]
+
+        _STALLS.labels(task).inc()
+        _STALL_SECONDS.observe(lag)
+        warning(f"Boucle bloquée {rec['lag_ms']} ms — tâche {task} @ {rec['where'] or rec['leaf'] or '?'}")
+
+    # ──────────────────────────────────────────────────────────
+    #  Veilleur (thread séparé)
+    # ──────────────────────────────────────────────────────────
+    def _watch(self) -> None:
+        # la pile est prise dès que le battement a dépassé la moitié du seuil :
+        # le blocage est alors en cours, son auteur est sur la pile
+        late = self.interval_s + self.threshold_s / 2
+        poll = max(0.005, self.interval_s / 2)
+        while not self._stop.wait(poll):
+            beat = self._beat
+            if time.monotonic() - beat < late:
+                continue
+            with self._lock:
+                if self._capture is not None and self._capture["beat"] == beat:
+                    continue                      # déjà capturé pour ce blocage
+            cap = self._snapshot(beat)
+            # battement reçu entre-temps : la pile ne montre plus le coupable
+            if cap is not None and self._beat == beat:
+                with self._lock:
+                    self._capture = cap
+
+    def _snapshot(self, beat: float) -> Optional[dict]:
+        frame = sys._current_frames().get(self._thread_id)
+        if frame is None:
+            return None
+        frames = []
+        while frame is not None and len(frames) < _MAX_FRAMES:
+            code = frame.f_code
+            frames.append((code.co_filename, frame.f_lineno, code.co_name,
+                           _project_path(code.co_filename)))
+            frame = frame.f_back
+        frames.reverse()                          # plus ancienne → plus récente
+
+        task = coro = None
+        try:
+            current = asyncio.current_task(self._loop)
+        except RuntimeError:
+            current = None
+        if current is not None:
+            task = current.get_name()
+            c = current.get_coro()
+            coro = getattr(c, "__qualname__", None) or repr(c)
+        return {"beat": beat, "task": task, "coro": coro, "frames": frames}
+
+    # ──────────────────────────────────────────────────────────
+    #  Rapport
+    # ──────────────────────────────────────────────────────────
+    def recent_max_lag(self, seconds: float) -> Optional[float]:
+        """Plus grand retard (s) sur les *seconds* dernières secondes, ou None."""
+        n = max(1, int(seconds / self.interval_s))
+        recent = list(self._lags)[-n:]
+        return max(recent) if recent else None
+
+    def to_dict(self, stacks: bool = True) -> dict:
+        lags = sorted(self._lags)
+
+        def _p(q: float) -> Optional[float]:
+            if not lags:
+                return None
+            return round(lags[min(len(lags) - 1, int(q * len(lags)))] * 1000, 2)
+
+        recent = list(self.stalls)
+        if not stacks:
+            recent = [{k: v for k, v in r.items() if k != "stack"} for r in recent]
+        return {
+            "threshold_ms": round(self.threshold_s * 1000, 1),
+            "interval_ms":  round(self.interval_s * 1000, 1),
+            "lag": {
+                "window": len(lags),
+                "p50_ms": _p(0.50),
+                "p99_ms": _p(0.99),
+                "max_ms": round(lags[-1] * 1000, 2) if lags else None,
+            },
+            "stalls_total": self.stalls_total,
+            "by_site": sorted(self.sites.values(), key=lambda s: s["total_ms"], reverse=True),
+            "recent": recent[::-1],
+        }
@@ -0,0 +1,680 @@
+# controllers/ProcessRoles.py
+# Author : Progradius
+# License: AGPL-3.0
+# -------------------------------------------------------------
+#  Mode multi-processus : contrôle | web | export
+# -------------------------------------------------------------
+"""
+Mode optionnel (PHYTO_PROCESS_MODE=multi) qui sort le serveur web et
+l'export Influx du processus de contrôle.
+
+‣ Processus de contrôle (principal) : capteurs, timers, régulations,
+  superviseur, watchdog. Il publie l'état dans un segment partagé
+  (utils.shared_state, seqlock) et exécute les commandes reçues.
+‣ Processus « web » : Server + API inchangés, branchés sur des proxys :
+  lectures depuis le segment (aucun aller-retour), écritures (sorties,
+  moteur, patch de config, tâches) par un canal de commandes (Pipe) avec
+  réponse et délai borné. Les logs du contrôle lui sont relayés pour la
+  console SSE.
+‣ Processus « export » : boucle Influx sur le même segment ; ses logs et
+  ses métriques remontent au contrôle.
+‣ Les fils sont créés par fork (ils héritent de la config et du mapping
+  du segment) et sont des tâches du superviseur : un crash du web est
+  relancé avec délai sans toucher aux régulations. Un fils dont le parent
+  disparaît s'arrête de lui-même.
+‣ /metrics (web) agrège contrôle, web et export (label ``process``).
+
+Variables d'environnement :
+    PHYTO_PROCESS_MODE   single | multi                       (défaut single)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import multiprocessing as mp
+import os
+import queue
+import signal
+import threading
+import time
+from typing import Dict, Optional
+
+from controllers.DeviceHealth import STATES as HEALTH_STATES
+from controllers.Supervisor import SupervisorError, UnknownTask
+from param.config import AppConfig
+from param.config_patch import ConfigPatchError, PatchReport
+from sensor_handlers.registry import unit_of
+from utils import metrics
+from utils.memory import MemoryMonitor, install_metrics as install_memory_metrics
+from utils.log_bus import log_bus
+from utils.profiler import DebugProbe, ProfilerBusy
+from utils.pretty_console import info, success, warning, error
+from utils.shared_state import StateSegment
+
+_CTX = mp.get_context("fork")
+_LOG_QUEUE = 1000                            # records en attente vers un fils
+_RPC_TIMEOUT = 2.0
+
+_COMMAND_SECONDS = metrics.histogram(
+    "phyto_ipc_command_seconds", "Commandes reçues des autres processus", ("cmd",)
+)
+_LOG_DROPPED = metrics.counter(
+    "phyto_ipc_log_dropped_total", "Logs non relayés (file du processus fils pleine)", ("role",)
+)
+_CHILD_STARTS = metrics.counter(
+    "phyto_process_starts_total", "Démarrages des processus fils", ("role",)
+)
+
+# erreurs reconstruites côté appelant (nom de classe → type)
+_REMOTE_ERRORS = {
+    "ConfigPatchError": ConfigPatchError,
+    "UnknownTask":      UnknownTask,
+    "SupervisorError":  SupervisorError,
+    "ProfilerBusy":     ProfilerBusy,
+}
+
+
+def enabled() -> bool:
+    return os.getenv("PHYTO_PROCESS_MODE", "single").lower() == "multi"
+
+
+class RemoteUnavailable(ConnectionError):
+    """Processus de contrôle injoignable ou muet au-delà du délai."""
+
+
+class ChildExited(RuntimeError):
+    """Processus fils terminé (code de sortie non nul)."""
+
+
+def _reload_config_in_place(config: AppConfig) -> None:
+    """Relit param.json dans l'instance partagée (les références restent valides)."""
+    fresh = AppConfig.load()
+    for name in AppConfig.model_fields:
+        setattr(config, name, getattr(fresh, name))
+
+
+# ──────────────────────────────────────────────────────────────
+#  Côté contrôle
+# ──────────────────────────────────────────────────────────────
+class ProcessRoles:
+
+    def __init__(
+        self,
+        *,
+        config: AppConfig,
+        sensor_handler,
+        outlets: dict,
+        motor_handler=None,
+        config_patcher=None,
+        boot=None,
+        loop_monitor=None,
+        supervisor=None,
+        memory=None,
+        discovery=None,
+        zones=None,
+        pulses=None,
+    ):
+        self.config = config
+        self.sensor_handler = sensor_handler
+        self.outlets = outlets
+        self.motor_handler = motor_handler
+        self.config_patcher = config_patcher
+        self.boot = boot
+        self.loop_monitor = loop_monitor
+        self.supervisor = supervisor
+        self.memory = memory
+        self.discovery = discovery
+        self.zones = zones
+        self.pulses = pulses
+        # clés figées au démarrage : un capteur ajouté à l'arbre I²C ensuite
+        # n'apparaît dans les processus web / export qu'après redémarrage
+        # (idem pour les sorties d'une zone climatique ajoutée à chaud)
+        self.measurements = dict(sensor_handler.measurements)
+
+        self.segment = StateSegment(sensor_handler.all_keys(), list(outlets))
+        self._child_metrics: Dict[str, list] = {}
+        self._debug = DebugProbe()
+        self._commands = {
+            "outlet":       self._cmd_outlet,
+            "motor":        self._cmd_motor,
+            "config.patch": self._cmd_config_patch,
+            "boot":         lambda: self.boot.to_dict(),
+            "loop":         lambda: self.loop_monitor.to_dict(),
+            "tasks":        lambda: self.supervisor.to_dict(),
+            "task":         lambda op, name: getattr(self.supervisor, op)(name),
+            "metrics":      self._cmd_metrics,
+            "sensors.health": lambda: self.sensor_handler.device_health(),
+            "sensors.fusion": lambda: self.sensor_handler.fusion_state(),
+            "devices":      lambda: self.discovery.to_dict(),
+            "zones":        lambda: self.zones.to_dict(),
+            "pulses":       lambda: self.pulses.to_dict(),
+            "memory":       lambda: self.memory.to_dict(),
+            "memory.op":    lambda op, *args: getattr(self.memory, op)(*args),
+            "debug.tasks":  self._debug.tasks,
+            "profile.start": self._debug.profile_start,
+            "profile.stop": self._debug.profile_stop,
+        }
+        self.publish()                       # segment lisible avant le 1er fork
+        info(f"Segment d'état partagé {self.segment.name} ({self.segment.size} octets)")
+
+    # ── Publication ─────────────────────────────────────────────
+    def publish(self) -> None:
+        sh = self.sensor_handler
+        enabled = set(sh.enabled_keys())
+        sensors = {}
+        for key in self.segment.sensor_keys:
+            hit = sh.get_cached_value(key)
+            health = HEALTH_STATES.index(sh.health_state(key))
+            sensors[key] = ((hit[0], hit[1]) if hit else (None, None)) + (
+                key in enabled, health, sh.filters.value(key))
+        outlets = {name: (comp.get_state(), comp.pin) for name, comp in self.outlets.items()}
+        speed = self.motor_handler.speed if self.motor_handler else None
+        self.segment.write(sensors, outlets, speed)
+
+    async def publish_loop(self, period: float = 0.5) -> None:
+        while True:
+            self.publish()
+            await asyncio.sleep(period)
+
+    # ── Commandes ───────────────────────────────────────────────
+    def _cmd_outlet(self, name: str, state: int) -> int:
+        comp = self.outlets[name]
+        comp.set_state(state)
+        self.publish()
+        return comp.get_state()
+
+    def _cmd_motor(self, speed: int) -> int:
+        self.motor_handler.set_motor_speed(speed)
+        self.publish()
+        return self.motor_handler.speed
+
+    def _cmd_config_patch(self, patch: dict) -> dict:
+        report = self.config_patcher.apply(patch)
+        if report.saved:
+            self.segment.bump_config()
+            self.publish()
+        return report.to_dict()
+
+    def _cmd_metrics(self) -> dict:
+        return {"control": metrics.REGISTRY.collect(), **self._child_metrics}
+
+    def _on_command(self, conn) -> None:
+        try:
+            rid, cmd, args = conn.recv()
+        except (EOFError, OSError):
+            asyncio.get_running_loop().remove_reader(conn.fileno())
+            return
+        t0 = time.perf_counter()
+        try:
+            reply = (rid, True, self._commands[cmd](*args))
+        except Exception as exc:
+            reply = (rid, False, (type(exc).__name__, str(exc)))
+        _COMMAND_SECONDS.labels(cmd).observe(time.perf_counter() - t0)
+        try:
+            conn.send(reply)
+        except OSError:
+            pass                             # le fils est mort entre-temps
+
+    # ── Processus fils (tâches du superviseur) ──────────────────
+    async def run_child(self, role: str) -> None:
+        """Démarre le fils *role* puis attend sa fin (relancé par le superviseur)."""
+        loop = asyncio.get_running_loop()
+        cmd_conn = child_conn = down_q = up_q = None
+        if role == "web":
+            cmd_conn, child_conn = _CTX.Pipe()
+            down_q = _CTX.Queue(maxsize=_LOG_QUEUE)
+        else:
+            up_q = _CTX.Queue(maxsize=_LOG_QUEUE)
+        for q in (down_q, up_q):
+            if q is not None:
+                q.cancel_join_thread()       # best effort : ne jamais bloquer la sortie
+
+        proc = _CTX.Process(
+            target=_child_main,
+            args=(self, role, child_conn, down_q, up_q, os.getpid()),
+            name=f"phyto-{role}",
+            daemon=True,
+        )
+        proc.start()
+        _CHILD_STARTS.labels(role).inc()
+        success(f"Processus {role} démarré (pid {proc.pid})")
+
+        helpers = []
+        stop = threading.Event()
+        if cmd_conn is not None:
+            child_conn.close()
+            loop.add_reader(cmd_conn.fileno(), self._on_command, cmd_conn)
+            helpers.append(loop.create_task(self._relay_logs_down(down_q, role), name=f"{role}_logs"))
+        if up_q is not None:
+            threading.Thread(target=self._drain_up, args=(up_q, role, stop),
+                             name=f"{role}-uplink", daemon=True).start()
+        try:
+            await _wait_exit(proc)
+        finally:
+            stop.set()
+            for task in helpers:
+                task.cancel()
+            if cmd_conn is not None:
+                loop.remove_reader(cmd_conn.fileno())
+                cmd_conn.close()
+            if proc.is_alive():
+                proc.terminate()
+                if not await _wait_exit(proc, timeout=2.0):
+                    proc.kill()
+                    await _wait_exit(proc, timeout=2.0)
+            proc.join(0)
+            for q in (down_q, up_q):
+                if q is not None:
+                    q.close()
+        if proc.exitcode:
+            raise ChildExited(f"processus {role} terminé (code {proc.exitcode})")
+
+    async def _relay_logs_down(self, down_q, role: str) -> None:
+        """Logs du contrôle → console SSE du web (perte si le web ne suit pas)."""
+        sub = log_bus.subscribe()
+        try:
+            while True:
+                rec = await sub.get()
+                try:
+                    down_q.put_nowait(rec)
+                except queue.Full:
+                    _LOG_DROPPED.labels(role).inc()
+        finally:
+            log_bus.unsubscribe(sub)
+
+    def _drain_up(self, up_q, role: str, stop: threading.Event) -> None:
+        """Thread : logs et métriques d'un fils (un fils mort ne bloque pas la boucle)."""
+        while not stop.is_set():
+            try:
+                kind, payload = up_q.get(timeout=1.0)
+            except queue.Empty:
+                continue
+            except (EOFError, OSError):
+                return
+            if kind == "log":
+                log_bus.publish(payload.level, payload.msg, payload.ansi, ts=payload.ts)
+            elif kind == "metrics":
+                self._child_metrics[role] = payload
+
+    def close(self) -> None:
+        self.segment.close(unlink=True)
+
+
+async def _wait_exit(proc, timeout: Optional[float] = None) -> bool:
+    """Attend la fin de *proc* sans bloquer la boucle (sentinelle du processus)."""
+    loop = asyncio.get_running_loop()
+    if proc.exitcode is not None:
+        return True
+    done = loop.create_future()
+    loop.add_reader(proc.sentinel, lambda: done.done() or done.set_result(True))
+    try:
+        await asyncio.wait_for(done, timeout)
+    except asyncio.TimeoutError:
+        return False
+    finally:
+        loop.remove_reader(proc.sentinel)
+    # la sentinelle se ferme avant que le processus soit récoltable
+    for _ in range(200):
+        if proc.exitcode is not None:
+            break
+        await asyncio.sleep(0.01)
+    return True
+
+
+# ──────────────────────────────────────────────────────────────
+#  Côté fils : canal de commandes et proxys
+# ──────────────────────────────────────────────────────────────
+class CommandClient:
+    """Appel synchrone borné vers le contrôle (commandes rares : écritures, diagnostics)."""
+
+    def __init__(self, conn, timeout: float = _RPC_TIMEOUT):
+        self.conn = conn
+        self.timeout = timeout
+        self._id = 0
+
+    def call(self, cmd: str, *args, timeout: Optional[float] = None):
+        self._id += 1
+        try:
+            self.conn.send((self._id, cmd, args))
+        except OSError as exc:
+            raise RemoteUnavailable(f"contrôle injoignable : {exc}")
+        timeout = timeout or self.timeout
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not self.conn.poll(remaining):
+                raise RemoteUnavailable(f"contrôle muet ({cmd}, {timeout} s)")
+            rid, ok, payload = self.conn.recv()
+            if rid != self._id:
+                continue                     # réponse d'un appel expiré
+            if ok:
+                return payload
+            kind, detail = payload
+            raise _REMOTE_ERRORS.get(kind, RuntimeError)(detail)
+
+
+class RemoteSensors:
+    """Interface de lecture de SensorController, servie par le segment partagé."""
+
+    def __init__(self, segment: StateSegment, measurements: dict, client: Optional["CommandClient"] = None):
+        self.segment = segment
+        self.measurements = measurements
+        self.client = client
+        self.stats = None                    # posé par Server (min/max côté web)
+        self._seen: Dict[str, float] = {}
+
+    def _sensors(self) -> dict:
+        return self.segment.read()["sensors"]
+
+    @property
+    def sensor_dict(self) -> Dict[str, list]:
+        snap = self._sensors()
+        out = {}
+        for measurement, keys in self.measurements.items():
+            active = [k for k in keys if snap[k][2]]
+            if active:
+                out[measurement] = active
+        return out
+
+    def enabled_keys(self) -> list:
+        return [k for k, (_, _, en, _, _) in self._sensors().items() if en]
+
+    def get_cached_value(self, key: str, filtered: bool = False):
+        hit = self._sensors().get(key)
+        if filtered and hit and hit[4] is not None:
+            return hit[4], hit[1]
+        return (hit[0], hit[1]) if hit and hit[0] is not None else None
+
+    def get_sensor_value(self, key: str):
+        hit = self.get_cached_value(key)
+        return hit[0] if hit else None
+
+    def read_all(self, keys=None) -> Dict[str, object]:
+        snap = self._sensors()
+        keys = self.enabled_keys() if keys is None else keys
+        return {k: snap[k][0] if k in snap else None for k in keys}
+
+    async def read_all_async(self, keys=None) -> Dict[str, object]:
+        """Lecture du segment partagé : mémoire seulement, rien à déporter."""
+        return self.read_all(keys)
+
+    def health_state(self, key: str) -> str:
+        hit = self._sensors().get(key)
+        return HEALTH_STATES[hit[3]] if hit else HEALTH_STATES[0]
+
+    def device_health(self) -> Dict[str, dict]:
+        return self.client.call("sensors.health") if self.client is not None else {}
+
+    def fusion_state(self) -> dict:
+        return self.client.call("sensors.fusion") if self.client is not None else {}
+
+    def snapshot(self) -> Dict[str, dict]:
+        return {
+            k: {"value": v, "ts": round(ts, 3) if ts is not None else None, "health": HEALTH_STATES[h],
+                "unit": unit_of(k), "filtered": f}
+            for k, (v, ts, en, h, f) in self._sensors().items() if en
+        }
+
+    def reconfigure(self, config: AppConfig) -> list:
+        return []                            # les drivers vivent dans le contrôle
+
+    def sync_stats(self) -> None:
+        """Min/max des nouvelles lectures publiées."""
+        if self.stats is None:
+            return
+        for key, (value, ts, _, _, _) in self._sensors().items():
+            if value is None or key not in self.stats.KEYS or self._seen.get(key) == ts:
+                continue
+            self._seen[key] = ts
+            self.stats.update(key, float(value))
+
+
+class RemoteOutlet:
+
+    def __init__(self, name: str, segment: StateSegment, client: CommandClient):
+        self.name = name
+        self.segment = segment
+        self.client = client
+
+    @property
+    def pin(self) -> int:
+        return self.segment.read()["outlets"][self.name][1]
+
+    def get_state(self) -> int:
+        return self.segment.read()["outlets"][self.name][0] or 0
+
+    def set_state(self, value: int) -> None:
+        self.client.call("outlet", self.name, value)
+
+
+class RemoteMotor:
+    """MotorHandler (``speed``, ``set_motor_speed``) et Motor (``get_motor_speed``)."""
+
+    def __init__(self, segment: StateSegment, client: CommandClient):
+        self.segment = segment
+        self.client = client
+
+    @property
+    def speed(self):
+        return self.segment.read()["motor"]
+
+    def get_motor_speed(self):
+        return self.speed
+
+    def set_motor_speed(self, speed: int) -> None:
+        self.client.call("motor", speed)
+
+
+class RemoteConfigPatcher:
+    """Patch appliqué (et sauvegardé) par le contrôle, puis relu ici."""
+
+    def __init__(self, client: CommandClient, config: AppConfig, segment: StateSegment):
+        self.client = client
+        self.config = config
+        self.segment = segment
+        self.config_gen = segment.read()["config_gen"]
+
+    def apply(self, patch: dict) -> PatchReport:
+        report = PatchReport(**self.client.call("config.patch", patch))
+        if report.saved:
+            self.refresh(force=True)
+        return report
+
+    def refresh(self, force: bool = False) -> bool:
+        gen = self.segment.read()["config_gen"]
+        if not force and gen == self.config_gen:
+            return False
+        self.config_gen = gen
+        _reload_config_in_place(self.config)
+        return True
+
+
+class RemoteView:
+    """``to_dict()`` d'un objet du contrôle (boot, loop monitor…)."""
+
+    def __init__(self, client: CommandClient, cmd: str):
+        self.client = client
+        self.cmd = cmd
+
+    def to_dict(self) -> dict:
+        return self.client.call(self.cmd)
+
+
+class RemoteDebug:
+    """/debug/* du web exécuté dans le processus de contrôle."""
+
+    def __init__(self, client: CommandClient):
+        self.client = client
+
+    def tasks(self) -> list:
+        return self.client.call("debug.tasks")
+
+    def profile_start(self, hz: int) -> int:
+        return self.client.call("profile.start", hz)
+
+    def profile_stop(self, top: int = 25) -> dict:
+        return self.client.call("profile.stop", top)
+
+
+class RemoteMemory(RemoteView):
+    """MemoryMonitor du contrôle (les instantanés tracemalloc peuvent être lents)."""
+
+    def __init__(self, client: CommandClient):
+        super().__init__(client, "memory")
+
+    def _op(self, op: str, *args):
+        return self.client.call("memory.op", op, *args, timeout=30.0)
+
+    def trace_start(self, frames: int = 1) -> dict:
+        return self._op("trace_start", frames)
+
+    def trace_diff(self, top: int = 20, rebase: bool = False) -> dict:
+        return self._op("trace_diff", top, rebase)
+
+    def trace_stop(self) -> dict:
+        return self._op("trace_stop")
+
+    def refresh_objects(self) -> dict:
+        return self._op("refresh_objects")
+
+
+class RemoteSupervisor(RemoteView):
+
+    def __init__(self, client: CommandClient):
+        super().__init__(client, "tasks")
+
+    def restart(self, name: str) -> dict:
+        return self.client.call("task", "restart", name)
+
+    def freeze(self, name: str) -> dict:
+        return self.client.call("task", "freeze", name)
+
+    def resume(self, name: str) -> dict:
+        return self.client.call("task", "resume", name)
+
+
+# ──────────────────────────────────────────────────────────────
+#  Point d'entrée des fils
+# ──────────────────────────────────────────────────────────────
+def _child_main(roles: ProcessRoles, role: str, conn, down_q, up_q, parent_pid: int) -> None:
+    # Ctrl-C : c'est le contrôle qui arrête ses fils ; pas de cleanup GPIO ici
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    for sig in (signal.SIGTERM, signal.SIGHUP):
+        signal.signal(sig, signal.SIG_DFL)
+    from utils import log_bus as bus
+    bus.reset_after_fork()
+    metrics.REGISTRY.reset()
+    bus.install_metrics()
+    install_memory_metrics()
+
+    main = _web_role if role == "web" else _export_role
+    try:
+        asyncio.run(main(roles, conn, down_q, up_q, parent_pid))
+    except Exception as exc:
+        error(f"Processus {role} : {exc!r}")
+        raise
+
+
+async def _follow(roles: ProcessRoles, sensors: RemoteSensors, patcher: RemoteConfigPatcher,
+                  parent_pid: int, on_config=None, period: float = 1.0) -> None:
+    """Suit le segment : min/max, génération de config, survie du parent."""
+    while True:
+        if os.getppid() != parent_pid:
+            warning("Processus de contrôle disparu → arrêt")
+            os._exit(0)
+        try:
+            sensors.sync_stats()
+            if patcher.refresh() and on_config is not None:
+                on_config(roles.config)
+        except Exception as exc:
+            warning(f"Suivi de l'état partagé : {exc!r}")
+        await asyncio.sleep(period)
+
+
+async def _relay_logs_up(up_q) -> None:
+    """Logs de ce fils → contrôle (qui les relaie à son tour vers le web)."""
+    sub = log_bus.subscribe()
+    while True:
+        rec = await sub.get()
+        try:
+            up_q.put_nowait(("log", rec))
+        except queue.Full:
+            pass
+
+
+async def _web_role(roles: ProcessRoles, conn, down_q, up_q, parent_pid: int) -> None:
+    from controllers.SystemStatus import SystemStatus
+    from network.web.server import Server
+
+    seg, config = roles.segment, roles.config
+    client = CommandClient(conn)
+    sensors = RemoteSensors(seg, roles.measurements, client)
+    outlets = {name: RemoteOutlet(name, seg, client) for name in seg.outlet_names}
+    motor = RemoteMotor(seg, client) if roles.motor_handler is not None else None
+    patcher = RemoteConfigPatcher(client, config, seg)
+
+    def _relay_down() -> None:
+        while True:
+            try:
+                rec = down_q.get()
+            except (EOFError, OSError):
+                return
+            log_bus.publish(rec.level, rec.msg, rec.ansi, ts=rec.ts)
+
+    threading.Thread(target=_relay_down, name="web-logs", daemon=True).start()
+
+    def _metrics() -> str:
+        try:
+            sources = client.call("metrics")
+        except RemoteUnavailable:
+            sources = {}
+        sources["web"] = metrics.REGISTRY.collect()
+        return metrics.render_merged(sources)
+
+    server = Server(
+        controller_status=SystemStatus(config, component=outlets.get("dailytimer1"), motor=motor),
+        sensor_handler=sensors,
+        config=config,
+        outlets=outlets,
+        motor_handler=motor,
+        config_patcher=patcher,
+        boot=RemoteView(client, "boot") if roles.boot is not None else None,
+        loop_monitor=RemoteView(client, "loop") if roles.loop_monitor is not None else None,
+        supervisor=RemoteSupervisor(client) if roles.supervisor is not None else None,
+        metrics_render=_metrics,
+        debug_remote=RemoteDebug(client),
+        memory=RemoteMemory(client) if roles.memory is not None else None,
+        discovery=RemoteView(client, "devices") if roles.discovery is not None else None,
+        zones=RemoteView(client, "zones") if roles.zones is not None else None,
+        pulses=RemoteView(client, "pulses") if roles.pulses is not None else None,
+    )
+    loop = asyncio.get_running_loop()
+    loop.create_task(_follow(roles, sensors, patcher, parent_pid))
+    loop.create_task(MemoryMonitor().run())          # jauges RSS/USS du fils
+    await server.run()
+
+
+async def _export_role(roles: ProcessRoles, conn, down_q, up_q, parent_pid: int) -> None:
+    from network.web import influx_handler
+
+    seg, config = roles.segment, roles.config
+    sensors = RemoteSensors(seg, roles.measurements)
+    patcher = RemoteConfigPatcher(None, config, seg)
+    influx_handler.reload_endpoint(config)
+    influx_handler.bind_sensor_handler(sensors)
+
+    loop = asyncio.get_running_loop()
+    loop.create_task(_relay_logs_up(up_q))
+    loop.create_task(_follow(roles, sensors, patcher, parent_pid, on_config=influx_handler.reload_endpoint))
+
+    async def _push_metrics() -> None:
+        while True:
+            try:
+                up_q.put_nowait(("metrics", metrics.REGISTRY.collect()))
+            except queue.Full:
+                pass
+            await asyncio.sleep(15)
+
+    loop.create_task(MemoryMonitor().run())
+    loop.create_task(_push_metrics())
+    await influx_handler.write_sensor_values(period=60)
@@ -0,0 +1,246 @@
+# controllers/PulseTrain.py
+# Author : Progradius
+# License: AGPL-3.0
+# -------------------------------------------------------------
+#  Train d'impulsions cadencé par un thread dédié (brumisation, dosage)
+# -------------------------------------------------------------
+"""
+Mode « impulsions » des CyclicTimers : ON ``on_ms`` / OFF ``off_ms`` à la
+milliseconde, hors de la boucle asyncio.
+
+‣ Un thread par sortie, démarré au premier passage en mode impulsions.
+  Échéances absolues (``perf_counter_ns``) : front n = t0 + n·période,
+  aucune dérive cumulée ; un retard (machine suspendue) de plus d'une
+  période resynchronise le train au lieu de rattraper les impulsions.
+‣ Attente hybride : sommeil jusqu'à ``PHYTO_PULSE_SPIN_US`` avant le
+  front, puis attente active (qui rend le GIL) jusqu'à l'échéance.
+‣ Priorité temps réel (SCHED_FIFO) demandée pour le thread ; sans le
+  droit (CAP_SYS_NICE), le train tourne en priorité normale
+  (``realtime: false`` dans le rapport).
+‣ Écriture GPIO directe (relais actif bas), sans log ni relecture de
+  configuration : ``configure`` remplace le couple (on, off) d'un bloc,
+  pris en compte au cycle suivant ; ``on_ms = 0`` met le train au repos
+  (sortie OFF) immédiatement.
+‣ Retard de chaque front (écriture − échéance) : histogramme
+  ``phyto_pulse_lateness_seconds`` et rapport glissant (moyenne, p50,
+  p95, p99, max en µs) servi par /api/v1/diagnostics/pulse.
+
+Limite : le thread partage le GIL avec la boucle ; une section Python qui
+le garde plus de ``sys.getswitchinterval()`` (5 ms) retarde le front
+d'autant, ce que le rapport de gigue rend visible.
+
+Variables d'environnement :
+    PHYTO_PULSE_RT        0 = pas de demande SCHED_FIFO             (défaut 1)
+    PHYTO_PULSE_SPIN_US   attente active avant chaque front, en µs  (défaut 2000)
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import deque
+from typing import Optional
+
+from hal.backend import GPIO
+from utils.metrics import counter, histogram
+from utils.pretty_console import info, warning
+
+_LATENESS = histogram(
+    "phyto_pulse_lateness_seconds", "Retard des fronts du train d'impulsions", ("timer",),
+    buckets=(0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.002, 0.005, 0.01, 0.025, 0.05, 0.1),
+)
+_PULSES = counter("phyto_pulses_total", "Impulsions émises", ("timer",))
+_RESYNCS = counter("phyto_pulse_resyncs_total", "Trains resynchronisés après un retard d'une période", ("timer",))
+
+_RT_PRIORITY = 50
+
+
+def _spin_ns() -> int:
+    try:
+        return max(0, int(os.getenv("PHYTO_PULSE_SPIN_US", "2000"))) * 1000
+    except ValueError:
+        return 2_000_000
+
+
+def _realtime() -> bool:
+    """SCHED_FIFO pour le thread appelant (Linux) ; False si refusé."""
+    if os.getenv("PHYTO_PULSE_RT", "1") == "0" or not hasattr(os, "sched_setscheduler"):
+        return False
+    try:
+        prio = min(_RT_PRIORITY, os.sched_get_priority_max(os.SCHED_FIFO))
+        os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(prio))
+        return True
+    except (OSError, AttributeError):
+        return False
+
+
+class PulseTrain:
+
+    def __init__(self, pin: int, name: str, window: int = 2000):
+        self.pin = pin
+        self.name = name
+        self.realtime = False
+        self.pulses = 0
+        self.resyncs = 0
+        self._params = (0, 0)                       # (on, off) en ns ; on = 0 → repos
+        self._late: deque = deque(maxlen=window)    # retards récents (ns)
+        self._metric = _LATENESS.labels(name)
+        self._spin = _spin_ns()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # ──────────────────────────────────────────────────────────
+    #  Pilotage (boucle asyncio)
+    # ──────────────────────────────────────────────────────────
+    def configure(self, on_ms: int, off_ms: int) -> bool:
+        """Nouvelles durées (ms) ; True si elles ont changé."""
+        params = (int(on_ms) * 1_000_000, max(1, int(off_ms)) * 1_000_000)
+        if params == self._params:
+            return False
+        resting = self._params[0] == 0
+        self._params = params
+        if resting or params[0] == 0:
+            self._wake.set()
+        return True
+
+    @property
+    def active(self) -> bool:
+        return self._params[0] > 0
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name=f"pulse-{self.name}", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 1.0) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+        self._thread = None
+        self._write(False)
+
+    # ──────────────────────────────────────────────────────────
+    #  Thread de cadencement
+    # ──────────────────────────────────────────────────────────
+    def _run(self) -> None:
+        self.realtime = _realtime()
+        info(f"Train d'impulsions {self.name} (GPIO {self.pin}) : "
+             f"{'SCHED_FIFO' if self.realtime else 'priorité normale'}")
+        try:
+            self._pulse_loop()
+        except Exception as e:
+            warning(f"Train d'impulsions {self.name} arrêté : {e!r}")
+        finally:
+            self._write(False)
+
+    def _pulse_loop(self) -> None:
+        edge = None
+        while not self._stop.is_set():
+            on, off = self._params
+            if not on:
+                self._write(False)
+                self._wake.wait()
+                self._wake.clear()
+                edge = None
+                continue
+
+            now = time.perf_counter_ns()
+            if edge is None:
+                edge = now
+            elif now - edge > on + off:
+                self.resyncs += 1
+                _RESYNCS.labels(self.name).inc()
+                edge = now
+
+            if not self._until(edge):
+                continue
+            self._edge(True, edge)
+            if not self._until(edge + on):
+                continue
+            self._edge(False, edge + on)
+            self.pulses += 1
+            _PULSES.labels(self.name).inc()
+            edge += on + off
+
+    def _until(self, deadline: int) -> bool:
+        """Attend *deadline* ; False si arrêt ou mise au repos entre-temps."""
+        while True:
+            left = deadline - time.perf_counter_ns()
+            if left > self._spin:
+                if self._wake.wait((left - self._spin) / 1e9):
+                    self._wake.clear()
+                    if self._stop.is_set() or not self._params[0]:
+                        return False
+                continue
+            while time.perf_counter_ns() < deadline:
+                time.sleep(0)                       # rend le GIL sans dormir
+            return not self._stop.is_set()
+
+    def _edge(self, on: bool, deadline: int) -> None:
+        late = time.perf_counter_ns() - deadline
+        self._write(on)
+        self._late.append(late)
+        self._metric.observe(late / 1e9)
+
+    def _write(self, on: bool) -> None:
+        # relais actif bas
+        try:
+            GPIO.output(self.pin, GPIO.LOW if on else GPIO.HIGH)
+        except RuntimeError as e:
+            warning(f"Train d'impulsions {self.name} : écriture GPIO {self.pin} échouée : {e}")
+
+    # ──────────────────────────────────────────────────────────
+    #  Rapport
+    # ──────────────────────────────────────────────────────────
+    def jitter(self) -> dict:
+        late = sorted(self._late)
+        if not late:
+            return {"edges": 0}
+
+        def pct(q: float) -> float:
+            return round(late[min(len(late) - 1, int(q * len(late)))] / 1000, 1)
+
+        return {
+            "edges":   len(late),
+            "mean_us": round(sum(late) / len(late) / 1000, 1),
+            "p50_us":  pct(0.50),
+            "p95_us":  pct(0.95),
+            "p99_us":  pct(0.99),
+            "max_us":  round(late[-1] / 1000, 1),
+        }
+
+    def to_dict(self) -> dict:
+        on, off = self._params
+        return {
+            "pin":      self.pin,
+            "running":  self.running,
+            "active":   bool(on),
+            "on_ms":    on // 1_000_000,
+            "off_ms":   off // 1_000_000,
+            "realtime": self.realtime,
+            "pulses":   self.pulses,
+            "resyncs":  self.resyncs,
+            "lateness": self.jitter(),
+        }
+
+
+class PulseTrains:
+    """Vue ``to_dict()`` des trains des CyclicTimers (None : pas en mode impulsions)."""
+
+    def __init__(self, *cyclic_timers):
+        self.timers = cyclic_timers
+
+    def to_dict(self) -> dict:
+        return {
+            f"cyclic{t.timer_id}": t.pulse.to_dict() if t.pulse is not None else None
+            for t in self.timers
+        }
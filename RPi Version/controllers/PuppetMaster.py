@@ -7,24 +7,48 @@
 
 import asyncio
 
+from network.web import influx_handler
 from network.web.influx_handler import write_sensor_values
 from components.dailytimer_handler import timer_daily
 from components.cyclic_timer_handler import timer_cyclic
 from components.MotorHandler import temp_control
+from components.climate_control import climate_control
 from components.heater_control import heat_control
 from network.web.server import Server
+from controllers import LoopMonitor as loop_monitor
+from controllers import ProcessRoles as process_roles
+from controllers import BusDiscovery as bus_discovery
+from controllers.PulseTrain import PulseTrains
+from controllers.Supervisor import Supervisor, SupervisorError
+from controllers.ZoneManager import ZoneManager
+from utils.memory import MemoryMonitor
 from utils.pretty_console import info, warning, error
 from param.config import AppConfig
+from param.config_patch import ConfigPatcher
 
 
 class PuppetMaster:
     """
-    Lance et supervise tous les jobs :
+    Déclare tous les jobs auprès du superviseur (relance, battements,
+    watchdog matériel) :
       • Timers (daily & cyclic)
       • Régulation du moteur
       • Régulation du chauffage
+      • Zones climatiques (photopériode, chauffage et extracteur par tente)
+      • Cache capteurs (rafraîchi pour l'API)
+      • Découverte à chaud des capteurs I²C / 1-Wire
       • Push InfluxDB
-      • Serveur HTTP (pages + API)
+      • Serveur HTTP (pages + API /api/v1)
+      • Chien de garde de la boucle (retard, appels bloquants)
+      • Télémétrie mémoire (RSS/USS, objets, pente)
+
+    PHYTO_PROCESS_MODE=multi : serveur HTTP et export Influx tournent dans
+    des processus fils (controllers/ProcessRoles.py), ce processus ne garde
+    que l'acquisition et la régulation.
+
+    Chaque tâche est nommée : les blocages détectés lui sont attribués.
+    Les boucles de contrôle sont critiques : tant que l'une d'elles est
+    arrêtée ou muette, le watchdog matériel n'est plus caressé.
     """
 
     def __init__(
@@ -37,7 +61,8 @@ class PuppetMaster:
         cyclic_timer1,
         cyclic_timer2,
         motor_handler,
-        heater_component
+        heater_component,
+        boot=None,
     ):
         self.config             = config
         self.controller_status  = controller_status
@@ -48,9 +73,69 @@ class PuppetMaster:
         self.cyclic_timer2      = cyclic_timer2
         self.motor_handler      = motor_handler
         self.heater             = heater_component
+        self.boot               = boot
+        self.loop_monitor       = (
+            loop_monitor.LoopMonitor() if loop_monitor.enabled() else None
+        )
+        self.supervisor         = Supervisor(loop_monitor=self.loop_monitor)
+        self.memory             = MemoryMonitor()
+        self.discovery          = (
+            bus_discovery.BusDiscovery(sensor_handler) if bus_discovery.enabled() else None
+        )
+        self.roles              = None            # mode multi-processus (main_loop)
+        self.outlets            = {
+            "dailytimer1": dailytimer1.component,
+            "dailytimer2": dailytimer2.component,
+            "cyclic1":     cyclic_timer1.component,
+            "cyclic2":     cyclic_timer2.component,
+            "heater":      heater_component,
+        }
+        self.zones              = ZoneManager(config, sensor_handler, heater_component)
+        self.outlets.update(self.zones.outlets())
+        self.pulses             = PulseTrains(cyclic_timer1, cyclic_timer2)
+
+        # Patchs de config → rechargement ciblé des sous-systèmes
+        self.config_patcher = ConfigPatcher(config)
+        self.config_patcher.subscribe("sensors",   self._reload_sensors)
+        self.config_patcher.subscribe("scheduler", self._reload_scheduler)
+        self.config_patcher.subscribe("exporter",  self._reload_exporter)
+        for subsystem in ("zones", "regulation", "scheduler"):
+            self.config_patcher.subscribe(subsystem, self._reload_zones)
 
         info("PuppetMaster initialisé")
 
+    # ──────────────────────────────────────────────────────────
+    #  Handlers de rechargement (ConfigPatcher)
+    # ──────────────────────────────────────────────────────────
+    def _reload_sensors(self, config: AppConfig, changed: list) -> None:
+        self.sensor_handler.reconfigure(config)
+
+    def _reload_scheduler(self, config: AppConfig, changed: list) -> None:
+        for timer in (self.dailytimer1, self.dailytimer2):
+            timer.refresh_from_config(config)
+            # application immédiate, sans attendre le prochain tick
+            timer.toggle_state_daily()
+        for timer in (self.cyclic_timer1, self.cyclic_timer2):
+            timer.refresh_from_config(config)
+            # changement de mode : la boucle dort dans une phase de l'ancien
+            # mode (séquentiel : jusqu'à on/off_time) → relance immédiate
+            if f"Cyclic{timer.timer_id}_Settings.mode" in changed:
+                try:
+                    self.supervisor.restart(f"timer_cyclic{timer.timer_id}")
+                except SupervisorError as exc:
+                    warning(f"CyclicTimer #{timer.timer_id} non relancé : {exc}")
+
+    def _reload_exporter(self, config: AppConfig, changed: list) -> None:
+        influx_handler.reload_endpoint(config)
+
+    def _reload_zones(self, config: AppConfig, changed: list) -> None:
+        before = set(self.zones.outlets())
+        self.zones.reload(config, changed)
+        current = self.zones.outlets()
+        for name in before - set(current):
+            del self.outlets[name]
+        self.outlets.update(current)
+
     def _set_global_exception(self) -> None:
         """
         Avant : on arrêtait toute la boucle.
@@ -59,8 +144,10 @@ class PuppetMaster:
         def _handler(loop, context):
             exc = context.get("exception")
             msg = context.get("message")
+            task = context.get("task") or context.get("future")
+            where = f" [{task.get_name()}]" if isinstance(task, asyncio.Task) else ""
             if exc:
-                error(f"Exception asyncio non gérée : {exc!r}")
+                error(f"Exception asyncio non gérée{where} : {exc!r}")
             else:
                 error(f"Erreur asyncio : {msg}")
 
@@ -68,70 +155,154 @@ class PuppetMaster:
 
     async def main_loop(self) -> None:
         self._set_global_exception()
-        loop = asyncio.get_event_loop()
+        sup = self.supervisor
+
+        # --- Chien de garde de la boucle (en premier : il voit tout le boot) ---
+        if self.loop_monitor is not None:
+            sup.add("loop_monitor", self.loop_monitor.run, critical=False)
+        sup.add("memory_monitor", self.memory.run, critical=False)
 
         # --- Daily timers ---
+        # (battement = nom de la boucle, noté par MeteredClock à chaque itération)
         info("Démarrage des DailyTimers")
-        loop.create_task(
-            timer_daily(
-                self.dailytimer1,
-                self.config,
-                sampling_time=60,
-            )
+        sup.add(
+            "timer_daily1",
+            lambda: timer_daily(self.dailytimer1, self.config, sampling_time=60),
+            heartbeat="timer_daily1",
         )
-        loop.create_task(
-            timer_daily(
-                self.dailytimer2,
-                self.config,
-                sampling_time=60
-            )
+        sup.add(
+            "timer_daily2",
+            lambda: timer_daily(self.dailytimer2, self.config, sampling_time=60),
+            heartbeat="timer_daily2",
         )
 
         # --- Cyclic timers ---
         info("Démarrage des CyclicTimers")
-        loop.create_task(timer_cyclic(self.cyclic_timer1))
-        loop.create_task(timer_cyclic(self.cyclic_timer2))
-
-        # --- Contrôle moteur ---
-        info("Démarrage du contrôle moteur")
-        loop.create_task(
-            temp_control(
-                motor_handler=self.motor_handler,
-                config=self.config,
-                sensor_handler=self.sensor_handler,
-                sampling_time=15
+        sup.add("timer_cyclic1", lambda: timer_cyclic(self.cyclic_timer1, self.config),
+                heartbeat="timer_cyclic1")
+        sup.add("timer_cyclic2", lambda: timer_cyclic(self.cyclic_timer2, self.config),
+                heartbeat="timer_cyclic2")
+
+        if self.config.climate.enabled:
+            # --- Régulation coordonnée chauffage + moteur ---
+            info("Démarrage de la régulation climatique coordonnée")
+            sup.add(
+                "climate_control",
+                lambda: climate_control(
+                    config=self.config,
+                    sensor_handler=self.sensor_handler,
+                    heater_component=self.heater,
+                    fan=self.motor_handler,
+                    sampling_time=15,
+                    zone=self.zones.main,
+                ),
+                heartbeat="climate_control",
+            )
+        else:
+            # --- Contrôle moteur ---
+            info("Démarrage du contrôle moteur")
+            sup.add(
+                "temp_control",
+                lambda: temp_control(
+                    motor_handler=self.motor_handler,
+                    config=self.config,
+                    sensor_handler=self.sensor_handler,
+                    sampling_time=15,
+                    zone=self.zones.main,
+                ),
+                heartbeat="temp_control",
             )
-        )
 
-        # --- Contrôle chauffage ---
-        info("Démarrage du contrôle chauffage")
-        loop.create_task(
-            heat_control(
-                heater_component=self.heater,
-                sensor_handler=self.sensor_handler,
-                config=self.config,
-                sampling_time=30
+            # --- Contrôle chauffage ---
+            info("Démarrage du contrôle chauffage")
+            sup.add(
+                "heat_control",
+                lambda: heat_control(
+                    heater_component=self.heater,
+                    sensor_handler=self.sensor_handler,
+                    config=self.config,
+                    sampling_time=30,
+                    zone=self.zones.main,
+                ),
+                heartbeat="heat_control",
             )
-        )
+
+        # --- Zones climatiques (bascules jour/nuit, boucles par tente) ---
+        self.zones.install(sup)
+
+        # --- Cache capteurs (API / pages) ---
+        sup.add("sensor_poll", lambda: self.sensor_handler.poll_loop(period=15), critical=False)
+        if self.discovery is not None:
+            sup.add("bus_discovery", self.discovery.run, critical=False)
+
+        online = self.config.network.host_machine_state.lower() == "online"
+        if process_roles.enabled():
+            self._start_roles(online)
+        else:
+            self._start_local_services(online)
+
+        info("Toutes les tâches asynchrones sont déclarées → superviseur")
+
+        # le superviseur lance, relance et surveille ; ne rend jamais la main
+        try:
+            await sup.run()
+        finally:
+            if self.roles is not None:
+                self.roles.close()
+
+    def _start_local_services(self, online: bool) -> None:
+        """Mode mono-processus : export et serveur HTTP sur cette boucle."""
+        sup = self.supervisor
 
         # --- InfluxDB push ---
-        if self.config.network.host_machine_state.lower() == "online":
+        if online:
             info("InfluxDB : envoi périodique activé (delay 60 s)")
-            loop.create_task(write_sensor_values(period=60))
+            influx_handler.reload_endpoint(self.config)
+            influx_handler.bind_sensor_handler(self.sensor_handler)
+            sup.add("influx_export", lambda: write_sensor_values(period=60), critical=False)
         else:
             warning("InfluxDB : hôte hors-ligne - export désactivé")
 
         # --- Serveur HTTP ---
         info("Démarrage du serveur HTTP")
-        loop.create_task(
-            Server(
-                controller_status=self.controller_status,
-                sensor_handler=self.sensor_handler,
-                config=self.config,
-            ).run()
+        server = Server(
+            controller_status=self.controller_status,
+            sensor_handler=self.sensor_handler,
+            config=self.config,
+            outlets=self.outlets,
+            motor_handler=self.motor_handler,
+            config_patcher=self.config_patcher,
+            boot=self.boot,
+            loop_monitor=self.loop_monitor,
+            supervisor=sup,
+            memory=self.memory,
+            discovery=self.discovery,
+            zones=self.zones,
+            pulses=self.pulses,
         )
+        sup.add("http_server", server.run, critical=False)
 
-        info("Toutes les tâches asynchrones sont démarrées")
-
-        # boucle infinie
-        await asyncio.Event().wait()
+    def _start_roles(self, online: bool) -> None:
+        """Mode multi-processus : web et export dans des processus fils."""
+        sup = self.supervisor
+        info("Mode multi-processus : web et export hors du processus de contrôle")
+        self.roles = process_roles.ProcessRoles(
+            config=self.config,
+            sensor_handler=self.sensor_handler,
+            outlets=self.outlets,
+            motor_handler=self.motor_handler,
+            config_patcher=self.config_patcher,
+            boot=self.boot,
+            loop_monitor=self.loop_monitor,
+            supervisor=sup,
+            memory=self.memory,
+            discovery=self.discovery,
+            zones=self.zones,
+            pulses=self.pulses,
+        )
+        sup.add("state_publisher", self.roles.publish_loop, critical=False)
+        sup.add("proc_web", lambda: self.roles.run_child("web"), critical=False)
+        if online:
+            sup.add("proc_export", lambda: self.roles.run_child("export"), critical=False)
+        else:
+            warning("InfluxDB : hôte hors-ligne - export désactivé")
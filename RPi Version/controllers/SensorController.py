@@ -6,25 +6,73 @@
 #  (refactoré pour utiliser AppConfig au lieu de Parameter)
 # --------------------------------------------------------------------
 
-import smbus2
-from typing import Dict, List
-
-# Handlers spécialisés
-from sensor_handlers.BME280Handler   import BME280Handler
-from sensor_handlers.DS18Handler     import DS18Handler
-from sensor_handlers.VEML6075Handler import VEMLHandler
-from sensor_handlers.VL53L0XHandler  import VL53L0XHandler
-from sensor_handlers.MLX90614Handler import MLX90614Handler
-from sensor_handlers.TSL2591Handler  import TSL2591Handler
-from sensor_handlers.HCSR04Handler   import HCSR04Handler
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+# Registre des drivers (intégrés + greffons) : clés, unités, capacités
+from sensor_handlers import registry
+from sensor_handlers.registry import DriverSpec, KeySpec
+
+# Accès bus (réel ou simulé)
+from hal import backend as hal
+from controllers.DerivedMetrics import DerivedMetrics
+from controllers.DeviceHealth import DeviceHealth
+from controllers.SensorFilter import SensorFilter
+from controllers.SensorTree import SensorTree
+from controllers.TemperatureFusion import KEY as FUSED_KEY, TemperatureFusion
 
 # Affichage « Pretty »
 from utils.pretty_console import info, warning, error
+from utils.metrics import counter, histogram
+from utils.timebase import Clock, SYSTEM_CLOCK
 
 # Votre modèle de config
 from param.config import AppConfig
 
 
+# measurement Influx → clés des capteurs uniques (ordre d'export et d'affichage)
+MEASUREMENTS: Dict[str, Tuple[str, ...]] = registry.measurements(registry.singletons())
+ALL_KEYS: Tuple[str, ...] = tuple(k for keys in MEASUREMENTS.values() for k in keys)
+
+# passage read_all_async plus coûteux (max des bus) → hors de la boucle asyncio
+INLINE_BUDGET_MS = 10.0
+# poll_loop : attente de la fin du sondage avant le premier passage
+_PROBE_POLL_S = 0.05
+
+
+class Route(NamedTuple):
+    """Tout ce qu'il faut pour lire une clé, calculé une fois par (re)configuration."""
+    spec: DriverSpec
+    key: KeySpec
+    unit: str                    # entrée de l'arbre I²C ; "" = capteur unique
+    device: str                  # disjoncteur (controllers/DeviceHealth)
+    lane: str                    # bus : i2c-N, w1, gpio ; « derived » : calculée
+    order: tuple                 # ordre de lecture sur le bus (mux, canal, adresse)
+    inputs: tuple = ()           # clé dérivée : clés d'entrée
+
+
+def device_of(sensor_key: str) -> str:
+    """
+    Périphérique physique d'une clé : le driver, la sonde pour les DS18B20,
+    « type@nom » pour un capteur de l'arbre I²C (BME280T@etagere1 → bme280@etagere1).
+    """
+    hit = registry.lookup(sensor_key)
+    if hit is None:
+        return sensor_key
+    spec = hit[0]
+    name = sensor_key.partition("@")[2]
+    if name:
+        return f"{spec.kind}@{name}"
+    return sensor_key if spec.device_per_key else spec.name
+
+_READ_SECONDS = histogram("phyto_sensor_read_seconds", "Durée de get_sensor_value", ("key",))
+_READ_ERRORS = counter("phyto_sensor_read_errors_total", "Lectures capteur sans valeur (erreur ou désactivé)", ("key",))
+_READ_ALL_SECONDS = histogram("phyto_sensor_read_all_seconds", "Durée d'un passage read_all (tous bus)")
+
+
 class SensorController:
     """
     Regroupe tous les capteurs sous des measurements « métier » :
@@ -33,71 +81,256 @@ class SensorController:
       • water        : DS18B#3 (température d'eau)
       • distance     : VL53L0X + HC-SR04
       • lux          : TSL2591
+
+    Chaque périphérique passe par un disjoncteur (controllers/DeviceHealth) :
+    un capteur absent ou mort ne coûte plus rien sur le chemin chaud.
+
+    Les capteurs multiples de l'arbre I²C (controllers/SensorTree) ajoutent
+    leurs clés « BASE@nom » au measurement de leur clé de base.
+
+    Chaque lecture passe aussi par l'étage de filtrage (controllers/
+    SensorFilter) : les consommateurs choisissent la vue brute ou filtrée.
+    Les métriques dérivées (controllers/DerivedMetrics : VPD, DLI…) et la
+    température de régulation fusionnée REG-T (controllers/
+    TemperatureFusion) sont des clés comme les autres, calculées en fin de
+    passage.
+
+    Clés, unités, measurements et capacités viennent du registre
+    (sensor_handlers/registry) ; une table clé → ``Route``, recalculée à
+    chaque (re)configuration, sert chaque lecture en un accès dict.
     """
 
-    def __init__(self, config: AppConfig):
+    def __init__(self, config: AppConfig, probe: bool = True, clock: Clock = SYSTEM_CLOCK):
+        """
+        probe=False : n'instancie aucun driver (boot rapide) ; appeler
+        ensuite ``await probe_async()`` pour sonder les capteurs en parallèle.
+        clock : horloge de ``min_interval`` (virtuelle dans benchmarks/replay.py).
+        """
         self.config = config
+        self.clock = clock
+        self.probed = False
+        self.health = DeviceHealth()
+        self.filters = SensorFilter(config.sensor_filters, clock)
+        self.derived = DerivedMetrics(config.derived_metrics, clock)
+        self.fusion = TemperatureFusion(config.temperature_fusion)
+        self.tree = SensorTree()
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._pool_size = 0
+        # un verrou par bus : read_all_async lit hors de la boucle asyncio
+        self._lane_locks: Dict[str, threading.RLock] = {}
 
-        # ── Bus I2C (/dev/i2c-1) ───────────────────────────────────────
+        # ── Bus I2C (/dev/i2c-1), partagé avec l'arbre I²C ─────────────
         try:
-            self.i2c = smbus2.SMBus(1)
+            self.i2c = hal.i2c_view(1)
             info("Bus I²C /dev/i2c-1 ouvert")
-        except FileNotFoundError as e:
+        except OSError as e:
             error(f"Impossible d'ouvrir /dev/i2c-1 → {e}")
             self.i2c = None
 
         # ── Activation selon AppConfig.sensors ─────────────────────────
+        if probe:
+            self._sync_drivers()
+            self.probed = True
+        else:
+            for name, enabled in self._wanted_drivers().items():
+                setattr(self, f"{name}_enabled", enabled)
+                setattr(self, name, None)
+            self.tree.sync(config, instantiate=False)
+
+        # ── Table de dispatch + dictionnaire de mesures (Influx / Web) ─
+        self._refresh_tables()
+
+        # ── Cache des dernières lectures : clé → (valeur, epoch) ──────
+        # Alimenté par chaque get_sensor_value ; lu par l'API sans I/O.
+        self._cache: Dict[str, Tuple[float, float]] = {}
+        # clé → clock.monotonic() de la dernière lecture matérielle (min_interval)
+        self._fresh: Dict[str, float] = {}
+
+        # ── Abonnés aux changements de valeur (zones climatiques) ─────
+        self._listeners: List[Callable[[str, object], None]] = []
+        self._published: Dict[str, object] = {}
+
+        info(f"SensorController initialisé avec : {self.sensor_dict}")
+
+    # ──────────────────────────────────────────────────────────
+    #  Instanciation / reconfiguration des drivers
+    # ──────────────────────────────────────────────────────────
+    def _wanted_drivers(self) -> Dict[str, bool]:
         s = self.config.sensors
-        self.bme_enabled  = s.bme280_state
-        self.ds18_enabled = s.ds18b20_state
-        self.veml_enabled = s.veml6075_state
-        self.vl53_enabled = s.vl53L0x_state
-        self.mlx_enabled  = s.mlx90614_state
-        self.tsl_enabled  = s.tsl2591_state
-        self.hcsr_enabled = s.hcsr04_state
-
-        # Instanciation conditionnelle
-        self.bme  = BME280Handler(i2c=self.i2c)   if self.bme_enabled else None
-        self.ds18 = DS18Handler()                 if self.ds18_enabled else None
-        self.veml = VEMLHandler(i2c=self.i2c)     if self.veml_enabled else None
-        self.vl53 = VL53L0XHandler(config)        if self.vl53_enabled else None
-        self.mlx  = MLX90614Handler(i2c=self.i2c) if self.mlx_enabled else None
-        self.tsl  = TSL2591Handler(i2c=self.i2c)  if self.tsl_enabled else None
-        self.hcsr = HCSR04Handler(
-            trigger_pin=self.config.gpio.hcsr_trigger_pin,
-            echo_pin=self.config.gpio.hcsr_echo_pin
-        ) if self.hcsr_enabled else None
-
-        # ── Dictionnaire de mesures pour Influx / Web ─────────────────
+        return {spec.name: bool(getattr(s, spec.state_field, False)) for spec in registry.singletons()}
+
+    def _make_driver(self, name: str):
+        try:
+            spec = registry.get(name)
+        except KeyError:
+            raise ValueError(f"driver inconnu : {name}") from None
+        return spec.build(self)
+
+    def _sync_drivers(self) -> List[str]:
+        """
+        Instancie les drivers nouvellement activés et libère ceux qui ont été
+        désactivés ; les drivers inchangés ne sont pas touchés.
+        Retourne la liste des drivers modifiés.
+        """
+        touched = []
+        for name, enabled in self._wanted_drivers().items():
+            setattr(self, f"{name}_enabled", enabled)
+            current = getattr(self, name, None)
+            if enabled and current is None:
+                setattr(self, name, self._make_driver(name))
+                touched.append(name)
+            elif not enabled and current is not None:
+                self._release(name)
+                touched.append(name)
+        touched += self.tree.sync(self.config)
+        return touched
+
+    def _release(self, name: str) -> None:
+        current = getattr(self, name, None)
+        for closer in ("close", "cleanup"):
+            if hasattr(current, closer):
+                try:
+                    getattr(current, closer)()
+                except Exception as e:
+                    warning(f"Libération {name} : {e}")
+                break
+        setattr(self, name, None)
+
+    # ──────────────────────────────────────────────────────────
+    #  Branchement à chaud (controllers/BusDiscovery)
+    # ──────────────────────────────────────────────────────────
+    def devices_of(self, driver: str) -> List[str]:
+        """Périphériques (disjoncteurs) servis par un driver."""
+        return sorted({device_of(k.key) for k in registry.get(driver).keys})
+
+    def attach_driver(self, name: str, driver) -> None:
+        """Driver (ré)apparu : remplace l'ancien, disjoncteurs remis à neuf."""
+        if getattr(self, name, None) is not None:
+            self._release(name)
+        setattr(self, name, driver)
+        for device in self.devices_of(name):
+            self.health.forget(device)
+
+    def detach_driver(self, name: str, reason: str) -> None:
+        """Driver disparu du bus : libéré, lectures coupées jusqu'à son retour."""
+        self._release(name)
+        for device in self.devices_of(name):
+            self.health.breaker(device).trip(reason)
+
+    async def probe_async(self, timeout: float = 10.0) -> List[str]:
+        """
+        Sonde en parallèle (un thread par driver) tous les capteurs activés,
+        chacun borné par *timeout*. Chaque driver est rattaché dès que son
+        init se termine ; un capteur muet ne retarde pas les autres.
+        """
+        async def _one(name: str, make, attach) -> Optional[str]:
+            try:
+                drv = await asyncio.wait_for(asyncio.to_thread(make, name), timeout)
+            except asyncio.TimeoutError:
+                warning(f"Sondage {name} : pas de réponse après {timeout}s")
+                return None
+            except Exception as e:
+                error(f"Sondage {name} : {e!r}")
+                return None
+            attach(name, drv)
+            return name
+
+        wanted = [n for n, en in self._wanted_drivers().items()
+                  if en and getattr(self, n, None) is None]
+        done = await asyncio.gather(
+            *(_one(n, self._make_driver, lambda n, d: setattr(self, n, d)) for n in wanted),
+            *(_one(n, self.tree.make, self.tree.attach) for n in self.tree.pending()),
+        )
+        self._refresh_tables()
+        self.probed = True
+        attached = [n for n in done if n]
+        info(f"Capteurs sondés : {', '.join(attached) or 'aucun'}")
+        return attached
+
+    def reconfigure(self, config: AppConfig) -> List[str]:
+        """
+        Applique un nouveau Sensor_State sur l'instance existante (partagée
+        par les régulations, l'export et le serveur web).
+        """
+        self.config = config
+        self.derived.configure(config.derived_metrics)
+        self.fusion.configure(config.temperature_fusion)
+        touched = self._sync_drivers()
+        self._refresh_tables()
+        enabled = set(self.enabled_keys())
+        self.filters.configure(config.sensor_filters, enabled)
+        for key in list(self._cache):
+            if key not in enabled:
+                del self._cache[key]
+                self._fresh.pop(key, None)
+        for spec in registry.singletons():
+            for key in spec.keys:
+                if key.key not in enabled:
+                    self.health.forget(device_of(key.key))
+        tree_devices = set(self.tree.devices())
+        for device in list(self.health.breakers):
+            if "@" in device and device not in tree_devices:
+                self.health.forget(device)
+        info(f"SensorController reconfiguré ({', '.join(touched) or 'aucun driver'}) → {self.sensor_dict}")
+        return touched
+
+    def _refresh_tables(self) -> None:
+        self._routes = self._build_routes()
+        self.measurements = self._build_measurements()
         self.sensor_dict = self._build_sensor_dict()
-        info(f"SensorController initialisé avec : {self.sensor_dict}")
+
+    def _build_routes(self) -> Dict[str, Route]:
+        """Clé active → Route : capteurs uniques activés + entrées de l'arbre I²C."""
+        routes: Dict[str, Route] = {}
+        for spec in registry.singletons():
+            if not getattr(self, f"{spec.name}_enabled", False):
+                continue
+            if spec.bus == "i2c":
+                lane, order = "i2c-1", (-1, -1, hal.i2c_address(spec.kind, spec.address))
+            else:
+                lane, order = spec.bus, ()
+            for key in spec.keys:
+                routes[key.key] = Route(spec, key, "", device_of(key.key), lane, order)
+        for name, dev in self.tree.specs.items():
+            spec = registry.by_kind(dev.driver)
+            if spec is None:
+                continue
+            lane, order = self.tree.lane(name)
+            for key in spec.keys:
+                routes[f"{key.key}@{name}"] = Route(spec, key, name, self.tree.device(name), lane, order)
+        derived = registry.get("derived")
+        for key, (unit, inputs) in self.derived.plan(routes).items():
+            hit = registry.lookup(key)
+            routes[key] = Route(derived, hit[1], unit, "derived", "derived", (), inputs)
+        sources = self.fusion.plan(routes)
+        if sources:
+            hit = registry.lookup(FUSED_KEY)
+            routes[FUSED_KEY] = Route(derived, hit[1], "", "derived", "derived", (), sources)
+        return routes
 
     def _is_sensor_enabled(self, sensor_name: str) -> bool:
-        sensor_mapping = {
-            "BME280T": self.bme_enabled, "BME280H": self.bme_enabled, "BME280P": self.bme_enabled,
-            "DS18B#1": self.ds18_enabled, "DS18B#2": self.ds18_enabled, "DS18B#3": self.ds18_enabled,
-            "TSL-LUX": self.tsl_enabled, "TSL-IR": self.tsl_enabled,
-            "VEML-UVA": self.veml_enabled, "VEML-UVB": self.veml_enabled, "VEML-UVINDEX": self.veml_enabled,
-            "MLX-AMB": self.mlx_enabled, "MLX-OBJ": self.mlx_enabled,
-            "VL53L0X": self.vl53_enabled,
-            "HCSR04": self.hcsr_enabled,
-        }
-        return sensor_mapping.get(sensor_name, False)
+        return sensor_name in self._routes
+
+    def _build_measurements(self) -> Dict[str, Tuple[str, ...]]:
+        """MEASUREMENTS + clés de l'arbre I²C, rangées avec leur clé de base."""
+        out = {m: list(keys) for m, keys in MEASUREMENTS.items()}
+        derived = [k for k, route in self._routes.items() if route.lane == "derived"]
+        for key in (*self.tree.keys(), *derived):
+            hit = registry.lookup(key)
+            if hit is not None and hit[1].measurement:
+                out.setdefault(hit[1].measurement, []).append(key)
+        return {m: tuple(keys) for m, keys in out.items()}
+
+    def all_keys(self) -> List[str]:
+        """Toutes les clés connues (actives ou non), dans l'ordre des measurements."""
+        return [k for keys in self.measurements.values() for k in keys]
 
     def _build_sensor_dict(self) -> Dict[str, List[str]]:
         """
         Construit le dictionnaire des capteurs activés, utilisé pour l'export.
         """
-        base_sensor_dict: Dict[str, List[str]] = {
-            "air":          ["BME280T", "BME280H", "BME280P", "MLX-AMB", "DS18B#1", "DS18B#2"],
-            "surface_temp": ["MLX-OBJ"],
-            "water":        ["DS18B#3"],
-            "distance":     ["VL53L0X", "HCSR04"],
-            "lux":          ["TSL-LUX", "TSL-IR"],
-        }
-
         sensor_dict: Dict[str, List[str]] = {}
-        for measurement, sensor_keys in base_sensor_dict.items():
+        for measurement, sensor_keys in self.measurements.items():
             enabled_sensors = [
                 sensor for sensor in sensor_keys
                 if self._is_sensor_enabled(sensor)
@@ -107,62 +340,298 @@ class SensorController:
 
         return sensor_dict
 
+    def _revive(self, driver: str) -> None:
+        """Essai d'un périphérique hors service : ré-instancie un driver non initialisé."""
+        current = getattr(self, driver, None)
+        if current is not None and getattr(current, "available", True):
+            return
+        try:
+            fresh = self._make_driver(driver)
+        except Exception as e:
+            warning(f"Ré-initialisation {driver} : {e!r}")
+            return
+        if getattr(fresh, "available", True):
+            setattr(self, driver, fresh)
+
     def get_sensor_value(self, sensor_key: str):
         """
         Retourne la mesure demandée (float ou int) ou None si désactivé/erreur.
+        Un périphérique hors service (disjoncteur ouvert) rend None sans I/O.
         """
-        try:
-            result = None
+        result = self._read(sensor_key)
+        self.filters.update(sensor_key, result, self._sample_time(sensor_key, result))
+        self._publish(sensor_key, result)
+        return result
 
-            if sensor_key.startswith("DS18B#") and self.ds18:
-                idx = int(sensor_key.split("#")[1])
-                result = self.ds18.get_ds18_temp(idx)
-
-            elif sensor_key.startswith("BME280") and self.bme:
-                result = {
-                    "BME280T": self.bme.get_bme_temp,
-                    "BME280H": self.bme.get_bme_hygro,
-                    "BME280P": self.bme.get_bme_pressure
-                }[sensor_key]()
-
-            elif sensor_key.startswith("TSL-") and self.tsl:
-                result = {
-                    "TSL-LUX": self.tsl.calculate_lux,
-                    "TSL-IR": self.tsl.get_ir
-                }[sensor_key]()
-
-            elif sensor_key.startswith("VEML-") and self.veml:
-                result = {
-                    "VEML-UVA": self.veml.get_veml_uva,
-                    "VEML-UVB": self.veml.get_veml_uvb,
-                    "VEML-UVINDEX": self.veml.get_uv_index
-                }[sensor_key]()
-
-            elif sensor_key in ("MLX-AMB", "MLX-OBJ") and self.mlx:
-                result = {
-                    "MLX-AMB": self.mlx.get_ambient_temp,
-                    "MLX-OBJ": self.mlx.get_object_temp
-                }[sensor_key]()
-
-            elif sensor_key == "VL53L0X" and self.vl53:
-                result = self.vl53.get_vl53_reading()
-
-            elif sensor_key == "HCSR04" and self.hcsr:
-                result = self.hcsr.get_distance_cm()
+    def get_filtered_value(self, sensor_key: str):
+        """Lecture comme ``get_sensor_value``, rendue par l'étage de filtrage."""
+        raw = self.get_sensor_value(sensor_key)
+        return self.filters.value(sensor_key) if self.filters.settings.enabled else raw
 
-        except Exception as e:
-            error(f"Erreur lecture capteur {sensor_key}: {e}")
+    def _sample_time(self, sensor_key: str, value) -> Optional[float]:
+        """Horloge de la lecture matérielle derrière *value* (None : échec, maintenant)."""
+        return self._fresh.get(sensor_key) if value is not None else None
+
+    def _read(self, sensor_key: str):
+        """Lecture matérielle + disjoncteur + cache (sans les stats min/max)."""
+        route = self._routes.get(sensor_key)
+        if route is None:
+            _READ_ERRORS.labels(sensor_key).inc()
+            return None
+        if not self.probed:
+            return None                              # sondage du boot en cours
+
+        if route.lane == "derived":
+            return self._derive(sensor_key, route)
+
+        spec = route.spec
+        if spec.min_interval:
+            hit = self._cache.get(sensor_key)
+            last = self._fresh.get(sensor_key)
+            if hit is not None and last is not None and self.clock.monotonic() - last < spec.min_interval:
+                return hit[0]                        # plus récent que ce que la puce sait donner
+
+        breaker = self.health.breaker(route.device)
+        if not breaker.allow():
+            return None
+
+        with self._lane_lock(route.lane):
+            if breaker.probing:
+                if route.unit:
+                    self.tree.revive(route.unit)
+                else:
+                    self._revive(spec.name)
+
+            t0 = time.perf_counter()
+            reason = "aucune valeur"
             result = None
+            group = None
+            drv = self.tree.drivers.get(route.unit) if route.unit else getattr(self, spec.name, None)
+            try:
+                if drv is None:
+                    reason = "driver absent"
+                elif not getattr(drv, "available", True):
+                    reason = "non initialisé"
+                elif spec.grouped:
+                    group = getattr(drv, spec.grouped)()
+                    result = group.get(route.key.key)
+                else:
+                    result = getattr(drv, route.key.method)(*route.key.args)
+            except Exception as e:
+                reason = repr(e)
+                result = None
+            _READ_SECONDS.labels(sensor_key).observe(time.perf_counter() - t0)
 
         if result is None:
-            warning(f"{sensor_key} désactivé ou introuvable")
+            _READ_ERRORS.labels(sensor_key).inc()
+            breaker.failure(reason)
             return None
+        breaker.success()
 
-        stats = getattr(self, "stats", None)
-        if stats and sensor_key in stats.KEYS:
-            try:
-                stats.update(sensor_key, float(result))
-            except Exception:
-                pass
+        now, mono = time.time(), self.clock.monotonic()
+        self._cache[sensor_key] = (result, now)
+        self._fresh[sensor_key] = mono
+        if group:
+            # clés sœurs de la même transaction : resservies jusqu'à min_interval
+            suffix = f"@{route.unit}" if route.unit else ""
+            for base, value in group.items():
+                key = base + suffix
+                if value is not None and key != sensor_key and key in self._routes:
+                    self._cache[key] = (value, now)
+                    self._fresh[key] = mono
+        return result
 
+    def _derive(self, sensor_key: str, route: Route, values: Optional[Dict[str, object]] = None):
+        """Clé dérivée : entrées du passage en cours (*values*) ou lues à l'instant."""
+        inputs = [values[k] if values is not None and k in values else self._read(k) for k in route.inputs]
+        t = self._fresh.get(route.inputs[0])
+        if sensor_key == FUSED_KEY:
+            result = self._fuse(route.inputs, inputs)
+            t = max((self._fresh.get(k, 0.0) for k in route.inputs), default=None) or None
+        else:
+            result = self.derived.compute(route.key.method, route.unit, inputs, t)
+        if result is None:
+            return None
+        self._cache[sensor_key] = (result, time.time())
+        self._fresh[sensor_key] = t if t is not None else self.clock.monotonic()
         return result
+
+    def _fuse(self, keys: tuple, values: list) -> Optional[float]:
+        now = self.clock.monotonic()
+        samples = {}
+        for key, value in zip(keys, values):
+            fresh = self._fresh.get(key)
+            samples[key] = (value, None if fresh is None else now - fresh, self.health_state(key))
+        return self.fusion.fuse(samples)
+
+    def subscribe(self, listener: Callable[[str, object], None]) -> None:
+        """*listener(clé, valeur)* appelé quand une lecture diffère de la précédente."""
+        self._listeners.append(listener)
+
+    def _publish(self, sensor_key: str, value) -> None:
+        """Après une lecture, dans le thread appelant : stats min/max + abonnés."""
+        if value is not None:
+            stats = getattr(self, "stats", None)
+            if stats and sensor_key in stats.KEYS:
+                try:
+                    stats.update(sensor_key, float(value))
+                except Exception:
+                    pass
+        if not self._listeners or self._published.get(sensor_key, ...) == value:
+            return
+        self._published[sensor_key] = value
+        for listener in self._listeners:
+            try:
+                listener(sensor_key, value)
+            except Exception as e:
+                warning(f"Abonné capteurs ({sensor_key}) : {e!r}")
+
+    # ──────────────────────────────────────────────────────────
+    #  Lecture groupée (par bus, par canal de multiplexeur)
+    # ──────────────────────────────────────────────────────────
+    def _lane_lock(self, lane: str) -> threading.RLock:
+        lock = self._lane_locks.get(lane)
+        if lock is None:
+            lock = self._lane_locks.setdefault(lane, threading.RLock())
+        return lock
+
+    def _lanes(self, keys: List[str]) -> Dict[str, list]:
+        lanes: Dict[str, list] = {}
+        for i, key in enumerate(keys):
+            route = self._routes.get(key)
+            lane, order = (route.lane, route.order) if route else ("-", ())
+            lanes.setdefault(lane, []).append((order, i, key))
+        return lanes
+
+    def blocking_ms(self, keys: Iterable[str]) -> float:
+        """Durée estimée d'un passage : bus le plus lent (lecture groupée comptée une fois)."""
+        per_lane: Dict[str, float] = {}
+        seen = set()
+        for key in keys:
+            route = self._routes.get(key)
+            if route is None:
+                continue
+            if route.spec.grouped:
+                if route.device in seen:
+                    continue
+                seen.add(route.device)
+            per_lane[route.lane] = per_lane.get(route.lane, 0.0) + route.spec.blocking_ms
+        return max(per_lane.values(), default=0.0)
+
+    def _executor(self, workers: int) -> ThreadPoolExecutor:
+        if self._pool is None or workers > self._pool_size:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False)
+            self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="sensor-bus")
+            self._pool_size = workers
+        return self._pool
+
+    def read_all(self, keys: Optional[Iterable[str]] = None) -> Dict[str, object]:
+        """
+        Lit *keys* (défaut : toutes les clés actives) en un passage :
+          • sur un bus, les clés sont lues canal de multiplexeur par canal
+            (une commutation par canal, pas par lecture) ;
+          • les bus indépendants (i2c-N, 1-Wire, GPIO) sont lus en
+            parallèle, un thread par bus.
+        Stats min/max et abonnés sont servis ensuite, dans le thread appelant.
+        """
+        keys = self.enabled_keys() if keys is None else list(keys)
+        t0 = time.perf_counter()
+        values = self._read_lanes(keys)
+        _READ_ALL_SECONDS.observe(time.perf_counter() - t0)
+        return self._publish_all(keys, values)
+
+    async def read_all_async(self, keys: Optional[Iterable[str]] = None) -> Dict[str, object]:
+        """
+        ``read_all`` depuis la boucle asyncio : un passage estimé plus long
+        que ``INLINE_BUDGET_MS`` (sondes 1-Wire, intégration TSL2591…) est
+        lu dans un thread ; stats et abonnés restent servis dans la boucle.
+        """
+        keys = self.enabled_keys() if keys is None else list(keys)
+        if self.blocking_ms(keys) <= INLINE_BUDGET_MS:
+            return self.read_all(keys)
+        t0 = time.perf_counter()
+        values = await asyncio.to_thread(self._read_lanes, keys)
+        _READ_ALL_SECONDS.observe(time.perf_counter() - t0)
+        return self._publish_all(keys, values)
+
+    def _read_lanes(self, keys: List[str]) -> Dict[str, object]:
+        lanes = self._lanes(keys)
+        derived = lanes.pop("derived", [])
+
+        def run(item) -> List[Tuple[str, object]]:
+            lane, batch = item
+            with self._lane_lock(lane):
+                return [(key, self._read(key)) for _, _, key in sorted(batch)]
+
+        if len(lanes) > 1:
+            batches = list(self._executor(len(lanes)).map(run, lanes.items()))
+        else:
+            batches = [run(item) for item in lanes.items()]
+        values = dict(pair for batch in batches for pair in batch)
+        # métriques dérivées en dernier, sur les lectures de ce passage
+        for _, _, key in derived:
+            values[key] = self._derive(key, self._routes[key], values)
+        return values
+
+    def _publish_all(self, keys: List[str], values: Dict[str, object]) -> Dict[str, object]:
+        self.filters.update_many({key: (value, self._sample_time(key, value)) for key, value in values.items()})
+        for key, value in values.items():
+            self._publish(key, value)
+        return {key: values[key] for key in keys}
+
+    # ──────────────────────────────────────────────────────────
+    #  Cache (lecture sans accès matériel)
+    # ──────────────────────────────────────────────────────────
+    def enabled_keys(self) -> List[str]:
+        """Toutes les clés capteur actives, dans l'ordre des measurements."""
+        return [k for keys in self.sensor_dict.values() for k in keys]
+
+    def get_cached_value(self, sensor_key: str, filtered: bool = False) -> Optional[Tuple[float, float]]:
+        """(valeur, epoch) de la dernière lecture réussie (vue brute ou filtrée), ou None."""
+        if filtered and self.filters.settings.enabled:
+            return self.filters.cached(sensor_key)
+        return self._cache.get(sensor_key)
+
+    def health_state(self, sensor_key: str) -> str:
+        """healthy | degraded | open | half-open pour le périphérique de la clé."""
+        return self.health.state(device_of(sensor_key))
+
+    def fusion_state(self) -> dict:
+        """Dernier échantillon de REG-T : valeur, primaire, contribution de chaque source."""
+        return self.fusion.to_dict()
+
+    def device_health(self) -> Dict[str, dict]:
+        """Détail des disjoncteurs (périphériques déjà lus au moins une fois)."""
+        return self.health.to_dict()
+
+    def snapshot(self) -> Dict[str, dict]:
+        """Dernières valeurs connues de toutes les clés actives (+ santé du périphérique)."""
+        out: Dict[str, dict] = {}
+        for key in self.enabled_keys():
+            hit = self._cache.get(key)
+            out[key] = (
+                {"value": hit[0], "ts": round(hit[1], 3)} if hit
+                else {"value": None, "ts": None}
+            )
+            out[key]["health"] = self.health_state(key)
+            out[key]["unit"] = registry.unit_of(key)
+            out[key]["filtered"] = self.filters.value(key)
+        return out
+
+    def refresh(self) -> None:
+        """Relit toutes les clés actives (remplit le cache)."""
+        self.read_all()
+
+    async def poll_loop(self, period: int = 15) -> None:
+        """
+        Rafraîchit périodiquement le cache pour l'API / les pages. Premier
+        passage dès la fin du sondage (cache rempli quelques ms après le
+        boot, pas une période plus tard), puis toutes les *period* s.
+        """
+        info(f"Cache capteurs : rafraîchissement toutes les {period}s")
+        while not self.probed:
+            await asyncio.sleep(_PROBE_POLL_S)
+        while True:
+            await self.read_all_async()
+            await asyncio.sleep(period)
@@ -0,0 +1,211 @@
+# controllers/SensorFilter.py
+# Author : Progradius
+# License: AGPL-3.0
+# -------------------------------------------------------------
+#  Filtrage en flux des mesures (valeurs aberrantes, lissage)
+# -------------------------------------------------------------
+"""
+Étage entre l'acquisition (SensorController) et les consommateurs. Chaque
+clé capteur a son canal ; chaque nouvel échantillon matériel y passe par :
+
+    Hampel   fenêtre glissante de N échantillons bruts (tampon circulaire
+             de taille fixe) : un point à plus de k·1,4826·MAD (au moins
+             ``hampel_floor``) de la médiane est remplacé par la médiane
+             (pic isolé, glitch I²C) ;
+    pente    variation limitée à ``max_rate`` unités/s depuis la valeur
+             filtrée précédente ;
+    EMA      lissage exponentiel (``ema_alpha`` = 1 : aucun) ;
+    périmé   une lecture invalide (None) garde la dernière valeur filtrée
+             jusqu'à ``stale_s`` secondes, puis le canal rend None.
+
+Vues : ``raw`` (la lecture telle quelle, inchangée pour l'export et
+l'interface) et ``filtered`` (ce canal), au choix du consommateur ; les
+régulations prennent la vue filtrée : un échantillon isolé ne bascule
+plus un relais.
+
+Lecture groupée (``update_many``, un passage de read_all) : les médianes
+et MAD des canaux de même fenêtre sont calculées en un seul appel NumPy
+quand NumPy est installé et que les canaux sont assez nombreux ; sinon,
+calcul Python canal par canal (mêmes résultats).
+"""
+
+from __future__ import annotations
+
+import time
+from statistics import median
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from param.config import FilterSettings, SensorFiltersSettings
+from utils.metrics import counter
+from utils.timebase import Clock, SYSTEM_CLOCK
+
+try:
+    import numpy as np
+except ImportError:                                     # pragma: no cover
+    np = None
+
+_MAD_SCALE = 1.4826                 # MAD → écart-type d'une loi normale
+_NUMPY_MIN_CHANNELS = 8             # en deçà, le coût d'appel NumPy domine
+
+_FILTERED = counter("phyto_sensor_filtered_total", "Corrections de l'étage de filtrage", ("key", "stage"))
+
+
+class FilterChannel:
+    """Canal d'une clé : tampon circulaire brut + état du filtre."""
+
+    __slots__ = ("key", "settings", "buf", "count", "pos", "value", "t", "wall", "last_good", "stale")
+
+    def __init__(self, key: str, settings: FilterSettings):
+        self.key = key
+        self.settings = settings
+        self.buf: List[float] = [0.0] * max(settings.hampel_window, 1)
+        self.count = 0                        # échantillons dans le tampon (≤ fenêtre)
+        self.pos = 0                          # prochaine case écrite
+        self.value: Optional[float] = None    # sortie filtrée
+        self.t: Optional[float] = None        # horloge (monotone) du dernier échantillon
+        self.wall: Optional[float] = None     # epoch de la dernière sortie valide
+        self.last_good: Optional[float] = None
+        self.stale = False
+
+    def push(self, x: float) -> None:
+        self.buf[self.pos] = x
+        self.pos = (self.pos + 1) % len(self.buf)
+        self.count = min(self.count + 1, len(self.buf))
+
+    def window(self) -> Optional[List[float]]:
+        """Tampon plein : fenêtre Hampel exploitable (sinon None)."""
+        if self.settings.hampel_window < 3 or self.count < len(self.buf):
+            return None
+        return self.buf
+
+    def finish(self, x: float, t: float, med: Optional[float], mad: Optional[float]) -> float:
+        """Étapes après la médiane : remplacement Hampel, pente, EMA."""
+        s = self.settings
+        y = x
+        if med is not None and abs(x - med) > max(s.hampel_k * _MAD_SCALE * mad, s.hampel_floor):
+            y = med
+            _FILTERED.labels(self.key, "hampel").inc()
+        if s.max_rate is not None and self.value is not None and self.t is not None:
+            step = s.max_rate * max(t - self.t, 0.0)
+            clamped = min(max(y, self.value - step), self.value + step)
+            if clamped != y:
+                y = clamped
+                _FILTERED.labels(self.key, "rate").inc()
+        if self.value is None or s.ema_alpha >= 1.0:
+            self.value = y
+        else:
+            self.value += s.ema_alpha * (y - self.value)
+        self.t = self.last_good = t
+        self.wall = time.time()
+        self.stale = False
+        return self.value
+
+    def missing(self, t: float) -> Optional[float]:
+        """Lecture invalide : dernière valeur tenue jusqu'à ``stale_s``."""
+        if self.value is not None and (self.last_good is None or t - self.last_good > self.settings.stale_s):
+            self.value = None
+            self.stale = True
+            _FILTERED.labels(self.key, "stale").inc()
+        self.t = t
+        return self.value
+
+
+def _mad(window: List[float], med: float) -> float:
+    return median(abs(v - med) for v in window)
+
+
+class SensorFilter:
+
+    def __init__(self, settings: SensorFiltersSettings, clock: Clock = SYSTEM_CLOCK):
+        self.settings = settings
+        self.clock = clock
+        self.channels: Dict[str, FilterChannel] = {}
+
+    def configure(self, settings: SensorFiltersSettings, keys: Iterable[str] = ()) -> None:
+        """Nouveaux réglages : canaux modifiés repartis de zéro, canaux des clés disparues oubliés."""
+        self.settings = settings
+        keep = set(keys)
+        for key in list(self.channels):
+            if key not in keep or self.channels[key].settings != settings.for_key(key):
+                del self.channels[key]
+
+    def _channel(self, key: str) -> FilterChannel:
+        ch = self.channels.get(key)
+        if ch is None:
+            ch = self.channels[key] = FilterChannel(key, self.settings.for_key(key))
+        return ch
+
+    # ──────────────────────────────────────────────────────────
+    #  Échantillons
+    # ──────────────────────────────────────────────────────────
+    def update(self, key: str, value, t: Optional[float] = None) -> Optional[float]:
+        """Un échantillon (*t* : horloge de la lecture matérielle) → valeur filtrée."""
+        return self.update_many({key: (value, t)}).get(key)
+
+    def update_many(self, samples: Dict[str, Tuple[object, Optional[float]]]) -> Dict[str, Optional[float]]:
+        """
+        Échantillons d'un même passage : clé → (valeur, horloge de lecture).
+        Un échantillon déjà vu (même horloge : valeur resservie par
+        ``min_interval``) ne repasse pas dans le filtre.
+        """
+        now = self.clock.monotonic()
+        out: Dict[str, Optional[float]] = {}
+        fresh: List[Tuple[FilterChannel, float, float]] = []
+        for key, (value, t) in samples.items():
+            t = now if t is None else t
+            if not self.settings.enabled:
+                out[key] = value
+                continue
+            ch = self._channel(key)
+            if ch.t is not None and t <= ch.t:
+                out[key] = ch.value
+            elif isinstance(value, (int, float)) and not isinstance(value, bool):
+                ch.push(float(value))
+                fresh.append((ch, float(value), t))
+            else:
+                out[key] = ch.missing(t)
+
+        for (ch, x, t), (med, mad) in zip(fresh, self._medians([ch for ch, _, _ in fresh])):
+            out[ch.key] = ch.finish(x, t, med, mad)
+        return out
+
+    @staticmethod
+    def _medians(channels: List[FilterChannel]) -> List[Tuple[Optional[float], Optional[float]]]:
+        """(médiane, MAD) de la fenêtre de chaque canal ; None tant qu'elle n'est pas pleine."""
+        result: List[Tuple[Optional[float], Optional[float]]] = [(None, None)] * len(channels)
+        groups: Dict[int, List[int]] = {}
+        for i, ch in enumerate(channels):
+            if ch.window() is not None:
+                groups.setdefault(len(ch.buf), []).append(i)
+        for rows in groups.values():
+            if np is not None and len(rows) >= _NUMPY_MIN_CHANNELS:
+                block = np.array([channels[i].buf for i in rows])
+                meds = np.median(block, axis=1)
+                mads = np.median(np.abs(block - meds[:, None]), axis=1)
+                for i, med, mad in zip(rows, meds.tolist(), mads.tolist()):
+                    result[i] = (med, mad)
+            else:
+                for i in rows:
+                    med = median(channels[i].buf)
+                    result[i] = (med, _mad(channels[i].buf, med))
+        return result
+
+    # ──────────────────────────────────────────────────────────
+    #  Vue filtrée
+    # ──────────────────────────────────────────────────────────
+    def value(self, key: str) -> Optional[float]:
+        ch = self.channels.get(key)
+        return ch.value if ch is not None else None
+
+    def cached(self, key: str) -> Optional[Tuple[float, float]]:
+        """(valeur filtrée, epoch de la dernière lecture valide), ou None."""
+        ch = self.channels.get(key)
+        if ch is None or ch.value is None:
+            return None
+        return ch.value, ch.wall
+
+    def to_dict(self) -> Dict[str, dict]:
+        return {
+            key: {"value": ch.value, "stale": ch.stale, "window": ch.count, **ch.settings.model_dump()}
+            for key, ch in self.channels.items()
+        }
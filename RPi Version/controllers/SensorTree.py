@@ -0,0 +1,163 @@
+# controllers/SensorTree.py
+# Author : Progradius
+# License: AGPL-3.0
+# -------------------------------------------------------------
+#  Arbre I²C : capteurs multiples (bus, multiplexeur, adresse)
+# -------------------------------------------------------------
+"""
+Capteurs déclarés dans la section ``Sensor_Tree`` de la config (un BME280
+par étagère, plusieurs TSL2591 derrière un TCA9548A…), en plus des
+capteurs uniques de ``Sensor_State``.
+
+‣ Une entrée = bus → [multiplexeur, canal] → adresse, type de capteur et
+  nom logique. Ses clés sont celles du type suffixées du nom :
+  BME280T@etagere1, BME280H@etagere1, TSL-LUX@etagere2…
+‣ Un driver par entrée, construit sur ``hal.i2c_view`` : bus partagé,
+  routage du multiplexeur fait au moment de chaque transaction.
+‣ ``lane(name)`` place chaque capteur sur son bus et l'ordonne par
+  (multiplexeur, canal, adresse) : SensorController.read_all lit un canal
+  en entier avant de passer au suivant, et les bus indépendants en
+  parallèle.
+‣ ``sync`` est incrémental : seules les entrées ajoutées, modifiées ou
+  retirées sont (ré)instanciées ou libérées.
+‣ Types, adresses par défaut et clés viennent du registre des drivers
+  (sensor_handlers/registry) : un greffon I²C s'y ajoute sans toucher ici.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, List, Tuple
+
+from hal import backend as hal
+from param.config import AppConfig, SensorDevice
+from sensor_handlers import registry
+from sensor_handlers.registry import DriverSpec
+from utils.pretty_console import info, warning
+
+
+def driver_spec(kind: str) -> DriverSpec:
+    """Entrée du registre d'un type de Sensor_Tree (« bme280 », greffon « sht31 »…)."""
+    spec = registry.by_kind(kind)
+    if spec is None or not spec.tree:
+        raise ValueError(f"type de capteur inconnu : {kind}")
+    return spec
+
+
+class SensorTree:
+
+    def __init__(self):
+        self.specs: Dict[str, SensorDevice] = {}          # nom → entrée active
+        self.drivers: Dict[str, object] = {}              # nom → handler
+
+    # ──────────────────────────────────────────────────────────
+    #  Description
+    # ──────────────────────────────────────────────────────────
+    @staticmethod
+    def address_of(spec: SensorDevice) -> int:
+        return spec.address if spec.address is not None else driver_spec(spec.driver).address
+
+    def keys_of(self, name: str) -> Tuple[str, ...]:
+        return tuple(f"{k.key}@{name}" for k in driver_spec(self.specs[name].driver).keys)
+
+    def keys(self) -> List[str]:
+        return [k for name in self.specs for k in self.keys_of(name)]
+
+    def device(self, name: str) -> str:
+        """Nom du périphérique (disjoncteur) : « bme280@etagere1 »."""
+        return f"{self.specs[name].driver}@{name}"
+
+    def devices(self) -> List[str]:
+        return [self.device(name) for name in self.specs]
+
+    def lane(self, name: str) -> Tuple[str, tuple]:
+        spec = self.specs[name]
+        mux = -1 if spec.mux is None else spec.mux
+        channel = -1 if spec.channel is None else spec.channel
+        return f"i2c-{spec.bus}", (mux, channel, self.address_of(spec))
+
+    def path(self, name: str) -> str:
+        spec = self.specs[name]
+        where = f"i2c-{spec.bus}"
+        if spec.mux is not None:
+            where += f"/0x{spec.mux:02X}.{spec.channel}"
+        return f"{where}@0x{self.address_of(spec):02X}"
+
+    # ──────────────────────────────────────────────────────────
+    #  Drivers
+    # ──────────────────────────────────────────────────────────
+    def make(self, name: str):
+        """Instancie le handler d'une entrée (appelable depuis un thread)."""
+        spec = self.specs[name]
+        drv = driver_spec(spec.driver)
+        address = self.address_of(spec)
+        if hal.is_simulated():
+            hal.simulator().wire_i2c(spec.driver, address, spec.bus, spec.mux, spec.channel, factory=drv.sim)
+        i2c = hal.i2c_view(spec.bus, spec.mux, spec.channel)
+        return drv.build_at(i2c, address)
+
+    def attach(self, name: str, driver) -> None:
+        if name in self.specs:
+            self.drivers[name] = driver
+
+    def release(self, name: str) -> None:
+        driver = self.drivers.pop(name, None)
+        if hasattr(driver, "close"):
+            try:
+                driver.close()
+            except Exception as e:
+                warning(f"Libération {name} : {e}")
+
+    def revive(self, name: str) -> None:
+        """Essai d'un capteur hors service : ré-instancie un driver non initialisé."""
+        current = self.drivers.get(name)
+        if current is not None and getattr(current, "available", True):
+            return
+        try:
+            fresh = self.make(name)
+        except Exception as e:
+            warning(f"Ré-initialisation {name} : {e!r}")
+            return
+        if getattr(fresh, "available", True):
+            self.drivers[name] = fresh
+
+    def sync(self, config: AppConfig, instantiate: bool = True) -> List[str]:
+        """
+        Aligne l'arbre sur la config ; retourne les noms touchés.
+        instantiate=False : entrées enregistrées sans driver (sondage différé).
+        """
+        wanted = {d.name: d for d in config.sensor_tree.devices if d.enabled}
+        touched = []
+        for name in list(self.specs):
+            if name not in wanted or wanted[name] != self.specs[name]:
+                self.release(name)
+                del self.specs[name]
+                touched.append(name)
+        for name, spec in wanted.items():
+            if name in self.specs:
+                continue
+            self.specs[name] = spec
+            if name not in touched:
+                touched.append(name)
+            if instantiate:
+                try:
+                    self.drivers[name] = self.make(name)
+                except Exception as e:
+                    warning(f"Capteur {name} ({self.path(name)}) : {e!r}")
+        if touched:
+            info(f"Arbre I²C : {len(self.specs)} capteur(s) ({', '.join(touched)} mis à jour)")
+        return touched
+
+    def pending(self) -> List[str]:
+        """Entrées sans driver (à sonder)."""
+        return [name for name in self.specs if name not in self.drivers]
+
+    def to_dict(self) -> Dict[str, dict]:
+        return {
+            name: {
+                "driver": spec.driver,
+                "path":   self.path(name),
+                "keys":   list(self.keys_of(name)),
+                "ready":  getattr(self.drivers.get(name), "available", False),
+            }
+            for name, spec in self.specs.items()
+        }
@@ -0,0 +1,429 @@
+# controllers/Supervisor.py
+# Author : Progradius
+# License: AGPL-3.0
+# -------------------------------------------------------------
+#  Arbre de tâches supervisé + watchdog matériel conditionné
+# -------------------------------------------------------------
+"""
+Le superviseur possède toutes les tâches asyncio de PuppetMaster.
+
+‣ Chaque tâche est déclarée par une *fabrique* (``lambda: coroutine``) :
+  elle peut donc être relancée.
+‣ Politique de relance :
+    always      relancée même si elle se termine normalement (boucles)
+    on-failure  relancée seulement sur exception
+    never       jamais relancée
+  avec un délai exponentiel (1 s → 60 s), remis à zéro après 60 s de
+  fonctionnement stable.
+‣ Battements : les boucles de contrôle notent chaque itération
+  (utils.timebase.HEARTBEATS, via MeteredClock) avec l'heure de réveil
+  attendue. Une boucle qui ne s'est pas réveillée à l'heure + ``grace``
+  est considérée bloquée : elle est annulée puis relancée.
+‣ Watchdog matériel (/dev/watchdog) : caressé par la boucle asyncio
+  elle-même, uniquement si toutes les tâches critiques (non gelées)
+  tournent, qu'aucun battement n'est en retard et que le retard de boucle
+  récent reste sous ``lag_budget``. Sinon la carte redémarre d'elle-même.
+‣ API : état (GET /api/v1/tasks), relance, gel et reprise d'une tâche.
+
+Variables d'environnement :
+    PHYTO_HW_WATCHDOG        1 = ouvre /dev/watchdog             (défaut 0)
+    PHYTO_WATCHDOG_DEV       périphérique              (défaut /dev/watchdog)
+    PHYTO_WATCHDOG_LAG_MS    budget de retard de boucle (défaut 2000)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Coroutine, Dict, Optional
+
+from utils.metrics import counter, gauge
+from utils.pretty_console import info, success, warning, error
+from utils.timebase import HEARTBEATS
+
+_RESTARTS = counter("phyto_task_restarts_total", "Relances de tâches supervisées", ("task", "reason"))
+_PETS = counter("phyto_watchdog_pets_total", "Écritures sur le watchdog matériel")
+_PET_SKIPPED = counter("phyto_watchdog_skipped_total", "Caresses refusées (système non sain)", ("reason",))
+
+RESTART_POLICIES = ("always", "on-failure", "never")
+
+
+class SupervisorError(Exception):
+    """Commande invalide (tâche inconnue, état incompatible)."""
+
+
+class UnknownTask(SupervisorError):
+    """Aucune tâche de ce nom."""
+
+
+# ──────────────────────────────────────────────────────────────
+#  Watchdog matériel
+# ──────────────────────────────────────────────────────────────
+class HardwareWatchdog:
+    """
+    /dev/watchdog : une écriture repousse le redémarrage matériel ; à la
+    fermeture, le caractère magique « V » le désarme proprement.
+    """
+
+    def __init__(self, device: str = "/dev/watchdog", enabled: bool = True):
+        self.device = device
+        self.enabled = enabled
+        self._fd = None
+        self.last_pet: Optional[float] = None
+
+    @classmethod
+    def from_env(cls) -> "HardwareWatchdog":
+        return cls(
+            device=os.getenv("PHYTO_WATCHDOG_DEV", "/dev/watchdog"),
+            enabled=os.getenv("PHYTO_HW_WATCHDOG", "0") != "0",
+        )
+
+    @property
+    def active(self) -> bool:
+        return self._fd is not None
+
+    def open(self) -> bool:
+        if not self.enabled or self._fd is not None:
+            return self.active
+        try:
+            self._fd = open(self.device, "w")
+        except OSError as e:
+            warning(f"Watchdog matériel non disponible : {e}")
+            self.enabled = False
+            return False
+        success(f"🛡️  Watchdog matériel armé ({self.device})")
+        return True
+
+    def pet(self) -> None:
+        if self._fd is None:
+            return
+        self._fd.write("\n")
+        self._fd.flush()
+        self.last_pet = time.monotonic()
+        _PETS.inc()
+
+    def close(self) -> None:
+        """Désarme (« V ») puis ferme ; sans effet si jamais ouvert."""
+        fd, self._fd = self._fd, None
+        if fd is None:
+            return
+        try:
+            fd.write("V")
+            fd.flush()
+            fd.close()
+            info("🛡️  Watchdog matériel désactivé proprement")
+        except OSError as e:
+            warning(f"Impossible de désactiver le watchdog : {e}")
+
+
+# ──────────────────────────────────────────────────────────────
+#  Tâches supervisées
+# ──────────────────────────────────────────────────────────────
+@dataclass
+class TaskSpec:
+    name: str
+    factory: Callable[[], Coroutine[Any, Any, Any]]
+    critical: bool = True
+    restart: str = "always"
+    heartbeat: Optional[str] = None          # clé HEARTBEATS (None = pas de battement)
+    grace: float = 30.0                      # retard toléré sur le réveil attendu (s)
+
+    # état courant
+    state: str = "pending"                   # pending/running/backoff/frozen/exited/failed
+    task: Optional[asyncio.Task] = field(default=None, repr=False)
+    restarts: int = 0
+    started_at: Optional[float] = None
+    last_exit: Optional[float] = None
+    last_error: Optional[str] = None
+    backoff: float = 0.0
+    _wake: Optional[asyncio.Event] = field(default=None, repr=False)
+    _cancel_reason: Optional[str] = field(default=None, repr=False)
+
+
+class Supervisor:
+
+    def __init__(
+        self,
+        *,
+        loop_monitor=None,
+        watchdog: Optional[HardwareWatchdog] = None,
+        pet_interval: float = 5.0,
+        lag_budget: Optional[float] = None,
+        backoff_initial: float = 1.0,
+        backoff_max: float = 60.0,
+        stable_after: float = 60.0,
+    ):
+        self.specs: Dict[str, TaskSpec] = {}
+        self.loop_monitor = loop_monitor
+        self.watchdog = watchdog or HardwareWatchdog.from_env()
+        self.pet_interval = pet_interval
+        if lag_budget is None:
+            try:
+                lag_budget = float(os.getenv("PHYTO_WATCHDOG_LAG_MS", "2000")) / 1000
+            except ValueError:
+                lag_budget = 2.0
+        self.lag_budget = lag_budget
+        self.backoff_initial = backoff_initial
+        self.backoff_max = backoff_max
+        self.stable_after = stable_after
+        self.health: Dict[str, Any] = {"healthy": None, "reasons": []}
+        self._runners: Dict[str, asyncio.Task] = {}
+
+        gauge("phyto_task_up", "Tâche supervisée en cours d'exécution", ("task",)).set_function(
+            lambda: {(n,): int(s.state == "running") for n, s in self.specs.items()}
+        )
+        gauge("phyto_watchdog_healthy", "Dernier bilan de santé du superviseur").set_function(
+            lambda: int(bool(self.health["healthy"]))
+        )
+
+    # ──────────────────────────────────────────────────────────
+    #  Déclaration
+    # ──────────────────────────────────────────────────────────
+    def add(
+        self,
+        name: str,
+        factory: Callable[[], Coroutine[Any, Any, Any]],
+        *,
+        critical: bool = True,
+        restart: str = "always",
+        heartbeat: Optional[str] = None,
+        grace: float = 30.0,
+    ) -> TaskSpec:
+        if restart not in RESTART_POLICIES:
+            raise ValueError(f"politique inconnue : {restart}")
+        if name in self.specs:
+            raise ValueError(f"tâche déjà déclarée : {name}")
+        spec = self.specs[name] = TaskSpec(
+            name=name, factory=factory, critical=critical, restart=restart,
+            heartbeat=heartbeat, grace=grace,
+        )
+        if self._runners:                    # superviseur déjà lancé
+            self._spawn(spec)
+        return spec
+
+    # ──────────────────────────────────────────────────────────
+    #  Exécution
+    # ──────────────────────────────────────────────────────────
+    async def run(self) -> None:
+        """Lance toutes les tâches puis surveille (ne rend jamais la main)."""
+        for spec in self.specs.values():
+            self._spawn(spec)
+        self.watchdog.open()
+        try:
+            while True:
+                await asyncio.sleep(self.pet_interval)
+                self._check_heartbeats()
+                self._evaluate_and_pet()
+        finally:
+            for runner in self._runners.values():
+                runner.cancel()
+
+    def _spawn(self, spec: TaskSpec) -> None:
+        spec._wake = asyncio.Event()
+        self._runners[spec.name] = asyncio.get_running_loop().create_task(
+            self._child(spec), name=f"supervise:{spec.name}"
+        )
+
+    async def _child(self, spec: TaskSpec) -> None:
+        while True:
+            if spec.state == "frozen":
+                spec._wake.clear()
+                await spec._wake.wait()
+                continue
+
+            if spec.heartbeat:
+                now = time.monotonic()
+                HEARTBEATS[spec.heartbeat] = (now, now)     # le démarrage compte
+            spec.state = "running"
+            spec.started_at = time.monotonic()
+            spec._cancel_reason = None
+            spec.task = asyncio.get_running_loop().create_task(spec.factory(), name=spec.name)
+            reason = None
+            try:
+                await spec.task
+                reason = "exited"
+            except asyncio.CancelledError:
+                if spec._cancel_reason is None:
+                    # c'est le superviseur lui-même qui est annulé
+                    spec.task.cancel()
+                    raise
+                # annulation ciblée (relance / gel / battement) : on boucle
+                reason = spec._cancel_reason
+            except Exception as exc:
+                reason = "failed"
+                spec.last_error = repr(exc)
+                error(f"Tâche {spec.name} en échec : {exc!r}")
+            finally:
+                spec.last_exit = time.monotonic()
+
+            if spec.state == "frozen":
+                continue
+
+            ran = spec.last_exit - spec.started_at
+            if reason == "exited" and spec.restart != "always":
+                spec.state = "exited"
+                info(f"Tâche {spec.name} terminée")
+                return
+            if reason in ("failed", "stalled") and spec.restart == "never":
+                spec.state = "failed"
+                return
+
+            if reason in ("exited", "failed", "stalled"):
+                if reason == "exited":
+                    warning(f"Tâche {spec.name} s'est arrêtée d'elle-même → relance")
+                spec.backoff = (
+                    self.backoff_initial if ran >= self.stable_after or not spec.backoff
+                    else min(self.backoff_max, spec.backoff * 2)
+                )
+            else:                                           # relance manuelle
+                spec.backoff = 0.0
+            spec.restarts += 1
+            _RESTARTS.labels(spec.name, reason).inc()
+
+            if spec.backoff:
+                spec.state = "backoff"
+                info(f"Tâche {spec.name} relancée dans {spec.backoff:g} s ({reason})")
+                spec._wake.clear()
+                try:
+                    await asyncio.wait_for(spec._wake.wait(), spec.backoff)
+                except asyncio.TimeoutError:
+                    pass
+
+    def _cancel(self, spec: TaskSpec, reason: str) -> None:
+        spec._cancel_reason = reason
+        if spec.task is not None and not spec.task.done():
+            spec.task.cancel()
+
+    # ──────────────────────────────────────────────────────────
+    #  Battements & santé
+    # ──────────────────────────────────────────────────────────
+    def _heartbeat_state(self, spec: TaskSpec, now: float) -> Optional[dict]:
+        if not spec.heartbeat or spec.heartbeat not in HEARTBEATS:
+            return None
+        last, due = HEARTBEATS[spec.heartbeat]
+        return {
+            "age_s":    round(now - last, 1),
+            "due_in_s": round(due - now, 1),
+            "stale":    now > due + spec.grace,
+        }
+
+    def _check_heartbeats(self) -> None:
+        now = time.monotonic()
+        for spec in self.specs.values():
+            if spec.state != "running":
+                continue
+            hb = self._heartbeat_state(spec, now)
+            if hb and hb["stale"]:
+                error(f"Tâche {spec.name} : pas de battement depuis {hb['age_s']} s → relance")
+                self._cancel(spec, "stalled")
+
+    def evaluate(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        reasons = []
+        for spec in self.specs.values():
+            if not spec.critical or spec.state == "frozen":
+                continue
+            if spec.state != "running":
+                reasons.append(f"{spec.name}: {spec.state}")
+                continue
+            hb = self._heartbeat_state(spec, now)
+            if hb and hb["stale"]:
+                reasons.append(f"{spec.name}: battement en retard")
+        if self.loop_monitor is not None:
+            lag = self.loop_monitor.recent_max_lag(self.pet_interval)
+            if lag is not None and lag > self.lag_budget:
+                reasons.append(f"retard de boucle {lag * 1000:.0f} ms")
+        self.health = {"healthy": not reasons, "reasons": reasons}
+        return self.health
+
+    def _evaluate_and_pet(self) -> None:
+        was = self.health["healthy"]
+        health = self.evaluate()
+        if health["healthy"]:
+            self.watchdog.pet()
+            if was is False:
+                success("Superviseur : système de nouveau sain")
+            return
+        for reason in health["reasons"]:
+            _PET_SKIPPED.labels(reason.split(":", 1)[0]).inc()
+        if was is not False:
+            verb = "watchdog NON caressé" if self.watchdog.active else "watchdog inactif"
+            warning(f"Superviseur : système non sain ({'; '.join(health['reasons'])}) → {verb}")
+
+    # ──────────────────────────────────────────────────────────
+    #  Commandes (API)
+    # ──────────────────────────────────────────────────────────
+    def _spec(self, name: str) -> TaskSpec:
+        spec = self.specs.get(name)
+        if spec is None:
+            raise UnknownTask(f"tâche inconnue : {name}")
+        return spec
+
+    def restart(self, name: str) -> dict:
+        spec = self._spec(name)
+        if spec.state == "frozen":
+            raise SupervisorError(f"{name} est gelée : la reprendre d'abord")
+        if spec.state in ("exited", "failed"):
+            self._spawn(spec)
+        elif spec.state == "backoff":
+            spec._wake.set()
+        else:
+            self._cancel(spec, "manual")
+        info(f"Superviseur : relance de {name} demandée")
+        return self.task_state(spec)
+
+    def freeze(self, name: str) -> dict:
+        spec = self._spec(name)
+        if spec.state != "frozen":
+            previous, spec.state = spec.state, "frozen"
+            self._cancel(spec, "frozen")
+            if previous in ("exited", "failed"):
+                self._spawn(spec)
+            elif previous == "backoff":
+                spec._wake.set()
+            warning(f"Superviseur : {name} gelée" + (" (critique, exclue du watchdog)" if spec.critical else ""))
+        return self.task_state(spec)
+
+    def resume(self, name: str) -> dict:
+        spec = self._spec(name)
+        if spec.state != "frozen":
+            raise SupervisorError(f"{name} n'est pas gelée")
+        spec.state = "pending"
+        spec.backoff = 0.0
+        spec._wake.set()
+        info(f"Superviseur : {name} reprise")
+        return self.task_state(spec)
+
+    # ──────────────────────────────────────────────────────────
+    #  Rapport
+    # ──────────────────────────────────────────────────────────
+    def task_state(self, spec: TaskSpec) -> dict:
+        now = time.monotonic()
+        return {
+            "name":       spec.name,
+            "state":      spec.state,
+            "critical":   spec.critical,
+            "restart":    spec.restart,
+            "restarts":   spec.restarts,
+            "uptime_s":   round(now - spec.started_at, 1) if spec.state == "running" and spec.started_at else None,
+            "backoff_s":  spec.backoff or None,
+            "last_error": spec.last_error,
+            "heartbeat":  self._heartbeat_state(spec, now),
+        }
+
+    def to_dict(self) -> dict:
+        wd = self.watchdog
+        return {
+            "healthy":  self.health["healthy"],
+            "reasons":  self.health["reasons"],
+            "watchdog": {
+                "enabled":     wd.enabled,
+                "active":      wd.active,
+                "device":      wd.device,
+                "last_pet_s":  round(time.monotonic() - wd.last_pet, 1) if wd.last_pet else None,
+                "lag_budget_ms": round(self.lag_budget * 1000),
+            },
+            "tasks": [self.task_state(s) for s in self.specs.values()],
+        }
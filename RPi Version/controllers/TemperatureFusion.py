@@ -0,0 +1,129 @@
+# controllers/TemperatureFusion.py
+# Author : Progradius
+# License: AGPL-3.0
+# -------------------------------------------------------------
+#  Température de régulation fusionnée (plusieurs sondes d'air)
+# -------------------------------------------------------------
+"""
+Clé ``REG-T`` : la température que lisent les régulations de la zone
+« main » (moteur, chauffage), calculée une fois par passage d'acquisition
+à partir de toutes les sondes d'air configurées (``Temperature_Fusion``).
+
+Pour chaque échantillon :
+‣ Santé : source exclue si son périphérique est coupé (disjoncteur open /
+  half-open), si elle n'a pas de valeur ou si sa dernière lecture a plus
+  de ``max_age_s`` ; poids divisé par deux si « degraded ».
+‣ Biais : l'écart de chaque source à la source primaire (première de la
+  liste disponible) est suivi en moyenne glissante tant que la primaire
+  répond, puis retranché. Une panne de la primaire ne fait pas sauter la
+  consigne de l'écart entre sondes : bascule sans à-coup.
+‣ Aberrantes : à partir de trois sources, celles à plus de ``outlier_c``
+  de la médiane (valeurs corrigées) sont écartées ; à deux sources en
+  désaccord, la plus lourde l'emporte.
+‣ Moyenne pondérée des sources retenues. ``to_dict`` détaille, pour le
+  dernier échantillon, la contribution (ou le motif d'exclusion) de
+  chacune.
+
+``enabled`` faux : REG-T recopie la première source disponible.
+"""
+
+from __future__ import annotations
+
+import time
+from statistics import median
+from typing import Dict, List, Optional, Tuple
+
+from param.config import TemperatureFusionSettings
+from utils.metrics import counter
+
+KEY = "REG-T"
+_BIAS_ALPHA = 0.05                  # ~20 échantillons
+
+_EXCLUDED = counter("phyto_fusion_excluded_total", "Sources écartées de REG-T", ("key", "reason"))
+
+
+class TemperatureFusion:
+
+    def __init__(self, settings: TemperatureFusionSettings):
+        self.settings = settings
+        self.bias: Dict[str, float] = {}
+        self.last: dict = {}
+
+    def configure(self, settings: TemperatureFusionSettings) -> None:
+        if [s.key for s in settings.sources] != [s.key for s in self.settings.sources]:
+            self.bias.clear()
+        self.settings = settings
+
+    def plan(self, available) -> Tuple[str, ...]:
+        """Sources configurées parmi les clés actives (*available*), primaire en tête."""
+        keys = tuple(s.key for s in self.settings.sources if s.key in available)
+        return keys if self.settings.enabled else keys[:1]
+
+    def fuse(self, samples: Dict[str, Tuple[object, Optional[float], str]]) -> Optional[float]:
+        """
+        *samples* : source → (valeur, âge de la lecture en s, état de santé),
+        dans l'ordre de ``plan``. Retourne REG-T, ou None si aucune source.
+        """
+        weights = {s.key: s.weight for s in self.settings.sources}
+        detail: Dict[str, dict] = {}
+        valid: Dict[str, Tuple[float, float]] = {}            # source → (valeur corrigée, poids)
+        for key, (value, age, health) in samples.items():
+            reason = None
+            if health in ("open", "half-open"):
+                reason = health
+            elif not isinstance(value, (int, float)):
+                reason = "no-value"
+            elif age is None or age > self.settings.max_age_s:
+                reason = "stale"
+            detail[key] = {"value": value, "weight": 0.0, "bias": round(self.bias.get(key, 0.0), 3),
+                           "used": False, "reason": reason}
+            if reason is None:
+                weight = weights.get(key, 1.0) * (0.5 if health == "degraded" else 1.0)
+                valid[key] = (float(value) - self.bias.get(key, 0.0), weight)
+
+        primary = next(iter(valid), None)
+        if primary is not None and primary == next(iter(samples), None):
+            self._learn_bias(samples, valid)
+
+        for key in self._outliers(valid):
+            detail[key]["reason"] = "outlier"
+            del valid[key]
+        for key, d in detail.items():
+            if d["reason"]:
+                _EXCLUDED.labels(key, d["reason"]).inc()
+
+        value = None
+        if valid:
+            total = sum(w for _, w in valid.values())
+            value = round(sum(v * w for v, w in valid.values()) / total, 2)
+            for key, (_, w) in valid.items():
+                detail[key].update(used=True, weight=round(w / total, 3))
+        self.last = {"value": value, "ts": round(time.time(), 3), "primary": primary, "sources": detail}
+        return value
+
+    def _learn_bias(self, samples: Dict[str, tuple], valid: Dict[str, Tuple[float, float]]) -> None:
+        """Écart de chaque source à la primaire, appris tant que la primaire répond."""
+        primary = next(iter(samples))
+        ref = float(samples[primary][0])
+        for key in valid:
+            if key == primary:
+                continue
+            error = float(samples[key][0]) - ref
+            if abs(error) > 4 * self.settings.outlier_c:
+                continue                                        # sonde en vrac : pas un biais
+            old = self.bias.get(key)
+            self.bias[key] = error if old is None else old + _BIAS_ALPHA * (error - old)
+            valid[key] = (float(samples[key][0]) - self.bias[key], valid[key][1])
+
+    def _outliers(self, valid: Dict[str, Tuple[float, float]]) -> List[str]:
+        if len(valid) >= 3:
+            med = median(v for v, _ in valid.values())
+            return [k for k, (v, _) in valid.items() if abs(v - med) > self.settings.outlier_c]
+        if len(valid) == 2:
+            (ka, (va, wa)), (kb, (vb, wb)) = valid.items()
+            if abs(va - vb) > self.settings.outlier_c:
+                return [kb if wa >= wb else ka]
+        return []
+
+    def to_dict(self) -> dict:
+        return self.last
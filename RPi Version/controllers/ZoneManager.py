@@ -0,0 +1,267 @@
+# controllers/ZoneManager.py
+# Author : Progradius
+# License: AGPL-3.0
+# -------------------------------------------------------------
+#  Zones climatiques : plusieurs tentes sur un même contrôleur
+# -------------------------------------------------------------
+"""
+Possède toutes les zones (model/Zone.py) : « main », l'installation
+historique, plus celles de la section ``Zones`` de la config, chacune avec
+ses capteurs, sa photopériode, ses consignes et ses sorties relais.
+
+‣ Acquisition partagée : aucune zone ne lit le bus pour elle-même. Le
+  SensorController publie chaque valeur qui change ; un index
+  clé capteur → zones ne réveille que les zones liées à cette clé.
+‣ Planification partagée : une seule tâche (``zone_scheduler``) dort
+  jusqu'à la prochaine bascule jour/nuit de l'ensemble des zones, bascule
+  la lumière des zones concernées et réveille leurs boucles.
+‣ Boucles par zone pilotées par évènements : une zone stable ne coûte
+  rien, le travail suit le nombre de changements et non zones × périodes
+  d'échantillonnage. Par défaut une seule boucle possède chauffage et
+  extracteur (components/climate_control) ; ``Climate_Control.enabled``
+  faux : une boucle par sortie (heat_control, fan_control).
+‣ Rechargement à chaud (ConfigPatcher « zones », « regulation »,
+  « scheduler ») : zones ajoutées, modifiées ou retirées une à une ; une
+  zone retirée coupe ses sorties.
+
+Chaque sortie d'une zone doit être une broche libre : ni GPIO_Settings, ni
+une autre zone. Une zone en conflit est refusée (signalée dans l'API).
+"""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Dict, List, Optional
+
+from components.climate_control import climate_control
+from components.fan_control import fan_control
+from components.heater_control import heat_control
+from controllers.Supervisor import SupervisorError
+from model.Component import Component
+from model.Zone import MAIN, Zone, legacy_settings
+from param.config import AppConfig, ZoneSettings
+from utils.pretty_console import error, info, success, warning
+from utils.timebase import Clock, MeteredClock, SYSTEM_CLOCK
+
+# rôle de sortie → champ de la broche dans ZoneSettings
+OUTPUTS = {
+    "light":  "light_pin",
+    "heater": "heater_pin",
+    "fan":    "fan_pin",
+}
+# rôle de sortie → boucle de régulation (tâche « boucle:zone »)
+LOOPS = {
+    "heater": "heat_control",
+    "fan":    "fan_control",
+}
+CLIMATE_LOOP = "climate_control"        # régulateur coordonné : toutes les sorties ci-dessus
+
+_MAX_SLEEP = 3600.0            # recalage périodique (changement d'heure, NTP)
+
+
+class ZoneManager:
+
+    def __init__(self, config: AppConfig, sensor_handler, heater_component=None,
+                 clock: Clock = SYSTEM_CLOCK, deadband: float = 0.1):
+        self.config = config
+        self.sensors = sensor_handler
+        self.clock = clock
+        self.deadband = deadband
+        self.coordinated = config.climate.enabled       # figé au démarrage
+        self.supervisor = None
+        self.rejected: Dict[str, str] = {}              # nom → raison
+        self._by_key: Dict[str, List[Zone]] = {}
+        self._changed: Optional[asyncio.Event] = None
+
+        self.main = Zone(
+            legacy_settings(config),
+            outputs={"heater": heater_component} if heater_component is not None else None,
+            deadband=deadband,
+        )
+        self.zones: Dict[str, Zone] = {MAIN: self.main}
+        for settings in config.zones.zones:
+            if settings.enabled:
+                self._add(settings)
+        self._index()
+
+        sensor_handler.subscribe(self._on_sensor)
+        info(f"Zones : {', '.join(self.zones)}")
+
+    # ──────────────────────────────────────────────────────────
+    #  Zones
+    # ──────────────────────────────────────────────────────────
+    def _busy_pins(self, exclude: Optional[str] = None) -> Dict[int, str]:
+        busy = {pin: f"GPIO_Settings.{field}" for field, pin in self.config.gpio.model_dump().items()}
+        for zone in self.zones.values():
+            if zone.name != exclude:
+                for role, comp in zone.outputs.items():
+                    busy[comp.pin] = f"{zone.name}.{role}"
+        return busy
+
+    def _add(self, settings: ZoneSettings) -> Optional[Zone]:
+        busy = self._busy_pins(exclude=settings.name)
+        pins = {role: getattr(settings, attr) for role, attr in OUTPUTS.items()
+                if getattr(settings, attr) is not None}
+        for role, pin in pins.items():
+            owner = busy.get(pin)
+            if owner is not None:
+                self.rejected[settings.name] = f"{role} GPIO {pin} déjà pris par {owner}"
+                error(f"Zone {settings.name} refusée : {self.rejected[settings.name]}")
+                return None
+            busy[pin] = f"{settings.name}.{role}"
+
+        self.rejected.pop(settings.name, None)
+        zone = Zone(settings, {role: Component(pin) for role, pin in pins.items()}, self.deadband)
+        zone.event_driven = True
+        self.zones[zone.name] = zone
+        success(f"Zone {zone.name} : capteur {settings.temp_sensor}, sorties {pins or 'aucune'}")
+        return zone
+
+    def _remove(self, name: str) -> None:
+        zone = self.zones.pop(name)
+        zone.removed = True
+        zone.notify("removed")
+        for comp in zone.outputs.values():
+            comp.set_state(0)
+        if self.supervisor is not None:
+            for loop in (*LOOPS.values(), CLIMATE_LOOP):
+                spec = self.supervisor.specs.get(f"{loop}:{name}")
+                if spec is not None:
+                    spec.critical = False           # terminée exprès, pas une panne
+        warning(f"Zone {name} retirée : sorties coupées")
+
+    def _index(self) -> None:
+        by_key: Dict[str, List[Zone]] = {}
+        for zone in self.zones.values():
+            for key in zone.sensor_keys():
+                by_key.setdefault(key, []).append(zone)
+        self._by_key = by_key
+
+    def _on_sensor(self, key: str, value) -> None:
+        for zone in self._by_key.get(key, ()):
+            zone.offer(key, value)
+
+    def outlets(self) -> Dict[str, Component]:
+        """Sorties des zones configurées, nommées « zone_rôle » (API /outlets)."""
+        return {f"{zone.name}_{role}": comp
+                for zone in self.zones.values() if zone.name != MAIN
+                for role, comp in zone.outputs.items()}
+
+    # ──────────────────────────────────────────────────────────
+    #  Tâches
+    # ──────────────────────────────────────────────────────────
+    def install(self, sup) -> None:
+        """Déclare le planificateur et les boucles des zones configurées."""
+        self.supervisor = sup
+        self.main.event_driven = True
+        sup.add("zone_scheduler", self.run, heartbeat="zone_scheduler", grace=120.0)
+        for zone in self.zones.values():
+            if zone.name != MAIN:
+                self._start(zone)
+
+    def _start(self, zone: Zone) -> None:
+        sup = self.supervisor
+        if sup is None:
+            return
+        for loop in self._loops(zone):
+            task = f"{loop}:{zone.name}"
+            spec = sup.specs.get(task)
+            if spec is None:
+                sup.add(task, lambda name=zone.name, loop=loop: self._loop(name, loop),
+                        restart="on-failure", heartbeat=task)
+            else:
+                spec.critical = True
+                try:
+                    sup.restart(task)
+                except SupervisorError as e:
+                    warning(f"Zone {zone.name} : {e}")
+
+    def _loops(self, zone: Zone) -> List[str]:
+        """Boucles de régulation d'une zone, selon ses sorties."""
+        loops = [loop for role, loop in LOOPS.items() if role in zone.outputs]
+        return [CLIMATE_LOOP] if loops and self.coordinated else loops
+
+    async def _loop(self, name: str, loop: str) -> None:
+        zone = self.zones.get(name)
+        if zone is None or loop not in self._loops(zone):
+            return
+        if loop == CLIMATE_LOOP:
+            await climate_control(config=self.config, sensor_handler=self.sensors,
+                                  heater_component=zone.outputs.get("heater"), fan=zone.outputs.get("fan"),
+                                  sampling_time=15, clock=self.clock, zone=zone)
+        elif loop == "heat_control":
+            await heat_control(heater_component=zone.outputs["heater"], sensor_handler=self.sensors,
+                               config=self.config, sampling_time=30, clock=self.clock, zone=zone)
+        else:
+            await fan_control(fan_component=zone.outputs["fan"], sensor_handler=self.sensors,
+                              zone=zone, sampling_time=15, clock=self.clock)
+
+    async def run(self) -> None:
+        """Planificateur : dort jusqu'à la prochaine bascule jour/nuit."""
+        clock = MeteredClock(self.clock, "zone_scheduler")
+        self._changed = asyncio.Event()
+        while True:
+            now = clock.now()
+            for zone in list(self.zones.values()):
+                self._tick(zone, now)
+            nxt = min(zone.next_transition(now) for zone in self.zones.values())
+            # marge d'une seconde : réveil franchement dans la minute visée
+            seconds = min(_MAX_SLEEP, (nxt - now).total_seconds() + 1)
+            self._changed.clear()
+            await clock.wait(self._changed, seconds)
+
+    def _tick(self, zone: Zone, now) -> None:
+        day = zone.is_day(now)
+        if day != zone.day:
+            first = zone.day is None
+            zone.day = day
+            if not first:
+                zone.notify("photoperiod")
+                info(f"Zone {zone.name} → {'jour' if day else 'nuit'}")
+        light = zone.outputs.get("light")
+        if light is not None:
+            wanted = int(day and zone.settings.enabled)
+            if light.get_state() != wanted:
+                light.set_state(wanted)
+
+    # ──────────────────────────────────────────────────────────
+    #  Rechargement (ConfigPatcher)
+    # ──────────────────────────────────────────────────────────
+    def reload(self, config: AppConfig, changed: list) -> None:
+        self.config = config
+        # consignes moteur / chauffage lues à chaque passage : toujours réveiller main
+        if not self.main.update(legacy_settings(config)):
+            self.main.notify("config")
+
+        wanted = {s.name: s for s in config.zones.zones if s.enabled}
+        for name in [n for n in self.zones if n != MAIN and n not in wanted]:
+            self._remove(name)
+        for name in [n for n in self.rejected if n not in wanted]:
+            del self.rejected[name]
+
+        for name, settings in wanted.items():
+            zone = self.zones.get(name)
+            same_pins = zone is not None and all(
+                getattr(zone.settings, attr) == getattr(settings, attr) for attr in OUTPUTS.values()
+            )
+            if same_pins:
+                zone.update(settings)
+                continue
+            if zone is not None:
+                self._remove(name)
+            zone = self._add(settings)
+            if zone is not None:
+                self._start(zone)
+
+        self._index()
+        if self._changed is not None:
+            self._changed.set()
+
+    # ──────────────────────────────────────────────────────────
+    def to_dict(self) -> dict:
+        now = self.clock.now()
+        return {
+            "zones":    {name: zone.to_dict(now) for name, zone in self.zones.items()},
+            "rejected": dict(self.rejected),
+            "index":    {key: [z.name for z in zones] for key, zones in self._by_key.items()},
+        }
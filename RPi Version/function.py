@@ -5,19 +5,16 @@
 #  Fonctions utilitaires « système »  (temps, stockage, GPIO, …)
 # ------------------------------------------------------------------
 
+from __future__ import annotations
+
 import shutil
 import subprocess
+from typing import TYPE_CHECKING
 
-import RPi.GPIO as GPIO
-
-from param.config import AppConfig
 from utils.pretty_console import info, success, warning, error
 
-# ───────────────────────────────────────────────────────────────
-#  Init GPIO global – BCM & warnings off
-# ───────────────────────────────────────────────────────────────
-GPIO.setmode(GPIO.BCM)
-GPIO.setwarnings(False)
+if TYPE_CHECKING:
+    from param.config import AppConfig
 
 # ==================================================================
 #                       OUTILS DE CONVERSION TEMPS
@@ -56,20 +53,22 @@ def check_ram_usage() -> None:
 # ==================================================================
 #                       SYNCHRONISATION NTP
 # ==================================================================
-def set_ntp_time() -> None:
+def set_ntp_time(timeout: float = 10.0) -> None:
     """
     Active (ou vérifie) la synchro NTP via systemd-timesyncd.
-    Nécessite sudo ou des permissions adaptées.
+    Nécessite sudo ou des permissions adaptées (sudo -n : jamais de prompt).
     """
     try:
-        subprocess.run(["sudo", "timedatectl", "set-ntp", "true"], check=True)
+        subprocess.run(["sudo", "-n", "timedatectl", "set-ntp", "true"], check=True, timeout=timeout)
         status = subprocess.run(
             ["timedatectl", "show", "-p", "NTPSynchronized"],
-            capture_output=True, text=True, check=True
+            capture_output=True, text=True, check=True, timeout=timeout
         )
         success(f"NTP synchronisé : {status.stdout.strip()}")
     except subprocess.CalledProcessError as e:
         error(f"timedatectl a échoué : {e}")
+    except subprocess.TimeoutExpired:
+        error(f"timedatectl sans réponse après {timeout}s")
     except Exception as e:
         error(f"Erreur synchro NTP : {e}")
 
@@ -81,7 +80,12 @@ def motor_all_pin_down_at_boot(config: AppConfig | None = None) -> None:
     Met **toutes** les broches moteur à LOW au boot (sécurité).
     Si `config` n'est pas fourni, on le charge depuis AppConfig.
     """
+    from hal.backend import GPIO
+    GPIO.setwarnings(False)
+    GPIO.setmode(GPIO.BCM)
+
     if config is None:
+        from param.config import AppConfig
         config = AppConfig.load()
 
     pins = [
@@ -0,0 +1,258 @@
+# hal/backend.py
+# Author : Progradius
+# License: AGPL-3.0
+# -------------------------------------------------------------
+#  Couche d'abstraction matérielle : GPIO, I²C, 1-Wire
+# -------------------------------------------------------------
+"""
+Point d'accès unique au matériel pour tout le projet.
+
+‣ ``PHYTO_HAL`` choisit le backend :
+    rpi   → RPi.GPIO + smbus2 + /sys/bus/w1/devices (le vrai Pi)
+    sim   → GPIO / bus I²C / arbre w1 simulés (hal/sim/…)
+    auto  → rpi sur un Raspberry Pi (/proc/device-tree/model), sim
+            ailleurs (défaut) ; sur un Pi, un RPi.GPIO absent ou cassé
+            est une erreur, jamais un repli silencieux sur de faux relais
+‣ Le choix est fait au premier accès, jamais à l'import.
+‣ ``GPIO`` s'utilise exactement comme le module RPi.GPIO :
+      from hal.backend import GPIO
+      GPIO.setup(pin, GPIO.OUT, initial=GPIO.HIGH)
+  Sur le Pi, les attributs résolus SONT ceux de RPi.GPIO (aucune
+  indirection après le premier appel), sauf ``output`` qui est compté.
+‣ Les bus de ``open_i2c`` sont enveloppés : chaque transaction alimente
+  les métriques ``phyto_i2c_*`` (utils.metrics).
+‣ ``i2c_view(bus, mux, channel)`` : accès partagé à un point de l'arbre
+  I²C (un objet bus par numéro, multiplexeurs TCA9548A — hal/i2c_mux.py).
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from typing import TYPE_CHECKING, Dict, Optional
+
+from utils.metrics import counter, histogram
+from utils.pretty_console import info, warning
+
+if TYPE_CHECKING:
+    from hal.i2c_mux import I2CView, SharedBus
+    from hal.sim.hardware import SimHardware
+
+W1_SYSFS_ROOT = "/sys/bus/w1/devices"
+DT_MODEL = "/proc/device-tree/model"
+
+_backend: Optional[str] = None
+_sim: Optional["SimHardware"] = None
+_shared_buses: Dict[int, "SharedBus"] = {}
+_shared_lock = threading.Lock()
+
+
+# ──────────────────────────────────────────────────────────────
+#  Sélection du backend
+# ──────────────────────────────────────────────────────────────
+def on_raspberry_pi() -> bool:
+    try:
+        with open(DT_MODEL, "rb") as f:
+            return b"Raspberry Pi" in f.read()
+    except OSError:
+        return False
+
+
+def backend_name() -> str:
+    """« rpi » ou « sim » (résolu une seule fois)."""
+    global _backend
+    if _backend is None:
+        wanted = os.getenv("PHYTO_HAL", "auto").lower()
+        if wanted not in ("auto", "rpi", "sim"):
+            warning(f"PHYTO_HAL={wanted!r} inconnu → auto")
+            wanted = "auto"
+        if wanted == "auto":
+            if on_raspberry_pi():
+                try:
+                    import RPi.GPIO  # noqa: F401
+                except (ImportError, RuntimeError) as exc:
+                    raise RuntimeError(
+                        f"Raspberry Pi détecté mais RPi.GPIO inutilisable ({exc!r}) : "
+                        "réparer l'installation, ou PHYTO_HAL=sim pour simuler"
+                    ) from exc
+                wanted = "rpi"
+            else:
+                wanted = "sim"
+                warning("Machine autre qu'un Raspberry Pi → matériel SIMULÉ (PHYTO_HAL=sim)")
+        _backend = wanted
+        info(f"HAL : backend « {_backend} »")
+    return _backend
+
+
+def is_simulated() -> bool:
+    return backend_name() == "sim"
+
+
+def simulator() -> "SimHardware":
+    """Banc simulé partagé (environnement, bus, GPIO, w1) — backend sim seulement."""
+    global _sim
+    if backend_name() != "sim":
+        raise RuntimeError("simulateur indisponible : backend « rpi » actif")
+    if _sim is None:
+        from hal.sim.hardware import SimHardware
+        _sim = SimHardware.from_env()
+    return _sim
+
+
+def use_simulator(sim: "SimHardware") -> None:
+    """Installe un banc simulé précis (rejeu, bancs de mesure)."""
+    global _sim
+    reset("sim")
+    _sim = sim
+
+
+def reset(backend: Optional[str] = None) -> None:
+    """Oublie le backend résolu (outils / bancs de test) ; force *backend* si donné."""
+    global _backend, _sim
+    if _sim is not None:
+        _sim.close()
+    _backend, _sim = backend, None
+    _shared_buses.clear()
+    GPIO.__dict__.clear()
+
+
+# ──────────────────────────────────────────────────────────────
+#  GPIO
+# ──────────────────────────────────────────────────────────────
+_GPIO_WRITES = counter("phyto_gpio_writes_total", "Écritures GPIO.output", ("pin",))
+_GPIO_ERRORS = counter("phyto_gpio_write_errors_total", "Écritures GPIO.output en erreur", ("pin",))
+
+
+def _metered_output(output):
+    def metered(channel, state):
+        pins = tuple(channel) if isinstance(channel, (list, tuple)) else (channel,)
+        try:
+            output(channel, state)
+        except Exception:
+            for pin in pins:
+                _GPIO_ERRORS.labels(pin).inc()
+            raise
+        for pin in pins:
+            _GPIO_WRITES.labels(pin).inc()
+    return metered
+
+
+class _LazyGPIO:
+    """
+    Proxy du module RPi.GPIO : le backend est résolu au premier attribut
+    demandé, puis chaque attribut est mis en cache sur l'instance.
+    """
+
+    def __getattr__(self, name: str):
+        if backend_name() == "rpi":
+            import RPi.GPIO as impl
+        else:
+            impl = simulator().gpio
+        value = getattr(impl, name)
+        if name == "output":
+            value = _metered_output(value)
+        self.__dict__[name] = value
+        return value
+
+
+GPIO = _LazyGPIO()
+
+
+# ──────────────────────────────────────────────────────────────
+#  I²C / 1-Wire
+# ──────────────────────────────────────────────────────────────
+_I2C_SECONDS = histogram("phyto_i2c_transaction_seconds", "Durée des transactions I²C", ("op",))
+_I2C_BYTES = counter("phyto_i2c_bytes_total", "Octets de données transférés sur I²C", ("op",))
+_I2C_ERRORS = counter("phyto_i2c_errors_total", "Transactions I²C en erreur (NACK, timeout…)", ("op",))
+
+
+class MeteredI2C:
+    """
+    Enveloppe smbus2 : les transactions utilisées par les drivers sont
+    chronométrées ; tout autre attribut est délégué tel quel.
+    """
+
+    def __init__(self, bus):
+        self._bus = bus
+        self._read = (_I2C_SECONDS.labels("read"), _I2C_BYTES.labels("read"), _I2C_ERRORS.labels("read"))
+        self._write = (_I2C_SECONDS.labels("write"), _I2C_BYTES.labels("write"), _I2C_ERRORS.labels("write"))
+
+    def _call(self, meters, nbytes: int, fn, *args):
+        seconds, nbytes_total, errors = meters
+        t0 = time.perf_counter()
+        try:
+            result = fn(*args)
+        except OSError:
+            errors.inc()
+            raise
+        finally:
+            seconds.observe(time.perf_counter() - t0)
+        nbytes_total.inc(nbytes)
+        return result
+
+    def read_i2c_block_data(self, addr, register, length, *args):
+        return self._call(self._read, length, self._bus.read_i2c_block_data, addr, register, length, *args)
+
+    def write_i2c_block_data(self, addr, register, data, *args):
+        return self._call(self._write, len(data), self._bus.write_i2c_block_data, addr, register, data, *args)
+
+    def read_byte_data(self, addr, register, *args):
+        return self._call(self._read, 1, self._bus.read_byte_data, addr, register, *args)
+
+    def write_byte_data(self, addr, register, value, *args):
+        return self._call(self._write, 1, self._bus.write_byte_data, addr, register, value, *args)
+
+    def read_word_data(self, addr, register, *args):
+        return self._call(self._read, 2, self._bus.read_word_data, addr, register, *args)
+
+    def write_word_data(self, addr, register, value, *args):
+        return self._call(self._write, 2, self._bus.write_word_data, addr, register, value, *args)
+
+    def read_byte(self, addr, *args):
+        return self._call(self._read, 1, self._bus.read_byte, addr, *args)
+
+    def write_byte(self, addr, value, *args):
+        return self._call(self._write, 1, self._bus.write_byte, addr, value, *args)
+
+    def __getattr__(self, name: str):
+        return getattr(self._bus, name)
+
+
+def open_i2c(bus: int = 1) -> MeteredI2C:
+    """Bus I²C compatible smbus2 (read/write_i2c_block_data, close…)."""
+    if backend_name() == "rpi":
+        import smbus2
+        return MeteredI2C(smbus2.SMBus(bus))
+    return MeteredI2C(simulator().i2c(bus))
+
+
+def i2c_view(bus: int = 1, mux: Optional[int] = None, channel: Optional[int] = None) -> "I2CView":
+    """
+    Accès à *bus* (direct) ou au canal *channel* du TCA9548A *mux* : tous
+    les drivers d'un même bus partagent un seul objet smbus2 et son verrou.
+    """
+    from hal.i2c_mux import I2CView, SharedBus
+    with _shared_lock:
+        shared = _shared_buses.get(bus)
+        if shared is None:
+            shared = _shared_buses[bus] = SharedBus(bus, open_i2c(bus))
+    return I2CView(shared, mux, channel)
+
+
+def i2c_address(device: str, default: int) -> int:
+    """
+    Adresse d'un périphérique. Sur le Pi : *default* ; en simulation :
+    l'adresse du plan de bus simulé (ex. VL53L0X ré-adressé pour
+    cohabiter avec le TSL2591 sur 0x29).
+    """
+    if backend_name() == "rpi":
+        return default
+    return simulator().address_of(device, default)
+
+
+def w1_root() -> str:
+    """Racine de l'arbre sysfs 1-Wire (réel ou simulé)."""
+    if backend_name() == "rpi":
+        return W1_SYSFS_ROOT
+    return simulator().w1.root
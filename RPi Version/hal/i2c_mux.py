@@ -0,0 +1,114 @@
+# hal/i2c_mux.py
+# Author : Progradius
+# License: AGPL-3.0
+# -------------------------------------------------------------
+#  Bus I²C partagés et multiplexeurs TCA9548A
+# -------------------------------------------------------------
+"""
+Un bus physique = un seul objet smbus2 partagé par tous les drivers, un
+verrou, et la liste des multiplexeurs TCA9548A qui y sont câblés.
+
+‣ ``I2CView(bus, mux, channel)`` : vue compatible smbus2 d'un point de
+  l'arbre (bus direct si ``mux`` est None). Avant chaque transaction, sous
+  le verrou du bus, le routage est ajusté : canal voulu ouvert sur SON
+  multiplexeur, tous les autres multiplexeurs du bus fermés (deux capteurs
+  de même adresse derrière deux muxes ne doivent jamais se voir).
+‣ L'état de chaque multiplexeur est mémorisé : une transaction sur le
+  canal déjà ouvert ne coûte aucune écriture. Lire les capteurs groupés par
+  canal (SensorController.read_all) réduit donc les commutations au
+  minimum, compté dans ``phyto_i2c_mux_switches_total``.
+‣ Échec d'écriture vers un multiplexeur → état « inconnu », réécrit à la
+  transaction suivante.
+"""
+
+from __future__ import annotations
+
+import threading
+from typing import Dict, Optional
+
+from utils.metrics import counter
+
+TCA9548A_CHANNELS = 8
+_UNKNOWN = -1                                   # état du mux à (ré)écrire
+
+_SWITCHES = counter("phyto_i2c_mux_switches_total", "Écritures de routage vers un TCA9548A", ("bus",))
+
+
+class SharedBus:
+
+    def __init__(self, number: int, raw):
+        self.number = number
+        self.raw = raw                          # MeteredI2C
+        self.lock = threading.RLock()
+        self.muxes: Dict[int, Optional[int]] = {}      # adresse → canal ouvert (None = fermé)
+        self._switches = _SWITCHES.labels(number)
+
+    def add_mux(self, address: int) -> None:
+        with self.lock:
+            self.muxes.setdefault(address, _UNKNOWN)
+
+    def route(self, mux: Optional[int], channel: Optional[int]) -> None:
+        """À appeler sous ``lock`` : ouvre *channel* sur *mux*, ferme les autres."""
+        for addr, current in self.muxes.items():
+            wanted = channel if addr == mux else None
+            if current == wanted:
+                continue
+            self.muxes[addr] = _UNKNOWN
+            self.raw.write_byte(addr, 0 if wanted is None else 1 << wanted)
+            self.muxes[addr] = wanted
+            self._switches.inc()
+
+
+class I2CView:
+    """Vue smbus2 d'un (bus, mux, canal) ; ``close`` ne ferme pas le bus partagé."""
+
+    def __init__(self, bus: SharedBus, mux: Optional[int] = None, channel: Optional[int] = None):
+        if mux is not None:
+            if channel is None or not 0 <= channel < TCA9548A_CHANNELS:
+                raise ValueError(f"canal TCA9548A invalide : {channel}")
+            bus.add_mux(mux)
+        self.bus = bus
+        self.mux = mux
+        self.channel = channel
+
+    @property
+    def path(self) -> str:
+        if self.mux is None:
+            return f"i2c-{self.bus.number}"
+        return f"i2c-{self.bus.number}/0x{self.mux:02X}.{self.channel}"
+
+    def _call(self, name: str, *args):
+        bus = self.bus
+        with bus.lock:
+            bus.route(self.mux, self.channel)
+            return getattr(bus.raw, name)(*args)
+
+    def read_i2c_block_data(self, *args):
+        return self._call("read_i2c_block_data", *args)
+
+    def write_i2c_block_data(self, *args):
+        return self._call("write_i2c_block_data", *args)
+
+    def read_byte_data(self, *args):
+        return self._call("read_byte_data", *args)
+
+    def write_byte_data(self, *args):
+        return self._call("write_byte_data", *args)
+
+    def read_word_data(self, *args):
+        return self._call("read_word_data", *args)
+
+    def write_word_data(self, *args):
+        return self._call("write_word_data", *args)
+
+    def read_byte(self, *args):
+        return self._call("read_byte", *args)
+
+    def write_byte(self, *args):
+        return self._call("write_byte", *args)
+
+    def close(self) -> None:
+        pass
+
+    def __getattr__(self, name: str):
+        return getattr(self.bus.raw, name)
@@ -0,0 +1,321 @@
+# hal/sim/devices.py
+# Author : Progradius
+# License: AGPL-3.0
+"""
+Capteurs simulés au niveau REGISTRE : les vrais drivers de lib/sensors
+lisent et écrivent exactement les mêmes registres que sur le Pi, et
+retrouvent en sortie de leur compensation les grandeurs de ``SimEnvironment``.
+
+‣ BME280   : calibration choisie pour inverser la compensation flottante
+             (T3 = 0, P2..P9 = 0, H1/H3..H6 = 0) → relation linéaire.
+‣ TSL2591  : comptes CH0/CH1 recalculés selon gain / temps d'intégration.
+‣ VEML6075 : registres 16 bits LSB/MSB, ID 0x26, UVCOMP = 0.
+‣ MLX90614 : mots 16 bits, 0.02 K/LSB.
+‣ VL53L0X  : machine d'états minimale (SPAD ready, VHV, single-shot).
+‣ SHT31    : commande de mesure 0x2C06 → 6 octets T/CRC, H/CRC.
+‣ TCA9548A : multiplexeur 8 voies (octet de contrôle = masque des canaux).
+‣ HC-SR04  : au niveau GPIO (impulsion ECHO datée sur le front TRIG).
+"""
+
+from __future__ import annotations
+
+import random
+import threading
+import time
+from dataclasses import dataclass, field, fields
+from typing import Callable, List
+
+
+# ──────────────────────────────────────────────────────────────
+#  Environnement physique partagé
+# ──────────────────────────────────────────────────────────────
+@dataclass
+class SimEnvironment:
+    """Grandeurs « vraies » vues par tous les capteurs simulés."""
+    temperature: float = 24.0        # °C air
+    humidity: float = 55.0           # %RH
+    pressure: float = 1013.25        # hPa
+    lux: float = 12_000.0
+    ir_ratio: float = 0.25           # IR / pleine bande (TSL2591)
+    uva: float = 180.0               # comptes UVA calibrés
+    uvb: float = 90.0                # comptes UVB calibrés
+    object_temp: float = 22.0        # °C surface (MLX)
+    distance_mm: int = 420           # VL53L0X / HC-SR04
+    water_temp: float = 19.5         # °C (DS18B#3)
+    noise: float = 0.0               # écart-type relatif (0 = déterministe)
+    seed: int = 0
+    _listeners: List[Callable[["SimEnvironment"], None]] = field(
+        default_factory=list, repr=False, compare=False)
+
+    def __post_init__(self):
+        self._rng = random.Random(self.seed)
+        self._lock = threading.Lock()
+
+    def set(self, **values) -> None:
+        """Met à jour des grandeurs et notifie les abonnés (arbre w1, …)."""
+        known = {f.name for f in fields(self) if not f.name.startswith("_")}
+        for key, val in values.items():
+            if key not in known:
+                raise AttributeError(f"grandeur inconnue : {key}")
+            setattr(self, key, val)
+        for cb in list(self._listeners):
+            cb(self)
+
+    def subscribe(self, callback: Callable[["SimEnvironment"], None]) -> None:
+        self._listeners.append(callback)
+
+    def sample(self, name: str) -> float:
+        """Valeur bruitée (graine fixe → suite reproductible)."""
+        val = getattr(self, name)
+        if not self.noise:
+            return val
+        with self._lock:
+            return val * (1.0 + self._rng.gauss(0.0, self.noise))
+
+
+# ──────────────────────────────────────────────────────────────
+#  Base : banc de registres 8 bits
+# ──────────────────────────────────────────────────────────────
+class RegisterDevice:
+
+    def __init__(self, env: SimEnvironment):
+        self.env = env
+        self.regs = bytearray(256)
+
+    def read(self, register: int, length: int) -> bytes:
+        self.on_read(register, length)
+        end = register + length
+        if end <= 256:
+            return bytes(self.regs[register:end])
+        return bytes(self.regs[register:]) + bytes(self.regs[:end - 256])
+
+    def write(self, register: int, data: bytes) -> None:
+        for i, b in enumerate(data):
+            self.regs[(register + i) & 0xFF] = b
+        self.on_write(register, data)
+
+    # crochets
+    def on_read(self, register: int, length: int) -> None:
+        pass
+
+    def on_write(self, register: int, data: bytes) -> None:
+        pass
+
+
+# ──────────────────────────────────────────────────────────────
+#  BME280 (0x76)
+# ──────────────────────────────────────────────────────────────
+class SimBME280(RegisterDevice):
+    T1, T2 = 27504, 26435
+    P1 = 36477
+    H2 = 362
+
+    def __init__(self, env: SimEnvironment):
+        super().__init__(env)
+        self.regs[0xD0] = 0x60                                   # chip id
+        calib = bytearray(26)
+        calib[0:2] = self.T1.to_bytes(2, "little")
+        calib[2:4] = self.T2.to_bytes(2, "little", signed=True)
+        calib[6:8] = self.P1.to_bytes(2, "little")
+        self.regs[0x88:0x88 + 26] = calib
+        self.regs[0xE1:0xE3] = self.H2.to_bytes(2, "little", signed=True)
+
+    def on_read(self, register: int, length: int) -> None:
+        if register == 0xF7:                                     # burst T/P/H
+            self._latch()
+
+    def _latch(self) -> None:
+        t = self.env.sample("temperature")
+        adc_t = int(round((t * 5120.0 / self.T2 + self.T1 / 1024.0) * 16384.0))
+        adc_p = int(round(1048576.0 - self.env.sample("pressure") * 100.0 * self.P1 / 6250.0))
+        adc_h = int(round(max(0.0, min(self.env.sample("humidity"), 100.0)) * 65536.0 / self.H2))
+        adc_t, adc_p = max(0, min(adc_t, 0xFFFFF)), max(0, min(adc_p, 0xFFFFF))
+        self.regs[0xF7:0xFA] = bytes((adc_p >> 12, (adc_p >> 4) & 0xFF, (adc_p & 0x0F) << 4))
+        self.regs[0xFA:0xFD] = bytes((adc_t >> 12, (adc_t >> 4) & 0xFF, (adc_t & 0x0F) << 4))
+        self.regs[0xFD:0xFF] = bytes((adc_h >> 8, adc_h & 0xFF))
+
+
+# ──────────────────────────────────────────────────────────────
+#  TSL2591 (0x29) — registre = commande & 0x1F
+# ──────────────────────────────────────────────────────────────
+class SimTSL2591(RegisterDevice):
+    _ATIME = {0: 100.0, 1: 200.0, 2: 300.0, 3: 400.0, 4: 500.0, 5: 600.0}
+    _AGAIN = {0x00: 1.0, 0x10: 25.0, 0x20: 428.0, 0x30: 9876.0}
+
+    def __init__(self, env: SimEnvironment):
+        super().__init__(env)
+        self.regs[0x12] = 0x50                                   # device id
+
+    def read(self, register: int, length: int) -> bytes:
+        return super().read(register & 0x1F, length)
+
+    def write(self, register: int, data: bytes) -> None:
+        super().write(register & 0x1F, data)
+
+    def on_read(self, register: int, length: int) -> None:
+        if register in (0x14, 0x16):
+            ctrl = self.regs[0x01]
+            cpl = self._ATIME.get(ctrl & 0x07, 100.0) * self._AGAIN.get(ctrl & 0x30, 1.0) / 408.0
+            # lux = (full - 1.64·ir) / cpl avec ir = k·full  →  full = lux·cpl / (1 - 1.64·k)
+            k = self.env.ir_ratio
+            full = self.env.sample("lux") * cpl / max(1e-6, 1.0 - 1.64 * k)
+            full = max(0, min(int(full), 0xFFFF))
+            ir = max(0, min(int(full * k), 0xFFFF))
+            self.regs[0x14:0x16] = full.to_bytes(2, "little")
+            self.regs[0x16:0x18] = ir.to_bytes(2, "little")
+
+
+# ──────────────────────────────────────────────────────────────
+#  VEML6075 (0x10) — registres 16 bits
+# ──────────────────────────────────────────────────────────────
+class SimVEML6075(RegisterDevice):
+
+    def __init__(self, env: SimEnvironment):
+        super().__init__(env)
+        self._words = {0x0C: 0x0026}
+
+    def read(self, register: int, length: int) -> bytes:
+        if register == 0x07:
+            self._words[0x07] = max(0, min(int(self.env.sample("uva")), 0xFFFF))
+        elif register == 0x09:
+            self._words[0x09] = max(0, min(int(self.env.sample("uvb")), 0xFFFF))
+        word = self._words.get(register, 0)
+        return bytes((word & 0xFF, word >> 8))[:length]
+
+    def write(self, register: int, data: bytes) -> None:
+        lsb = data[0] if data else 0
+        msb = data[1] if len(data) > 1 else 0
+        self._words[register] = lsb | (msb << 8)
+
+
+# ──────────────────────────────────────────────────────────────
+#  MLX90614 (0x5A) — RAM/EEPROM en mots 16 bits
+# ──────────────────────────────────────────────────────────────
+class SimMLX90614(RegisterDevice):
+
+    def __init__(self, env: SimEnvironment, dual_zone: bool = False):
+        super().__init__(env)
+        self._words = {0x25: 0x9FB4 | (0x40 if dual_zone else 0)}
+
+    @staticmethod
+    def _kelvin(celsius: float) -> int:
+        return max(0, min(int(round((celsius + 273.15) / 0.02)), 0x7FFF))
+
+    def read(self, register: int, length: int) -> bytes:
+        if register == 0x06:
+            word = self._kelvin(self.env.sample("temperature"))
+        elif register in (0x07, 0x08):
+            word = self._kelvin(self.env.sample("object_temp"))
+        else:
+            word = self._words.get(register, 0)
+        return bytes((word & 0xFF, word >> 8))[:length]
+
+
+# ──────────────────────────────────────────────────────────────
+#  VL53L0X (0x29 sur le Pi ; ré-adressé en simulation)
+# ──────────────────────────────────────────────────────────────
+class SimVL53L0X(RegisterDevice):
+    _SYSRANGE_START = 0x00
+    _INTERRUPT_STATUS = 0x13
+    _RANGE_MM = 0x1E
+
+    def __init__(self, env: SimEnvironment):
+        super().__init__(env)
+        self.regs[0xC0] = 0xEE                                   # model id
+        self.regs[0x91] = 0x3C                                   # stop variable
+        self.regs[0x92] = 0x80 | 0x05                            # SPAD : aperture, 5
+        self.regs[0xB0:0xB6] = b"\xff" * 6
+        self.regs[0xF8:0xFA] = (0x0064).to_bytes(2, "big")     # osc calibrate
+
+    def read(self, register: int, length: int) -> bytes:
+        if register == 0x83:
+            self.regs[0x83] |= 0x01                              # SPAD info prête
+        elif register == self._INTERRUPT_STATUS:
+            self.regs[self._INTERRUPT_STATUS] = 0x07             # mesure prête
+        elif register == self._SYSRANGE_START:
+            self.regs[self._SYSRANGE_START] &= ~0x01 & 0xFF      # démarrage acquitté
+        return super().read(register, length)
+
+    def on_write(self, register: int, data: bytes) -> None:
+        if register == self._SYSRANGE_START and data and data[0] & 0x03:
+            mm = max(0, min(int(self.env.sample("distance_mm")), 8190))
+            self.regs[self._RANGE_MM:self._RANGE_MM + 2] = mm.to_bytes(2, "big")
+
+
+# ──────────────────────────────────────────────────────────────
+#  SHT31 (0x44) — greffon sensor_handlers/SHT31Handler.py
+# ──────────────────────────────────────────────────────────────
+class SimSHT31(RegisterDevice):
+
+    def on_write(self, register: int, data: bytes) -> None:
+        if register == 0x2C:                                     # mesure single shot
+            from lib.sensors.SHT31 import crc8
+            raw_t = int(round((self.env.sample("temperature") + 45.0) * 65535.0 / 175.0))
+            raw_h = int(round(max(0.0, min(self.env.sample("humidity"), 100.0)) * 65535.0 / 100.0))
+            out = bytearray()
+            for raw in (max(0, min(raw_t, 0xFFFF)), raw_h):
+                word = bytes((raw >> 8, raw & 0xFF))
+                out += word + bytes((crc8(word),))
+            self.regs[0:6] = out
+
+
+# ──────────────────────────────────────────────────────────────
+#  TCA9548A : un octet de contrôle, un bit par canal ouvert
+# ──────────────────────────────────────────────────────────────
+class SimTCA9548A:
+
+    def __init__(self):
+        self.control = 0
+        self.channels: List[dict] = [{} for _ in range(8)]       # canal → {adresse: périphérique}
+        self.writes = 0
+
+    def attach(self, channel: int, address: int, device) -> None:
+        self.channels[channel][address] = device
+
+    def detach(self, channel: int, address: int) -> None:
+        self.channels[channel].pop(address, None)
+
+    def write_byte(self, value: int) -> None:
+        self.control = value & 0xFF
+        self.writes += 1
+
+    def read_byte(self) -> int:
+        return self.control
+
+    def routed(self, address: int):
+        """Périphérique vu à *address* sur les canaux ouverts (le 1er s'il y a conflit)."""
+        for ch in range(8):
+            if self.control & (1 << ch):
+                dev = self.channels[ch].get(address)
+                if dev is not None:
+                    return dev
+        return None
+
+
+# ──────────────────────────────────────────────────────────────
+#  HC-SR04 (GPIO) : ECHO haut pendant l'aller-retour du son
+# ──────────────────────────────────────────────────────────────
+class SimHCSR04:
+    SOUND_CM_S = 34300.0
+
+    def __init__(self, env: SimEnvironment, gpio, trigger_pin: int, echo_pin: int):
+        self.env = env
+        self._t_trig = None
+        gpio.watch(trigger_pin, self._on_trigger)
+        gpio.attach(echo_pin, self._echo)
+
+    def _on_trigger(self, pin: int, level: int) -> None:
+        if level == 0:                                           # front descendant
+            self._t_trig = time.perf_counter()
+
+    def _echo(self) -> int:
+        if self._t_trig is None:
+            return 0
+        start = self._t_trig + 0.0002
+        width = (self.env.sample("distance_mm") / 10.0) * 2 / self.SOUND_CM_S
+        now = time.perf_counter()
+        if start <= now < start + width:
+            return 1
+        if now >= start + width:
+            self._t_trig = None
+        return 0
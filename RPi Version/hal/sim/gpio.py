@@ -0,0 +1,170 @@
+# hal/sim/gpio.py
+# Author : Progradius
+# License: AGPL-3.0
+"""
+GPIO simulé, compatible avec l'API de RPi.GPIO utilisée par le projet.
+
+‣ Mêmes constantes et mêmes erreurs que RPi.GPIO (mode non défini,
+  sortie non configurée…) pour que le code appelant suive les mêmes chemins.
+‣ ``latency_s`` : coût artificiel de chaque setup/output/input.
+‣ ``inject(pin, fault, count)`` : pannes à la demande
+    "stuck_high" / "stuck_low" → la broche ignore les écritures
+    "error"                    → RuntimeError sur le prochain accès
+‣ ``watch(pin, cb)`` : notifié à chaque écriture (modèles physiques,
+  HC-SR04) ; ``attach(pin, source)`` : niveau d'entrée piloté par un device.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+Channels = Union[int, Iterable[int]]
+
+
+class SimGPIO:
+    # constantes RPi.GPIO
+    BOARD, BCM = 10, 11
+    OUT, IN = 0, 1
+    LOW, HIGH = 0, 1
+    PUD_OFF, PUD_DOWN, PUD_UP = 20, 21, 22
+    RISING, FALLING, BOTH = 31, 32, 33
+    RPI_INFO = {"TYPE": "Simulated", "P1_REVISION": 3}
+    VERSION = "sim"
+
+    def __init__(self, latency_s: float = 0.0, history: int = 10_000):
+        self.latency_s = latency_s
+        self._mode: Optional[int] = None
+        self._dir: Dict[int, int] = {}
+        self._level: Dict[int, int] = {}
+        self._faults: Dict[int, Tuple[str, Optional[int]]] = {}
+        self._sources: Dict[int, Callable[[], int]] = {}
+        self._watchers: Dict[int, List[Callable[[int, int], None]]] = {}
+        self._lock = threading.RLock()
+        self.writes = 0
+        self.history: deque = deque(maxlen=history)     # (perf_counter, pin, niveau)
+
+    # ──────────────────────────────────────────────────────────
+    #  API RPi.GPIO
+    # ──────────────────────────────────────────────────────────
+    def setwarnings(self, flag: bool) -> None:
+        pass
+
+    def setmode(self, mode: int) -> None:
+        if self._mode is not None and mode != self._mode:
+            raise ValueError("A different mode has already been set!")
+        self._mode = mode
+
+    def getmode(self) -> Optional[int]:
+        return self._mode
+
+    def setup(self, channel: Channels, direction: int, pull_up_down: int = PUD_OFF,
+              initial: Optional[int] = None) -> None:
+        for pin in self._channels(channel):
+            self._check_mode()
+            self._delay()
+            with self._lock:
+                self._dir[pin] = direction
+                if direction == self.OUT:
+                    self._set(pin, self.LOW if initial is None else int(bool(initial)))
+                else:
+                    self._level.setdefault(pin, 1 if pull_up_down == self.PUD_UP else 0)
+
+    def output(self, channel: Channels, value) -> None:
+        pins = self._channels(channel)
+        values = list(value) if isinstance(value, (list, tuple)) else [value] * len(pins)
+        for pin, val in zip(pins, values):
+            self._check_mode()
+            self._fault(pin)
+            if self._dir.get(pin) != self.OUT:
+                raise RuntimeError("The GPIO channel has not been set up as an OUTPUT")
+            self._delay()
+            self._set(pin, int(bool(val)))
+
+    def input(self, channel: int) -> int:
+        self._check_mode()
+        self._fault(channel)
+        if channel not in self._dir:
+            raise RuntimeError("You must setup() the GPIO channel first")
+        self._delay()
+        source = self._sources.get(channel)
+        if source is not None and self._dir[channel] == self.IN:
+            return int(bool(source()))
+        return self._level.get(channel, 0)
+
+    def cleanup(self, channel: Optional[Channels] = None) -> None:
+        with self._lock:
+            if channel is None:
+                self._dir.clear()
+                self._mode = None
+            else:
+                for pin in self._channels(channel):
+                    self._dir.pop(pin, None)
+
+    # ──────────────────────────────────────────────────────────
+    #  Extensions simulation
+    # ──────────────────────────────────────────────────────────
+    def inject(self, pin: int, fault: str, count: Optional[int] = None) -> None:
+        """Panne sur *pin* ; *count* accès concernés (None = permanente)."""
+        if fault not in ("stuck_high", "stuck_low", "error"):
+            raise ValueError(f"panne GPIO inconnue : {fault}")
+        self._faults[pin] = (fault, count)
+
+    def clear_faults(self) -> None:
+        self._faults.clear()
+
+    def attach(self, pin: int, source: Callable[[], int]) -> None:
+        """Le niveau lu sur l'entrée *pin* est fourni par *source()*."""
+        self._sources[pin] = source
+
+    def watch(self, pin: int, callback: Callable[[int, int], None]) -> None:
+        """*callback(pin, niveau)* à chaque écriture effective sur *pin*."""
+        self._watchers.setdefault(pin, []).append(callback)
+
+    def level(self, pin: int) -> int:
+        """Niveau courant sans contrôle de mode (bancs de test, modèles)."""
+        return self._level.get(pin, 0)
+
+    # ──────────────────────────────────────────────────────────
+    def _set(self, pin: int, level: int) -> None:
+        fault = self._faults.get(pin)
+        if fault and fault[0] in ("stuck_high", "stuck_low"):
+            self._consume(pin)
+            level = 1 if fault[0] == "stuck_high" else 0
+        with self._lock:
+            self._level[pin] = level
+            self.writes += 1
+            self.history.append((time.perf_counter(), pin, level))
+        for cb in self._watchers.get(pin, ()):
+            cb(pin, level)
+
+    def _fault(self, pin: int) -> None:
+        fault = self._faults.get(pin)
+        if fault and fault[0] == "error":
+            self._consume(pin)
+            raise RuntimeError(f"GPIO {pin} : erreur injectée")
+
+    def _consume(self, pin: int) -> None:
+        kind, count = self._faults[pin]
+        if count is None:
+            return
+        if count <= 1:
+            del self._faults[pin]
+        else:
+            self._faults[pin] = (kind, count - 1)
+
+    def _check_mode(self) -> None:
+        if self._mode is None:
+            raise RuntimeError(
+                "Please set pin numbering mode using GPIO.setmode(GPIO.BOARD) or GPIO.setmode(GPIO.BCM)"
+            )
+
+    def _delay(self) -> None:
+        if self.latency_s:
+            time.sleep(self.latency_s)
+
+    @staticmethod
+    def _channels(channel: Channels) -> List[int]:
+        return [channel] if isinstance(channel, int) else list(channel)
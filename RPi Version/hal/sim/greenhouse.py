@@ -0,0 +1,128 @@
+# hal/sim/greenhouse.py
+# Author : Progradius
+# License: AGPL-3.0
+"""
+Modèle thermique de serre (premier ordre) branché sur le GPIO simulé.
+
+    dT/dt = (T_ext − T) / τ                        pertes par l'enveloppe
+          + heater · P_chauffage                   relais actif BAS
+          + lampe  · P_lampe                       DailyTimer #1, actif BAS
+          − k_ventil[vitesse] · (T − T_ext)        moteur 4 vitesses, actif HAUT
+
+T_ext suit une sinusoïde journalière (minimum vers 3 h, maximum vers 15 h).
+
+Humidité : bilan de vapeur d'eau (g/m³), transpiration plus forte lampe
+allumée, fuites de l'enveloppe et ventilation tirant vers l'air extérieur
+(``outside_rh`` à T_ext) ; l'HR vient de la température courante.
+
+    dW/dt = transpiration − (W − W_ext)·(1/τ + k_ventil[vitesse])
+
+Température et HR sont poussées dans ``SimEnvironment`` : BME280,
+MLX90614 et sondes w1 les mesurent comme sur la vraie serre. Énergie
+consommée par le chauffage et l'extraction cumulée dans ``energy_wh``.
+"""
+
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import List, Optional, Sequence
+
+from hal.sim.devices import SimEnvironment
+from hal.sim.gpio import SimGPIO
+
+
+@dataclass
+class GreenhouseParams:
+    outside_mean: float = 16.0           # °C
+    outside_amplitude: float = 6.0       # °C (demi-amplitude jour/nuit)
+    tau_s: float = 3600.0                # constante de temps de l'enveloppe
+    heater_c_per_h: float = 8.0          # gain du chauffage (°C/h)
+    lamp_c_per_h: float = 3.0            # gain des lampes (°C/h)
+    # renouvellement d'air par vitesse (1/s) : 0 = moteur à l'arrêt
+    fan_rate: Sequence[float] = field(default_factory=lambda: (0.0, 1 / 1800, 1 / 900, 1 / 600, 1 / 400))
+    outside_rh: float = 70.0             # %RH
+    transpiration_day: float = 8.0       # g/m³/h, lampe allumée
+    transpiration_night: float = 1.0     # g/m³/h
+    heater_w: float = 1500.0
+    fan_w: Sequence[float] = field(default_factory=lambda: (0.0, 25.0, 45.0, 70.0, 110.0))
+
+
+def saturation_density(t: float) -> float:
+    """Vapeur d'eau à saturation, g/m³ (Magnus)."""
+    return 2166.8 * 0.6112 * math.exp(17.62 * t / (243.12 + t)) / (t + 273.15)
+
+
+class GreenhouseModel:
+
+    def __init__(
+        self,
+        env: SimEnvironment,
+        gpio: SimGPIO,
+        *,
+        heater_pin: int,
+        motor_pins: List[int],
+        lamp_pin: Optional[int] = None,
+        params: Optional[GreenhouseParams] = None,
+    ):
+        self.env = env
+        self.gpio = gpio
+        self.heater_pin = heater_pin
+        self.motor_pins = list(motor_pins)
+        self.lamp_pin = lamp_pin
+        self.p = params or GreenhouseParams()
+        self.temperature = env.temperature
+        self.vapour = saturation_density(env.temperature) * env.humidity / 100.0
+        self.energy_wh = {"heater": 0.0, "fan": 0.0}
+
+    # ──────────────────────────────────────────────────────────
+    def outside(self, now: datetime) -> float:
+        hour = now.hour + now.minute / 60.0
+        return self.p.outside_mean + self.p.outside_amplitude * math.sin(2 * math.pi * (hour - 9.0) / 24.0)
+
+    def heater_on(self) -> bool:
+        return self.gpio.level(self.heater_pin) == 0           # relais actif bas
+
+    def lamp_on(self) -> bool:
+        return self.lamp_pin is not None and self.gpio.level(self.lamp_pin) == 0
+
+    def fan_speed(self) -> int:
+        for speed, pin in enumerate(self.motor_pins, start=1):
+            if self.gpio.level(pin):                            # actif haut
+                return speed
+        return 0
+
+    @property
+    def humidity(self) -> float:
+        return min(100.0, 100.0 * self.vapour / saturation_density(self.temperature))
+
+    def step(self, dt: float, now: datetime) -> float:
+        """Intègre *dt* secondes (Euler explicite ; dt ≪ τ)."""
+        t_out = self.outside(now)
+        t = self.temperature
+        speed = self.fan_speed()
+        heater, lamp = self.heater_on(), self.lamp_on()
+        dT = (t_out - t) / self.p.tau_s
+        if heater:
+            dT += self.p.heater_c_per_h / 3600.0
+        if lamp:
+            dT += self.p.lamp_c_per_h / 3600.0
+        dT -= self.p.fan_rate[speed] * (t - t_out)
+        self.temperature = t + dT * dt
+
+        w_out = saturation_density(t_out) * self.p.outside_rh / 100.0
+        source = (self.p.transpiration_day if lamp else self.p.transpiration_night) / 3600.0
+        dW = source - (self.vapour - w_out) * (1.0 / self.p.tau_s + self.p.fan_rate[speed])
+        self.vapour = min(self.vapour + dW * dt, saturation_density(self.temperature))   # condensation
+
+        self.energy_wh["heater"] += self.p.heater_w * heater * dt / 3600.0
+        self.energy_wh["fan"] += self.p.fan_w[speed] * dt / 3600.0
+        self.env.set(temperature=round(self.temperature, 3), humidity=round(self.humidity, 2))
+        return self.temperature
+
+    async def run(self, clock, dt: float = 30.0) -> None:
+        """Tâche d'intégration, cadencée par l'horloge (réelle ou virtuelle)."""
+        while True:
+            self.step(dt, clock.now())
+            await clock.sleep(dt)
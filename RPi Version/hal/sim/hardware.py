@@ -0,0 +1,140 @@
+# hal/sim/hardware.py
+# Author : Progradius
+# License: AGPL-3.0
+"""
+Banc matériel simulé complet : un ``SimEnvironment``, le GPIO, le bus I²C 1
+peuplé des capteurs du projet et l'arbre w1.
+
+Variables d'environnement (lues par ``from_env``) :
+    PHYTO_SIM_GPIO_LATENCY_US   coût d'un accès GPIO          (défaut 0)
+    PHYTO_SIM_I2C_LATENCY_US    coût fixe d'une transaction   (défaut 0)
+    PHYTO_SIM_I2C_BYTE_US       coût par octet (100 kHz ≈ 90) (défaut 90)
+    PHYTO_SIM_NOISE             bruit relatif des mesures     (défaut 0)
+    PHYTO_SIM_SEED              graine du bruit               (défaut 0)
+"""
+
+from __future__ import annotations
+
+import os
+from typing import Dict, Optional
+
+from hal.sim.devices import (
+    SimEnvironment, SimBME280, SimTSL2591, SimVEML6075, SimMLX90614,
+    SimVL53L0X, SimHCSR04, SimTCA9548A,
+)
+from hal.sim.gpio import SimGPIO
+from hal.sim.i2c import SimI2CBus
+from hal.sim.w1 import SimW1Tree
+
+# Plan du bus I²C 1 simulé. Le VL53L0X est ré-adressé en 0x30 (comme sur
+# une carte où il cohabite avec le TSL2591, tous deux livrés en 0x29).
+DEFAULT_I2C_LAYOUT: Dict[str, int] = {
+    "bme280":   0x76,
+    "tsl2591":  0x29,
+    "veml6075": 0x10,
+    "mlx90614": 0x5A,
+    "vl53l0x":  0x30,
+}
+
+_DEVICE_CLASSES = {
+    "bme280":   SimBME280,
+    "tsl2591":  SimTSL2591,
+    "veml6075": SimVEML6075,
+    "mlx90614": SimMLX90614,
+    "vl53l0x":  SimVL53L0X,
+}
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+class SimHardware:
+
+    def __init__(
+        self,
+        env: Optional[SimEnvironment] = None,
+        *,
+        gpio_latency_s: float = 0.0,
+        i2c_latency_s: float = 0.0,
+        i2c_byte_time_s: float = 90e-6,
+        layout: Optional[Dict[str, int]] = None,
+        w1_probes: Optional[Dict[str, str]] = None,
+        hcsr_pins: Optional[tuple] = None,
+    ):
+        self.env = env or SimEnvironment()
+        self.gpio = SimGPIO(latency_s=gpio_latency_s)
+        self.layout = dict(DEFAULT_I2C_LAYOUT if layout is None else layout)
+        self._buses: Dict[int, SimI2CBus] = {}
+        self._i2c_opts = {"latency_s": i2c_latency_s, "byte_time_s": i2c_byte_time_s}
+
+        bus = self.i2c(1)
+        for name, addr in self.layout.items():
+            bus.attach(addr, _DEVICE_CLASSES[name](self.env))
+
+        self.w1 = SimW1Tree(self.env, w1_probes)
+        self.hcsr = None
+        if hcsr_pins:
+            self.wire_hcsr04(*hcsr_pins)
+
+    @classmethod
+    def from_env(cls) -> "SimHardware":
+        env = SimEnvironment(
+            noise=_env_float("PHYTO_SIM_NOISE", 0.0),
+            seed=int(_env_float("PHYTO_SIM_SEED", 0)),
+        )
+        return cls(
+            env,
+            gpio_latency_s=_env_float("PHYTO_SIM_GPIO_LATENCY_US", 0.0) / 1e6,
+            i2c_latency_s=_env_float("PHYTO_SIM_I2C_LATENCY_US", 0.0) / 1e6,
+            i2c_byte_time_s=_env_float("PHYTO_SIM_I2C_BYTE_US", 90.0) / 1e6,
+        )
+
+    # ──────────────────────────────────────────────────────────
+    def i2c(self, bus: int = 1) -> SimI2CBus:
+        """Bus partagé : tous les handlers voient les mêmes périphériques."""
+        if bus not in self._buses:
+            self._buses[bus] = SimI2CBus(bus, **self._i2c_opts)
+        return self._buses[bus]
+
+    def address_of(self, device: str, default: int) -> int:
+        return self.layout.get(device, default)
+
+    def mux(self, address: int, bus: int = 1) -> SimTCA9548A:
+        """TCA9548A sur *bus* à *address* (créé au premier appel)."""
+        i2c = self.i2c(bus)
+        dev = i2c.devices.get(address)
+        if not isinstance(dev, SimTCA9548A):
+            dev = SimTCA9548A()
+            i2c.attach(address, dev)
+        return dev
+
+    def wire_i2c(self, device: str, address: int, bus: int = 1,
+                 mux: Optional[int] = None, channel: Optional[int] = None, factory=None):
+        """
+        Capteur supplémentaire de l'arbre I²C (config Sensor_Tree). Une
+        adresse déjà occupée au même point de l'arbre n'est pas recâblée.
+        *factory(env)* : périphérique simulé d'un driver greffon.
+        """
+        make = factory or _DEVICE_CLASSES[device]
+        if mux is None:
+            i2c = self.i2c(bus)
+            if address not in i2c.devices:
+                i2c.attach(address, make(self.env))
+            return i2c.devices[address]
+        tca = self.mux(mux, bus)
+        if address not in tca.channels[channel]:
+            tca.attach(channel, address, make(self.env))
+        return tca.channels[channel][address]
+
+    def wire_hcsr04(self, trigger_pin: int, echo_pin: int) -> SimHCSR04:
+        """Relie un HC-SR04 simulé aux broches TRIG/ECHO (une seule fois)."""
+        if self.hcsr is None:
+            self.hcsr = SimHCSR04(self.env, self.gpio, trigger_pin, echo_pin)
+        return self.hcsr
+
+    def close(self) -> None:
+        self.w1.close()
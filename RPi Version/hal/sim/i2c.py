@@ -0,0 +1,140 @@
+# hal/sim/i2c.py
+# Author : Progradius
+# License: AGPL-3.0
+"""
+Bus I²C simulé, compatible smbus2 pour les appels utilisés par les drivers.
+
+‣ Un périphérique absent répond comme sur le Pi : ``OSError`` errno 121
+  (Remote I/O error).
+‣ Coût d'une transaction ≈ ``latency_s + nb_octets × byte_time_s``
+  (100 kHz ≈ 90 µs par octet, ACK compris) pour que les mesures de
+  performance hors Pi restent représentatives.
+‣ Un multiplexeur (SimTCA9548A) attaché au bus rend visibles les
+  périphériques de ses canaux ouverts.
+‣ ``inject(addr, fault, count)`` :
+    "nack"    → OSError 121
+    "timeout" → OSError 110 après ``timeout_s``
+    "corrupt" → octets lus inversés (CRC / valeurs aberrantes)
+"""
+
+from __future__ import annotations
+
+import errno
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+
+class SimI2CBus:
+
+    def __init__(self, bus: int = 1, *, latency_s: float = 0.0,
+                 byte_time_s: float = 0.0, timeout_s: float = 0.025):
+        self.bus = bus
+        self.latency_s = latency_s
+        self.byte_time_s = byte_time_s
+        self.timeout_s = timeout_s
+        self.devices: Dict[int, object] = {}
+        self._faults: Dict[int, Tuple[str, Optional[int]]] = {}
+        self._lock = threading.Lock()          # un seul maître sur le bus
+        self.transactions = 0
+        self.closed = False
+
+    # ──────────────────────────────────────────────────────────
+    #  Câblage
+    # ──────────────────────────────────────────────────────────
+    def attach(self, address: int, device) -> None:
+        self.devices[address] = device
+
+    def detach(self, address: int) -> None:
+        self.devices.pop(address, None)
+
+    def inject(self, address: int, fault: str, count: Optional[int] = None) -> None:
+        if fault not in ("nack", "timeout", "corrupt"):
+            raise ValueError(f"panne I²C inconnue : {fault}")
+        self._faults[address] = (fault, count)
+
+    def clear_faults(self) -> None:
+        self._faults.clear()
+
+    # ──────────────────────────────────────────────────────────
+    #  API smbus2
+    # ──────────────────────────────────────────────────────────
+    def read_i2c_block_data(self, i2c_addr: int, register: int, length: int, force=None) -> List[int]:
+        dev, corrupt = self._begin(i2c_addr, length + 2)
+        with self._lock:
+            data = list(dev.read(register & 0xFF, length))
+        return [b ^ 0xFF for b in data] if corrupt else data
+
+    def write_i2c_block_data(self, i2c_addr: int, register: int, data, force=None) -> None:
+        dev, _ = self._begin(i2c_addr, len(data) + 2)
+        with self._lock:
+            dev.write(register & 0xFF, bytes(data))
+
+    def read_byte_data(self, i2c_addr: int, register: int, force=None) -> int:
+        return self.read_i2c_block_data(i2c_addr, register, 1)[0]
+
+    def write_byte_data(self, i2c_addr: int, register: int, value: int, force=None) -> None:
+        self.write_i2c_block_data(i2c_addr, register, [value & 0xFF])
+
+    def read_word_data(self, i2c_addr: int, register: int, force=None) -> int:
+        lsb, msb = self.read_i2c_block_data(i2c_addr, register, 2)
+        return lsb | (msb << 8)
+
+    def write_word_data(self, i2c_addr: int, register: int, value: int, force=None) -> None:
+        self.write_i2c_block_data(i2c_addr, register, [value & 0xFF, (value >> 8) & 0xFF])
+
+    def read_byte(self, i2c_addr: int, force=None) -> int:
+        """Sonde d'adresse (équivalent i2cdetect -r)."""
+        dev, _ = self._begin(i2c_addr, 1)
+        return dev.read_byte() if hasattr(dev, "read_byte") else 0
+
+    def write_byte(self, i2c_addr: int, value: int, force=None) -> None:
+        dev, _ = self._begin(i2c_addr, 1)
+        if hasattr(dev, "write_byte"):
+            with self._lock:
+                dev.write_byte(value & 0xFF)
+
+    def close(self) -> None:
+        # bus partagé entre handlers : fermer ne le détruit pas
+        self.closed = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ──────────────────────────────────────────────────────────
+    def _begin(self, address: int, nbytes: int):
+        self.transactions += 1
+        cost = self.latency_s + nbytes * self.byte_time_s
+        if cost:
+            time.sleep(cost)
+
+        corrupt = False
+        fault = self._faults.get(address)
+        if fault:
+            kind, count = fault
+            if count is not None:
+                if count <= 1:
+                    del self._faults[address]
+                else:
+                    self._faults[address] = (kind, count - 1)
+            if kind == "nack":
+                raise OSError(errno.EREMOTEIO, os.strerror(errno.EREMOTEIO))
+            if kind == "timeout":
+                time.sleep(self.timeout_s)
+                raise OSError(errno.ETIMEDOUT, os.strerror(errno.ETIMEDOUT))
+            corrupt = kind == "corrupt"
+
+        dev = self.devices.get(address)
+        if dev is None:
+            for mux in list(self.devices.values()):
+                if hasattr(mux, "routed"):
+                    dev = mux.routed(address)
+                    if dev is not None:
+                        break
+        if dev is None:
+            raise OSError(errno.EREMOTEIO, os.strerror(errno.EREMOTEIO))
+        return dev, corrupt
@@ -0,0 +1,79 @@
+# hal/sim/w1.py
+# Author : Progradius
+# License: AGPL-3.0
+"""
+Arbre sysfs 1-Wire simulé : mêmes noms de dossiers (28-xxxxxxxxxxxx) et
+même format ``w1_slave`` que le module noyau w1_therm, dans un répertoire
+temporaire. Les fichiers sont réécrits à chaque changement de
+``SimEnvironment`` ; ``inject_crc_error`` produit une trame « NO ».
+"""
+
+from __future__ import annotations
+
+import os
+import shutil
+import tempfile
+from typing import Dict, List, Optional
+
+from hal.sim.devices import SimEnvironment
+
+
+class SimW1Tree:
+
+    def __init__(self, env: SimEnvironment, probes: Optional[Dict[str, str]] = None,
+                 root: Optional[str] = None):
+        """
+        probes : {id sysfs: grandeur de l'environnement}
+                 ex. {"28-000000000001": "temperature", …}
+        """
+        self.env = env
+        self._own_root = root is None
+        self.root = root or tempfile.mkdtemp(prefix="phyto-w1-")
+        self.probes = probes if probes is not None else {
+            "28-000000000001": "temperature",
+            "28-000000000002": "temperature",
+            "28-000000000003": "water_temp",
+        }
+        self._crc_errors: Dict[str, int] = {}
+        for dev in self.probes:
+            os.makedirs(os.path.join(self.root, dev), exist_ok=True)
+        self.sync(env)
+        env.subscribe(self.sync)
+
+    def devices(self) -> List[str]:
+        return sorted(self.probes)
+
+    def inject_crc_error(self, device: str, count: int = 1) -> None:
+        self._crc_errors[device] = count
+        self.sync(self.env)
+
+    def add_probe(self, device: str, quantity: str) -> None:
+        """Branchement à chaud d'une sonde."""
+        self.probes[device] = quantity
+        os.makedirs(os.path.join(self.root, device), exist_ok=True)
+        self.sync(self.env)
+
+    def remove_probe(self, device: str) -> None:
+        self.probes.pop(device, None)
+        shutil.rmtree(os.path.join(self.root, device), ignore_errors=True)
+
+    # ──────────────────────────────────────────────────────────
+    def sync(self, env: SimEnvironment) -> None:
+        for dev, quantity in self.probes.items():
+            milli = int(round(env.sample(quantity) * 1000))
+            raw = (milli * 16 // 1000) & 0xFFFF
+            hexes = f"{raw & 0xFF:02x} {raw >> 8:02x} 4b 46 7f ff 0c 10 1c"
+            crc_ok = "YES"
+            if self._crc_errors.get(dev):
+                self._crc_errors[dev] -= 1
+                crc_ok = "NO"
+            text = f"{hexes} : crc=1c {crc_ok}\n{hexes} t={milli}\n"
+            path = os.path.join(self.root, dev, "w1_slave")
+            tmp = path + ".tmp"
+            with open(tmp, "w") as f:
+                f.write(text)
+            os.replace(tmp, path)            # lecture jamais partielle
+
+    def close(self) -> None:
+        if self._own_root:
+            shutil.rmtree(self.root, ignore_errors=True)
@@ -97,3 +97,11 @@ class BME280:
     def read_humidity(self):
         _, _, raw_h = self._read_raw()
         return round(self._compensate_hum(raw_h), 2)
+
+    def read_all(self):
+        """(température °C, pression hPa, humidité %) en une seule lecture burst."""
+        raw_t, raw_p, raw_h = self._read_raw()
+        temp = self._compensate_temp(raw_t)          # calcule t_fine pour P et H
+        return (round(temp, 2),
+                round(self._compensate_press(raw_p) / 100.0, 2),
+                round(self._compensate_hum(raw_h), 2))
@@ -3,7 +3,7 @@
 # Author: Progradius (adapté)
 # License: AGPL 3.0
 
-import RPi.GPIO as GPIO
+from hal.backend import GPIO
 import time
 
 class HCSR04:
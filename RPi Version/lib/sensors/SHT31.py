@@ -0,0 +1,43 @@
+# lib/sensors/SHT31.py
+# Author: Progradius
+# License: AGPL 3.0
+
+import time
+
+_CMD_MEASURE = (0x2C, 0x06)     # single shot, répétabilité haute, clock stretching
+_CMD_SOFT_RESET = (0x30, 0xA2)
+_MEASURE_S = 0.016              # 15 ms max en répétabilité haute
+
+
+def crc8(data) -> int:
+    """CRC-8 Sensirion : polynôme 0x31, init 0xFF."""
+    crc = 0xFF
+    for byte in data:
+        crc ^= byte
+        for _ in range(8):
+            crc = ((crc << 1) ^ 0x31) & 0xFF if crc & 0x80 else (crc << 1) & 0xFF
+    return crc
+
+
+class SHT31:
+    """
+    Driver SHT31-D (smbus2) : température et humidité d'une même mesure.
+    Adresse 0x44 (ADDR à la masse) ou 0x45.
+    """
+
+    def __init__(self, i2c_bus, address=0x44):
+        self._i2c = i2c_bus
+        self._addr = address
+        self._i2c.write_i2c_block_data(self._addr, _CMD_SOFT_RESET[0], [_CMD_SOFT_RESET[1]])
+        time.sleep(0.002)
+
+    def read_all(self):
+        """(température °C, humidité %RH) d'une seule mesure."""
+        self._i2c.write_i2c_block_data(self._addr, _CMD_MEASURE[0], [_CMD_MEASURE[1]])
+        time.sleep(_MEASURE_S)
+        data = self._i2c.read_i2c_block_data(self._addr, 0x00, 6)
+        if crc8(data[0:2]) != data[2] or crc8(data[3:5]) != data[5]:
+            raise IOError("SHT31 : CRC invalide")
+        raw_t = data[0] << 8 | data[1]
+        raw_h = data[3] << 8 | data[4]
+        return round(-45.0 + 175.0 * raw_t / 65535.0, 2), round(100.0 * raw_h / 65535.0, 2)
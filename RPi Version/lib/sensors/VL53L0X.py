@@ -267,8 +267,8 @@ class VL53L0X:
         else:
             raise TimeoutError()
 
-        # lecture du résultat (MSB:LSB)
-        msb, lsb = self._read_regs(_RESULT_RANGE_STATUS + 10, 2, '>HH')
+        # lecture du résultat (mot 16 bits MSB:LSB)
+        distance = self._read_reg(_RESULT_RANGE_STATUS + 10, '>H')
         # clear interrupt
         self._write_reg(_INTERRUPT_CLEAR, 'B', 0x01)
-        return (msb << 8) | (lsb & 0xFF)
+        return distance
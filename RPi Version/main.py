@@ -7,25 +7,14 @@ import traceback
 import signal
 import sys
 import atexit
-import threading
-import time
 import os   # ← ajouté
 
-import RPi.GPIO as GPIO
-from utils.pretty_console import title, action, success, warning, error, clock
-from function import motor_all_pin_down_at_boot, set_ntp_time, check_ram_usage
-from network.network_handler import do_connect, is_host_connected
-
-from model.Component import Component
-from model.DailyTimer import DailyTimer
-from model.CyclicTimer import CyclicTimer
-from components.MotorHandler import MotorHandler
-
-from controllers.SensorController import SensorController
-from controllers.SystemStatus import SystemStatus
-from controllers.PuppetMaster import PuppetMaster
-
-from param.config import AppConfig
+from utils.pretty_console import (
+    title, success, warning, error, clock, install_rich_traceback,
+)
+from function import check_ram_usage
+from utils.memory import configure_gc, freeze_after_boot
+from app import Application
 
 # =============================================================
 #                  VARIABLES GLOBALES SÉCURITÉ
@@ -33,15 +22,12 @@ from param.config import AppConfig
 
 # mode de run (pour désactiver certaines fonctions en service)
 RUN_AS_SERVICE = os.getenv("PHYTO_RUN_MODE", "").lower() == "service"
-# si PHYTO_HW_WATCHDOG=0 → on ne lance pas le thread watchdog
-DISABLE_HW_WATCHDOG = os.getenv("PHYTO_HW_WATCHDOG", "0") == "0"
+# /dev/watchdog est piloté par le superviseur (controllers/Supervisor.py) :
+# caressé seulement si le système est sain ; PHYTO_HW_WATCHDOG=1 pour l'armer
 
 # Pins non-moteur qu'on peut forcer à HIGH sans danger
 GENERIC_SAFE_PINS = []          # on remplira après chargement config
 MOTOR_PINS = []                 # on remplira après chargement config
-watchdog_thread = None
-watchdog_active = False
-watchdog_stop = threading.Event()
 
 
 # =============================================================
@@ -55,6 +41,7 @@ def cleanup_gpio():
       - pour les pins moteur → on les met comme au boot (LOW chez toi)
     """
     print("🧹 Cleanup GPIO avant extinction…")
+    from hal.backend import GPIO
     try:
         GPIO.setwarnings(False)
         GPIO.setmode(GPIO.BCM)
@@ -85,22 +72,16 @@ def cleanup_gpio():
 
 
 def disable_watchdog():
-    """Désactive /dev/watchdog si possible"""
-    global watchdog_active
-    if not watchdog_active:
+    """Désarme /dev/watchdog (« V ») s'il a été ouvert par le superviseur"""
+    application = globals().get("app")
+    if application is None or "puppet_master" not in vars(application):
         return
-    try:
-        with open("/dev/watchdog", "w") as f:
-            f.write("V")
-        print("🛡️  Watchdog matériel désactivé proprement")
-    except Exception as e:
-        print(f"⚠️ Impossible de désactiver le watchdog : {e}")
+    application.puppet_master.supervisor.watchdog.close()
 
 
 def handle_exit_signal(signum, frame):
     print(f"\n🛑 Signal {signum} reçu → arrêt sécurisé.")
     disable_watchdog()
-    watchdog_stop.set()
     cleanup_gpio()
     sys.exit(0)
 
@@ -114,138 +95,32 @@ atexit.register(disable_watchdog)
 atexit.register(cleanup_gpio)
 
 
-def watchdog_worker():
-    """Thread d'écriture régulière sur /dev/watchdog"""
-    global watchdog_active
-    try:
-        with open("/dev/watchdog", "w") as f:
-            watchdog_active = True
-            print("🛡️  Watchdog matériel activé")
-            while not watchdog_stop.is_set():
-                f.write("\n")
-                f.flush()
-                time.sleep(10)
-    except Exception as e:
-        warning(f"Watchdog matériel non disponible : {e}")
-        watchdog_active = False
-
-
 # =============================================================
 #                    INITIALISATION SYSTÈME
 # =============================================================
+#  Étapes rapides d'abord (config → GPIO sûrs → composants → timers) :
+#  après une coupure de courant, les sorties retrouvent immédiatement
+#  l'état planifié dans param.json. Réseau, NTP, ping et sondage des
+#  capteurs sont lancés ensuite EN PARALLÈLE, boucles déjà actives.
+# =============================================================
+install_rich_traceback()
+configure_gc()                  # seuils GC relevés, aucune collecte forcée ensuite
 title("Phyto-Controller - Boot")
+app = Application()
 
-# (1) Chargement de la configuration
-config = AppConfig.load()
-success("Configuration chargée")
-
-# Maintenant qu'on a la config, on sait quelles sont les pins moteur
-MOTOR_PINS[:] = [
-    config.gpio.motor_pin1,
-    config.gpio.motor_pin2,
-    config.gpio.motor_pin3,
-    config.gpio.motor_pin4,
-]
-
-# Et les autres pins qu'on peut mettre HIGH à la fin
-GENERIC_SAFE_PINS[:] = [
-    config.gpio.dailytimer1_pin,
-    config.gpio.dailytimer2_pin,
-    config.gpio.cyclic1_pin,
-    config.gpio.cyclic2_pin,
-    config.gpio.heater_pin,
-    # surtout pas les pins moteur ici
-]
-
-# (2) Sécurité : broches moteur → LOW (avant toute autre init)
-# c'est ton état sûr
-motor_all_pin_down_at_boot(config)
-
-# (3) Initialisation globale des broches GPIO
-GPIO.setwarnings(False)
-GPIO.setmode(GPIO.BCM)
-
-# On initialise d'abord les pins "non dangereuses" en HIGH
-for pin in GENERIC_SAFE_PINS:
-    GPIO.setup(pin, GPIO.OUT, initial=GPIO.HIGH)
+# (1) Configuration → on sait quelles broches protéger à l'extinction
+MOTOR_PINS[:] = app.motor_pins
+GENERIC_SAFE_PINS[:] = app.generic_pins     # surtout pas les pins moteur ici
 
-# Puis on initialise les pins moteur en LOW explicitement
-for pin in MOTOR_PINS:
-    GPIO.setup(pin, GPIO.OUT, initial=GPIO.LOW)
+# (2…7) GPIO sûrs → composants → moteur → timers → capteurs → orchestrateur
+app.build()
 
-success("GPIO initialisés (génériques=HIGH, moteur=LOW)")
-
-# (4) Wi-Fi
-try:
-    action("Connexion Wi-Fi…")
-    do_connect()
-    success("Interface Wi-Fi prête")
-except Exception:
-    error("Connexion Wi-Fi échouée")
-    traceback.print_exc()
-
-# (5) NTP
-try:
-    action("Synchronisation NTP…")
-    set_ntp_time()
-except Exception:
-    warning("NTP indisponible → heure non synchronisée")
-
-# (6) Vérification de la reachabilité de l'hôte
-if is_host_connected() == "offline":
-    warning("Machine hôte hors-ligne → mode dégradé")
-
-# (7) Initialisation des composants physiques
-light1       = Component(pin=config.gpio.dailytimer1_pin)
-light2       = Component(pin=config.gpio.dailytimer2_pin)
-cyclic_out1  = Component(pin=config.gpio.cyclic1_pin)
-cyclic_out2  = Component(pin=config.gpio.cyclic2_pin)
-heater       = Component(pin=config.gpio.heater_pin)
-
-# ATTENTION : MotorHandler va réutiliser les pins moteur, mais on les a déjà
-# mises dans l'état sûr juste au-dessus
-motor_handler = MotorHandler(config)
-success("Composants physiques initialisés")
-
-# (8) Timers
-dailytimer1   = DailyTimer(light1,       timer_id="1", config=config)
-dailytimer2   = DailyTimer(light2,       timer_id="2", config=config)
-cyclic_timer1 = CyclicTimer(cyclic_out1, timer_id="1", config=config)
-cyclic_timer2 = CyclicTimer(cyclic_out2, timer_id="2", config=config)
-
-# (9) Capteurs
-sensor_handler = SensorController(config)
-success("Bus capteurs prêt")
-
-# (10) Statut système
-controller_status = SystemStatus(
-    config=config,
-    component=light1,
-    motor=motor_handler.motor
-)
-
-# (11) Orchestrateur principal
-puppet_master = PuppetMaster(
-    config             = config,
-    controller_status  = controller_status,
-    sensor_handler     = sensor_handler,
-    dailytimer1        = dailytimer1,
-    dailytimer2        = dailytimer2,
-    cyclic_timer1      = cyclic_timer1,
-    cyclic_timer2      = cyclic_timer2,
-    motor_handler      = motor_handler,
-    heater_component   = heater,
-)
-
-# (12) Info mémoire
+# (8) Info mémoire ; objets du boot gelés (avant tout fork des rôles)
 check_ram_usage()
+freeze_after_boot()
 print()
 
-# Lancement du watchdog dans un thread
-if not DISABLE_HW_WATCHDOG:
-    watchdog_thread = threading.Thread(target=watchdog_worker, daemon=True)
-    watchdog_thread.start()
-else:
+if not app.puppet_master.supervisor.watchdog.enabled:
     print("Watchdog matériel désactivé (mode service ou variable d'env).")
 
 # =============================================================
@@ -253,16 +128,14 @@ else:
 # =============================================================
 try:
     clock("Démarrage boucle principale… (Ctrl-C pour quitter)")
-    asyncio.run(puppet_master.main_loop())
+    asyncio.run(app.run())
 except KeyboardInterrupt:
     warning("Arrêt demandé par l'utilisateur (Ctrl-C)")
 except Exception as e:
     error(f"Crash : {e}")
     traceback.print_exc()
 finally:
-    watchdog_stop.set()
-    if watchdog_thread and watchdog_thread.is_alive():
-        watchdog_thread.join(timeout=2)
+    disable_watchdog()
     # on appelle quand même cleanup GPIO (c’est déjà enregistré dans atexit)
     cleanup_gpio()
     success("Programme terminé (watchdog & GPIO nettoyés)")
@@ -5,12 +5,9 @@
 #  Abstraction d'un composant commandé par une sortie GPIO
 # -------------------------------------------------------------
 
-import RPi.GPIO as GPIO
+from hal.backend import GPIO
 from utils.pretty_console import action, info, warning
 
-# ─────────────────────────── init GPIO global ─────────────────
-GPIO.setwarnings(False)
-GPIO.setmode(GPIO.BCM)
 
 class Component:
     """
@@ -24,6 +21,8 @@ class Component:
 
     def __init__(self, pin: int):
         self.pin: int = pin  # rendu public pour accès externe (ex: DailyTimer)
+        GPIO.setwarnings(False)
+        GPIO.setmode(GPIO.BCM)          # idempotent ; plus d'init à l'import
         GPIO.setup(self.pin, GPIO.OUT)
 
         # Par défaut, le composant est désactivé (GPIO HIGH pour relais actif bas)
@@ -3,23 +3,28 @@
 # License : AGPL-3.0
 # -------------------------------------------------------------
 #  Minuteur cyclique : déclenche périodiquement un composant
-#  Deux modes :
+#  Trois modes :
 #    • journalier   : period_days, triggers_per_day, first_trigger_hour
 #    • séquentiel   : cycles ON/OFF jour & nuit
+#    • impulsions   : train ON/OFF en ms jour & nuit (thread dédié)
 # -------------------------------------------------------------
 
+from __future__ import annotations
+
 from typing import Union
 from param.config      import AppConfig
 from utils.pretty_console import info, action, warning, success
 
 class CyclicTimer:
     """
-    • mode                    → "journalier" ou "séquentiel"
+    • mode                    → "journalier", "séquentiel" ou "impulsions"
     • period_days             → espacement en jours (journalier)
     • triggers_per_day        → nombre d'actions par journée (journalier)
     • first_trigger_hour      → heure du 1er déclenchement (journalier)
     • action_duration_seconds → durée ON (journalier)
     • on/off_*                → durées ON/OFF jour & nuit (séquentiel)
+    • pulse_on/off_ms_*       → durées ON/OFF en ms jour & nuit (impulsions)
+    • pulse                   → PulseTrain en cours (mode impulsions), sinon None
 
     Toute modification met à jour AppConfig et sauve automatiquement.
     """
@@ -33,6 +38,7 @@ class CyclicTimer:
         self.component = component
         self.timer_id  = str(timer_id)
         self._config   = config
+        self.pulse     = None
         self._load_from_config_block()
         info(f"CyclicTimer #{self.timer_id} chargé → {self}")
 
@@ -58,14 +64,20 @@ class CyclicTimer:
         self.off_time_day       = s.off_time_day
         self.on_time_night      = s.on_time_night
         self.off_time_night     = s.off_time_night
+        # impulsions
+        self.pulse_on_ms_day    = s.pulse_on_ms_day
+        self.pulse_off_ms_day   = s.pulse_off_ms_day
+        self.pulse_on_ms_night  = s.pulse_on_ms_night
+        self.pulse_off_ms_night = s.pulse_off_ms_night
 
-    def refresh_from_config(self):
+    def refresh_from_config(self, config: AppConfig | None = None):
         """
-        Recharge les paramètres depuis le JSON en cours.
+        Recharge les paramètres depuis le JSON en cours (ou depuis *config*
+        déjà en mémoire, cas d'un patch de configuration).
         À appeler périodiquement pour prendre en compte
         les changements faits à chaud via la page de conf.
         """
-        self._config = AppConfig.load()
+        self._config = config if config is not None else AppConfig.load()
         self._load_from_config_block()
         success(f"CyclicTimer #{self.timer_id} rafraîchi depuis AppConfig")
 
@@ -79,6 +91,8 @@ class CyclicTimer:
     def get_off_time_day(self):       return self.off_time_day
     def get_on_time_night(self):      return self.on_time_night
     def get_off_time_night(self):     return self.off_time_night
+    def get_pulse_day(self):          return self.pulse_on_ms_day, self.pulse_off_ms_day
+    def get_pulse_night(self):        return self.pulse_on_ms_night, self.pulse_off_ms_night
 
     # ───────────────────────── setters ───────────────────────
     def _set_and_save(self, attr: str, value):
@@ -90,7 +104,7 @@ class CyclicTimer:
         self._config.save()
 
     def set_mode(self, mode: str):
-        if mode not in ("journalier", "séquentiel"):
+        if mode not in ("journalier", "séquentiel", "impulsions"):
             warning(f"Mode invalide : {mode}"); return
         self._set_and_save("mode", mode)
         action(f"CyclicTimer #{self.timer_id} mode → {mode}")
@@ -151,5 +165,7 @@ class CyclicTimer:
             f"first={self.first_trigger_hour}h action={self.action_duration}s "
             f"day {self.on_time_day}/{self.off_time_day}s "
             f"night {self.on_time_night}/{self.off_time_night}s "
+            f"pulse {self.pulse_on_ms_day}/{self.pulse_off_ms_day}ms "
+            f"{self.pulse_on_ms_night}/{self.pulse_off_ms_night}ms "
             f"GPIO={self.component.pin}>"
         )
@@ -6,10 +6,12 @@
 #  + prise en compte d'un champ "enabled" dans la conf
 # -------------------------------------------------------------
 
-from datetime import datetime
+from __future__ import annotations
+
 from function import convert_time_to_minutes
 from param.config import AppConfig
 from utils.pretty_console import info, warning, clock, action, success
+from utils.timebase import Clock, SYSTEM_CLOCK
 
 
 class DailyTimer:
@@ -20,10 +22,12 @@ class DailyTimer:
     • Si le timer est désactivé (enabled = false/disabled), on force OFF.
     """
 
-    def __init__(self, component, timer_id: int, config: AppConfig):
+    def __init__(self, component, timer_id: int, config: AppConfig,
+                 clock: Clock = SYSTEM_CLOCK):
         self.component = component
         self.timer_id = int(timer_id)
         self._config = config
+        self._clock = clock            # (masque pretty_console.clock ici seulement)
 
         # choix du bloc config
         if self.timer_id == 1:
@@ -62,12 +66,13 @@ class DailyTimer:
             except Exception as e:
                 warning(f"Impossible de forcer OFF le composant du DailyTimer #{self.timer_id} : {e}")
 
-    def refresh_from_config(self):
+    def refresh_from_config(self, config: AppConfig | None = None):
         """
-        Recharge les horaires depuis le JSON en cours.
+        Recharge les horaires depuis le JSON en cours (ou depuis *config*
+        déjà en mémoire, cas d'un patch de configuration).
         À appeler à chaque boucle pour prise en compte à chaud.
         """
-        self._config = AppConfig.load()
+        self._config = config if config is not None else AppConfig.load()
         blk = self._config.daily_timer1 if self.timer_id == 1 else self._config.daily_timer2
 
         self.enabled = getattr(blk, "enabled", True)
@@ -121,7 +126,7 @@ class DailyTimer:
         # 2. logique habituelle
         start = convert_time_to_minutes(self.start_hour, self.start_minute)
         stop = convert_time_to_minutes(self.stop_hour, self.stop_minute)
-        now = datetime.now()
+        now = self._clock.now()
         now_m = convert_time_to_minutes(now.hour, now.minute)
 
         active = (
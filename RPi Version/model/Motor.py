@@ -1,10 +1,7 @@
 
-import RPi.GPIO as GPIO
+from hal.backend import GPIO
 from utils.pretty_console import info, warning, error
 
-GPIO.setwarnings(False)
-GPIO.setmode(GPIO.BCM)
-
 
 class Motor:
     """
@@ -24,6 +21,9 @@ class Motor:
     def __init__(self, pin1: int, pin2: int, pin3: int, pin4: int):
         self.pin1, self.pin2, self.pin3, self.pin4 = pin1, pin2, pin3, pin4
 
+        GPIO.setwarnings(False)
+        GPIO.setmode(GPIO.BCM)
+
         # État SÉCURISÉ au démarrage : tout LOW
         for p in (self.pin1, self.pin2, self.pin3, self.pin4):
             GPIO.setup(p, GPIO.OUT, initial=GPIO.LOW)
@@ -77,7 +77,23 @@ class Motor:
         return 0
 
     # ───────────────────────── utilitaire ─────────────────────
+    def write(self, speed: int) -> None:
+        """
+        Les quatre pins en UNE écriture GPIO (RPi.GPIO et le simulateur
+        acceptent une liste de canaux et de niveaux) : pin *speed* HIGH,
+        les autres LOW ; 0 → tout LOW.
+        """
+        pins = [self.pin1, self.pin2, self.pin3, self.pin4]
+        levels = [GPIO.HIGH if speed == n else GPIO.LOW for n in range(1, 5)]
+        try:
+            GPIO.output(pins, levels)
+        except TypeError:
+            # backend sans écriture groupée : pins éteintes d'abord
+            for pin, level in sorted(zip(pins, levels), key=lambda pl: pl[1]):
+                self._set_pin(pin, level == GPIO.HIGH)
+        except RuntimeError as e:
+            warning(f"[MOTOR] GPIO {pins} non prêts : {e}")
+
     def all_off(self) -> None:
         """Force l'état sûr : tout LOW."""
-        for p in (self.pin1, self.pin2, self.pin3, self.pin4):
-            self._set_pin(p, False)
+        self.write(0)
@@ -0,0 +1,202 @@
+# model/Zone.py
+# Author : Progradius
+# License: AGPL-3.0
+# -------------------------------------------------------------
+#  Zone climatique : capteurs, photopériode, consignes, sorties
+# -------------------------------------------------------------
+"""
+Une zone (tente) et tout ce que ses boucles de régulation doivent savoir.
+
+‣ La zone « main » est l'installation historique : REG-T (température
+  fusionnée des sondes d'air, controllers/TemperatureFusion), fenêtre jour
+  de DailyTimer1, Temperature_Settings, chauffage et moteur de
+  GPIO_Settings (``legacy_settings``). Les autres zones viennent de la
+  section ``Zones`` de la config.
+‣ Réveils pilotés par les changements : chaque boucle prend son propre
+  évènement (``listener``), déclenché quand une mesure liée à la zone bouge
+  d'au moins ``deadband``, à chaque bascule jour/nuit et à chaque
+  changement de config. Sans ZoneManager (``event_driven`` faux, rejeu
+  benchmarks/replay.py), les boucles échantillonnent comme avant.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from param.config import AppConfig, Photoperiod, ZoneSettings
+from utils.metrics import counter
+
+MAIN = "main"
+
+_WAKEUPS = counter("phyto_zone_wakeups_total", "Réveils des boucles d'une zone", ("zone", "reason"))
+
+
+def legacy_settings(config: AppConfig) -> ZoneSettings:
+    """Zone « main » décrite par les sections historiques de la config."""
+    dt = config.daily_timer1
+    return ZoneSettings(
+        name=MAIN,
+        temp_sensor="REG-T",
+        humidity_sensor="BME280H",
+        photoperiod=Photoperiod(
+            start_hour=dt.start_hour, start_minute=dt.start_minute,
+            stop_hour=dt.stop_hour, stop_minute=dt.stop_minute,
+        ),
+        temperature=config.temperature,
+        heater_enabled=config.heater_settings.enabled,
+    )
+
+
+def in_window(start_m: int, stop_m: int, now_m: int) -> bool:
+    """Minute *now_m* dans [start, stop] (bornes incluses, passage de minuit géré)."""
+    if start_m <= stop_m:
+        return start_m <= now_m <= stop_m
+    return now_m >= start_m or now_m <= stop_m
+
+
+class Zone:
+
+    def __init__(self, settings: ZoneSettings, outputs: Optional[dict] = None, deadband: float = 0.1):
+        self.settings = settings
+        self.outputs: dict = outputs or {}          # "light" / "heater" / "fan" → Component
+        self.deadband = deadband
+        self.event_driven = False
+        self.removed = False
+        self.day: Optional[bool] = None
+        self.wakeups: Counter = Counter()           # raison → nombre
+        self.regulator = None                       # components/climate_control.ClimateRegulator
+        self._listeners: List[asyncio.Event] = []
+        self._seen: Dict[str, object] = {}
+
+    @property
+    def name(self) -> str:
+        return self.settings.name
+
+    def loop_name(self, base: str) -> str:
+        """Nom de boucle (battement) : « climate_control », « climate_control:tente2 »."""
+        return base if self.name == MAIN else f"{base}:{self.name}"
+
+    def sensor_keys(self) -> Tuple[str, ...]:
+        s = self.settings
+        return tuple(k for k in (s.temp_sensor, s.humidity_sensor) if k)
+
+    # ──────────────────────────────────────────────────────────
+    #  Photopériode
+    # ──────────────────────────────────────────────────────────
+    def _window(self) -> Tuple[int, int]:
+        p = self.settings.photoperiod
+        return p.start_hour * 60 + p.start_minute, p.stop_hour * 60 + p.stop_minute
+
+    def is_day(self, now: datetime) -> bool:
+        start, stop = self._window()
+        return in_window(start, stop, now.hour * 60 + now.minute)
+
+    def next_transition(self, now: datetime) -> datetime:
+        """Prochaine minute où ``is_day`` change (jour à *start*, nuit à *stop* + 1)."""
+        start, stop = self._window()
+        midnight = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        edges = [midnight + timedelta(days=d, minutes=m)
+                 for d in (0, 1) for m in (start, stop + 1)]
+        return min(t for t in edges if t > now)
+
+    def targets(self, day: bool) -> Tuple[float, float]:
+        t = self.settings.temperature
+        if day:
+            return t.target_temp_min_day, t.target_temp_max_day
+        return t.target_temp_min_night, t.target_temp_max_night
+
+    # ──────────────────────────────────────────────────────────
+    #  Réveils
+    # ──────────────────────────────────────────────────────────
+    def listener(self) -> asyncio.Event:
+        """Évènement propre à une boucle (à créer depuis la boucle asyncio)."""
+        event = asyncio.Event()
+        self._listeners.append(event)
+        return event
+
+    def notify(self, reason: str) -> None:
+        self.wakeups[reason] += 1
+        _WAKEUPS.labels(self.name, reason).inc()
+        for event in self._listeners:
+            event.set()
+
+    def offer(self, key: str, value) -> bool:
+        """Nouvelle mesure d'une clé liée : réveil si elle a bougé d'au moins ``deadband``."""
+        last = self._seen.get(key)
+        if isinstance(value, (int, float)) and isinstance(last, (int, float)):
+            if abs(value - last) < self.deadband:
+                return False
+        elif value == last and key in self._seen:
+            return False
+        self._seen[key] = value
+        self.notify("sensor")
+        return True
+
+    def update(self, settings: ZoneSettings) -> bool:
+        if settings == self.settings:
+            return False
+        self.settings = settings
+        self.notify("config")
+        return True
+
+    async def idle(self, clock, event: asyncio.Event, seconds: float, sensor_handler) -> bool:
+        """
+        Pause d'une boucle entre deux passages ; True s'il faut en refaire un.
+        Hors ZoneManager : simple ``sleep``, passage à chaque période.
+        """
+        if not self.event_driven:
+            await clock.sleep(seconds)
+            return True
+        event.clear()
+        if await clock.wait(event, seconds):
+            return True
+        return self.needs_poll(sensor_handler, 2 * seconds)
+
+    # ──────────────────────────────────────────────────────────
+    #  Mesures
+    # ──────────────────────────────────────────────────────────
+    def needs_poll(self, sensor_handler, max_age: float) -> bool:
+        """Sans évènements, ou cache trop vieux (acquisition arrêtée) : lire soi-même."""
+        if not self.event_driven:
+            return True
+        hit = sensor_handler.get_cached_value(self.settings.temp_sensor)
+        return hit is None or time.time() - hit[1] > max_age
+
+    def reading(self, sensor_handler, key: Optional[str] = None, max_age: float = 60.0,
+                filtered: bool = True):
+        """
+        Valeur du cache partagé si fraîche, sinon lecture du capteur. Vue
+        filtrée par défaut (controllers/SensorFilter) : une régulation ne
+        bascule pas sur un échantillon isolé ; ``filtered=False`` : brute.
+        """
+        key = key or self.settings.temp_sensor
+        if self.event_driven:
+            hit = sensor_handler.get_cached_value(key, filtered=filtered)
+            if hit is not None and time.time() - hit[1] <= max_age:
+                return hit[0]
+        if filtered and hasattr(sensor_handler, "get_filtered_value"):
+            return sensor_handler.get_filtered_value(key)
+        return sensor_handler.get_sensor_value(key)
+
+    # ──────────────────────────────────────────────────────────
+    def to_dict(self, now: Optional[datetime] = None) -> dict:
+        s = self.settings
+        out = {
+            "enabled":      s.enabled,
+            "sensors":      {"temperature": s.temp_sensor, "humidity": s.humidity_sensor},
+            "photoperiod":  s.photoperiod.model_dump(),
+            "day":          self.day,
+            "targets":      dict(zip(("min", "max"), self.targets(bool(self.day)))),
+            "heater":       s.heater_enabled,
+            "outputs":      {role: {"pin": c.pin, "state": c.get_state()} for role, c in self.outputs.items()},
+            "last_values":  dict(self._seen),
+            "wakeups":      dict(self.wakeups),
+            "regulator":    self.regulator.to_dict() if self.regulator is not None else None,
+        }
+        if now is not None:
+            out["next_transition"] = self.next_transition(now).isoformat(timespec="minutes")
+        return out
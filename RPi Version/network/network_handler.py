@@ -13,13 +13,15 @@ import subprocess
 from utils.pretty_console import info, success, warning, error, action
 from param.config       import AppConfig
 
-def do_connect() -> None:
+def do_connect(config: AppConfig | None = None, timeout: float = 20.0) -> None:
     """
     Active la radio Wi-Fi (nmcli) puis tente de se connecter sur SSID/PASS
     définis dans AppConfig.network. Nécessite les droits root.
+    Chaque appel nmcli est borné par *timeout* secondes.
     """
-    # Recharge la config à jour
-    config = AppConfig.load()
+    # Recharge la config à jour si non fournie
+    if config is None:
+        config = AppConfig.load()
     ssid     = config.network.wifi_ssid
     password = config.network.wifi_password
 
@@ -34,32 +36,35 @@ def do_connect() -> None:
 
     try:
         # Active la radio Wi-Fi
-        subprocess.run(["nmcli", "radio", "wifi", "on"], check=True)
+        subprocess.run(["nmcli", "radio", "wifi", "on"], check=True, timeout=timeout)
         # Se connecte
         subprocess.run(
             ["nmcli", "device", "wifi", "connect", ssid, "password", password],
-            check=True
+            check=True, timeout=timeout
         )
         success("Connexion Wi-Fi réussie ✅")
 
     except subprocess.CalledProcessError as exc:
         error(f"Erreur de connexion Wi-Fi : {exc}")
+    except subprocess.TimeoutExpired:
+        error(f"Connexion Wi-Fi : nmcli sans réponse après {timeout}s")
 
 
-def is_host_connected() -> str:
+def is_host_connected(config: AppConfig | None = None) -> str:
     """
     Ping l'hôte configuré dans AppConfig.network.host_machine_address
     (1 paquet, timeout 1 s) ; renvoie « online » ou « offline ».
     """
-    # Recharge la config à jour
-    config = AppConfig.load()
+    # Recharge la config à jour si non fournie
+    if config is None:
+        config = AppConfig.load()
     host = config.network.host_machine_address
 
     info(f"Ping vers {host} …")
     try:
         ret = subprocess.run(
             ["ping", "-c", "1", "-W", "1", host],
-            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=3
         ).returncode
 
         if ret == 0:
@@ -1,214 +1,470 @@
-# controller/api.py
+# network/web/api_handler.py
 # Author : Progradius
 # License: AGPL-3.0
 """
-Mini-REST API HTTP (GET only) pour exposer des données et modifier à la volée
-certains paramètres via AppConfig (Pydantic + JSON centralisé).
+API REST JSON versionnée (/api/v1), routée depuis network.web.server.Server.
+
+‣ Toutes les lectures sont servies depuis l'état en cache (SensorController
+  ._cache, état des sorties, AppConfig en mémoire) : aucune lecture capteur
+  n'est déclenchée par une requête.
+‣ Dispatch par table : chemins statiques → dict, chemins paramétrés → regex.
+‣ Réponses GET avec ETag ; « If-None-Match » → 304 sans corps.
+‣ Encodage JSON via orjson si disponible, sinon json standard compact.
+
+Routes :
+    GET   /api/v1/snapshot           capteurs + santé des périphériques + sorties
+                                     + moteur + timers
+    GET   /api/v1/status             état système condensé
+    GET   /api/v1/boot               durée de chaque étape du démarrage
+    GET   /api/v1/diagnostics/loop   retard de la boucle + blocages attribués
+    GET   /api/v1/diagnostics/memory RSS/USS, pente, objets par type, GC
+    GET   /api/v1/diagnostics/pulse  trains d'impulsions des CyclicTimers :
+                                     durées, priorité, retard des fronts (µs)
+    POST  /api/v1/diagnostics/memory/<op>
+                                     op = trace_start {"frames": n} | trace_diff
+                                     {"top": n, "rebase": bool} | trace_stop | count
+    GET   /api/v1/tasks              tâches supervisées, santé, watchdog matériel
+    GET   /api/v1/devices            capteurs vus sur les bus I²C / 1-Wire + évènements
+    GET   /api/v1/zones              zones climatiques : capteurs, photopériode,
+                                     consignes, sorties, réveils
+    POST  /api/v1/tasks/<name>/<op>  op = restart | freeze | resume
+    GET   /api/v1/sensors            dernières valeurs de toutes les clés
+    GET   /api/v1/sensors/fusion     température de régulation REG-T : sources
+                                     retenues / écartées, poids, biais
+    GET   /api/v1/sensors/<key>      dernière valeur d'une clé (DS18B%231 …)
+    GET   /api/v1/outlets            état de toutes les sorties relais
+    GET   /api/v1/outlets/<name>     état d'une sortie
+    POST  /api/v1/outlets/<name>     {"state": "on"|"off"|1|0}
+    GET   /api/v1/motor              vitesse appliquée, cible (transition en cours), mode
+    POST  /api/v1/motor              {"speed": 0..4}  (passe en mode manual)
+    GET   /api/v1/config             AppConfig complet (alias JSON)
+    GET   /api/v1/config/<section>   une section (ex. Motor_Settings)
+    PATCH /api/v1/config             JSON Merge Patch (RFC 7396) par alias, ou
+                                     clés pointées {"Section.champ": valeur}
+                                     → rapport (changements, rechargements, ms)
 """
 
 from __future__ import annotations
-import asyncio
+
+import hashlib
 import json
 import re
-from urllib.parse import parse_qs, urlparse
+from urllib.parse import unquote
+
+from param.config         import AppConfig
+from param.config_patch   import ConfigPatcher, ConfigPatchError
+from controllers.Supervisor import SupervisorError, UnknownTask
+from utils.pretty_console import action, error
+
+try:
+    import orjson
+
+    def _dumps(obj) -> bytes:
+        return orjson.dumps(obj)
+except ImportError:                                     # pragma: no cover
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+API_PREFIX = "/api/v1"
+
+_STATUS_TEXT = {
+    200: "OK",
+    304: "Not Modified",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    409: "Conflict",
+    422: "Unprocessable Entity",
+    503: "Service Unavailable",
+}
 
-from param.config                 import AppConfig
-from controllers.SensorController import SensorController
-from utils.pretty_console            import info, warning, error
+
+class ApiError(Exception):
+    """Erreur HTTP levée par un handler ; convertie en réponse JSON."""
+
+    def __init__(self, code: int, detail: str):
+        super().__init__(detail)
+        self.code   = code
+        self.detail = detail
+
+
+def _parse_on_off(raw) -> int:
+    """Accepte on/off, true/false, enabled/disabled, 1/0 → 1 | 0."""
+    txt = str(raw).strip().lower()
+    if txt in ("1", "on", "true", "enabled", "yes"):
+        return 1
+    if txt in ("0", "off", "false", "disabled", "no"):
+        return 0
+    raise ApiError(422, f"état invalide : {raw!r}")
 
 
 class API:
     """
-    Chaque connexion HTTP instancie un objet API chargé de :
-      • parser l'URL reçue,
-      • mettre à jour AppConfig si besoin,
-      • retourner JSON ou erreur HTTP.
+    Instanciée une fois par le Server ; ``dispatch`` est appelé pour chaque
+    requête dont le chemin commence par /api/v1.
     """
 
+    # (méthode, chemin relatif) → nom du handler
+    _STATIC = {
+        ("GET",   "/snapshot"): "_get_snapshot",
+        ("GET",   "/status"):   "_get_status",
+        ("GET",   "/boot"):     "_get_boot",
+        ("GET",   "/diagnostics/loop"): "_get_loop_diagnostics",
+        ("GET",   "/diagnostics/memory"): "_get_memory_diagnostics",
+        ("GET",   "/diagnostics/pulse"): "_get_pulse_diagnostics",
+        ("GET",   "/tasks"):    "_get_tasks",
+        ("GET",   "/devices"):  "_get_devices",
+        ("GET",   "/zones"):    "_get_zones",
+        ("GET",   "/sensors"):  "_get_sensors",
+        ("GET",   "/sensors/fusion"): "_get_fusion",
+        ("GET",   "/outlets"):  "_get_outlets",
+        ("GET",   "/motor"):    "_get_motor",
+        ("POST",  "/motor"):    "_post_motor",
+        ("GET",   "/config"):   "_get_config",
+        ("PATCH", "/config"):   "_patch_config",
+    }
+    # (méthode, regex) → nom du handler (groupes nommés → kwargs)
+    _PATTERNS = [
+        ("GET",  re.compile(r"/sensors/(?P<key>[^/]+)"),     "_get_sensor"),
+        ("GET",  re.compile(r"/outlets/(?P<name>[^/]+)"),    "_get_outlet"),
+        ("POST", re.compile(r"/outlets/(?P<name>[^/]+)"),    "_post_outlet"),
+        ("GET",  re.compile(r"/config/(?P<section>[^/]+)"),  "_get_config_section"),
+        ("POST", re.compile(r"/tasks/(?P<name>[^/]+)/(?P<op>restart|freeze|resume)"), "_post_task"),
+        ("POST", re.compile(r"/diagnostics/memory/(?P<op>trace_start|trace_diff|trace_stop|count)"),
+         "_post_memory"),
+    ]
+
     def __init__(
         self,
-        writer: asyncio.StreamWriter,
-        request_line: str,
         controller_status,
-        config: AppConfig
+        sensor_handler,
+        config: AppConfig,
+        *,
+        outlets: dict | None = None,
+        motor_handler=None,
+        config_patcher: ConfigPatcher | None = None,
+        boot=None,
+        loop_monitor=None,
+        supervisor=None,
+        memory=None,
+        discovery=None,
+        zones=None,
+        pulses=None,
     ):
-        self._writer           = writer
-        self._request_line     = request_line      # ex : "GET /status HTTP/1.1"
-        self._controller_state = controller_status
-        self._config           = config
-        # capteurs mettent à jour automatiquement les stats via injection
-        self._sensors          = SensorController(config)
-
-    async def handle(self):
-        """Route la requête et écrit la réponse HTTP."""
-        try:
-            method, raw_path, _ = self._request_line.split()
-        except ValueError:
-            await self._http_error(400, "Bad Request")
-            return
+        self.controller_status = controller_status
+        self.sensor_handler    = sensor_handler
+        self.config            = config
+        self.outlets           = outlets or {}
+        self.motor_handler     = motor_handler
+        self.config_patcher    = config_patcher or ConfigPatcher(config)
+        self.boot              = boot
+        self.loop_monitor      = loop_monitor
+        self.supervisor        = supervisor
+        self.memory            = memory
+        self.discovery         = discovery
+        self.zones             = zones
+        self.pulses            = pulses
 
-        if method != "GET":
-            await self._http_error(405, "Method Not Allowed")
-            return
+        self._known_paths = {p for _, p in self._STATIC}
 
-        parsed = urlparse(raw_path)
-        path   = parsed.path
-        q      = parse_qs(parsed.query, keep_blank_values=True)
+    # ──────────────────────────────────────────────────────────
+    #  Dispatch
+    # ──────────────────────────────────────────────────────────
+    def dispatch(
+        self,
+        method: str,
+        path: str,
+        headers: dict[str, str],
+        body: bytes,
+    ) -> tuple[int, dict[str, str], bytes]:
+        """Retourne (code HTTP, en-têtes, corps)."""
+        rel = path.split("?", 1)[0][len(API_PREFIX):].rstrip("/") or "/"
+        try:
+            handler, kwargs = self._route(method, rel)
+            payload = {}
+            if method in ("POST", "PATCH", "PUT"):
+                payload = self._parse_body(body)
+                kwargs["payload"] = payload
+            result = getattr(self, handler)(**kwargs)
+            code = 200
+        except ApiError as exc:
+            if exc.code >= 500:
+                error(f"API → {exc.code} {exc.detail}")
+            result, code = {"error": exc.detail}, exc.code
+        except ConnectionError as exc:
+            # mode multi-processus : processus de contrôle injoignable
+            error(f"API {method} {rel} : {exc}")
+            result, code = {"error": str(exc)}, 503
+        except Exception as exc:
+            error(f"API {method} {rel} : {exc!r}")
+            result, code = {"error": "internal error"}, 500
+
+        data = _dumps(result)
+        hdrs = {"Content-Type": "application/json"}
 
-        # ─── Configuration via query-string ─────────────────────
-        if "dt1start" in q and "dt1stop" in q:
-            self._configure_dailytimer(q)
-        if "period_days" in q and "action_duration_seconds" in q:
-            self._configure_cyclic(q)
+        if method == "GET" and code == 200:
+            etag = 'W/"' + hashlib.blake2b(data, digest_size=8).hexdigest() + '"'
+            hdrs["ETag"] = etag
+            hdrs["Cache-Control"] = "no-cache"
+            inm = headers.get("if-none-match", "")
+            if inm and (inm.strip() == "*" or etag in (t.strip() for t in inm.split(","))):
+                return 304, {"ETag": etag}, b""
 
-        # ─── Endpoints JSON ───────────────────────────────────
-        if path == "/temperature":
-            await self._send_json(self._temperature_json())
+        return code, hdrs, data
 
-        elif path == "/hygrometry":
-            await self._send_json(self._hygrometry_json())
+    def _route(self, method: str, rel: str) -> tuple[str, dict]:
+        handler = self._STATIC.get((method, rel))
+        if handler:
+            return handler, {}
 
-        elif path == "/pressure":
-            await self._send_json(self._pressure_json())
+        path_exists = rel in self._known_paths
+        for m, rx, name in self._PATTERNS:
+            mt = rx.fullmatch(rel)
+            if not mt:
+                continue
+            path_exists = True
+            if m == method:
+                return name, {k: unquote(v) for k, v in mt.groupdict().items()}
 
-        elif path == "/status":
-            await self._send_json(self._system_state_json())
+        if path_exists:
+            raise ApiError(405, f"méthode {method} non supportée sur {rel}")
+        raise ApiError(404, f"ressource inconnue : {rel}")
 
-        else:
-            await self._http_error(404, "Not Found")
+    @staticmethod
+    def _parse_body(body: bytes) -> dict:
+        if not body:
+            return {}
+        try:
+            data = json.loads(body)
+        except ValueError as exc:
+            raise ApiError(400, f"JSON invalide : {exc}")
+        if not isinstance(data, dict):
+            raise ApiError(400, "objet JSON attendu")
+        return data
 
     # ──────────────────────────────────────────────────────────
-    # CONFIGURATION
+    #  Capteurs (cache)
     # ──────────────────────────────────────────────────────────
-    def _configure_dailytimer(self, q: dict[str, list[str]]):
-        """Met à jour début/fin du DailyTimer #1 dans AppConfig puis sauve."""
-        try:
-            sh, sm = self._split_hhmm(q["dt1start"][0])
-            eh, em = self._split_hhmm(q["dt1stop"][0])
+    def _get_sensors(self) -> dict:
+        return self.sensor_handler.snapshot()
 
-            dt1 = self._config.daily_timer1
-            dt1.start_hour   = sh
-            dt1.start_minute = sm
-            dt1.stop_hour    = eh
-            dt1.stop_minute  = em
+    def _get_fusion(self) -> dict:
+        return self.sensor_handler.fusion_state()
 
-            self._config.save()
-            info(f"DailyTimer mis à jour → {sh:02d}:{sm:02d}–{eh:02d}:{em:02d}")
+    def _get_sensor(self, key: str) -> dict:
+        if key not in self.sensor_handler.enabled_keys():
+            raise ApiError(404, f"capteur inconnu ou désactivé : {key}")
+        hit = self.sensor_handler.get_cached_value(key)
+        return {
+            "key":   key,
+            "value": hit[0] if hit else None,
+            "ts":    round(hit[1], 3) if hit else None,
+        }
 
-        except Exception as exc:
-            warning(f"DailyTimer: format invalide ({exc})")
+    # ──────────────────────────────────────────────────────────
+    #  Sorties relais
+    # ──────────────────────────────────────────────────────────
+    def _outlet_state(self, name: str, comp) -> dict:
+        return {"name": name, "pin": comp.pin, "state": "on" if comp.get_state() else "off"}
+
+    def _get_outlets(self) -> dict:
+        return {name: self._outlet_state(name, c) for name, c in self.outlets.items()}
 
-    def _configure_cyclic(self, q: dict[str, list[str]]):
+    def _get_outlet(self, name: str) -> dict:
+        comp = self.outlets.get(name)
+        if comp is None:
+            raise ApiError(404, f"sortie inconnue : {name}")
+        return self._outlet_state(name, comp)
+
+    def _post_outlet(self, name: str, payload: dict) -> dict:
         """
-        Met à jour le CyclicTimer #1 dans AppConfig puis sauve.
-        Attend les paramètres :
-          • period_days
-          • action_duration_seconds
+        Commande immédiate d'une sortie. Le timer propriétaire reprend la main
+        à sa prochaine échéance : pour un forçage durable, désactiver le timer
+        via PATCH /config.
         """
+        comp = self.outlets.get(name)
+        if comp is None:
+            raise ApiError(404, f"sortie inconnue : {name}")
+        if "state" not in payload:
+            raise ApiError(422, "champ 'state' requis")
+        comp.set_state(_parse_on_off(payload["state"]))
+        action(f"API → sortie {name} ← {payload['state']}")
+        return self._outlet_state(name, comp)
+
+    # ──────────────────────────────────────────────────────────
+    #  Moteur
+    # ──────────────────────────────────────────────────────────
+    def _get_motor(self) -> dict:
+        speed = self.motor_handler.speed if self.motor_handler else None
+        return {
+            "speed":      speed,
+            "target":     getattr(self.motor_handler, "target", speed),
+            "mode":       self.config.motor.motor_mode,
+            "user_speed": self.config.motor.motor_user_speed,
+        }
+
+    def _post_motor(self, payload: dict) -> dict:
+        if self.motor_handler is None:
+            raise ApiError(404, "aucun moteur déclaré")
         try:
-            days = int(q["period_days"][0])
-            dur  = int(q["action_duration_seconds"][0])
+            speed = int(payload["speed"])
+        except (KeyError, TypeError, ValueError):
+            raise ApiError(422, "champ 'speed' (0..4) requis")
+        if not 0 <= speed <= 4:
+            raise ApiError(422, f"vitesse hors plage : {speed}")
 
-            c1 = self._config.cyclic1
-            c1.period_days             = days
-            c1.action_duration_seconds = dur
+        # on passe en manuel pour que la régulation ne reprenne pas la main
+        self.config_patcher.apply({
+            "Motor_Settings": {"motor_mode": "manual", "motor_user_speed": speed}
+        })
+        self.motor_handler.set_motor_speed(speed)
+        action(f"API → moteur vitesse {speed} (manual)")
+        return self._get_motor()
 
-            self._config.save()
-            info(f"CyclicTimer mis à jour → période {days} j, action {dur} s")
+    # ──────────────────────────────────────────────────────────
+    #  Configuration
+    # ──────────────────────────────────────────────────────────
+    def _get_config(self) -> dict:
+        return self.config.model_dump(by_alias=True)
 
-        except Exception as exc:
-            warning(f"CyclicTimer: paramètres invalides ({exc})")
+    def _get_config_section(self, section: str) -> dict:
+        data = self._get_config()
+        if section not in data:
+            raise ApiError(404, f"section inconnue : {section}")
+        return data[section]
 
-    @staticmethod
-    def _split_hhmm(txt: str) -> tuple[int, int]:
+    def _patch_config(self, payload: dict) -> dict:
+        try:
+            report = self.config_patcher.apply(payload)
+        except ConfigPatchError as exc:
+            raise ApiError(422, str(exc))
+        return report.to_dict()
+
+    # ──────────────────────────────────────────────────────────
+    #  Vues agrégées
+    # ──────────────────────────────────────────────────────────
+    def _timers(self) -> dict:
+        cfg = self.config
+        out = {}
+        for name, blk in (("dailytimer1", cfg.daily_timer1), ("dailytimer2", cfg.daily_timer2)):
+            out[name] = {
+                "enabled": blk.enabled,
+                "start":   f"{blk.start_hour:02d}:{blk.start_minute:02d}",
+                "stop":    f"{blk.stop_hour:02d}:{blk.stop_minute:02d}",
+            }
+        for name, blk in (("cyclic1", cfg.cyclic1), ("cyclic2", cfg.cyclic2)):
+            out[name] = blk.model_dump()
+        return out
+
+    def _get_snapshot(self) -> dict:
+        # pas d'horodatage « now » : le corps (donc l'ETag) ne change que si
+        # l'état change → les requêtes conditionnelles restent en 304
+        sensors = self.sensor_handler.snapshot()
+        return {
+            "ts":      max((s["ts"] for s in sensors.values() if s.get("ts")), default=None),
+            "sensors": sensors,
+            "devices": self.sensor_handler.device_health(),
+            "outlets": self._get_outlets(),
+            "motor":   self._get_motor(),
+            "heater":  {"enabled": self.config.heater_settings.enabled},
+            "timers":  self._timers(),
+        }
+
+    def _get_boot(self) -> dict:
+        if self.boot is None:
+            raise ApiError(404, "aucune séquence de boot enregistrée")
+        return self.boot.to_dict()
+
+    def _get_loop_diagnostics(self) -> dict:
+        if self.loop_monitor is None:
+            raise ApiError(404, "surveillance de la boucle désactivée (PHYTO_LOOP_MONITOR=0)")
+        return self.loop_monitor.to_dict()
+
+    def _get_pulse_diagnostics(self) -> dict:
+        if self.pulses is None:
+            raise ApiError(404, "trains d'impulsions indisponibles")
+        return self.pulses.to_dict()
+
+    def _get_devices(self) -> dict:
+        if self.discovery is None:
+            raise ApiError(404, "découverte des capteurs désactivée (PHYTO_DISCOVERY_S=0)")
+        return self.discovery.to_dict()
+
+    def _get_zones(self) -> dict:
+        if self.zones is None:
+            raise ApiError(404, "zones climatiques indisponibles")
+        return self.zones.to_dict()
+
+    def _require_memory(self):
+        if self.memory is None:
+            raise ApiError(404, "télémétrie mémoire indisponible")
+        return self.memory
+
+    def _get_memory_diagnostics(self) -> dict:
+        return self._require_memory().to_dict()
+
+    def _post_memory(self, op: str, payload: dict) -> dict:
         """
-        Convertit 'hh:mm' ou 'hh%3Amm' en (h, m), lève ValueError sinon.
+        trace_start : démarre tracemalloc, instantané de référence
+        trace_diff  : allocations par ligne depuis la référence
+        trace_stop  : arrête tracemalloc (libère sa mémoire)
+        count       : recompte tout de suite les objets surveillés
         """
-        txt = txt.replace("%3A", ":")
-        m = re.fullmatch(r"(\d{1,2}):(\d{1,2})", txt)
-        if not m:
-            raise ValueError("HH:MM attendu")
-        h, mn = map(int, m.groups())
-        if not (0 <= h < 24 and 0 <= mn < 60):
-            raise ValueError("plage horaire invalide")
-        return h, mn
+        mem = self._require_memory()
+        try:
+            if op == "trace_start":
+                return mem.trace_start(int(payload.get("frames", 1)))
+            if op == "trace_diff":
+                return mem.trace_diff(int(payload.get("top", 20)), bool(payload.get("rebase", False)))
+            if op == "trace_stop":
+                return mem.trace_stop()
+            return mem.refresh_objects()
+        except (TypeError, ValueError) as exc:
+            raise ApiError(422, str(exc))
+        except RuntimeError as exc:
+            raise ApiError(409, str(exc))
 
     # ──────────────────────────────────────────────────────────
-    # GÉNÉRATION JSON
+    #  Tâches supervisées
     # ──────────────────────────────────────────────────────────
-    def _temperature_json(self) -> dict:
-        data: dict[str, float] = {}
-        if self._sensors.bme:
-            data["BME280"] = self._sensors.bme.get_bme_temp()
-        if self._sensors.ds18:
-            for idx in (1, 2, 3):
-                data[f"DS18B#{idx}"] = self._sensors.ds18.get_ds18_temp(idx)
-        return data
+    def _require_supervisor(self):
+        if self.supervisor is None:
+            raise ApiError(404, "aucun superviseur de tâches")
+        return self.supervisor
 
-    def _hygrometry_json(self) -> dict:
-        return (
-            {"BME280H": self._sensors.bme.get_bme_hygro()}
-            if self._sensors.bme else {}
-        )
+    def _get_tasks(self) -> dict:
+        return self._require_supervisor().to_dict()
 
-    def _pressure_json(self) -> dict:
-        return (
-            {"BME280P": self._sensors.bme.get_bme_pressure()}
-            if self._sensors.bme else {}
-        )
-
-    def _system_state_json(self) -> dict:
+    def _post_task(self, name: str, op: str, payload: dict) -> dict:
         """
-        Expose l'état système, y compris les réglages du CyclicTimer refactoré.
+        restart : annule puis relance tout de suite (sans délai)
+        freeze  : arrête la tâche et l'exclut du bilan du watchdog
+        resume  : relance une tâche gelée
         """
-        st  = self._controller_state
-        cfg = self._config.cyclic1
-
-        # Base du payload pour le cyclic
-        cyc: dict[str, int | str] = {
-            "mode":                     cfg.mode,
-            "period_days":              cfg.period_days,
-            "action_duration_seconds":  cfg.action_duration_seconds,
-        }
-        # Si mode "séquentiel", on ajoute les temps on/off
-        if cfg.mode == "séquentiel":
-            cyc.update({
-                "on_time_day":    cfg.on_time_day,
-                "off_time_day":   cfg.off_time_day,
-                "on_time_night":  cfg.on_time_night,
-                "off_time_night": cfg.off_time_night,
-            })
+        sup = self._require_supervisor()
+        try:
+            state = getattr(sup, op)(name)
+        except UnknownTask as exc:
+            raise ApiError(404, str(exc))
+        except SupervisorError as exc:
+            raise ApiError(409, str(exc))
+        action(f"API → tâche {name} : {op}")
+        return state
 
+    def _get_status(self) -> dict:
+        cs = self.controller_status
         return {
-            "component_state": st.get_component_state(),
-            "motor_speed"    : st.get_motor_speed(),
-            "dailytimer1"    : {
-                "start": st.get_dailytimer_current_start_time(),
-                "stop" : st.get_dailytimer_current_stop_time(),
+            "component_state": cs.get_component_state(),
+            "motor_speed":     self.motor_handler.speed if self.motor_handler else None,
+            "dailytimer1": {
+                "start": cs.get_dailytimer_current_start_time(),
+                "stop":  cs.get_dailytimer_current_stop_time(),
             },
-            "cyclic1"        : cyc,
+            "cyclic1": self.config.cyclic1.model_dump(),
         }
 
-    # ──────────────────────────────────────────────────────────
-    # HTTP / JSON HELPERS
-    # ──────────────────────────────────────────────────────────
-    async def _send_json(self, payload: dict | None):
-        body = json.dumps(payload or {}, indent=2).encode("utf-8")
-        headers = (
-            "HTTP/1.1 200 OK\r\n"
-            "Content-Type: application/json\r\n"
-            f"Content-Length: {len(body)}\r\n"
-            "Connection: close\r\n\r\n"
-        ).encode("utf-8")
-        self._writer.write(headers + body)
-        await self._writer.drain()
-
-    async def _http_error(self, code: int, msg: str):
-        body = f"{code} {msg}".encode("utf-8")
-        headers = (
-            f"HTTP/1.1 {code} {msg}\r\n"
-            f"Content-Length: {len(body)}\r\n\r\n"
-        ).encode("utf-8")
-        self._writer.write(headers + body)
-        await self._writer.drain()
-        error(f"API → {code} {msg}")
+
+def status_line(code: int) -> str:
+    """« 200 OK », « 304 Not Modified »… pour la ligne de statut HTTP."""
+    return f"{code} {_STATUS_TEXT.get(code, 'Internal Server Error' if code >= 500 else '')}".strip()
@@ -1,36 +1,59 @@
 # network/web/influx_handler.py
 
+from __future__ import annotations
+
 import asyncio
-import gc
+import time
+from typing import TYPE_CHECKING
 from urllib.parse import urlencode
 
-import requests
-
+from utils.metrics import counter, histogram
 from utils.pretty_console import info, warning, error
-from param.config import AppConfig
-from controllers.SensorController import SensorController
+
+if TYPE_CHECKING:                       # imports lourds : typage seulement
+    from param.config import AppConfig
+    from controllers.SensorController import SensorController
+
+_POST_SECONDS = histogram("phyto_influx_post_seconds", "Durée des POST InfluxDB")
+_POST_BYTES = counter("phyto_influx_bytes_total", "Octets de line protocol envoyés à InfluxDB")
+_POST_FAILURES = counter("phyto_influx_failures_total", "POST InfluxDB en échec", ("reason",))
 
 # Variables globales pouvant être mises à jour dynamiquement
 _params = None
 _sensor_handler = None
 _query_base = ""
 
-def reload_sensor_handler(config: AppConfig) -> None:
+def reload_endpoint(config: AppConfig) -> None:
     """
-    Recharge dynamiquement le SensorController et l'endpoint Influx.
+    Recalcule uniquement l'URL d'écriture Influx (Network_Settings).
     """
-    global _params, _sensor_handler, _query_base
+    global _params, _query_base
     _params = config
-    _sensor_handler = SensorController(_params)
     _query_base = f"http://{_params.network.host_machine_address}:{_params.network.influx_db_port}/write?" + urlencode({
         "db": _params.network.influx_db_name,
         "u": _params.network.influx_db_user,
         "p": _params.network.influx_db_password,
     })
-    info(f"[Influx] Handler rechargé avec mesures : {_sensor_handler.sensor_dict.keys()}")
+    info(f"[Influx] Endpoint → {_params.network.host_machine_address}:{_params.network.influx_db_port}/{_params.network.influx_db_name}")
 
-# Initialisation
-reload_sensor_handler(AppConfig.load())
+def bind_sensor_handler(sensor_handler: SensorController) -> None:
+    """
+    Utilise le SensorController partagé de l'application (pas de second
+    accès au bus). Ses reconfigurations sont donc vues sans rechargement.
+    """
+    global _sensor_handler
+    _sensor_handler = sensor_handler
+
+# Pas d'initialisation à l'import : l'application appelle reload_endpoint()
+# et bind_sensor_handler(). Jamais de SensorController construit ici : un
+# second contrôleur doublerait les accès au bus et son état (filtres,
+# disjoncteurs, fusion) divergerait de celui, patché, de l'application.
+def _ensure_ready() -> None:
+    if _sensor_handler is None:
+        raise RuntimeError("[Influx] aucun SensorController lié : appeler bind_sensor_handler()")
+    if _params is None:
+        from param.config import AppConfig
+        reload_endpoint(AppConfig.load())
 
 def _escape_field_key(key: str) -> str:
     return key.replace(" ", r"\ ").replace(",", r"\,").replace("=", r"\=")
@@ -48,22 +71,32 @@ def _send_grouped_point(measurement: str, values: dict[str, float]) -> None:
     payload = f"{measurement} {','.join(field_parts)}"
     info(f"[{measurement}] → {', '.join(field_parts)}")
 
+    import requests                     # ~100 ms d'import : différé au 1er envoi
+    data = payload.encode("utf-8")
+    t0 = time.perf_counter()
     try:
-        r = requests.post(_query_base, data=payload, timeout=4)
+        r = requests.post(_query_base, data=data, timeout=4)
         if r.status_code != 204:
+            _POST_FAILURES.labels("http").inc()
             warning(f"InfluxDB HTTP {r.status_code}: {r.text.strip()}")
+        else:
+            _POST_BYTES.inc(len(data))
     except requests.RequestException as exc:
+        _POST_FAILURES.labels("network").inc()
         error(f"POST InfluxDB : {exc}")
+    finally:
+        _POST_SECONDS.observe(time.perf_counter() - t0)
 
 async def write_sensor_values(period: int = 60) -> None:
+    _ensure_ready()
     info(f"▶️ Boucle de collecte démarrée (intervalle : {period}s)")
     while True:
-        for measurement, sensors in _sensor_handler.sensor_dict.items():
-            sensor_values = {}
-            for sensor_name in sensors:
-                val = _sensor_handler.get_sensor_value(sensor_name)
-                sensor_values[sensor_name] = val
-            _send_grouped_point(measurement, sensor_values)
-
-        gc.collect()
+        # une lecture groupée (par bus / canal de mux), hors de la boucle si
+        # le passage dépasse INLINE_BUDGET_MS, puis un point par measurement
+        sensor_dict = _sensor_handler.sensor_dict
+        values = await _sensor_handler.read_all_async([k for keys in sensor_dict.values() for k in keys])
+        for measurement, sensors in sensor_dict.items():
+            _send_grouped_point(measurement, {name: values.get(name) for name in sensors})
+
+        # pas de gc.collect() ici : le GC générationnel suffit (utils/memory.py)
         await asyncio.sleep(period)
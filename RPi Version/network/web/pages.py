@@ -2,20 +2,46 @@
 # Author: Progradius
 # License: AGPL-3.0
 
-from jinja2 import Environment, FileSystemLoader
-from param.config import AppConfig
-from typing import get_origin, get_args, Literal
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, get_origin, get_args, Literal
 from datetime import datetime
-import RPi.GPIO as GPIO
+from functools import lru_cache
 import os
 
-# Initialisation de Jinja2 (répertoire templates)
+if TYPE_CHECKING:
+    from param.config import AppConfig
+
+# Répertoire des templates ; l'environnement Jinja2 est créé au 1er rendu
 TEMPLATE_DIR = os.path.join(os.path.dirname(__file__), "templates")
-env = Environment(loader=FileSystemLoader(TEMPLATE_DIR))
+
+# Champs structurés (listes, dicts, modèles imbriqués) : hors du formulaire
+# /conf, édités via PATCH /api/v1/config. Rendus en texte, ils seraient
+# renvoyés sous forme de repr et feraient rejeter tout le formulaire.
+API_ONLY_FIELDS = frozenset({
+    "Sensor_Tree.devices",
+    "Zones.zones",
+    "Sensor_Filters.default", "Sensor_Filters.keys",
+    "Temperature_Fusion.sources",
+})
+
+
+@lru_cache(maxsize=1)
+def _env():
+    from jinja2 import Environment, FileSystemLoader
+    return Environment(loader=FileSystemLoader(TEMPLATE_DIR))
+
+
+def _gpio_state(pin: int) -> str:
+    try:
+        import RPi.GPIO as GPIO
+        return "On" if GPIO.input(pin) == GPIO.LOW else "Off"
+    except Exception:
+        return "—"
 
 
 def render_template(template_name: str, **context) -> str:
-    template = env.get_template(template_name)
+    template = _env().get_template(template_name)
     return template.render(**context)
 
 
@@ -61,11 +87,7 @@ def main_page(controller_status, sensor_handler, stats, config: AppConfig) -> st
     """
     Génère la page principale affichant l'état des composants et les statistiques.
     """
-    def gpio_state(pin: int) -> str:
-        try:
-            return "On" if GPIO.input(pin) == GPIO.LOW else "Off"
-        except:
-            return "—"
+    gpio_state = _gpio_state
 
     # Configuration des minuteurs journaliers
     dt1 = config.daily_timer1
@@ -86,6 +108,12 @@ def main_page(controller_status, sensor_handler, stats, config: AppConfig) -> st
                 f"Premier : {cyc.first_trigger_hour}h00<br>"
                 f"Durée : {cyc.action_duration_seconds}s"
             )
+        elif cyc.mode == "impulsions":
+            return (
+                "Mode : Impulsions<br>"
+                f"Jour - ON {cyc.pulse_on_ms_day} ms / OFF {cyc.pulse_off_ms_day} ms<br>"
+                f"Nuit - ON {cyc.pulse_on_ms_night} ms / OFF {cyc.pulse_off_ms_night} ms"
+            )
         else:
             return (
                 "Mode : Séquentiel<br>"
@@ -256,6 +284,15 @@ def conf_page(config: AppConfig) -> str:
                     "label": fld.alias or attr,
                     "input_html": _render_field(f"{alias}.{(fld.alias or attr)}", val, fld.annotation)
                 })
+            impulsions_fields = []
+            for attr in ("pulse_on_ms_day", "pulse_off_ms_day", "pulse_on_ms_night", "pulse_off_ms_night"):
+                fld = section_obj.__class__.model_fields[attr]
+                val = getattr(section_obj, attr)
+                impulsions_fields.append({
+                    "name": f"{alias}.{(fld.alias or attr)}",
+                    "label": fld.alias or attr,
+                    "input_html": _render_field(f"{alias}.{(fld.alias or attr)}", val, fld.annotation)
+                })
             sections.append({
                 "type": "cyclic",
                 "title": alias,
@@ -263,7 +300,8 @@ def conf_page(config: AppConfig) -> str:
                 "enabled": "enabled" if enabled_val else "disabled",
                 "mode": mode,
                 "journalier_fields": journalier_fields,
-                "sequentiel_fields": sequentiel_fields
+                "sequentiel_fields": sequentiel_fields,
+                "impulsions_fields": impulsions_fields
             })
             continue
 
@@ -291,12 +329,17 @@ def conf_page(config: AppConfig) -> str:
         # ---------------------------------------------------------------------
         fields = []
         for attr, fld in section_obj.model_fields.items():
+            name = f"{alias}.{(fld.alias or attr)}"
+            if name in API_ONLY_FIELDS:
+                continue
             val = getattr(section_obj, attr)
             fields.append({
-                "name": f"{alias}.{(fld.alias or attr)}",
+                "name": name,
                 "label": fld.alias or attr,
-                "input_html": _render_field(f"{alias}.{(fld.alias or attr)}", val, fld.annotation)
+                "input_html": _render_field(name, val, fld.annotation)
             })
+        if not fields:
+            continue
         sections.append({
             "type": "default",
             "title": alias,
@@ -307,11 +350,7 @@ def conf_page(config: AppConfig) -> str:
 
 
 def monitor_page(sensor_handler, stats, config: AppConfig, controller_status=None) -> str:
-    def gpio_state(pin: int) -> str:
-        try:
-            return "On" if GPIO.input(pin) == GPIO.LOW else "Off"
-        except:
-            return "—"
+    gpio_state = _gpio_state
 
     def fmt_d(dt: str) -> str:
         return datetime.fromisoformat(dt).strftime("%d/%m/%Y %H:%M:%S") if dt else "—"
@@ -334,13 +373,9 @@ def monitor_page(sensor_handler, stats, config: AppConfig, controller_status=Non
         speed = 0
     percent = int(speed / 4 * 100)
 
-    # Capteurs
-    units = {
-        "BME280T": "°C", "BME280H": "%", "BME280P": "hPa",
-        "DS18B#1": "°C", "DS18B#2": "°C", "DS18B#3": "°C",
-        "MLX-AMB": "°C", "MLX-OBJ": "°C",
-        "VL53-DIST": "mm", "HCSR-DIST": "cm", "TSL-LUX": "lx",
-    }
+    # Capteurs actifs, unités du registre des drivers
+    from sensor_handlers.registry import unit_of
+    units = {name: unit_of(name) for name in sensor_handler.enabled_keys()}
     sensors = {
         name: (f"{val:.1f}", unit) if isinstance(val := sensor_handler.get_sensor_value(name), (int, float))
         else ("—", unit)
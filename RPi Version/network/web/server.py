@@ -3,21 +3,23 @@
 # License: AGPL-3.0
 # -------------------------------------------------------------
 # Serveur HTTP ultra-léger basé sur asyncio, utilisant AppConfig
-# + PTY pour console ANSI → SSE avec historique & keep-alive
+# + bus de logs in-process → SSE avec historique & keep-alive
 # -------------------------------------------------------------
 
 from __future__ import annotations
 import asyncio
-import errno
 import json
 import os
-import pty
-import subprocess
+import time
 import urllib.parse
-from collections import deque
 
+from utils import metrics
 from utils.pretty_console import success, warning, error, action, info
+from utils.log_bus import log_bus
+from utils.profiler import DebugProbe, ProfilerBusy, default_hz
+from network.web.api_handler import API, API_PREFIX, status_line
 from network.web.pages import (
+    API_ONLY_FIELDS,
     main_page,
     conf_page,
     monitor_page,
@@ -25,12 +27,17 @@ from network.web.pages import (
 )
 from model.SensorStats import SensorStats
 from param.config import AppConfig
-from controllers.SensorController import SensorController
-from network.web import influx_handler
+from param.config_patch import ConfigPatcher, ConfigPatchError
 
-# Chemin vers votre script main.py
-BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
-MAIN_PY = os.path.join(BASE_DIR, "main.py")
+_HTTP_SECONDS = metrics.histogram("phyto_http_request_seconds", "Durée de traitement HTTP par route", ("route",))
+_HTTP_REQUESTS = metrics.counter("phyto_http_requests_total", "Requêtes HTTP par route et code", ("route", "code"))
+_HTTP_ABORTED = metrics.counter("phyto_http_aborted_total", "Connexions HTTP interrompues (exception)")
+
+_ROUTES = {"/", "/conf", "/monitor", "/console", "/console/stream", "/status", "/metrics",
+           "/debug/profile", "/debug/tasks"}
+
+# bornes de /debug/profile (mémoire et durée maîtrisées en production)
+PROFILE_MAX_SECONDS = 300
 
 
 class Server:
@@ -39,8 +46,13 @@ class Server:
         GET,POST /conf         → Configuration
         GET  /monitor          → Monitored Values
         GET  /console          → Console (xterm.js + SSE)
-        GET  /console/stream   → Flux SSE des logs ANSI (historique + live)
+        GET  /console/stream   → Flux SSE des logs (ANSI, ou JSON via ?format=json)
         GET  /status           → JSON status
+        GET  /metrics          → Métriques (format texte Prometheus)
+        GET  /debug/profile    → Profil échantillonné : ?seconds=10&hz=100&top=25
+                                 &format=json|collapsed (&process=control|web)
+        GET  /debug/tasks      → Tâches asyncio et leur point d'attente
+        *    /api/v1/...       → API REST JSON (cf. network.web.api_handler)
     """
 
     def __init__(
@@ -50,38 +62,67 @@ class Server:
         config: AppConfig,
         host: str = "0.0.0.0",
         port: int = 8123,
+        *,
+        outlets: dict | None = None,
+        motor_handler=None,
+        config_patcher: ConfigPatcher | None = None,
+        boot=None,
+        loop_monitor=None,
+        supervisor=None,
+        memory=None,
+        discovery=None,
+        zones=None,
+        pulses=None,
+        metrics_render=None,
+        debug_remote=None,
     ):
         self.controller_status = controller_status
         self.sensor_handler = sensor_handler
         self.config = config
         self.host = host
         self.port = port
+        # mode multi-processus : rendu agrégé de tous les processus
+        self.render_metrics = metrics_render or metrics.render
+        # /debug : ce processus, ou le contrôle en mode multi-processus
+        self.debug_local = DebugProbe()
+        self.debug_remote = debug_remote
 
         # Min/max stats
         self.stats = SensorStats()
         setattr(self.sensor_handler, "stats", self.stats)
 
-        # pour lister les clients SSE
-        self._console_queues: list[asyncio.Queue[str]] = []
-        # pour stocker les dernières lignes (taille max configurable)
-        self._console_history = deque(maxlen=1000)
+        # Patchs de config validés + rechargement ciblé
+        if config_patcher is None:
+            config_patcher = ConfigPatcher(config)
+            config_patcher.subscribe(
+                "sensors", lambda cfg, _: self.sensor_handler.reconfigure(cfg)
+            )
+        self.config_patcher = config_patcher
+
+        # API REST /api/v1 (servie depuis le cache)
+        self.api = API(
+            controller_status,
+            sensor_handler,
+            config,
+            outlets=outlets,
+            motor_handler=motor_handler,
+            config_patcher=config_patcher,
+            boot=boot,
+            loop_monitor=loop_monitor,
+            supervisor=supervisor,
+            memory=memory,
+            discovery=discovery,
+            zones=zones,
+            pulses=pulses,
+        )
 
     async def run(self) -> None:
         """
-        En mode normal (développement / lancé à la main) → on ouvre un PTY,
-        on lance main.py et on broadcast les logs.
-        En mode service (systemd) → on ne lance PAS un second main.py.
+        Démarre le serveur HTTP. La console web lit directement le bus de
+        logs in-process (utils.log_bus) : aucun sous-processus, quel que
+        soit PHYTO_RUN_MODE.
         On tolère le cas où le port est déjà pris (par un autre process).
         """
-        run_mode = os.getenv("PHYTO_RUN_MODE", "").lower()
-
-        # démarre la tâche PTY → broadcast seulement si on n'est pas en mode service
-        if run_mode != "service":
-            asyncio.create_task(self._spawn_pty_and_broadcast())
-        else:
-            info("Mode service détecté → pas de PTY ni de sous-processus main.py")
-
-        # démarre le serveur HTTP
         try:
             srv = await asyncio.start_server(self._handle, self.host, self.port)
         except OSError as e:
@@ -100,63 +141,47 @@ class Server:
         async with srv:
             await srv.serve_forever()
 
-    async def _spawn_pty_and_broadcast(self) -> None:
-        """Ouvre un PTY, lance main.py et diffuse chaque ligne ANSI.
-
-        ATTENTION : ne doit pas être appelé en mode service/systemd, sinon on se
-        retrouve avec un main.py qui lance un main.py.
-        """
-        # double protection au cas où
-        if os.getenv("PHYTO_RUN_MODE", "").lower() == "service":
-            info("Mode service -> _spawn_pty_and_broadcast() ignoré.")
-            return
-
-        master_fd, slave_fd = pty.openpty()
-        proc = subprocess.Popen(
-            ["python3", "-u", MAIN_PY],
-            cwd=BASE_DIR,
-            stdin=slave_fd,
-            stdout=slave_fd,
-            stderr=slave_fd,
-            close_fds=True,
-            env={**os.environ, "PYTHONUNBUFFERED": "1"},
-        )
-        os.close(slave_fd)
-
-        loop = asyncio.get_event_loop()
-        reader = os.fdopen(master_fd, "rb", buffering=0)
-        buf = b""
-        try:
-            while True:
-                chunk = await loop.run_in_executor(None, reader.read, 1024)
-                if not chunk:
-                    break  # EOF
-                buf += chunk
-                while b"\n" in buf:
-                    line, buf = buf.split(b"\n", 1)
-                    text = line.decode("utf-8", errors="ignore")
-                    # on stocke dans l'historique
-                    self._console_history.append(text)
-                    # on broadcast à tous les clients
-                    for q in list(self._console_queues):
-                        await q.put(text)
-        except OSError as e:
-            if e.errno == errno.EIO:
-                info("PTY EOF détecté, arrêt du broadcast console")
-            else:
-                error(f"PTY broadcast erreur inattendue: {e!r}")
-        except Exception as e:
-            error(f"PTY broadcast erreur: {e!r}")
-        finally:
-            reader.close()
-            proc.terminate()
-            proc.wait()
+    @staticmethod
+    def _sse_event(rec, as_json: bool) -> bytes:
+        """Formate un LogRecord en évènement SSE (une ligne data: par ligne)."""
+        payload = json.dumps(rec.to_dict(), ensure_ascii=False) if as_json else rec.ansi
+        lines = "".join(f"data: {l}\n" for l in payload.split("\n"))
+        return f"{lines}\n".encode("utf-8")
+
+    @staticmethod
+    def _route_of(path: str) -> str:
+        """Label de route borné (pas de cardinalité libre dans /metrics)."""
+        path = path.split("?", 1)[0]
+        if path == API_PREFIX or path.startswith(API_PREFIX + "/"):
+            return API_PREFIX
+        if path.startswith("/static/"):
+            return "/static"
+        if path == "/index.html":
+            return "/"
+        return path if path in _ROUTES else "other"
 
     async def _handle(
         self,
         reader: asyncio.StreamReader,
         writer: asyncio.StreamWriter,
     ) -> None:
+        t0 = time.perf_counter()
+        try:
+            route, code = await self._serve(reader, writer)
+        except Exception:
+            _HTTP_ABORTED.inc()
+            raise
+        # flux SSE : durée = vie de la connexion, on ne compte que la requête
+        if route != "/console/stream":
+            _HTTP_SECONDS.labels(route).observe(time.perf_counter() - t0)
+        _HTTP_REQUESTS.labels(route, code).inc()
+
+    async def _serve(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+    ) -> tuple[str, int]:
+        """Traite une requête ; renvoie (route, code HTTP) pour les métriques."""
         # --- Request line & headers ---
         line = await reader.readline()
         try:
@@ -164,7 +189,7 @@ class Server:
         except ValueError:
             error("Requête malformée détectée")
             writer.close()
-            return
+            return "malformed", 400
 
         headers = {}
         while True:
@@ -176,11 +201,23 @@ class Server:
 
         action(f"{method} {path}")
 
-        # POST parsing
-        posted = {}
-        if method == "POST":
+        # corps de requête (POST / PATCH)
+        raw = b""
+        if method in ("POST", "PATCH", "PUT"):
             l = int(headers.get("content-length", "0"))
             raw = await reader.readexactly(l) if l else b""
+
+        # --- API REST ---
+        if path == API_PREFIX or path.startswith(API_PREFIX + "/"):
+            code, hdrs, body = self.api.dispatch(method, path, headers, raw)
+            self._write_response(writer, status_line(code), body, hdrs)
+            await writer.drain()
+            writer.close()
+            return API_PREFIX, code
+
+        # formulaires HTML (POST urlencoded)
+        posted = {}
+        if method == "POST":
             posted = urllib.parse.parse_qs(raw.decode(), keep_blank_values=True)
 
         # --- ROUTING ---
@@ -265,6 +302,9 @@ class Server:
             )
 
         elif method == "GET" and path.startswith("/console/stream"):
+            qs = urllib.parse.parse_qs(urllib.parse.urlparse(path).query)
+            as_json = qs.get("format", [""])[0] == "json"
+
             # SSE headers
             writer.write(
                 b"HTTP/1.1 200 OK\r\n"
@@ -272,32 +312,31 @@ class Server:
                 b"Cache-Control: no-cache\r\n"
                 b"Connection: keep-alive\r\n\r\n"
             )
-            await writer.drain()
-
-            # nouveau client
-            queue = asyncio.Queue()
-            self._console_queues.append(queue)
-            # on lui envoie en backlog tout l'historique
-            for past in self._console_history:
-                writer.write(f"data: {past}\n\n".encode("utf-8"))
-            await writer.drain()
 
+            # nouveau client : abonnement AVANT l'envoi de l'historique
+            queue = log_bus.subscribe()
             try:
+                for past in log_bus.history():
+                    writer.write(self._sse_event(past, as_json))
+                await writer.drain()
+
                 while True:
                     try:
-                        line = await asyncio.wait_for(queue.get(), timeout=15.0)
-                        msg = f"data: {line}\n\n"
+                        rec = await asyncio.wait_for(queue.get(), timeout=15.0)
+                        msg = self._sse_event(rec, as_json)
                     except asyncio.TimeoutError:
                         # keep-alive comment
-                        msg = ": keep-alive\n\n"
-                    writer.write(msg.encode("utf-8"))
+                        msg = b": keep-alive\n\n"
+                    writer.write(msg)
                     await writer.drain()
+            except ConnectionError:
+                pass
             except Exception as e:
                 error(f"SSE console erreur: {e!r}")
             finally:
-                self._console_queues.remove(queue)
+                log_bus.unsubscribe(queue)
                 writer.close()
-            return
+            return "/console/stream", 200
 
         elif method == "GET" and path.startswith("/status"):
             cs = self.controller_status
@@ -321,117 +360,113 @@ class Server:
                 "200 OK",
             )
 
+        elif method == "GET" and path.split("?", 1)[0] == "/metrics":
+            # valeurs déjà en mémoire : aucun accès matériel au scrape
+            body, ctype, status = (
+                self.render_metrics().encode("utf-8"),
+                metrics.CONTENT_TYPE,
+                "200 OK",
+            )
+
+        elif method == "GET" and path.split("?", 1)[0] in ("/debug/profile", "/debug/tasks"):
+            body, ctype, status = await self._debug(path)
+
         else:
             body, ctype, status = b"Not found", "text/plain", "404 Not Found"
 
         # réponse standard
+        self._write_response(writer, status, body, {"Content-Type": ctype})
+        await writer.drain()
+        writer.close()
+        return self._route_of(path), int(status.split(" ", 1)[0])
+
+    async def _debug(self, path: str) -> tuple[bytes, str, str]:
+        """/debug/profile et /debug/tasks → (corps, content-type, statut)."""
+        url = urllib.parse.urlparse(path)
+        qs = urllib.parse.parse_qs(url.query)
+
+        def _arg(name: str, default, cast=int):
+            try:
+                return cast(qs.get(name, [default])[0])
+            except ValueError:
+                return default
+
+        target = _arg("process", "control" if self.debug_remote else "local", str)
+        probe = self.debug_remote if target == "control" and self.debug_remote else self.debug_local
+
+        def _json(obj, status: str = "200 OK") -> tuple[bytes, str, str]:
+            return json.dumps(obj, ensure_ascii=False).encode("utf-8"), "application/json", status
+
+        try:
+            if url.path == "/debug/tasks":
+                return _json({"tasks": probe.tasks()})
+
+            seconds = max(0.1, min(PROFILE_MAX_SECONDS, _arg("seconds", 10, float)))
+            hz = probe.profile_start(_arg("hz", default_hz()))
+            info(f"Profil {seconds:g} s à {hz} Hz démarré")
+            try:
+                await asyncio.sleep(seconds)
+            finally:
+                report = probe.profile_stop(max(1, _arg("top", 25)))
+        except ProfilerBusy as exc:
+            return _json({"error": str(exc)}, "409 Conflict")
+        except ConnectionError as exc:
+            return _json({"error": str(exc)}, "503 Service Unavailable")
+
+        if _arg("format", "json", str) == "collapsed":
+            return report["collapsed"].encode("utf-8"), "text/plain; charset=utf-8", "200 OK"
+        return _json(report)
+
+    @staticmethod
+    def _write_response(
+        writer: asyncio.StreamWriter,
+        status: str,
+        body: bytes,
+        headers: dict[str, str],
+    ) -> None:
+        head = "".join(f"{k}: {v}\r\n" for k, v in headers.items())
         writer.write(
             f"HTTP/1.1 {status}\r\n"
-            f"Content-Type: {ctype}\r\n"
+            f"{head}"
             f"Content-Length: {len(body)}\r\n"
             "Connection: close\r\n\r\n".encode("utf-8")
             + body
         )
-        await writer.drain()
-        writer.close()
 
     def _apply_conf_changes(self, posted: dict[str, list[str]]) -> None:
-        """ Mise à jour partielle de la config via POST (clé alias → champ). """
+        """
+        Formulaire /conf (clés « Section.champ ») → patch validé par section,
+        puis rechargement des seuls sous-systèmes concernés.
+        """
         if not posted:
             return
 
-        alias2field = {
-            fi.alias: name
-            for name, fi in self.config.model_fields.items()
-            if fi.alias
-        }
-
+        patch: dict[str, dict] = {}
         for alias, vals in posted.items():
             if alias.endswith("_switch"):
                 # champs radio "visuels" → ignorés
                 continue
-
-            raw = vals[0]
-
-            # ------------------------------------------------------------------
-            # Cas imbriqué : ex. DailyTimer1_Settings.enabled
-            # ------------------------------------------------------------------
-            if "." in alias:
-                top, nest = alias.split(".", 1)
-
-                # on retrouve le vrai nom du champ dans AppConfig
-                if top not in alias2field:
-                    warning(f"Ignoré alias «{top}»")
-                    continue
-
-                mdl = getattr(self.config, alias2field[top])
-
-                # champ connu dans le modèle ?
-                fld = mdl.__class__.model_fields.get(nest)
-
-                if fld:
-                    ann = fld.annotation
-                    val = (
-                        raw.lower() in ("1", "true", "enabled", "yes")
-                        if ann is bool
-                        else int(raw)
-                        if ann is int
-                        else float(raw)
-                        if ann is float
-                        else raw
-                    )
-                    setattr(mdl, nest, val)
-                    success(f"{alias} ← {raw}")
-                    continue
-
-                # ------------------------------------------------------------------
-                # Champ non défini dans le modèle (ex. .enabled pour Daily/Cyclic)
-                # ------------------------------------------------------------------
-                if top.startswith("DailyTimer") and nest == "enabled":
-                    val = raw.lower() in ("1", "true", "enabled", "yes")
-                    setattr(mdl, "enabled", val)
-                    success(f"{alias} (custom) ← {val}")
-                    continue
-
-                if top.startswith("Cyclic") and nest == "enabled":
-                    val = raw.lower() in ("1", "true", "enabled", "yes")
-                    setattr(mdl, "enabled", val)
-                    success(f"{alias} (custom) ← {val}")
-                    continue
-
-                warning(f"Ignoré champ imbriqué «{nest}» sur «{top}»")
+            if alias in API_ONLY_FIELDS:
+                # structuré : jamais modifié par le formulaire (API seulement)
                 continue
-
-            # ------------------------------------------------------------------
-            # Cas non imbriqué : ex. Heater_Settings, Motor_Settings
-            # ------------------------------------------------------------------
-            if alias not in alias2field:
+            if "." not in alias:
                 warning(f"Ignoré alias «{alias}»")
                 continue
+            top, nest = alias.split(".", 1)
+            patch.setdefault(top, {})[nest] = vals[0]
 
-            fldinfo = self.config.model_fields[alias2field[alias]]
-            ann = fldinfo.annotation
-            val = (
-                raw.lower() in ("1", "true", "enabled", "yes")
-                if ann is bool
-                else int(raw)
-                if ann is int
-                else float(raw)
-                if ann is float
-                else raw
-            )
-            setattr(self.config, alias2field[alias], val)
-            success(f"{alias} ← {raw}")
-
-        # ----------------------------------------------------------------------
-        # Sauvegarde + ré-init capteurs
-        # ----------------------------------------------------------------------
-        self.config.save()
-        info("Configuration sauvegardée")
+        try:
+            report = self.config_patcher.apply(patch)
+        except ConfigPatchError as exc:
+            error(f"Configuration rejetée : {exc}")
+            return
+        except ConnectionError as exc:
+            error(f"Configuration non appliquée : {exc}")
+            return
 
-        # recharger les capteurs avec la nouvelle config
-        self.sensor_handler = SensorController(self.config)
-        setattr(self.sensor_handler, "stats", self.stats)
-        self.sensor_handler.sensor_dict = self.sensor_handler._build_sensor_dict()
-        influx_handler.reload_sensor_handler(self.config)
-        success("Nouvelle configuration appliquée")
+        if report.changed:
+            reloaded = ", ".join(f"{k} {v} ms" for k, v in report.reloaded.items()) or "aucun"
+            success(
+                f"Nouvelle configuration appliquée ({len(report.changed)} champ(s), "
+                f"rechargé : {reloaded}, total {report.total_ms} ms)"
+            )
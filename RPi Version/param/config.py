@@ -5,7 +5,7 @@
 from __future__ import annotations
 import json
 from pathlib import Path
-from typing import ClassVar, Literal
+from typing import ClassVar, Dict, List, Literal, Optional
 
 from pydantic import BaseModel, Field, validator
 
@@ -31,14 +31,17 @@ class DailyTimerSettings(BaseModel):
 
 class CyclicSettings(BaseModel):
     """
-    Deux modes :
+    Trois modes :
       • **journalier**  : *triggers_per_day* activations chaque *period_days* (jour sur N)
       • **séquentiel**  : alternance ON/OFF jour-nuit avec des durées distinctes
+      • **impulsions**  : train ON/OFF en millisecondes, jour-nuit, cadencé par
+                          un thread dédié (controllers/PulseTrain.py) ;
+                          ``pulse_on_ms_* = 0`` → pas d'impulsion dans la phase
     """
     # nouveau : activable/désactivable
     enabled: bool = Field(True, alias="enabled")
 
-    mode: Literal["journalier", "séquentiel"] = Field("journalier", alias="mode")
+    mode: Literal["journalier", "séquentiel", "impulsions"] = Field("journalier", alias="mode")
 
     # —— mode « journalier » ——
     period_days: int  = Field(1,  alias="period_days", ge=1, description="1 = tous les jours, 2 = 1 jour / 2 …")
@@ -52,6 +55,12 @@ class CyclicSettings(BaseModel):
     on_time_night: int = Field(0, alias="on_time_night")
     off_time_night:int = Field(0, alias="off_time_night")
 
+    # —— mode « impulsions » (ms) ——
+    pulse_on_ms_day:    int = Field(800,   alias="pulse_on_ms_day",    ge=0, le=3_600_000)
+    pulse_off_ms_day:   int = Field(30000, alias="pulse_off_ms_day",   ge=1, le=86_400_000)
+    pulse_on_ms_night:  int = Field(0,     alias="pulse_on_ms_night",  ge=0, le=3_600_000)
+    pulse_off_ms_night: int = Field(30000, alias="pulse_off_ms_night", ge=1, le=86_400_000)
+
     @validator("enabled", pre=True)
     def _parse_enabled(cls, v):
         return str(v).lower() in ("enabled", "true", "1", "yes")
@@ -100,6 +109,8 @@ class MotorSettings(BaseModel):
     hysteresis: float
     min_speed: int
     max_speed: int
+    dead_time_ms: int = Field(50, ge=0, le=5000)       # tout OFF → nouvelle pin (break-before-make)
+    min_hold_s: float = Field(5.0, ge=0)                # vitesse tenue au moins (contacts des relais)
 
 
 class LifePeriod(BaseModel):
@@ -130,6 +141,207 @@ class SensorState(BaseModel):
         return str(v).lower() in ("enabled", "true", "1", "yes")
 
 
+def _parse_address(v):
+    # JSON n'a pas de littéral hexadécimal : "0x76" accepté
+    if isinstance(v, str):
+        return int(v, 0)
+    return v
+
+
+class SensorDevice(BaseModel):
+    """
+    Un capteur de l'arbre I²C : ``bus`` → [``mux`` TCA9548A, ``channel``] →
+    ``address``. Ses clés sont celles du type de capteur suffixées du nom
+    logique : BME280T@etagere1, BME280H@etagere1…
+    """
+    name: str = Field(..., pattern=r"^[A-Za-z0-9_-]{1,24}$")
+    driver: str                  # type du registre des drivers (sensor_handlers/registry)
+    bus: int = Field(1, ge=0)
+    mux: Optional[int] = Field(None, ge=0x70, le=0x77)
+    channel: Optional[int] = Field(None, ge=0, le=7)
+    address: Optional[int] = Field(None, ge=0x03, le=0x77)
+    enabled: bool = True
+
+    @validator("driver")
+    def _known_driver(cls, v):
+        from sensor_handlers import registry
+        if v not in registry.tree_kinds():
+            raise ValueError(f"type inconnu : {v} (connus : {', '.join(registry.tree_kinds())})")
+        return v
+
+    @validator("mux", "address", pre=True)
+    def _parse_hex(cls, v):
+        return _parse_address(v)
+
+    @validator("address")
+    def _fixed_address(cls, v, values):
+        # adresse figée par la puce : plusieurs exemplaires → un canal de mux chacun
+        from sensor_handlers import registry
+        spec = registry.by_kind(values.get("driver") or "")
+        if v is not None and spec is not None and spec.fixed_address and v != spec.address:
+            raise ValueError(f"adresse figée à 0x{spec.address:02X} pour {spec.kind} : utiliser un canal de multiplexeur")
+        return v
+
+    @validator("channel", always=True)
+    def _channel_with_mux(cls, v, values):
+        if (v is None) != (values.get("mux") is None):
+            raise ValueError("mux et channel vont ensemble")
+        return v
+
+    @validator("enabled", pre=True)
+    def _parse_enabled(cls, v):
+        return str(v).lower() in ("enabled", "true", "1", "yes")
+
+
+class SensorTreeSettings(BaseModel):
+    """Capteurs multiples (racks) en plus des capteurs uniques de Sensor_State."""
+    devices: List[SensorDevice] = Field(default_factory=list)
+
+    @validator("devices")
+    def _unique(cls, v):
+        names = [d.name for d in v]
+        dup = {n for n in names if names.count(n) > 1}
+        if dup:
+            raise ValueError(f"nom(s) en double : {', '.join(sorted(dup))}")
+        return v
+
+
+class FilterSettings(BaseModel):
+    """Filtre d'une clé capteur (controllers/SensorFilter), étapes dans l'ordre."""
+    hampel_window: int = Field(5, ge=0, le=31)          # échantillons ; 0 = pas de Hampel
+    hampel_k: float = Field(3.0, gt=0)                  # seuil en MAD normalisés
+    hampel_floor: float = Field(0.5, ge=0)              # écart toujours admis (série quantifiée, MAD = 0)
+    max_rate: Optional[float] = Field(None, gt=0)       # unités / s ; None = pas de limite
+    ema_alpha: float = Field(1.0, gt=0, le=1)           # 1 = pas de lissage
+    stale_s: float = Field(120.0, gt=0)                 # sans lecture valide depuis → None
+
+
+class SensorFiltersSettings(BaseModel):
+    """
+    Filtrage des mesures entre acquisition et consommateurs (régulations).
+    ``keys`` : réglage d'une clé (« BME280T@etagere1 ») ou d'une clé de
+    base (« BME280T », vaut pour tout l'arbre I²C) ; sinon ``default``.
+    """
+    enabled: bool = True
+    default: FilterSettings = Field(default_factory=FilterSettings)
+    keys: Dict[str, FilterSettings] = Field(default_factory=dict)
+
+    @validator("enabled", pre=True)
+    def _parse_enabled(cls, v):
+        return str(v).lower() in ("enabled", "true", "1", "yes")
+
+    def for_key(self, key: str) -> FilterSettings:
+        return self.keys.get(key) or self.keys.get(key.partition("@")[0]) or self.default
+
+
+class DerivedMetricsSettings(BaseModel):
+    """Métriques calculées sur l'appareil (controllers/DerivedMetrics)."""
+    enabled: bool = True
+    lux_to_ppfd: float = Field(0.0185, gt=0)            # µmol/m²/s par lux (soleil ; LED ≈ 0.012-0.02)
+    light_threshold_lux: float = Field(100.0, ge=0)     # au-dessus : compté dans la photopériode
+    max_gap_s: float = Field(900.0, gt=0)               # trou d'acquisition plus long : non intégré
+
+    @validator("enabled", pre=True)
+    def _parse_enabled(cls, v):
+        return str(v).lower() in ("enabled", "true", "1", "yes")
+
+
+class FusionSource(BaseModel):
+    key: str                                            # clé capteur : « BME280T », « DS18B#1 »…
+    weight: float = Field(1.0, gt=0)
+
+
+class TemperatureFusionSettings(BaseModel):
+    """Sources de la température de régulation REG-T (controllers/TemperatureFusion)."""
+    enabled: bool = True
+    sources: List[FusionSource] = Field(default_factory=lambda: [
+        FusionSource(key="BME280T", weight=1.0),
+        FusionSource(key="MLX-AMB", weight=0.5),
+        FusionSource(key="DS18B#1", weight=0.5),
+        FusionSource(key="DS18B#2", weight=0.5),
+    ])
+    outlier_c: float = Field(2.0, gt=0)                 # écart à la médiane au-delà duquel une source est écartée
+    max_age_s: float = Field(60.0, gt=0)                # lecture plus vieille : source exclue
+
+    @validator("enabled", pre=True)
+    def _parse_enabled(cls, v):
+        return str(v).lower() in ("enabled", "true", "1", "yes")
+
+    @validator("sources")
+    def _unique(cls, v):
+        keys = [s.key for s in v]
+        dup = {k for k in keys if keys.count(k) > 1}
+        if dup:
+            raise ValueError(f"source(s) en double : {', '.join(sorted(dup))}")
+        return v
+
+
+class ClimateControlSettings(BaseModel):
+    """
+    Régulateur coordonné chauffage + extraction (components/climate_control).
+    ``enabled`` faux : anciennes boucles séparées (redémarrage requis).
+    """
+    enabled: bool = True
+    fan_mode: Literal["pi", "steps"] = "pi"
+    kp: float = Field(1.0, ge=0)                        # paliers par °C au-dessus de la consigne max
+    ki: float = Field(0.002, ge=0)                      # paliers par °C·s
+    fan_stage_hysteresis: float = Field(0.3, ge=0, le=1)  # fraction de palier avant de changer
+    fan_min_dwell_s: float = Field(60.0, ge=0)          # palier tenu au moins
+    heater_min_on_s: float = Field(120.0, ge=0)
+    heater_min_off_s: float = Field(180.0, ge=0)
+    heater_min_cycle_s: float = Field(600.0, ge=0)      # entre deux démarrages (anti-court-cycle)
+    humidity_max: Optional[float] = Field(80.0, gt=0, le=100)   # %RH ; None : humidité ignorée
+    humidity_hysteresis: float = Field(5.0, ge=0)
+    humidity_stage: int = Field(2, ge=1, le=4)          # palier plancher pendant une purge
+
+    @validator("enabled", pre=True)
+    def _parse_enabled(cls, v):
+        return str(v).lower() in ("enabled", "true", "1", "yes")
+
+
+class Photoperiod(BaseModel):
+    start_hour: int = Field(..., ge=0, le=23)
+    start_minute: int = Field(..., ge=0, le=59)
+    stop_hour: int = Field(..., ge=0, le=23)
+    stop_minute: int = Field(..., ge=0, le=59)
+
+
+class ZoneSettings(BaseModel):
+    """
+    Une zone (tente) : ses capteurs, sa photopériode, ses consignes et ses
+    sorties relais. La zone « main » est implicite : c'est l'installation
+    décrite par les autres sections (REG-T, DailyTimer1, Temperature…).
+    """
+    name: str = Field(..., pattern=r"^[A-Za-z0-9_-]{1,24}$")
+    enabled: bool = True
+    temp_sensor: str = "BME280T"
+    humidity_sensor: Optional[str] = None
+    photoperiod: Photoperiod
+    temperature: TemperatureSettings
+    heater_enabled: bool = True
+    light_pin: Optional[int] = None
+    heater_pin: Optional[int] = None
+    fan_pin: Optional[int] = None
+
+    @validator("enabled", "heater_enabled", pre=True)
+    def _parse_enabled(cls, v):
+        return str(v).lower() in ("enabled", "true", "1", "yes")
+
+
+class ZonesSettings(BaseModel):
+    zones: List[ZoneSettings] = Field(default_factory=list)
+
+    @validator("zones")
+    def _unique(cls, v):
+        names = [z.name for z in v]
+        dup = {n for n in names if names.count(n) > 1}
+        if dup:
+            raise ValueError(f"nom(s) en double : {', '.join(sorted(dup))}")
+        if "main" in names:
+            raise ValueError("« main » est réservé à la zone historique")
+        return v
+
+
 # ────────────────────────────────────────────────────────────────
 #  Modèle principal
 # ────────────────────────────────────────────────────────────────
@@ -146,6 +358,12 @@ class AppConfig(BaseModel):
     gpio: GPIOSettings = Field(..., alias="GPIO_Settings")
     motor: MotorSettings = Field(..., alias="Motor_Settings")
     sensors: SensorState = Field(..., alias="Sensor_State")
+    sensor_tree: SensorTreeSettings = Field(default_factory=SensorTreeSettings, alias="Sensor_Tree")
+    sensor_filters: SensorFiltersSettings = Field(default_factory=SensorFiltersSettings, alias="Sensor_Filters")
+    derived_metrics: DerivedMetricsSettings = Field(default_factory=DerivedMetricsSettings, alias="Derived_Metrics")
+    temperature_fusion: TemperatureFusionSettings = Field(default_factory=TemperatureFusionSettings, alias="Temperature_Fusion")
+    climate: ClimateControlSettings = Field(default_factory=ClimateControlSettings, alias="Climate_Control")
+    zones: ZonesSettings = Field(default_factory=ZonesSettings, alias="Zones")
 
     _path: ClassVar[Path] = Path(__file__).parent.parent / "param" / "param.json"
 
@@ -188,6 +406,31 @@ class AppConfig(BaseModel):
             for k, v in self.sensors.model_dump().items()
         }
 
+        # arbre I²C : adresses en hexadécimal, comme sur le schéma de câblage
+        for dev in payload["Sensor_Tree"]["devices"]:
+            dev["enabled"] = "enabled" if dev["enabled"] else "disabled"
+            for k in ("mux", "address"):
+                if dev[k] is not None:
+                    dev[k] = f"0x{dev[k]:02X}"
+
+        payload["Sensor_Filters"]["enabled"] = (
+            "enabled" if self.sensor_filters.enabled else "disabled"
+        )
+        payload["Derived_Metrics"]["enabled"] = (
+            "enabled" if self.derived_metrics.enabled else "disabled"
+        )
+        payload["Temperature_Fusion"]["enabled"] = (
+            "enabled" if self.temperature_fusion.enabled else "disabled"
+        )
+
+        payload["Climate_Control"]["enabled"] = (
+            "enabled" if self.climate.enabled else "disabled"
+        )
+
+        for zone in payload["Zones"]["zones"]:
+            for k in ("enabled", "heater_enabled"):
+                zone[k] = "enabled" if zone[k] else "disabled"
+
         self._path.write_text(
             json.dumps(payload, indent=4, ensure_ascii=False),
             encoding="utf-8"
@@ -0,0 +1,201 @@
+# param/config_patch.py
+# Author: Progradius
+# License: AGPL-3.0
+"""
+Mise à jour partielle et validée d'AppConfig + rechargement ciblé.
+
+‣ Le patch est un JSON Merge Patch (RFC 7396) indexé par alias de section
+  ({"Motor_Settings": {"hysteresis": 1.5}}) ; les clés « pointées »
+  ({"Motor_Settings.hysteresis": 1.5}) sont acceptées et dépliées.
+‣ Seules les sections touchées sont revalidées via leur modèle pydantic ;
+  un champ inconnu ou une valeur invalide rejette TOUT le patch.
+‣ Le diff avec la config courante détermine les sous-systèmes à recharger :
+    Sensor_* / Derived_Metrics / Temperature_Fusion → "sensors"
+    DailyTimer*/Cyclic*    → "scheduler"
+    Network_Settings       → "exporter"
+    Motor/Temperature/...  → "regulation" (lu à chaud par les boucles)
+    Climate_Control        → "regulation", sauf ``enabled`` : redémarrage
+                             requis (choix des boucles au démarrage)
+    Zones                  → "zones"
+    GPIO_Settings          → redémarrage requis
+‣ Chaque rechargement est chronométré et remonté dans le PatchReport.
+"""
+
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass, field
+from typing import Callable
+
+from param.config         import AppConfig
+from utils.pretty_console import info, success, warning, error
+
+
+# section (alias JSON) → sous-système à recharger
+SECTION_SUBSYSTEM: dict[str, str] = {
+    "Sensor_State":         "sensors",
+    "Sensor_Tree":          "sensors",
+    "Sensor_Filters":       "sensors",
+    "Derived_Metrics":      "sensors",
+    "Temperature_Fusion":   "sensors",
+    "DailyTimer1_Settings": "scheduler",
+    "DailyTimer2_Settings": "scheduler",
+    "Cyclic1_Settings":     "scheduler",
+    "Cyclic2_Settings":     "scheduler",
+    "Network_Settings":     "exporter",
+    "Motor_Settings":       "regulation",
+    "Temperature_Settings": "regulation",
+    "Heater_Settings":      "regulation",
+    "GPIO_Settings":        "gpio",
+    "Life_Period":          "regulation",
+    "Climate_Control":      "regulation",
+    "Zones":                "zones",
+}
+
+# champ dont le sous-système diffère de celui de sa section
+FIELD_SUBSYSTEM: dict[str, str] = {
+    "Climate_Control.enabled": "climate_loops",
+}
+
+# sous-systèmes qui ne peuvent pas être reconfigurés à chaud
+RESTART_REQUIRED = {"gpio", "climate_loops"}
+
+
+class ConfigPatchError(ValueError):
+    """Patch rejeté (section/champ inconnu ou validation pydantic)."""
+
+
+@dataclass
+class PatchReport:
+    changed: list[str] = field(default_factory=list)             # "Section.champ"
+    reloaded: dict[str, float] = field(default_factory=dict)     # sous-système → ms
+    failed: dict[str, str] = field(default_factory=dict)         # sous-système → erreur
+    restart_required: list[str] = field(default_factory=list)
+    saved: bool = False
+    total_ms: float = 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            "changed":          self.changed,
+            "reloaded":         self.reloaded,
+            "failed":           self.failed,
+            "restart_required": self.restart_required,
+            "saved":            self.saved,
+            "total_ms":         self.total_ms,
+        }
+
+
+def merge_patch(target: dict, patch: dict) -> dict:
+    """Applique un JSON Merge Patch (RFC 7396) et renvoie un nouveau dict."""
+    out = dict(target)
+    for key, val in patch.items():
+        if val is None:
+            out.pop(key, None)
+        elif isinstance(val, dict) and isinstance(out.get(key), dict):
+            out[key] = merge_patch(out[key], val)
+        else:
+            out[key] = val
+    return out
+
+
+def normalize_patch(patch: dict) -> dict[str, dict]:
+    """Déplie les clés pointées → {section: {champ: valeur}}."""
+    out: dict[str, dict] = {}
+    for key, val in patch.items():
+        if "." in key:
+            top, nest = key.split(".", 1)
+            out.setdefault(top, {})[nest] = val
+        elif isinstance(val, dict):
+            out.setdefault(key, {}).update(val)
+        else:
+            raise ConfigPatchError(f"«{key}» : une section attend un objet")
+    return out
+
+
+class ConfigPatcher:
+    """
+    Applique les patchs sur l'instance AppConfig partagée et notifie les
+    sous-systèmes abonnés (``subscribe``) dont la section a changé.
+    """
+
+    def __init__(self, config: AppConfig):
+        self.config = config
+        self._alias2field = {
+            (fi.alias or name): name for name, fi in AppConfig.model_fields.items()
+        }
+        self._handlers: dict[str, list[Callable[[AppConfig, list[str]], None]]] = {}
+
+    def subscribe(self, subsystem: str, handler: Callable[[AppConfig, list[str]], None]) -> None:
+        """*handler(config, changed_paths)* est appelé quand *subsystem* change."""
+        self._handlers.setdefault(subsystem, []).append(handler)
+
+    # ──────────────────────────────────────────────────────────
+    def apply(self, patch: dict) -> PatchReport:
+        t0 = time.perf_counter()
+        report = PatchReport()
+        sections = normalize_patch(patch)
+
+        # 1) validation de toutes les sections touchées (tout ou rien)
+        staged: dict[str, object] = {}
+        for alias, sub in sections.items():
+            name = self._alias2field.get(alias)
+            if name is None:
+                raise ConfigPatchError(f"section inconnue : {alias}")
+            current = getattr(self.config, name)
+            model = type(current)
+            allowed = {fi.alias or n for n, fi in model.model_fields.items()} | set(model.model_fields)
+            unknown = [k for k in sub if k not in allowed]
+            if unknown:
+                raise ConfigPatchError(f"{alias} : champ(s) inconnu(s) {', '.join(unknown)}")
+
+            before = current.model_dump(by_alias=True)
+            try:
+                new = model.model_validate(merge_patch(before, sub))
+            except Exception as exc:
+                raise ConfigPatchError(f"{alias} : {exc}") from exc
+
+            after = new.model_dump(by_alias=True)
+            diff = [f"{alias}.{k}" for k in after if after[k] != before.get(k)]
+            if diff:
+                staged[name] = new
+                report.changed.extend(diff)
+
+        if not staged:
+            report.total_ms = round((time.perf_counter() - t0) * 1000, 2)
+            info("Config : aucun changement")
+            return report
+
+        # 2) application sur l'instance partagée + sauvegarde
+        for name, new in staged.items():
+            setattr(self.config, name, new)
+        self.config.save()
+        report.saved = True
+        success(f"Config sauvegardée : {', '.join(report.changed)}")
+
+        # 3) rechargement ciblé
+        touched: dict[str, list[str]] = {}
+        for path in report.changed:
+            subsystem = FIELD_SUBSYSTEM.get(path) or SECTION_SUBSYSTEM.get(path.split(".", 1)[0], "regulation")
+            touched.setdefault(subsystem, []).append(path)
+
+        for subsystem, paths in touched.items():
+            if subsystem in RESTART_REQUIRED:
+                report.restart_required.append(subsystem)
+                warning(f"Config : {subsystem} modifié → redémarrage requis")
+                continue
+            handlers = self._handlers.get(subsystem)
+            if not handlers:
+                continue            # lu à chaud, rien à reconstruire
+            ts = time.perf_counter()
+            try:
+                for handler in handlers:
+                    handler(self.config, paths)
+            except Exception as exc:
+                report.failed[subsystem] = repr(exc)
+                error(f"Rechargement {subsystem} échoué : {exc!r}")
+                continue
+            report.reloaded[subsystem] = round((time.perf_counter() - ts) * 1000, 2)
+            success(f"{subsystem} rechargé en {report.reloaded[subsystem]} ms")
+
+        report.total_ms = round((time.perf_counter() - t0) * 1000, 2)
+        return report
@@ -20,12 +20,14 @@ class BME280Handler:
     """Handler haut-niveau pour le capteur BME280 (bus I²C /dev/i2c-1)."""
 
     # --------------------------------------------------------------------- #
-    def __init__(self, i2c):
+    def __init__(self, i2c, address: Optional[int] = None):
         """
         Parameters
         ----------
         i2c : smbus2.SMBus
             Instance déjà ouverte sur le bus 1 (gérée par SensorController).
+        address : int, optional
+            0x76 (défaut du driver) ou 0x77 ; capteurs de l'arbre I²C.
         """
         try:
             from lib.sensors.BME280 import BME280
@@ -36,11 +38,12 @@ class BME280Handler:
             return
 
         # Tentative d'initialisation – le constructeur diffère selon les forks.
+        extra = {} if address is None else {"address": address}
         try:
-            self._sensor = BME280(i2c_dev=i2c)        # Pimoroni
+            self._sensor = BME280(i2c_dev=i2c, **extra)        # Pimoroni
         except TypeError:
             try:
-                self._sensor = BME280(i2c_bus=i2c)    # Variante adafruit
+                self._sensor = BME280(i2c_bus=i2c, **extra)    # Variante adafruit
             except Exception as ex:                   # Autre problème
                 error(f"❌ Init BME280 impossible : {ex}")
                 self.available = False
@@ -69,6 +72,20 @@ class BME280Handler:
     def get_bme_hygro(self):
         return self._safe("hum", "humidité")
 
+    def read_grouped(self) -> dict:
+        """T, H et P d'une seule transaction burst (lecture groupée du registre)."""
+        if not self.available:
+            return {}
+        if not hasattr(self._sensor, "read_all"):        # fork sans lecture burst
+            return {"BME280T": self.get_bme_temp(), "BME280H": self.get_bme_hygro(),
+                    "BME280P": self.get_bme_pressure()}
+        try:
+            temp, press, hum = self._sensor.read_all()
+        except Exception as e:
+            warning(f"BME280 : erreur lecture groupée → {e}")
+            return {}
+        return {"BME280T": temp, "BME280H": hum, "BME280P": press}
+
     # ------------------------------------------------------------------ #
     #  Helpers internes
     # ------------------------------------------------------------------ #
@@ -3,12 +3,14 @@
 # License: AGPL-3.0
 
 import glob
+import os
 from pathlib import Path
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
+from hal import backend as hal
 from utils.pretty_console import info, warning, error
 
-SYSFS_GLOB = "/sys/bus/w1/devices/28-*"
+SYSFS_PATTERN = "28-*"
 
 class DS18Handler:
     """
@@ -16,17 +18,51 @@ class DS18Handler:
       • available        → True si au moins une sonde trouvée
       • get_address_list → liste des dossiers (ex: ['28-00000a2b3c4d', ...])
       • get_ds18_temp(n) → température en °C (1-based), ou None si erreur
+      • rescan()         → sondes branchées / débranchées depuis le dernier appel
     """
 
     def __init__(self) -> None:
-        # recherche des répertoires 28-*
-        self._sensors: List[Path] = [Path(p) for p in glob.glob(SYSFS_GLOB)]
+        # recherche des répertoires 28-* (sysfs réel ou arbre simulé)
+        root = hal.w1_root()
+        self._sensors: List[Path] = sorted(Path(p) for p in glob.glob(os.path.join(root, SYSFS_PATTERN)))
         if self._sensors:
             info(f"✅ {len(self._sensors)} DS18B20 détectée(s) via sysfs")
             self.available = True
         else:
-            warning("Aucune sonde DS18B20 trouvée dans /sys/bus/w1/devices")
+            warning(f"Aucune sonde DS18B20 trouvée dans {root}")
             self.available = False
+        self._present = {p.name for p in self._sensors}
+
+    def rescan(self) -> Tuple[List[str], List[str]]:
+        """
+        Relit l'arbre 1-Wire sans renuméroter : une sonde connue garde son
+        numéro (même absente) ; une nouvelle prend la place d'une sonde
+        disparue, sinon le numéro suivant. Retourne (ajoutées, disparues).
+        """
+        root = hal.w1_root()
+        found = {Path(p).name: Path(p) for p in glob.glob(os.path.join(root, SYSFS_PATTERN))}
+        known = {p.name for p in self._sensors}
+        added = sorted(set(found) - self._present)
+        removed = sorted(self._present - set(found))
+
+        for dev in added:
+            if dev in known:
+                continue                     # sonde rebranchée : même numéro
+            free = next((i for i, p in enumerate(self._sensors) if p.name not in found), None)
+            if free is None:
+                self._sensors.append(found[dev])
+            else:
+                self._sensors[free] = found[dev]
+        self._present = set(found)
+        self.available = bool(self._sensors)
+        return added, removed
+
+    def slot_of(self, device: str) -> Optional[int]:
+        """Numéro (1-based) d'une sonde, ou None."""
+        for i, p in enumerate(self._sensors):
+            if p.name == device:
+                return i + 1
+        return None
 
     def get_address_list(self) -> List[str]:
         """Retourne la liste des IDs (ex : '28-00000a2b3c4d')."""
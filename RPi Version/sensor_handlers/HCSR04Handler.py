@@ -6,6 +6,7 @@ Handler pour le capteur ultrason HC-SR04 (distance).
 - Dépend du driver « lib.sensors.HCSR04 » portant le même nom de classe.
 """
 
+from hal import backend as hal
 from lib.sensors.HCSR04 import HCSR04
 from utils import pretty_console as pc
 
@@ -25,6 +26,8 @@ class HCSR04Handler:
         echo_pin         GPIO BCM relié à ECHO
         echo_timeout_us  Timeout micro-secondes (défaut 1 s)
         """
+        if hal.is_simulated():
+            hal.simulator().wire_hcsr04(trigger_pin, echo_pin)
         try:
             self.sensor = HCSR04(trigger_pin=trigger_pin,
                                  echo_pin=echo_pin,
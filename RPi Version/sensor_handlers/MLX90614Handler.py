@@ -21,18 +21,20 @@ class MLX90614Handler:
     # ------------------------------------------------------------------
     # Initialisation
     # ------------------------------------------------------------------
-    def __init__(self, i2c):
+    def __init__(self, i2c, address: int = ADDR):
         """
         Parameters
         ----------
         i2c : smbus2.SMBus
             Instance ouverte sur /dev/i2c-1.
+        address : int
+            Adresse I²C (0x5A par défaut).
         """
         from lib.sensors.MLX90614 import MLX90614
 
         self.available = False
         try:
-            self.mlx = MLX90614(i2c, address=self.ADDR)
+            self.mlx = MLX90614(i2c, address=address)
             self.available = True
             pc.success("MLX90614 initialisé")
         except Exception as exc:
@@ -0,0 +1,72 @@
+# sensor_handlers/SHT31Handler.py
+# Author : Progradius
+# License: AGPL-3.0
+"""
+Handler du capteur température / humidité Sensirion SHT31-D.
+
+Greffon du registre des drivers : activé par
+``PHYTO_SENSOR_PLUGINS=sensor_handlers.SHT31Handler``, puis déclaré dans
+Sensor_Tree (``"driver": "sht31"``, adresse 0x44 ou 0x45). Ses clés :
+SHT31T@nom, SHT31H@nom (measurement « air »).
+
+Expose :
+    • get_temp()      → température (°C | None)
+    • get_hygro()     → humidité relative (% | None)
+    • read_grouped()  → les deux d'une seule mesure
+"""
+
+from sensor_handlers.registry import DriverSpec, KeySpec, register
+from utils import pretty_console as pc
+
+
+class SHT31Handler:
+
+    ADDR = 0x44
+
+    def __init__(self, i2c, address: int = ADDR):
+        from lib.sensors.SHT31 import SHT31
+
+        self.available = False
+        try:
+            self.sht = SHT31(i2c, address=address)
+            self.available = True
+            pc.success(f"SHT31 initialisé (0x{address:02X})")
+        except Exception as exc:
+            pc.error(f"Impossible d'initialiser le SHT31 : {exc}")
+            self.sht = None
+
+    def read_grouped(self) -> dict:
+        """T et H d'une seule mesure."""
+        if not self.available:
+            return {}
+        try:
+            temp, hum = self.sht.read_all()
+        except Exception as exc:
+            pc.warning(f"SHT31 : erreur lecture → {exc}")
+            return {}
+        return {"SHT31T": temp, "SHT31H": hum}
+
+    def get_temp(self):
+        return self.read_grouped().get("SHT31T")
+
+    def get_hygro(self):
+        return self.read_grouped().get("SHT31H")
+
+
+def _build_at(i2c, address):
+    return SHT31Handler(i2c, address=address)
+
+
+def _sim(env):
+    from hal.sim.devices import SimSHT31
+    return SimSHT31(env)
+
+
+register(DriverSpec(
+    "sht31", "sht31", (
+        KeySpec("SHT31T", "get_temp", "°C", "air", quantity="air_temp"),
+        KeySpec("SHT31H", "get_hygro", "%", "air", quantity="rh"),
+    ),
+    address=0x44, build_at=_build_at, sim=_sim,
+    min_interval=0.5, grouped="read_grouped", blocking_ms=16.0,
+))
@@ -4,9 +4,10 @@
 """
 Handler haut-niveau pour le capteur de luminosité TSL2591.
 
-Expose deux méthodes :
+Expose trois méthodes :
     • get_ir()         → lecture brute du canal IR
     • calculate_lux()  → lux calculés (canaux complets + IR)
+    • read_grouped()   → les deux sur UNE intégration
 
 """
 
@@ -27,10 +28,9 @@ class TSL2591Handler:
         i2c : instance déjà ouverte de `smbus2.SMBus(1)`
         """
         try:
-            # Le constructeur du driver maison accepte un argument nommé `i2c`
-            # (cf. version que nous avons adaptée précédemment).
+            # Le constructeur du driver maison attend `i2c_bus`
             from lib.sensors.TSL2591 import Tsl2591
-            self.tsl = Tsl2591(i2c=i2c)
+            self.tsl = Tsl2591(i2c_bus=i2c)
             self.available = True
             pc.success("TSL2591 détecté et initialisé")
         except Exception as e:  # ImportError, OSError, ...
@@ -68,3 +68,15 @@ class TSL2591Handler:
         except Exception as e:
             pc.error(f"Calcul lux TSL2591 échoué : {e}")
             return None
+
+    # ──────────────────────────────────────────────────────────
+    def read_grouped(self) -> dict:
+        """Lux et IR sur une seule intégration (au lieu d'une par clé)."""
+        if not self.available:
+            return {}
+        try:
+            full, ir = self.tsl.get_full_luminosity()
+            return {"TSL-LUX": self.tsl.calculate_lux(full, ir), "TSL-IR": ir}
+        except Exception as e:
+            pc.error(f"Lecture groupée TSL2591 échouée : {e}")
+            return {}
@@ -10,7 +10,9 @@ Wrapper pour le télémètre laser VL53L0X.
   (millimètres) ou `None` en cas d'échec/timeout.
 """
 
-import smbus2
+from typing import Optional
+
+from hal import backend as hal
 from lib.sensors.VL53L0X import VL53L0X, TimeoutError
 from utils.pretty_console import info, warning, error
 
@@ -21,19 +23,25 @@ class VL53L0XHandler:
     """
 
     # ------------------------------------------------------------------
-    def __init__(self, parameters):
+    def __init__(self, parameters, i2c=None, address: Optional[int] = None):
         """
         Parameters
         ----------
         parameters : Parameter
             Objet config  (uniquement pour l'adresse I²C optionnelle).
+        i2c : smbus2.SMBus, optional
+            Bus (ou canal de multiplexeur) fourni par l'appelant ; à défaut
+            le bus 1 est ouvert ici.
+        address : int, optional
+            Adresse imposée (capteurs de l'arbre I²C).
         """
-        addr = getattr(parameters, "get_vl53_address", lambda: 0x29)()
+        addr = address if address is not None else getattr(
+            parameters, "get_vl53_address", lambda: hal.i2c_address("vl53l0x", 0x29))()
         self.available = False
         try:
-            # Ouverture bus I²C 1 (/dev/i2c-1)
-            self._bus = smbus2.SMBus(1)
-            self._vl53 = VL53L0X(i2c_bus=self._bus, i2c_address=addr)
+            # Ouverture bus I²C 1 (/dev/i2c-1 ou bus simulé)
+            self._bus = i2c if i2c is not None else hal.open_i2c(1)
+            self._vl53 = VL53L0X(i2c_bus=self._bus, address=addr)
             self.available = True
             info(f"VL53L0X ready @0x{addr:02X} ✔")
         except Exception as exc:
@@ -0,0 +1,289 @@
+# sensor_handlers/registry.py
+# Author : Progradius
+# License: AGPL-3.0
+# -------------------------------------------------------------
+#  Registre des drivers de capteurs (intégrés + greffons)
+# -------------------------------------------------------------
+"""
+Chaque driver déclare une fois ce que le reste du code en déduit :
+SensorController (table de dispatch, measurements, bus de lecture),
+SensorTree (types instanciables dans Sensor_Tree), BusDiscovery (adresses
+à sonder), export Influx et interface (unités).
+
+‣ ``KeySpec``    : une clé de base → méthode du handler, unité,
+                   measurement Influx (None = lisible mais pas exportée),
+                   grandeur physique (``quantity`` : air_temp, rh,
+                   leaf_temp, lux) dont se servent les métriques dérivées.
+‣ ``DriverSpec`` : le driver → ses clés, son bus (« i2c », « w1 »,
+                   « gpio »), son adresse I²C par défaut, son champ
+                   Sensor_State (capteur unique) et ses capacités :
+    min_interval  s minimales entre deux lectures matérielles : en deçà,
+                  la dernière valeur est resservie ;
+    grouped       méthode lisant toutes les clés en UNE transaction
+                  (dict clé de base → valeur) ;
+    blocking_ms   durée typique d'une lecture (décide si un passage
+                  complet doit quitter la boucle asyncio).
+‣ Les handlers ne sont importés qu'à l'instanciation : importer le
+  registre ne coûte rien (param/config.py s'en sert pour valider).
+
+Greffons : ``PHYTO_SENSOR_PLUGINS="module.a,module.b"`` ; chaque module
+appelle ``register(DriverSpec(...))`` à l'import (exemple :
+sensor_handlers/SHT31Handler.py). Un greffon I²C s'utilise ensuite dans
+la section Sensor_Tree, sans toucher au contrôleur.
+
+Variables d'environnement :
+    PHYTO_SENSOR_PLUGINS   modules de drivers supplémentaires (défaut vide)
+"""
+
+from __future__ import annotations
+
+import importlib
+import os
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from utils.pretty_console import error, info
+
+
+@dataclass(frozen=True)
+class KeySpec:
+    key: str                                # clé de base : « BME280T »
+    method: str                             # méthode du handler
+    unit: str = ""
+    measurement: Optional[str] = None       # None : hors export
+    args: Tuple = ()                        # DS18B20 : numéro de sonde
+    quantity: Optional[str] = None          # grandeur (controllers/DerivedMetrics)
+
+
+@dataclass(frozen=True)
+class DriverSpec:
+    name: str                               # attribut de SensorController : « bme »
+    kind: str                               # nom matériel (HAL, Sensor_Tree) : « bme280 »
+    keys: Tuple[KeySpec, ...]
+    bus: str = "i2c"                        # i2c | w1 | gpio
+    address: Optional[int] = None           # adresse I²C par défaut
+    fixed_address: bool = False             # adresse figée par la puce
+    state_field: Optional[str] = None       # champ Sensor_State (capteur unique)
+    build: Optional[Callable] = None        # build(controller) → handler unique
+    build_at: Optional[Callable] = None     # build_at(i2c, adresse) → handler de l'arbre
+    sim: Optional[Callable] = None          # sim(env) → périphérique simulé (greffons)
+    device_per_key: bool = False            # une puce par clé (sondes 1-Wire)
+    min_interval: float = 0.0
+    grouped: Optional[str] = None
+    blocking_ms: float = 1.0
+
+    @property
+    def tree(self) -> bool:
+        return self.build_at is not None
+
+
+_DRIVERS: Dict[str, DriverSpec] = {}        # nom → spec (ordre = ordre d'export)
+_BY_KIND: Dict[str, DriverSpec] = {}
+_BY_KEY: Dict[str, Tuple[DriverSpec, KeySpec]] = {}
+
+
+def register(spec: DriverSpec) -> DriverSpec:
+    if spec.name in _DRIVERS or spec.kind in _BY_KIND:
+        raise ValueError(f"driver déjà enregistré : {spec.name} / {spec.kind}")
+    clash = [k.key for k in spec.keys if k.key in _BY_KEY]
+    if clash:
+        raise ValueError(f"clé(s) déjà servie(s) par un autre driver : {', '.join(clash)}")
+    _DRIVERS[spec.name] = spec
+    _BY_KIND[spec.kind] = spec
+    for key in spec.keys:
+        _BY_KEY[key.key] = (spec, key)
+    return spec
+
+
+def drivers() -> List[DriverSpec]:
+    return list(_DRIVERS.values())
+
+
+def get(name: str) -> DriverSpec:
+    return _DRIVERS[name]
+
+
+def by_kind(kind: str) -> Optional[DriverSpec]:
+    return _BY_KIND.get(kind)
+
+
+def lookup(key: str) -> Optional[Tuple[DriverSpec, KeySpec]]:
+    """Driver et clé de base d'une clé (« BME280T@etagere1 » → bme, BME280T)."""
+    return _BY_KEY.get(key.partition("@")[0])
+
+
+def singletons() -> List[DriverSpec]:
+    """Capteurs uniques, activés par un champ de Sensor_State."""
+    return [d for d in _DRIVERS.values() if d.state_field]
+
+
+def tree_kinds() -> List[str]:
+    """Types instanciables dans Sensor_Tree."""
+    return [d.kind for d in _DRIVERS.values() if d.tree]
+
+
+def unit_of(key: str) -> str:
+    hit = lookup(key)
+    return hit[1].unit if hit else ""
+
+
+def measurements(specs: Optional[Iterable[DriverSpec]] = None) -> Dict[str, Tuple[str, ...]]:
+    """measurement Influx → clés de base, dans l'ordre d'enregistrement."""
+    out: Dict[str, List[str]] = {}
+    for spec in (_DRIVERS.values() if specs is None else specs):
+        for key in spec.keys:
+            if key.measurement:
+                out.setdefault(key.measurement, []).append(key.key)
+    return {m: tuple(keys) for m, keys in out.items()}
+
+
+def load_plugins(modules: Optional[str] = None) -> List[str]:
+    names = os.getenv("PHYTO_SENSOR_PLUGINS", "") if modules is None else modules
+    loaded = []
+    for name in filter(None, (n.strip() for n in names.split(","))):
+        try:
+            importlib.import_module(name)
+            loaded.append(name)
+        except Exception as e:
+            error(f"Greffon capteur {name} : {e!r}")
+    if loaded:
+        info(f"Greffons capteurs : {', '.join(loaded)}")
+    return loaded
+
+
+# ──────────────────────────────────────────────────────────────
+#  Drivers intégrés (imports paresseux)
+# ──────────────────────────────────────────────────────────────
+def _bme(ctl):
+    from sensor_handlers.BME280Handler import BME280Handler
+    return BME280Handler(i2c=ctl.i2c)
+
+
+def _bme_at(i2c, address):
+    from sensor_handlers.BME280Handler import BME280Handler
+    return BME280Handler(i2c, address=address)
+
+
+def _mlx(ctl):
+    from sensor_handlers.MLX90614Handler import MLX90614Handler
+    return MLX90614Handler(i2c=ctl.i2c)
+
+
+def _mlx_at(i2c, address):
+    from sensor_handlers.MLX90614Handler import MLX90614Handler
+    return MLX90614Handler(i2c, address=address)
+
+
+def _ds18(ctl):
+    from sensor_handlers.DS18Handler import DS18Handler
+    return DS18Handler()
+
+
+def _vl53(ctl):
+    from sensor_handlers.VL53L0XHandler import VL53L0XHandler
+    return VL53L0XHandler(ctl.config, i2c=ctl.i2c)
+
+
+def _vl53_at(i2c, address):
+    from sensor_handlers.VL53L0XHandler import VL53L0XHandler
+    return VL53L0XHandler(None, i2c=i2c, address=address)
+
+
+def _hcsr(ctl):
+    from sensor_handlers.HCSR04Handler import HCSR04Handler
+    return HCSR04Handler(
+        trigger_pin=ctl.config.gpio.hcsr_trigger_pin,
+        echo_pin=ctl.config.gpio.hcsr_echo_pin,
+    )
+
+
+def _tsl(ctl):
+    from sensor_handlers.TSL2591Handler import TSL2591Handler
+    return TSL2591Handler(i2c=ctl.i2c)
+
+
+def _tsl_at(i2c, address):
+    from sensor_handlers.TSL2591Handler import TSL2591Handler
+    return TSL2591Handler(i2c)
+
+
+def _veml(ctl):
+    from sensor_handlers.VEML6075Handler import VEMLHandler
+    return VEMLHandler(i2c=ctl.i2c)
+
+
+def _veml_at(i2c, address):
+    from sensor_handlers.VEML6075Handler import VEMLHandler
+    return VEMLHandler(i2c)
+
+
+# ordre d'enregistrement = ordre des clés dans chaque measurement
+register(DriverSpec(
+    "bme", "bme280", (
+        KeySpec("BME280T", "get_bme_temp", "°C", "air", quantity="air_temp"),
+        KeySpec("BME280H", "get_bme_hygro", "%", "air", quantity="rh"),
+        KeySpec("BME280P", "get_bme_pressure", "hPa", "air"),
+    ),
+    address=0x76, state_field="bme280_state", build=_bme, build_at=_bme_at,
+    min_interval=1.0, grouped="read_grouped", blocking_ms=2.0,   # t_sb = 1000 ms
+))
+register(DriverSpec(
+    "mlx", "mlx90614", (
+        KeySpec("MLX-AMB", "get_ambient_temp", "°C", "air"),
+        KeySpec("MLX-OBJ", "get_object_temp", "°C", "surface_temp", quantity="leaf_temp"),
+    ),
+    address=0x5A, state_field="mlx90614_state", build=_mlx, build_at=_mlx_at,
+))
+register(DriverSpec(
+    "ds18", "ds18b20", (
+        KeySpec("DS18B#1", "get_ds18_temp", "°C", "air", (1,)),
+        KeySpec("DS18B#2", "get_ds18_temp", "°C", "air", (2,)),
+        KeySpec("DS18B#3", "get_ds18_temp", "°C", "water", (3,)),
+    ),
+    bus="w1", state_field="ds18b20_state", build=_ds18, device_per_key=True,
+    min_interval=1.0, blocking_ms=750.0,                        # conversion 12 bits
+))
+register(DriverSpec(
+    "vl53", "vl53l0x", (KeySpec("VL53L0X", "get_vl53_reading", "mm", "distance"),),
+    address=0x29, state_field="vl53L0x_state", build=_vl53, build_at=_vl53_at,
+    min_interval=0.05, blocking_ms=35.0,
+))
+register(DriverSpec(
+    "hcsr", "hcsr04", (KeySpec("HCSR04", "get_distance_cm", "cm", "distance"),),
+    bus="gpio", state_field="hcsr04_state", build=_hcsr,
+    min_interval=0.06, blocking_ms=30.0,                        # écho ≤ 4 m
+))
+register(DriverSpec(
+    "tsl", "tsl2591", (
+        KeySpec("TSL-LUX", "calculate_lux", "lx", "lux", quantity="lux"),
+        KeySpec("TSL-IR", "get_ir", "", "lux"),
+    ),
+    address=0x29, fixed_address=True, state_field="tsl2591_state", build=_tsl, build_at=_tsl_at,
+    min_interval=0.2, grouped="read_grouped", blocking_ms=110.0,  # intégration 100 ms
+))
+register(DriverSpec(
+    "veml", "veml6075", (
+        KeySpec("VEML-UVA", "get_veml_uva"),
+        KeySpec("VEML-UVB", "get_veml_uvb"),
+        KeySpec("VEML-UVINDEX", "get_veml_uv_index"),
+    ),
+    address=0x10, fixed_address=True, state_field="veml6075_state", build=_veml, build_at=_veml_at,
+    min_interval=0.1, blocking_ms=2.0,
+))
+
+# métriques calculées (controllers/DerivedMetrics) : pas de matériel,
+# méthode = calcul de DerivedMetrics, actives quand leurs entrées le sont
+register(DriverSpec(
+    "derived", "derived", (
+        KeySpec("VPD", "vpd", "kPa", "climate"),
+        KeySpec("LEAF-VPD", "leaf_vpd", "kPa", "climate"),
+        KeySpec("DEWPOINT", "dew_point", "°C", "climate"),
+        KeySpec("ABSHUM", "absolute_humidity", "g/m³", "climate"),
+        KeySpec("DLI", "dli", "mol/m²/j", "light"),
+        KeySpec("PHOTOPERIOD", "photoperiod", "h", "light"),
+        KeySpec("REG-T", "fused_temperature", "°C", "climate"),     # controllers/TemperatureFusion
+    ),
+    bus="derived", blocking_ms=0.0,
+))
+
+load_plugins()
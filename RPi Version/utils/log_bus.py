@@ -0,0 +1,147 @@
+# utils/log_bus.py
+# Author : Progradius
+# License: AGPL-3.0
+"""
+Bus pub/sub in-process pour les messages de pretty_console.
+
+‣ Chaque message console est publié une seule fois sous forme de
+  ``LogRecord`` (texte ANSI prêt pour xterm.js + champs structurés).
+‣ Les abonnés (clients SSE de ``/console/stream``) reçoivent les records
+  via une ``asyncio.Queue`` bornée : un client lent perd les plus anciens
+  messages au lieu de faire grossir la mémoire.
+‣ ``publish`` est thread-safe : un thread (watchdog, executor…) peut
+  journaliser, la livraison est rebasculée sur la boucle de l'abonné.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, asdict
+
+from utils.metrics import counter, gauge
+
+_PUBLISHED = counter("phyto_log_bus_published_total", "Messages publiés sur le bus de logs")
+_DROPPED = counter("phyto_log_bus_dropped_total", "Messages jetés (file d'un client SSE pleine)")
+
+
+@dataclass(frozen=True)
+class LogRecord:
+    """Un message console, tel qu'affiché et tel que structuré."""
+    ts: float        # epoch (s)
+    level: str       # info / success / warning / error / action / clock / title / box
+    msg: str         # texte brut, sans couleur
+    ansi: str        # ligne(s) colorée(s) pour un terminal
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+class LogBus:
+    """
+    Historique circulaire + diffusion vers les abonnés asyncio.
+    """
+
+    def __init__(self, history: int = 1000, queue_size: int = 500):
+        self._history: deque[LogRecord] = deque(maxlen=history)
+        self._queue_size = queue_size
+        self._subscribers: list[tuple[asyncio.AbstractEventLoop, asyncio.Queue]] = []
+        self._lock = threading.Lock()
+
+    # ──────────────────────────────────────────────────────────
+    #  Publication
+    # ──────────────────────────────────────────────────────────
+    def publish(self, level: str, msg: str, ansi: str, ts: float | None = None) -> LogRecord:
+        """*ts* : horodatage d'origine (record relayé depuis un autre processus)."""
+        rec = LogRecord(ts=time.time() if ts is None else ts, level=level, msg=msg, ansi=ansi)
+        _PUBLISHED.inc()
+        with self._lock:
+            self._history.append(rec)
+            subscribers = list(self._subscribers)
+
+        for loop, queue in subscribers:
+            if loop.is_closed():
+                continue
+            try:
+                running = asyncio.get_running_loop()
+            except RuntimeError:
+                running = None
+            if running is loop:
+                self._deliver(queue, rec)
+            else:
+                loop.call_soon_threadsafe(self._deliver, queue, rec)
+        return rec
+
+    @staticmethod
+    def _deliver(queue: asyncio.Queue, rec: LogRecord) -> None:
+        """Dépose *rec* ; si la file est pleine on jette le plus ancien."""
+        if queue.full():
+            try:
+                queue.get_nowait()
+                _DROPPED.inc()
+            except asyncio.QueueEmpty:
+                pass
+        queue.put_nowait(rec)
+
+    # ──────────────────────────────────────────────────────────
+    #  Abonnement
+    # ──────────────────────────────────────────────────────────
+    def subscribe(self) -> asyncio.Queue:
+        """Crée une file pour la boucle courante (à appeler depuis une coroutine)."""
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self._queue_size)
+        with self._lock:
+            self._subscribers.append((loop, queue))
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        with self._lock:
+            self._subscribers = [(l, q) for l, q in self._subscribers if q is not queue]
+
+    def history(self) -> list[LogRecord]:
+        with self._lock:
+            return list(self._history)
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def queue_depths(self) -> list[int]:
+        """Taille courante de la file de chaque abonné (lecture seule)."""
+        with self._lock:
+            return [q.qsize() for _, q in self._subscribers]
+
+
+# Instance unique partagée par pretty_console et le serveur web
+log_bus = LogBus()
+
+
+
+def _queue_depth_stats() -> dict:
+    depths = log_bus.queue_depths()
+    return {("max",): max(depths, default=0), ("sum",): sum(depths)}
+
+
+def install_metrics() -> None:
+    """Jauges calculées au scrape (réinstallées dans un processus fils)."""
+    gauge("phyto_sse_clients", "Clients abonnés à /console/stream").set_function(
+        lambda: log_bus.subscriber_count
+    )
+    gauge("phyto_sse_queue_depth", "Files des clients SSE (max / somme)", ("stat",)).set_function(
+        _queue_depth_stats
+    )
+
+
+def reset_after_fork() -> None:
+    """
+    Processus fils (fork) : verrou neuf (il a pu être copié verrouillé) et
+    plus aucun abonné (leurs files appartiennent à la boucle du parent).
+    L'historique est conservé : la console du fils montre le boot.
+    """
+    log_bus._lock = threading.Lock()
+    log_bus._subscribers = []
+
+
+install_metrics()
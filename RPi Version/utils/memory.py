@@ -0,0 +1,350 @@
+# utils/memory.py
+# Author : Progradius
+# License: AGPL-3.0
+"""
+Télémétrie mémoire et réglage du ramasse-miettes (processus longue durée).
+
+‣ Politique GC : seuils générationnels relevés (les objets pydantic et les
+  LogRecord font vite déborder la génération 0 par défaut), AUCUNE
+  collecte forcée sur le chemin chaud, et ``gc.freeze()`` après le boot :
+  modules, config, drivers… passent en génération permanente et ne sont
+  plus jamais reparcourus (en mode multi-processus, les fils forkés ne
+  touchent plus leurs en-têtes → pages partagées en copy-on-write).
+‣ Durée de chaque collecte mesurée par génération (``gc.callbacks``).
+‣ ``MemoryMonitor`` : RSS / USS (/proc/self/status, smaps_rollup) toutes
+  les ``interval`` s, historique borné, pente de croissance (moindres
+  carrés) avec alerte, comptage d'objets des types à risque tous les
+  ``objects_every`` échantillons (un parcours de gc.get_objects()). Les
+  objets gelés n'y figurent pas : on compte ce qui est né APRÈS le boot,
+  c'est-à-dire ce qui peut fuir.
+‣ tracemalloc à la demande (API) : départ = référence, puis différences
+  par ligne de code ; arrêté explicitement (coût mémoire et CPU notable).
+
+Variables d'environnement :
+    PHYTO_GC_THRESHOLDS        seuils gen0,gen1,gen2            (défaut 5000,20,20)
+    PHYTO_MEM_INTERVAL         période d'échantillonnage, s     (défaut 60)
+    PHYTO_MEM_GROWTH_MB_DAY    pente USS/RSS signalée, Mo/jour  (défaut 4)
+    PHYTO_MEM_OBJECTS_EVERY    comptage d'objets tous les N échantillons (défaut 10)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import gc
+import os
+import time
+import tracemalloc
+from collections import Counter, deque
+from typing import Dict, List, Optional, Tuple
+
+from utils.metrics import gauge, histogram
+from utils.pretty_console import info, warning
+
+DEFAULT_THRESHOLDS = (5000, 20, 20)
+
+# types surveillés (nom de classe) ; « BaseModel » = toute instance pydantic
+TRACKED_TYPES = (
+    "SensorController", "AppConfig", "BaseModel", "LogRecord",
+    "Task", "Future", "Queue", "Thread",
+)
+
+_RSS = gauge("phyto_memory_rss_bytes", "Mémoire résidente du processus")
+_USS = gauge("phyto_memory_uss_bytes", "Mémoire privée du processus (USS)")
+_GROWTH = gauge("phyto_memory_growth_bytes_per_hour", "Pente de la mémoire sur l'historique")
+_OBJECTS = gauge("phyto_memory_objects", "Objets vivants des types surveillés", ("type",))
+_GC_PAUSE = histogram("phyto_gc_pause_seconds", "Durée des collectes du GC", ("generation",))
+
+_gc_t0 = 0.0
+
+
+def _thresholds_from_env() -> Tuple[int, int, int]:
+    raw = os.getenv("PHYTO_GC_THRESHOLDS", "")
+    try:
+        t0, t1, t2 = (int(x) for x in raw.split(","))
+        return t0, t1, t2
+    except ValueError:
+        return DEFAULT_THRESHOLDS
+
+
+def _on_gc(phase: str, gc_info: dict) -> None:
+    global _gc_t0
+    if phase == "start":
+        _gc_t0 = time.perf_counter()
+    else:
+        _GC_PAUSE.labels(str(gc_info["generation"])).observe(time.perf_counter() - _gc_t0)
+
+
+def configure_gc() -> Tuple[int, int, int]:
+    """Seuils générationnels + chronométrage des collectes (idempotent)."""
+    thresholds = _thresholds_from_env()
+    gc.set_threshold(*thresholds)
+    if _on_gc not in gc.callbacks:
+        gc.callbacks.append(_on_gc)
+    return thresholds
+
+
+def freeze_after_boot() -> int:
+    """
+    Collecte complète unique (hors chemin chaud) puis gel des survivants.
+    Appelée une seule fois, par main.py après ``app.build()`` : avant le
+    fork des rôles et hors de la boucle asyncio (collecte complète bloquante).
+    """
+    gc.collect()
+    gc.freeze()
+    frozen = gc.get_freeze_count()
+    info(f"GC : {frozen} objets gelés (génération permanente)")
+    return frozen
+
+
+def install_metrics() -> None:
+    """Jauges calculées au scrape (réinstallées dans un processus fils)."""
+    gauge("phyto_gc_collections", "Collectes du GC depuis le démarrage", ("generation",)).set_function(
+        lambda: {(str(g),): s["collections"] for g, s in enumerate(gc.get_stats())}
+    )
+    gauge("phyto_gc_tracked_objects", "Objets en attente par génération", ("generation",)).set_function(
+        lambda: {(str(g),): n for g, n in enumerate(gc.get_count())}
+    )
+    gauge("phyto_gc_frozen_objects", "Objets gelés (gc.freeze)").set_function(gc.get_freeze_count)
+
+
+# ──────────────────────────────────────────────────────────────
+#  Lecture /proc
+# ──────────────────────────────────────────────────────────────
+def _read_kb(path: str, fields: Tuple[str, ...]) -> Dict[str, int]:
+    out: Dict[str, int] = {}
+    try:
+        with open(path) as f:
+            for line in f:
+                key, _, rest = line.partition(":")
+                if key in fields:
+                    out[key] = int(rest.split()[0]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return out
+
+
+def process_memory() -> Dict[str, Optional[int]]:
+    """RSS, USS (privé), PSS et swap du processus, en octets (None si inconnu)."""
+    status = _read_kb("/proc/self/status", ("VmRSS", "VmSwap"))
+    rollup = _read_kb("/proc/self/smaps_rollup", ("Pss", "Private_Clean", "Private_Dirty"))
+    rss = status.get("VmRSS")
+    if rss is None:
+        try:
+            import resource                          # hors Linux : pic seulement
+            rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+        except (ImportError, OSError):
+            rss = None
+    uss = None
+    if "Private_Clean" in rollup:
+        uss = rollup["Private_Clean"] + rollup.get("Private_Dirty", 0)
+    return {"rss": rss, "uss": uss, "pss": rollup.get("Pss"), "swap": status.get("VmSwap")}
+
+
+def count_objects(names: Tuple[str, ...] = TRACKED_TYPES) -> Dict[str, int]:
+    """Instances vivantes non gelées par type surveillé (+ ``total`` suivis par le GC)."""
+    try:
+        from pydantic import BaseModel
+    except ImportError:                              # pragma: no cover
+        BaseModel = None
+    wanted = set(names)
+    counts: Counter = Counter()
+    objs = gc.get_objects()
+    for obj in objs:
+        name = type(obj).__name__
+        if name in wanted:
+            counts[name] += 1
+        if BaseModel is not None and isinstance(obj, BaseModel):
+            counts["BaseModel"] += 1
+    out = {name: counts.get(name, 0) for name in names}
+    out["total"] = len(objs)
+    return out
+
+
+def _slope_per_hour(points: List[Tuple[float, int]]) -> Optional[float]:
+    """Pente (octets/heure) par moindres carrés sur (epoch, octets)."""
+    n = len(points)
+    if n < 3:
+        return None
+    t0 = points[0][0]
+    xs = [(t - t0) / 3600 for t, _ in points]
+    ys = [v for _, v in points]
+    mx, my = sum(xs) / n, sum(ys) / n
+    den = sum((x - mx) ** 2 for x in xs)
+    if den == 0:
+        return None
+    return sum((x - mx) * (y - my) for x, y in zip(xs, ys)) / den
+
+
+# ──────────────────────────────────────────────────────────────
+#  Moniteur
+# ──────────────────────────────────────────────────────────────
+class MemoryMonitor:
+
+    def __init__(self, interval: Optional[float] = None, window: int = 1440,
+                 objects_every: Optional[int] = None, growth_mb_day: Optional[float] = None):
+        def _env(name: str, default: float) -> float:
+            try:
+                return float(os.getenv(name, str(default)))
+            except ValueError:
+                return default
+
+        self.interval = interval or _env("PHYTO_MEM_INTERVAL", 60)
+        self.objects_every = max(1, int(objects_every or _env("PHYTO_MEM_OBJECTS_EVERY", 10)))
+        self.growth_limit = (growth_mb_day if growth_mb_day is not None
+                             else _env("PHYTO_MEM_GROWTH_MB_DAY", 4)) * 1024 * 1024 / 24
+
+        self.history: deque = deque(maxlen=window)        # (epoch, rss, uss)
+        self.current: Dict[str, Optional[int]] = {}
+        self.objects: Dict[str, int] = {}
+        self.objects_ts: Optional[float] = None
+        self.objects_ms: Optional[float] = None
+        self._samples = 0
+        self._warned_at = 0.0
+        self._trace_base: Optional[tracemalloc.Snapshot] = None
+
+    # ──────────────────────────────────────────────────────────
+    #  Échantillonnage
+    # ──────────────────────────────────────────────────────────
+    async def run(self) -> None:
+        while True:
+            self.sample()
+            await asyncio.sleep(self.interval)
+
+    def sample(self) -> dict:
+        mem = process_memory()
+        now = time.time()
+        self.current = mem
+        self.history.append((now, mem["rss"], mem["uss"]))
+        if mem["rss"] is not None:
+            _RSS.set(mem["rss"])
+        if mem["uss"] is not None:
+            _USS.set(mem["uss"])
+
+        if self._samples % self.objects_every == 0:
+            self.refresh_objects()
+        self._samples += 1
+
+        growth = self.growth()
+        if growth is not None:
+            _GROWTH.set(round(growth))
+            self._check_growth(growth, now)
+        return mem
+
+    def refresh_objects(self) -> Dict[str, int]:
+        t0 = time.perf_counter()
+        self.objects = count_objects()
+        self.objects_ms = round((time.perf_counter() - t0) * 1000, 1)
+        self.objects_ts = time.time()
+        for name, n in self.objects.items():
+            _OBJECTS.labels(name).set(n)
+        return self.objects
+
+    def growth(self, min_span: float = 3600) -> Optional[float]:
+        """Octets/heure sur l'historique (USS si disponible, sinon RSS) ; None sous 1 h."""
+        if not self.history or self.history[-1][0] - self.history[0][0] < min_span:
+            return None
+        idx = 2 if self.history[-1][2] is not None else 1
+        return _slope_per_hour([(h[0], h[idx]) for h in self.history if h[idx] is not None])
+
+    def _check_growth(self, growth: float, now: float) -> None:
+        # il faut du recul (les caches se remplissent après le boot)
+        span = self.history[-1][0] - self.history[0][0]
+        if span < 6 * 3600 or growth <= self.growth_limit or now - self._warned_at < 6 * 3600:
+            return
+        self._warned_at = now
+        warning(f"Mémoire en hausse : {growth * 24 / 1048576:.1f} Mo/jour sur {span / 3600:.0f} h")
+
+    # ──────────────────────────────────────────────────────────
+    #  tracemalloc (à la demande)
+    # ──────────────────────────────────────────────────────────
+    _FILTERS = (
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+        tracemalloc.Filter(False, "<unknown>"),
+    )
+
+    def _snapshot(self) -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces(self._FILTERS)
+
+    def trace_start(self, frames: int = 1) -> dict:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(max(1, min(25, int(frames))))
+        self._trace_base = self._snapshot()
+        info(f"tracemalloc démarré ({tracemalloc.get_traceback_limit()} frame(s))")
+        return self.trace_status()
+
+    def trace_diff(self, top: int = 20, rebase: bool = False) -> dict:
+        """Allocations par ligne depuis la référence (la plus forte hausse d'abord)."""
+        if not tracemalloc.is_tracing() or self._trace_base is None:
+            raise RuntimeError("tracemalloc inactif : appeler trace_start d'abord")
+        snap = self._snapshot()
+        stats = snap.compare_to(self._trace_base, "lineno")
+        if rebase:
+            self._trace_base = snap
+        return {
+            **self.trace_status(),
+            "top": [
+                {
+                    "where":       str(s.traceback[0]),
+                    "size":        s.size,
+                    "size_diff":   s.size_diff,
+                    "count":       s.count,
+                    "count_diff":  s.count_diff,
+                }
+                for s in stats[:max(1, int(top))]
+            ],
+        }
+
+    def trace_stop(self) -> dict:
+        self._trace_base = None
+        tracemalloc.stop()
+        info("tracemalloc arrêté")
+        return self.trace_status()
+
+    @staticmethod
+    def trace_status() -> dict:
+        tracing = tracemalloc.is_tracing()
+        current, peak = tracemalloc.get_traced_memory() if tracing else (0, 0)
+        return {
+            "tracing":        tracing,
+            "traced_bytes":   current,
+            "traced_peak":    peak,
+            "overhead_bytes": tracemalloc.get_tracemalloc_memory() if tracing else 0,
+        }
+
+    # ──────────────────────────────────────────────────────────
+    #  Rapport
+    # ──────────────────────────────────────────────────────────
+    def to_dict(self) -> dict:
+        hist = list(self.history)
+        growth = self.growth()
+        return {
+            "interval_s": self.interval,
+            "current":    self.current,
+            "history": {
+                "samples":    len(hist),
+                "span_h":     round((hist[-1][0] - hist[0][0]) / 3600, 2) if hist else 0,
+                "first":      {"ts": hist[0][0], "rss": hist[0][1], "uss": hist[0][2]} if hist else None,
+                "min_rss":    min((h[1] for h in hist if h[1] is not None), default=None),
+                "max_rss":    max((h[1] for h in hist if h[1] is not None), default=None),
+                "growth_mb_day": round(growth * 24 / 1048576, 3) if growth is not None else None,
+            },
+            "objects": {
+                "ts":     self.objects_ts,
+                "ms":     self.objects_ms,
+                "counts": self.objects,
+            },
+            "gc": {
+                "enabled":     gc.isenabled(),
+                "thresholds":  gc.get_threshold(),
+                "pending":     gc.get_count(),
+                "frozen":      gc.get_freeze_count(),
+                "collections": [s["collections"] for s in gc.get_stats()],
+                "collected":   [s["collected"] for s in gc.get_stats()],
+            },
+            "tracemalloc": self.trace_status(),
+        }
+
+
+install_metrics()
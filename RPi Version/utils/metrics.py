@@ -0,0 +1,338 @@
+# utils/metrics.py
+# Author : Progradius
+# License: AGPL-3.0
+"""
+Métriques in-process (compteurs, jauges, histogrammes) au format texte
+Prometheus, servies sur ``/metrics`` par network/web/server.py.
+
+‣ Chaque module déclare ses métriques à l'import :
+      READS = histogram("phyto_sensor_read_seconds", "…", ("key",))
+  puis observe sur le chemin chaud :
+      READS.labels("BME280T").observe(dt)
+  Les déclarations sont idempotentes (même nom → même objet).
+‣ Coût d'une observation < 1 µs : un accès dict pour l'enfant labellisé,
+  un ``bisect`` pour le bucket, deux additions. Pas de verrou : sous le GIL
+  un incrément concurrent (thread de sondage) peut au pire être perdu.
+‣ Le rendu (scrape) ne lit que des valeurs déjà en mémoire ; les jauges
+  « callback » ne doivent jamais toucher au matériel.
+"""
+
+from __future__ import annotations
+
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Latences (s) : du transfert I²C (≈100 µs) au POST réseau lent (secondes)
+LATENCY_BUCKETS: Tuple[float, ...] = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+    0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+
+def _fmt(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", r"\\").replace('"', r"\"").replace("\n", r"\n")
+
+
+def _labelset(names: Sequence[str], values: Sequence, extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+# ──────────────────────────────────────────────────────────────
+#  Enfants (une série par combinaison de labels)
+# ──────────────────────────────────────────────────────────────
+class _CounterChild:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+
+class _GaugeChild(_CounterChild):
+    __slots__ = ()
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.value -= amount
+
+
+class _Timer:
+    __slots__ = ("_child", "_t0")
+
+    def __init__(self, child: "_HistogramChild"):
+        self._child = child
+
+    def __enter__(self):
+        self._t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self._child.observe(time.perf_counter() - self._t0)
+        return False
+
+
+class _HistogramChild:
+    __slots__ = ("bounds", "counts", "sum")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)       # dernier = +Inf
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+    def time(self) -> _Timer:
+        return _Timer(self)
+
+    @property
+    def count(self) -> int:
+        return sum(self.counts)
+
+
+# ──────────────────────────────────────────────────────────────
+#  Métriques
+# ──────────────────────────────────────────────────────────────
+class _Metric(ABC):
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[tuple, object] = {}
+        self._default = None if self.labelnames else self.labels()
+
+    @abstractmethod
+    def _new_child(self):
+        ...
+
+    def labels(self, *values):
+        """Série pour ces valeurs de labels (créée au premier appel)."""
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} : labels attendus {self.labelnames}, reçu {values}")
+            child = self._children[values] = self._new_child()
+        return child
+
+    def remove(self, *values) -> None:
+        self._children.pop(values, None)
+
+    def reset(self) -> None:
+        """Toutes les séries à zéro (processus fils : valeurs héritées du parent)."""
+        self._children = {}
+        self._default = None if self.labelnames else self.labels()
+
+    @abstractmethod
+    def samples(self) -> Iterable[Tuple[str, str, float]]:
+        ...
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        lines += [f"{name}{labels} {_fmt(value)}" for name, labels, value in self.samples()]
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._default.inc(amount)
+
+    def samples(self):
+        for values, child in list(self._children.items()):
+            yield self.name, _labelset(self.labelnames, values), child.value
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help, labelnames)
+        self._fn: Optional[Callable] = None
+
+    def _new_child(self):
+        return _GaugeChild()
+
+    def set(self, value: float) -> None:
+        self._default.set(value)
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._default.inc(amount)
+
+    def dec(self, amount: float = 1.0) -> None:
+        self._default.dec(amount)
+
+    def reset(self) -> None:
+        super().reset()
+        self._fn = None
+
+    def set_function(self, fn: Callable) -> "Gauge":
+        """
+        Valeur calculée au scrape : ``fn()`` renvoie un nombre (sans labels)
+        ou un dict {tuple de labels: valeur}.
+        """
+        self._fn = fn
+        return self
+
+    def samples(self):
+        if self._fn is not None:
+            try:
+                got = self._fn()
+            except Exception:
+                return
+            if isinstance(got, dict):
+                for values, value in got.items():
+                    yield self.name, _labelset(self.labelnames, values), value
+            else:
+                yield self.name, "", got
+            return
+        for values, child in list(self._children.items()):
+            yield self.name, _labelset(self.labelnames, values), child.value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, help, labelnames)
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self._default.observe(value)
+
+    def time(self) -> _Timer:
+        return self._default.time()
+
+    def samples(self):
+        for values, child in list(self._children.items()):
+            counts, total = list(child.counts), child.sum
+            cumul = 0
+            for bound, n in zip(self.buckets + (float("inf"),), counts):
+                cumul += n
+                yield (f"{self.name}_bucket",
+                       _labelset(self.labelnames, values, f'le="{_fmt(bound)}"'), cumul)
+            labels = _labelset(self.labelnames, values)
+            yield f"{self.name}_sum", labels, total
+            yield f"{self.name}_count", labels, cumul
+
+
+# ──────────────────────────────────────────────────────────────
+#  Registre
+# ──────────────────────────────────────────────────────────────
+class Registry:
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def _get_or_create(self, cls, name: str, help: str, labelnames, **kw):
+        metric = self._metrics.get(name)
+        if metric is None:
+            metric = self._metrics[name] = cls(name, help, labelnames, **kw)
+        elif not isinstance(metric, cls) or metric.labelnames != tuple(labelnames):
+            raise ValueError(f"métrique {name} déjà déclarée différemment")
+        return metric
+
+    def get(self, name: str) -> Optional[_Metric]:
+        return self._metrics.get(name)
+
+    def reset(self) -> None:
+        """
+        Après un fork : compteurs, histogrammes et jauges repartent de zéro ;
+        les jauges calculées sont retirées (elles lisent l'état du parent),
+        au processus fils de réinstaller les siennes.
+        """
+        for metric in list(self._metrics.values()):
+            metric.reset()
+        _process_metrics()
+
+    def render(self) -> str:
+        """Texte d'exposition Prometheus (version 0.0.4)."""
+        lines: List[str] = []
+        for metric in list(self._metrics.values()):
+            lines += metric.render()
+        return "\n".join(lines) + "\n"
+
+    def collect(self) -> List[tuple]:
+        """Familles en données simples (picklables) : (nom, aide, type, échantillons)."""
+        return [(m.name, m.help, m.kind, list(m.samples())) for m in list(self._metrics.values())]
+
+
+REGISTRY = Registry()
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def counter(name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+    return REGISTRY._get_or_create(Counter, name, help, labelnames)
+
+
+def gauge(name: str, help: str, labelnames: Sequence[str] = ()) -> Gauge:
+    return REGISTRY._get_or_create(Gauge, name, help, labelnames)
+
+
+def histogram(name: str, help: str, labelnames: Sequence[str] = (),
+              buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+    return REGISTRY._get_or_create(Histogram, name, help, labelnames, buckets=buckets)
+
+
+def render() -> str:
+    return REGISTRY.render()
+
+
+def render_merged(sources: Dict[str, List[tuple]]) -> str:
+    """
+    Exposition de plusieurs processus ({rôle: REGISTRY.collect()}) : une
+    famille par nom, chaque échantillon étiqueté ``process="<rôle>"``.
+    """
+    families: Dict[str, tuple] = {}
+    series: Dict[str, List[str]] = {}
+    for role, collected in sources.items():
+        tag = f'process="{_escape(role)}"'
+        for name, help, kind, samples in collected:
+            families.setdefault(name, (help, kind))
+            out = series.setdefault(name, [])
+            for sname, labels, value in samples:
+                labels = "{" + tag + ("," + labels[1:] if labels else "}")
+                out.append(f"{sname}{labels} {_fmt(value)}")
+    lines: List[str] = []
+    for name, (help, kind) in families.items():
+        lines += [f"# HELP {name} {help}", f"# TYPE {name} {kind}"] + series[name]
+    return "\n".join(lines) + "\n"
+
+
+# Métriques du processus (valeurs déjà connues, aucun accès /proc au scrape)
+def _process_metrics() -> None:
+    start = time.time()
+    gauge("phyto_process_start_time_seconds", "Epoch de démarrage du processus").set(start)
+    gauge("phyto_process_uptime_seconds", "Secondes depuis le démarrage").set_function(
+        lambda: round(time.time() - start, 3)
+    )
+
+
+_process_metrics()
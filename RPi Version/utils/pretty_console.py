@@ -7,8 +7,11 @@ Gestion unifiée de l'affichage console + log persistants.
 ‣ Couleurs ANSI (fallback sans couleur si le flux n'est pas un TTY)
 ‣ Pictogrammes (Unicode) pour chaque niveau de message
 ‣ Log file persistants via logging (avec rotation)
-‣ Optionnel : support de Rich pour un rendu amélioré
+‣ Optionnel : support de Rich pour un rendu amélioré (import paresseux,
+  désactivable via PHYTO_RICH=0 ; hook de traceback sur demande seulement)
 ‣ Filtrage dynamique du niveau de log console (LOG_LEVEL_CONSOLE)
+‣ Publication de chaque message sur le bus in-process (utils.log_bus)
+  → consommé directement par la console web (/console/stream)
 """
 
 import sys
@@ -18,38 +21,62 @@ import logging
 from logging.handlers import RotatingFileHandler
 import os
 
+from utils.log_bus import log_bus
+
 # ───────────────────────────────────────────────────────────────
 #  Paramètres globaux
 # ───────────────────────────────────────────────────────────────
 LOG_DIR = os.path.join(os.path.dirname(__file__), "..", "logs")
-os.makedirs(LOG_DIR, exist_ok=True)
 LOG_FILE = os.path.join(LOG_DIR, "phyto.log")
 
 # Niveau de log visible en console (modifiable dynamiquement)
 LOG_LEVEL_CONSOLE = logging.INFO  # DEBUG=10, INFO=20, WARNING=30, ERROR=40
 
-# Activation Rich si présent
-USE_RICH = False
-try:
-    from rich.console import Console as RichConsole
+# Silence total (console, bus, fichier) : rejeu accéléré, bancs de mesure
+_MUTED = False
+
+# Rich : résolu au premier affichage (None = pas encore tenté)
+_rich_console = None
+
+def _rich():
+    """Console Rich si disponible et autorisée, sinon None (import paresseux)."""
+    global _rich_console
+    if _rich_console is None:
+        _rich_console = False
+        if os.getenv("PHYTO_RICH", "1") != "0":
+            try:
+                from rich.console import Console as RichConsole
+                _rich_console = RichConsole()
+            except ImportError:
+                pass
+    return _rich_console or None
+
+def install_rich_traceback() -> bool:
+    """Installe le hook de traceback Rich (appel explicite de l'application)."""
+    if _rich() is None:
+        return False
     from rich.traceback import install as rich_traceback
-    rich_console = RichConsole()
     rich_traceback()
-    USE_RICH = True
-except ImportError:
-    pass
+    return True
 
 # ───────────────────────────────────────────────────────────────
-#  Logger principal
+#  Logger principal (fichier ouvert au premier message)
 # ───────────────────────────────────────────────────────────────
 logger = logging.getLogger("phyto")
 logger.setLevel(logging.DEBUG)
 
-file_handler = RotatingFileHandler(LOG_FILE, maxBytes=1_000_000, backupCount=5)
-file_handler.setFormatter(logging.Formatter(
-    "%(asctime)s [%(levelname)s] %(message)s", "%Y-%m-%d %H:%M:%S"
-))
-logger.addHandler(file_handler)
+_file_handler = None
+
+def _file_logger() -> logging.Logger:
+    global _file_handler
+    if _file_handler is None:
+        os.makedirs(LOG_DIR, exist_ok=True)
+        _file_handler = RotatingFileHandler(LOG_FILE, maxBytes=1_000_000, backupCount=5)
+        _file_handler.setFormatter(logging.Formatter(
+            "%(asctime)s [%(levelname)s] %(message)s", "%Y-%m-%d %H:%M:%S"
+        ))
+        logger.addHandler(_file_handler)
+    return logger
 
 # ───────────────────────────────────────────────────────────────
 #  Palette ANSI (console standard)
@@ -69,11 +96,15 @@ class _Ansi:
         "white"   : '\033[97m',
     }
 
-USE_COLOR = sys.stdout.isatty() and not USE_RICH
-
 def _c(text, color=None, *, bold=False, dim=False):
     """Applique couleur et attributs ANSI si autorisé (hors rich)."""
-    if not USE_COLOR or color not in _Ansi.FG:
+    if not sys.stdout.isatty() or _rich() is not None:
+        return text
+    return _ansi(text, color, bold=bold, dim=dim)
+
+def _ansi(text, color=None, *, bold=False, dim=False):
+    """Couleur ANSI inconditionnelle (rendu xterm.js de la console web)."""
+    if color not in _Ansi.FG:
         return text
     style = ""
     if bold: style += _Ansi.BOLD
@@ -105,6 +136,7 @@ def _should_display(level: int) -> bool:
     return level >= LOG_LEVEL_CONSOLE
 
 def _log_to_file(level, msg: str):
+    logger = _file_logger()
     if level == logging.INFO:
         logger.info(msg)
     elif level == logging.WARNING:
@@ -115,12 +147,20 @@ def _log_to_file(level, msg: str):
         logger.debug(msg)
 
 def _print(level_name: str, msg: str, color: str, *, level=logging.INFO, **kwargs):
+    if _MUTED:
+        return
     icon = ICONS.get(level_name, "")
     if _should_display(level):
-        if USE_RICH:
+        rich_console = _rich()
+        if rich_console:
             rich_console.print(f"[bold {color}]{icon} {msg}[/]", highlight=False)
         else:
             print(f"{_stamp()} {_c(icon, color)} {_c(msg, color, **kwargs)}")
+        stamp = _ansi(datetime.now().strftime("%H:%M:%S"), "grey", dim=True)
+        log_bus.publish(
+            level_name, msg,
+            f"{stamp} {_ansi(icon, color)} {_ansi(msg, color, **kwargs)}",
+        )
     _log_to_file(level, msg)
 
 # ─── Interfaces externes ───────────────────────────────────────
@@ -128,7 +168,12 @@ def set_console_log_level(level: int):
     """Change dynamiquement le niveau de log affiché en console."""
     global LOG_LEVEL_CONSOLE
     LOG_LEVEL_CONSOLE = level
-    logger.info(f"[Logger] Niveau console changé : {logging.getLevelName(level)}")
+    _file_logger().info(f"[Logger] Niveau console changé : {logging.getLevelName(level)}")
+
+def mute(flag: bool = True) -> None:
+    """Coupe (ou rétablit) toute sortie : console, console web et fichier."""
+    global _MUTED
+    _MUTED = flag
 
 def info(msg):     _print("info",    msg, "blue",    level=logging.INFO)
 def success(msg):  _print("success", msg, "green",   level=logging.INFO)
@@ -141,24 +186,33 @@ def clock(msg):    _print("clock",   msg, "magenta", level=logging.INFO)
 #  Titres & cadres
 # ───────────────────────────────────────────────────────────────
 def title(text, *, char="═"):
+    if _MUTED:
+        return
     width = shutil.get_terminal_size((80, 20)).columns
     bar   = char * width
     text  = f" {text} "
     mid   = text.center(width, char)
-    if USE_RICH:
+    rich_console = _rich()
+    if rich_console:
         rich_console.rule(text, style="bold magenta")
     else:
         print(_c(bar, "magenta", bold=True))
         print(_c(mid, "magenta", bold=True))
         print(_c(bar, "magenta", bold=True))
-    logger.info(f"[TITLE] {text.strip()}")
+    log_bus.publish("title", text.strip(), "\n".join(
+        _ansi(l, "magenta", bold=True) for l in (bar, mid, bar)
+    ))
+    _file_logger().info(f"[TITLE] {text.strip()}")
 
 def box(text: str, *, color="white"):
+    if _MUTED:
+        return
     lines = text.splitlines() or [""]
     maxi  = max(len(l) for l in lines)
     top   = f"╔{'═'*(maxi+2)}╗"
     bot   = f"╚{'═'*(maxi+2)}╝"
-    if USE_RICH:
+    rich_console = _rich()
+    if rich_console:
         rich_console.print(top, style=color)
         for line in lines:
             rich_console.print(f"║ {line.ljust(maxi)} ║", style=color)
@@ -168,4 +222,6 @@ def box(text: str, *, color="white"):
         for line in lines:
             print(_c(f"║ {line.ljust(maxi)} ║", color))
         print(_c(bot, color))
-    logger.info(f"[BOX]\n{text}")
\ No newline at end of file
+    framed = [top, *(f"║ {line.ljust(maxi)} ║" for line in lines), bot]
+    log_bus.publish("box", text, "\n".join(_ansi(l, color) for l in framed))
+    _file_logger().info(f"[BOX]\n{text}")
\ No newline at end of file
@@ -0,0 +1,255 @@
+# utils/profiler.py
+# Author : Progradius
+# License: AGPL-3.0
+"""
+Profilage statistique à la demande (/debug/profile) et état des tâches
+asyncio (/debug/tasks).
+
+‣ Un thread échantillonneur lit ``sys._current_frames()`` à ``hz`` Hz et
+  compte les piles de TOUS les threads (hors lui-même). Pour le thread de
+  la boucle, la tâche asyncio courante est insérée sous la racine : les
+  piles sont attribuées comme dans LoopMonitor.
+‣ Résultat : piles « repliées » (une ligne ``racine;f1;f2 N``, directement
+  consommable par flamegraph.pl / speedscope) + tableau top-N (temps
+  propre = feuille, temps total = fonction présente sur la pile).
+‣ Mémoire bornée : au plus ``max_stacks`` piles distinctes (le surplus est
+  compté sous « [table pleine] »), profondeur ``max_depth``. Durée bornée
+  par l'appelant, un seul profil à la fois par processus.
+‣ Coût : une capture par échantillon ; le temps passé à échantillonner
+  est mesuré et renvoyé (``overhead_pct``).
+
+Variables d'environnement :
+    PHYTO_PROFILE_HZ   fréquence d'échantillonnage par défaut   (défaut 100)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional
+
+from utils.metrics import counter
+
+_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+_SAMPLES = counter("phyto_profiler_samples_total", "Échantillons pris par le profileur")
+
+MAX_HZ = 1000
+
+
+def default_hz() -> int:
+    try:
+        return max(1, min(MAX_HZ, int(os.getenv("PHYTO_PROFILE_HZ", "100"))))
+    except ValueError:
+        return 100
+
+
+class ProfilerBusy(RuntimeError):
+    """Un profil est déjà en cours dans ce processus."""
+
+
+def _short(filename: str) -> str:
+    path = os.path.abspath(filename)
+    if path.startswith(_ROOT + os.sep) and "site-packages" not in path:
+        return os.path.relpath(path, _ROOT)
+    return os.path.basename(filename)
+
+
+# ──────────────────────────────────────────────────────────────
+#  Échantillonneur
+# ──────────────────────────────────────────────────────────────
+class SamplingProfiler:
+
+    def __init__(self, hz: Optional[int] = None, *, max_stacks: int = 2000, max_depth: int = 48,
+                 loop: Optional[asyncio.AbstractEventLoop] = None, loop_thread: Optional[int] = None):
+        self.hz = max(1, min(MAX_HZ, hz or default_hz()))
+        self.max_stacks = max_stacks
+        self.max_depth = max_depth
+        self.loop = loop
+        self.loop_thread = loop_thread
+
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.truncated = 0
+        self._labels: Dict[object, str] = {}          # code → « fichier:fonction »
+        self._threads: Dict[int, str] = {}
+        self._cost = 0.0
+        self._t0 = self._t1 = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "SamplingProfiler":
+        self._t0 = time.monotonic()
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+        self._t1 = time.monotonic()
+
+    # ──────────────────────────────────────────────────────────
+    def _run(self) -> None:
+        interval = 1.0 / self.hz
+        me = threading.get_ident()
+        next_names = 0.0
+        while not self._stop.wait(interval):
+            t0 = time.perf_counter()
+            if t0 >= next_names:                      # noms de threads : 1×/s suffit
+                self._threads = {t.ident: t.name for t in threading.enumerate()}
+                next_names = t0 + 1.0
+            self._sample(me)
+            self._cost += time.perf_counter() - t0
+
+    def _label(self, code) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            label = self._labels[code] = f"{_short(code.co_filename)}:{code.co_name}"
+        return label
+
+    def _task_name(self) -> Optional[str]:
+        try:
+            task = asyncio.current_task(self.loop)
+        except RuntimeError:
+            return None
+        return task.get_name() if task is not None else None
+
+    def _sample(self, me: int) -> None:
+        for tid, frame in sys._current_frames().items():
+            if tid == me:
+                continue
+            names = []
+            while frame is not None and len(names) < self.max_depth:
+                names.append(self._label(frame.f_code))
+                frame = frame.f_back
+            names.reverse()
+
+            root = self._threads.get(tid, f"thread-{tid}")
+            if tid == self.loop_thread and self.loop is not None:
+                task = self._task_name()
+                root = f"{root};task:{task}" if task else f"{root};(boucle)"
+            key = root + ";" + ";".join(names)
+
+            if key in self.stacks or len(self.stacks) < self.max_stacks:
+                self.stacks[key] += 1
+            else:
+                self.stacks[f"{root};[table pleine]"] += 1
+                self.truncated += 1
+        self.samples += 1
+        _SAMPLES.inc()
+
+    # ──────────────────────────────────────────────────────────
+    #  Rapport
+    # ──────────────────────────────────────────────────────────
+    def collapsed(self) -> str:
+        """Format « piles repliées » (Brendan Gregg), une pile par ligne."""
+        return "\n".join(f"{k} {n}" for k, n in self.stacks.most_common()) + "\n"
+
+    def top(self, n: int = 25) -> List[dict]:
+        own: Counter = Counter()
+        total: Counter = Counter()
+        for key, count in self.stacks.items():
+            frames = [f for f in key.split(";") if ":" in f and not f.startswith("task:")]
+            if not frames:
+                continue
+            own[frames[-1]] += count
+            for func in set(frames):
+                total[func] += count
+        seen = sum(self.stacks.values()) or 1
+        return [
+            {
+                "function":  func,
+                "self":      own[func],
+                "self_pct":  round(own[func] * 100 / seen, 1),
+                "total":     total[func],
+                "total_pct": round(total[func] * 100 / seen, 1),
+            }
+            for func, _ in own.most_common(n)
+        ]
+
+    def to_dict(self, top: int = 25) -> dict:
+        duration = (self._t1 or time.monotonic()) - self._t0
+        return {
+            "duration_s":   round(duration, 2),
+            "hz":           self.hz,
+            "samples":      self.samples,
+            "stacks":       len(self.stacks),
+            "truncated":    self.truncated,
+            "overhead_pct": round(self._cost * 100 / duration, 2) if duration > 0 else None,
+            "top":          self.top(top),
+            "collapsed":    self.collapsed(),
+        }
+
+
+# ──────────────────────────────────────────────────────────────
+#  Tâches asyncio
+# ──────────────────────────────────────────────────────────────
+def _await_chain(task: asyncio.Task, limit: int = 20) -> tuple:
+    """Frames de la chaîne d'await (extérieure → intérieure) et l'objet attendu."""
+    chain = []
+    coro = task.get_coro()
+    awaiting = None
+    while coro is not None and len(chain) < limit:
+        frame = getattr(coro, "cr_frame", None) or getattr(coro, "gi_frame", None)
+        if frame is not None:
+            chain.append(f"{_short(frame.f_code.co_filename)}:{frame.f_lineno} {frame.f_code.co_name}")
+        nxt = getattr(coro, "cr_await", None)
+        if nxt is None:
+            nxt = getattr(coro, "gi_yieldfrom", None)
+        if nxt is not None and not (hasattr(nxt, "cr_frame") or hasattr(nxt, "gi_frame")):
+            awaiting = type(nxt).__name__
+            break
+        coro = nxt
+    return chain, awaiting
+
+
+def task_report(loop: Optional[asyncio.AbstractEventLoop] = None) -> List[dict]:
+    """Toutes les tâches de la boucle avec leur point d'attente courant."""
+    loop = loop or asyncio.get_running_loop()
+    current = asyncio.current_task(loop)
+    out = []
+    for task in asyncio.all_tasks(loop):
+        coro = task.get_coro()
+        chain, awaiting = _await_chain(task)
+        out.append({
+            "name":     task.get_name(),
+            "coro":     getattr(coro, "__qualname__", None) or repr(coro),
+            "state":    "running" if task is current else ("done" if task.done() else "pending"),
+            "await_at": chain[-1] if chain else None,
+            "awaiting": awaiting,
+            "chain":    chain,
+        })
+    return sorted(out, key=lambda t: t["name"])
+
+
+# ──────────────────────────────────────────────────────────────
+#  Point d'accès /debug d'un processus
+# ──────────────────────────────────────────────────────────────
+class DebugProbe:
+    """Un profil à la fois ; à appeler depuis le thread de la boucle."""
+
+    def __init__(self):
+        self._active: Optional[SamplingProfiler] = None
+
+    def profile_start(self, hz: Optional[int] = None) -> int:
+        if self._active is not None:
+            raise ProfilerBusy("un profil est déjà en cours")
+        self._active = SamplingProfiler(
+            hz, loop=asyncio.get_running_loop(), loop_thread=threading.get_ident()
+        ).start()
+        return self._active.hz
+
+    def profile_stop(self, top: int = 25) -> dict:
+        prof, self._active = self._active, None
+        if prof is None:
+            raise ProfilerBusy("aucun profil en cours")
+        prof.stop()
+        return prof.to_dict(top)
+
+    def tasks(self) -> List[dict]:
+        return task_report()
@@ -0,0 +1,175 @@
+# utils/shared_state.py
+# Author : Progradius
+# License: AGPL-3.0
+"""
+Instantané d'état partagé entre processus (mode multi-processus).
+
+‣ Un segment ``multiprocessing.shared_memory`` à disposition FIXE, décrite
+  par un seul ``struct.Struct`` : une fiche par clé capteur (valeur, epoch,
+  valeur filtrée, drapeaux + santé du périphérique), une par sortie relais (état, broche),
+  la vitesse moteur.
+  Les lecteurs décodent sans sérialisation ni appel système.
+‣ Un seul écrivain (processus de contrôle), protégé par un *seqlock* :
+      seq impair  → écriture en cours
+      seq pair    → instantané cohérent
+  Le lecteur relit si seq a changé pendant sa lecture ; un CRC32 du corps
+  couvre en plus l'absence de barrière mémoire explicite côté Python (ARM).
+‣ En-tête : seq, epoch de publication, génération de config (incrémentée
+  à chaque patch appliqué → les autres rôles rechargent param.json).
+‣ La disposition est figée à la création ; les processus fils (fork)
+  héritent de l'objet et donc du mapping.
+"""
+
+from __future__ import annotations
+
+import struct
+import time
+import zlib
+from multiprocessing import shared_memory
+from typing import Dict, Optional, Sequence, Tuple
+
+_HEADER = struct.Struct("<QdII")            # seq, ts, config_gen, crc32
+_SEQ = struct.Struct("<Q")
+
+# drapeaux d'une fiche capteur
+HAS_VALUE = 0x01
+ENABLED = 0x02
+HEALTH_SHIFT = 2                            # bits 2-3 : index dans DeviceHealth.STATES
+HEALTH_MASK = 0x0C
+HAS_FILTERED = 0x10
+
+
+class SnapshotBusy(RuntimeError):
+    """Aucun instantané cohérent obtenu (écrivain trop actif ou mort en écriture)."""
+
+
+class StateSegment:
+
+    def __init__(self, sensor_keys: Sequence[str], outlet_names: Sequence[str],
+                 shm: Optional[shared_memory.SharedMemory] = None):
+        self.sensor_keys: Tuple[str, ...] = tuple(sensor_keys)
+        self.outlet_names: Tuple[str, ...] = tuple(outlet_names)
+        self._body = struct.Struct(
+            "<" + "dddB" * len(self.sensor_keys) + "bh" * len(self.outlet_names) + "b"
+        )
+        self.size = _HEADER.size + self._body.size
+        self.shm = shm or shared_memory.SharedMemory(create=True, size=self.size)
+        self._buf = self.shm.buf
+        self._seq = 0
+        self.config_gen = 0
+
+        # cache lecteur : (seq, instantané décodé)
+        self._last: Tuple[int, Optional[dict]] = (-1, None)
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    # ──────────────────────────────────────────────────────────
+    #  Écrivain (processus de contrôle uniquement)
+    # ──────────────────────────────────────────────────────────
+    def write(
+        self,
+        sensors: Dict[str, Tuple[Optional[float], Optional[float], bool, int, Optional[float]]],
+        outlets: Dict[str, Tuple[Optional[int], int]],
+        motor_speed: Optional[int],
+    ) -> None:
+        """
+        sensors : clé → (valeur, epoch, activé, code santé, valeur filtrée) ;
+        outlets : nom → (état, broche). Les clés absentes sont publiées vides.
+        """
+        fields = []
+        for key in self.sensor_keys:
+            value, ts, enabled, health, filtered = sensors.get(key, (None, None, False, 0, None))
+            flags = ((ENABLED if enabled else 0) | (HAS_VALUE if value is not None else 0)
+                     | (HAS_FILTERED if filtered is not None else 0)
+                     | ((health << HEALTH_SHIFT) & HEALTH_MASK))
+            fields += (float(value) if value is not None else 0.0, ts or 0.0,
+                       float(filtered) if filtered is not None else 0.0, flags)
+        for name in self.outlet_names:
+            state, pin = outlets.get(name, (None, -1))
+            fields += (-1 if state is None else int(state), pin)
+        fields.append(-1 if motor_speed is None else int(motor_speed))
+
+        body = self._body.pack(*fields)
+        self._seq += 1                                   # impair : écriture en cours
+        _SEQ.pack_into(self._buf, 0, self._seq)
+        self._buf[_HEADER.size:self.size] = body
+        _HEADER.pack_into(self._buf, 0, self._seq, time.time(), self.config_gen, zlib.crc32(body))
+        self._seq += 1                                   # pair : cohérent
+        _SEQ.pack_into(self._buf, 0, self._seq)
+
+    def bump_config(self) -> int:
+        """Nouvelle génération de config (publiée au prochain ``write``)."""
+        self.config_gen += 1
+        return self.config_gen
+
+    # ──────────────────────────────────────────────────────────
+    #  Lecteurs
+    # ──────────────────────────────────────────────────────────
+    def seq(self) -> int:
+        return _SEQ.unpack_from(self._buf, 0)[0]
+
+    def read(self, retries: int = 100) -> dict:
+        """
+        Instantané cohérent :
+            {"seq", "ts", "config_gen",
+             "sensors": {clé: (valeur|None, epoch|None, activé, code santé, filtrée|None)},
+             "outlets": {nom: (état|None, broche)}, "motor": vitesse|None}
+        Décodé une seule fois par seq (les lectures suivantes sont gratuites).
+        """
+        for _ in range(retries):
+            seq = self.seq()
+            if seq == self._last[0] and self._last[1] is not None:
+                return self._last[1]
+            if seq & 1:
+                time.sleep(0)                            # écrivain au milieu d'un write
+                continue
+            _, ts, gen, crc = _HEADER.unpack_from(self._buf, 0)
+            body = bytes(self._buf[_HEADER.size:self.size])
+            if self.seq() != seq or zlib.crc32(body) != crc:
+                continue
+            snap = self._decode(seq, ts, gen, body)
+            self._last = (seq, snap)
+            return snap
+        raise SnapshotBusy(f"instantané partagé illisible après {retries} essais")
+
+    def _decode(self, seq: int, ts: float, gen: int, body: bytes) -> dict:
+        fields = self._body.unpack(body)
+        sensors = {}
+        i = 0
+        for key in self.sensor_keys:
+            value, when, filtered, flags = fields[i:i + 4]
+            i += 4
+            has = bool(flags & HAS_VALUE)
+            sensors[key] = (value if has else None, when if has else None, bool(flags & ENABLED),
+                            (flags & HEALTH_MASK) >> HEALTH_SHIFT,
+                            filtered if flags & HAS_FILTERED else None)
+        outlets = {}
+        for name in self.outlet_names:
+            state, pin = fields[i:i + 2]
+            i += 2
+            outlets[name] = (None if state < 0 else state, pin)
+        motor = fields[i]
+        return {
+            "seq":        seq,
+            "ts":         ts,
+            "config_gen": gen,
+            "sensors":    sensors,
+            "outlets":    outlets,
+            "motor":      None if motor < 0 else motor,
+        }
+
+    # ──────────────────────────────────────────────────────────
+    def close(self, unlink: bool = False) -> None:
+        """Détache le mapping ; *unlink* (créateur seulement) supprime le segment."""
+        self._buf = None
+        try:
+            self.shm.close()
+        except BufferError:
+            pass
+        if unlink:
+            try:
+                self.shm.unlink()
+            except FileNotFoundError:
+                pass
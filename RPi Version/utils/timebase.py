@@ -0,0 +1,190 @@
+# utils/timebase.py
+# Author : Progradius
+# License: AGPL-3.0
+"""
+Horloge injectable pour les boucles de contrôle.
+
+‣ ``SystemClock`` : heure murale + ``asyncio.sleep`` (production).
+‣ ``VirtualClock`` : temps simulé. Il possède sa propre boucle asyncio
+  (``VirtualTimeLoop``) dont ``time()`` est virtuel : dès qu'aucune tâche
+  n'est prête, l'horloge saute directement à l'échéance du prochain timer.
+  Des semaines de ``await clock.sleep(...)`` s'exécutent donc en quelques
+  secondes, de façon déterministe.
+
+Les boucles reçoivent ``clock=`` (défaut ``SYSTEM_CLOCK``) et n'appellent
+plus ``datetime.now()`` / ``asyncio.sleep`` directement.
+
+``wait(event, seconds)`` : comme ``sleep`` mais réveillé plus tôt par un
+évènement (boucles pilotées par les changements, model/Zone.py).
+
+``MeteredClock`` enveloppe une horloge pour une boucle donnée : chaque
+période d'éveil (entre deux ``sleep`` / ``wait``) est une itération mesurée
+(``phyto_loop_iteration_seconds``) et un battement est noté dans
+``HEARTBEATS`` (lu par le superviseur).
+
+Limite : en temps virtuel, tout travail déporté dans un thread
+(``asyncio.to_thread``) est vu comme instantané par l'horloge.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import time
+from abc import ABC, abstractmethod
+from datetime import date, datetime, timedelta
+from typing import Awaitable, Optional, TypeVar
+
+from utils.metrics import counter, histogram
+
+T = TypeVar("T")
+
+_LOOP_SECONDS = histogram(
+    "phyto_loop_iteration_seconds", "Temps actif d'une itération de boucle de contrôle", ("loop",)
+)
+_LOOP_ITERATIONS = counter("phyto_loop_iterations_total", "Itérations des boucles de contrôle", ("loop",))
+
+# Battements des boucles : nom → (dernier battement, prochain réveil attendu),
+# en secondes time.monotonic() (temps réel, même sous VirtualClock).
+HEARTBEATS: dict[str, tuple[float, float]] = {}
+
+
+class Clock(ABC):
+    """Interface minimale utilisée par les boucles de contrôle."""
+
+    @abstractmethod
+    def now(self) -> datetime:
+        ...
+
+    def today(self) -> date:
+        return self.now().date()
+
+    @abstractmethod
+    def monotonic(self) -> float:
+        ...
+
+    async def sleep(self, seconds: float) -> None:
+        await asyncio.sleep(max(0.0, seconds))
+
+    async def wait(self, event: asyncio.Event, seconds: float) -> bool:
+        """Attend *event* au plus *seconds* ; True s'il est arrivé."""
+        if event.is_set():
+            return True
+        try:
+            await asyncio.wait_for(event.wait(), max(0.0, seconds))
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+
+class SystemClock(Clock):
+
+    def now(self) -> datetime:
+        return datetime.now()
+
+    def monotonic(self) -> float:
+        return time.monotonic()
+
+
+SYSTEM_CLOCK = SystemClock()
+
+
+class MeteredClock(Clock):
+    """Délègue à *clock* et mesure le temps actif de la boucle *name*."""
+
+    def __init__(self, clock: Clock, name: str):
+        self._clock = clock
+        self._name = name
+        self._busy = _LOOP_SECONDS.labels(name)
+        self._iterations = _LOOP_ITERATIONS.labels(name)
+        self._awake = time.perf_counter()
+
+    def now(self) -> datetime:
+        return self._clock.now()
+
+    def today(self) -> date:
+        return self._clock.today()
+
+    def monotonic(self) -> float:
+        return self._clock.monotonic()
+
+    async def sleep(self, seconds: float) -> None:
+        await self._metered(self._clock.sleep(seconds), seconds)
+
+    async def wait(self, event: asyncio.Event, seconds: float) -> bool:
+        return await self._metered(self._clock.wait(event, seconds), seconds)
+
+    async def _metered(self, pause: Awaitable[T], seconds: float) -> T:
+        self._busy.observe(time.perf_counter() - self._awake)
+        self._iterations.inc()
+        now = time.monotonic()
+        HEARTBEATS[self._name] = (now, now + max(0.0, seconds))
+        try:
+            return await pause
+        finally:
+            self._awake = time.perf_counter()
+            now = time.monotonic()
+            HEARTBEATS[self._name] = (now, now)
+
+
+# ──────────────────────────────────────────────────────────────
+#  Temps virtuel
+# ──────────────────────────────────────────────────────────────
+class VirtualTimeLoop(asyncio.SelectorEventLoop):
+    """
+    Boucle asyncio à temps virtuel : quand la file des callbacks prêts est
+    vide, le temps avance jusqu'au prochain timer programmé au lieu
+    d'attendre. (S'appuie sur ``_ready`` / ``_scheduled`` de BaseEventLoop,
+    stables de CPython 3.8 à 3.13.)
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._virtual = 0.0
+
+    def time(self) -> float:
+        return self._virtual
+
+    def advance(self, seconds: float) -> None:
+        self._virtual += max(0.0, seconds)
+
+    def _run_once(self):
+        # timers annulés en tête : retirés pour ne pas faire sauter le temps
+        while self._scheduled and self._scheduled[0]._cancelled:
+            self._timer_cancelled_count -= 1
+            heapq.heappop(self._scheduled)._scheduled = False
+        if not self._ready and self._scheduled:
+            when = self._scheduled[0]._when
+            if when > self._virtual:
+                self._virtual = when
+        super()._run_once()
+
+
+class VirtualClock(Clock):
+    """
+    Horloge simulée démarrant à *start* ; à utiliser avec ``run()`` qui
+    exécute une coroutine sur la ``VirtualTimeLoop`` associée.
+    """
+
+    def __init__(self, start: Optional[datetime] = None):
+        self.start = start or datetime(2024, 1, 1)
+        self.loop = VirtualTimeLoop()
+
+    def now(self) -> datetime:
+        return self.start + timedelta(seconds=self.loop.time())
+
+    def monotonic(self) -> float:
+        return self.loop.time()
+
+    def elapsed(self) -> float:
+        return self.loop.time()
+
+    def run(self, coro: Awaitable[T]) -> T:
+        asyncio.set_event_loop(self.loop)
+        try:
+            return self.loop.run_until_complete(coro)
+        finally:
+            asyncio.set_event_loop(None)
+
+    def close(self) -> None:
+        self.loop.close()